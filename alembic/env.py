@@ -24,6 +24,7 @@ from app.database import models  # Основные модели
 from app.database import daily_tasks_models  # Модели ежедневных задач
 from app.database import work_journal_models  # Модели журнала работ (если есть)
 from app.database import user_tasks_models  # Модели кэша пользовательских задач
+from app.database import scheduler_models  # Состояние планировщика задач
 
 target_metadata = Base.metadata
 
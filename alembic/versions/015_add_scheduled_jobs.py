@@ -0,0 +1,32 @@
+"""Add scheduled_jobs table for the persistent job scheduler
+
+Revision ID: 015_scheduled_jobs
+Revises: 014_add_yaroslav
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '015_scheduled_jobs'
+down_revision = '014_add_yaroslav'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'scheduled_jobs',
+        sa.Column('name', sa.String(100), primary_key=True),
+        sa.Column('next_run_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_status', sa.String(20), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('last_duration_ms', sa.Integer(), nullable=True),
+        sa.Column('run_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('locked_by', sa.String(100), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scheduled_jobs')
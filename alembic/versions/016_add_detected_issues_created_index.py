@@ -0,0 +1,20 @@
+"""Index detected_issues.created_at for /ai_quality window aggregation
+
+Revision ID: 016_detected_created_idx
+Revises: 015_scheduled_jobs
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = '016_detected_created_idx'
+down_revision = '015_scheduled_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_detected_issues_created', 'detected_issues', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_detected_issues_created', table_name='detected_issues')
@@ -0,0 +1,25 @@
+"""Add content fingerprint to work_journal_entries for incremental Sheets import
+
+Revision ID: 017_journal_fingerprint
+Revises: 016_detected_created_idx
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '017_journal_fingerprint'
+down_revision = '016_detected_created_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('work_journal_entries', sa.Column('content_fingerprint', sa.String(32), nullable=True))
+    op.create_index(
+        'uq_work_journal_fingerprint', 'work_journal_entries', ['content_fingerprint'], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_work_journal_fingerprint', table_name='work_journal_entries')
+    op.drop_column('work_journal_entries', 'content_fingerprint')
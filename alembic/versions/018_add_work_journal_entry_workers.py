@@ -0,0 +1,84 @@
+"""Normalised entry-worker table and trigram indexes for work journal search
+
+Revision ID: 018_journal_entry_workers
+Revises: 017_journal_fingerprint
+Create Date: 2026-10-16
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '018_journal_entry_workers'
+down_revision = '017_journal_fingerprint'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 1000
+
+
+def _worker_names(raw):
+    """worker_names column: JSON array, or a plain name in old rows"""
+    try:
+        names = json.loads(raw)
+    except (TypeError, ValueError):
+        names = [raw]
+    if not isinstance(names, list):
+        names = [names]
+    return list(dict.fromkeys(str(n).strip() for n in names if n and str(n).strip()))
+
+
+def upgrade() -> None:
+    op.create_table(
+        'work_journal_entry_workers',
+        sa.Column('entry_id', sa.Integer(),
+                  sa.ForeignKey('work_journal_entries.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('worker_name', sa.String(255), primary_key=True),
+        sa.Column('worker_key', sa.String(255), nullable=False),
+    )
+    op.create_index(
+        'idx_journal_entry_workers_key', 'work_journal_entry_workers', ['worker_key', 'entry_id']
+    )
+
+    # Backfill from the JSON column
+    bind = op.get_bind()
+    links = sa.table(
+        'work_journal_entry_workers',
+        sa.column('entry_id'), sa.column('worker_name'), sa.column('worker_key'),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT id, worker_names FROM work_journal_entries WHERE id > :last_id ORDER BY id LIMIT :batch"
+        ), {"last_id": last_id, "batch": BACKFILL_BATCH}).fetchall()
+        if not rows:
+            break
+        values = [
+            {
+                'entry_id': entry_id,
+                'worker_name': name[:255],
+                'worker_key': ' '.join(name.lower().replace('ё', 'е').split())[:255],
+            }
+            for entry_id, raw in rows
+            for name in _worker_names(raw)
+        ]
+        if values:
+            op.bulk_insert(links, values)
+        last_id = rows[-1][0]
+
+    if bind.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute(
+            'CREATE INDEX idx_work_journal_company_trgm ON work_journal_entries '
+            'USING gin (company gin_trgm_ops)'
+        )
+        op.execute(
+            'CREATE INDEX idx_journal_entry_workers_key_trgm ON work_journal_entry_workers '
+            'USING gin (worker_key gin_trgm_ops)'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS idx_work_journal_company_trgm')
+    op.drop_table('work_journal_entry_workers')
@@ -0,0 +1,21 @@
+"""Add ai_verdict to chat_messages (problem pre-filter training labels)
+
+Revision ID: 019_chat_message_ai_verdict
+Revises: 018_journal_entry_workers
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '019_chat_message_ai_verdict'
+down_revision = '018_journal_entry_workers'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_messages', sa.Column('ai_verdict', sa.String(20), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('chat_messages', 'ai_verdict')
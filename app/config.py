@@ -2,7 +2,8 @@
 Конфигурация приложения
 """
 import os
-from typing import Optional, List
+from functools import cached_property
+from typing import FrozenSet, Optional, List, Tuple
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
@@ -48,6 +49,14 @@ class Settings(BaseSettings):
     ai_task_detection_enabled: bool = True  # Включить автодетект задач в чатах
     ai_task_detection_min_confidence: int = 70  # Минимальная уверенность для автосоздания
     ai_task_detection_rate_limit: int = 10  # Запросов на чат в минуту
+    chat_message_flush_size: int = 100  # Сообщений чата в одном INSERT
+    chat_message_flush_interval: float = 1.0  # Секунд между сбросами буфера сообщений
+    problem_detection_batch_window: float = 3.0  # Секунд накопления сообщений чата в один AI запрос
+    problem_detection_batch_size: int = 10  # Максимум сообщений в одном AI запросе
+    problem_prefilter_enabled: bool = True  # Локальный фильтр перед AI детекцией проблем
+    problem_prefilter_min_recall: float = 0.98  # Целевой recall при выборе порога
+    problem_prefilter_audit_rate: float = 0.05  # Доля отсеянных сообщений, всё равно проверяемых AI
+    problem_prefilter_retrain_interval: int = 86400  # Переобучение модели (сек)
     
     # Group Notifications
     work_journal_group_chat_id: Optional[int] = None
@@ -62,11 +71,29 @@ class Settings(BaseSettings):
     plane_chat_id: Optional[int] = None
     plane_topic_id: Optional[int] = None
     plane_webhook_secret: Optional[str] = None
+
+    # Приём апдейтов Telegram: polling (по умолчанию) или webhook на общем aiohttp сервере
+    webhook_port: int = 8080  # Порт aiohttp сервера (n8n, Plane, Telegram)
+    use_webhook: bool = False  # True — Telegram шлёт апдейты на webhook_url вместо getUpdates
+    webhook_url: Optional[str] = None  # Публичный URL, напр. https://bot.example.com/webhooks/telegram
+    webhook_secret: Optional[str] = None  # X-Telegram-Bot-Api-Secret-Token (по умолчанию — из токена бота)
+    webhook_max_concurrency: int = 20  # Апдейтов, обрабатываемых одновременно
+    webhook_slot_timeout: float = 10.0  # Сек. ожидания свободного слота, затем 503 (Telegram повторит)
     
     # Plane API Configuration
     plane_api_url: Optional[str] = None  # e.g., https://plane.hhivp.com
     plane_api_token: Optional[str] = None
     plane_workspace_slug: Optional[str] = None  # e.g., hhivp
+    plane_issue_index_ttl: int = 120  # Секунд между обновлениями снимка задач проекта
+    plane_issue_ref_sweep_interval: int = 3600  # Полная пересборка таблицы #123 → задача
+    plane_projects_ttl: int = 600  # Секунд до фонового обновления списка проектов
+    plane_states_ttl: int = 3600  # Секунд до фонового обновления статусов проекта
+    plane_members_ttl: int = 900  # Секунд до фонового обновления участников workspace
+
+    # Общий HTTP пул (Plane, AI провайдеры, Whisper)
+    http_pool_limit: int = 100  # Всего соединений
+    http_pool_limit_per_host: int = 30  # Соединений к одному хосту
+    http_keepalive_timeout: int = 60  # Секунд держать idle соединение
     
     # Daily Tasks Settings
     daily_tasks_enabled: bool = False
@@ -83,6 +110,28 @@ class Settings(BaseSettings):
     ai_model: str = "gpt-4-turbo"  # Default AI model (fallback)
     ai_temperature: float = 0.7
     ai_max_tokens: int = 2000
+    ai_history_token_budget: int = 1500  # Бюджет токенов истории диалога (/ai)
+    ai_conversation_ttl: int = 1800  # Секунд простоя до сброса истории диалога
+    ai_cache_enabled: bool = True  # Кэш ответов AI (TTL по фиче, см. core/ai/cache.py)
+    ai_cache_max_entries: int = 500  # Размер локального LRU кэша ответов
+
+    user_cache_ttl: int = 300  # Секунд кэширования роли/активности BotUser в middleware
+    reconciliation_concurrency: int = 4  # Чатов, сверяемых параллельно
+    scheduler_max_concurrency: int = 2  # Одновременно выполняемых задач планировщика
+    message_log_flush_size: int = 200  # Записей аудита (MessageLog) в одном INSERT
+    message_log_flush_interval: float = 2.0  # Секунд между сбросами буфера аудита
+    message_log_max_pending: int = 20000  # Предел очереди аудита в памяти
+    message_log_overflow: str = "spill"  # drop_oldest | drop_newest | spill (в файл)
+    message_log_spill_path: str = "logs/message_log_spill.jsonl"  # Файл для переполнения очереди
+    ai_export_part_size_mb: int = 45  # Макс. размер части /ai_export (лимит Telegram — 50 МБ)
+    ai_export_batch_size: int = 500  # Строк DetectedIssue на одну выборку курсора
+    telegram_global_rate: float = 25.0  # Исходящих сообщений в секунду на бота (лимит Telegram — 30)
+    telegram_private_chat_rate: float = 1.0  # Сообщений в секунду в личный чат
+    telegram_group_rate_per_minute: float = 20.0  # Сообщений в минуту в группу
+    telegram_chat_burst: int = 3  # Сообщений подряд в один чат без ожидания
+    telegram_delivery_max_retries: int = 3  # Повторов после TelegramRetryAfter
+    fsm_state_ttl: int = 604800  # Секунд хранения FSM состояния в Redis (7 дней)
+    fsm_data_ttl: int = 604800  # Секунд хранения FSM данных в Redis
 
     # Logging
     log_level: str = "INFO"
@@ -115,14 +164,24 @@ class Settings(BaseSettings):
         except ValueError:
             raise ValueError('Admin user IDs must be comma-separated integers')
     
+    @cached_property
+    def _admin_user_ids_parsed(self) -> Tuple[int, ...]:
+        # Парсим строку один раз — is_admin вызывается на каждом апдейте
+        return tuple(int(id.strip()) for id in self.admin_user_ids.split(',') if id.strip())
+
+    @cached_property
+    def admin_user_id_set(self) -> FrozenSet[int]:
+        """ID админов как frozenset (O(1) проверка)"""
+        return frozenset(self._admin_user_ids_parsed)
+
     @property
     def admin_user_id_list(self) -> List[int]:
         """Получить список ID админов как список чисел"""
-        return [int(id.strip()) for id in self.admin_user_ids.split(',') if id.strip()]
+        return list(self._admin_user_ids_parsed)
     
     def is_admin(self, user_id: int) -> bool:
         """Проверить, является ли пользователь администратором"""
-        return user_id in self.admin_user_id_list
+        return user_id in self.admin_user_id_set
     
     @field_validator('telegram_token')
     @classmethod
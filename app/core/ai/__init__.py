@@ -7,6 +7,7 @@ from .base import AIProvider, AIMessage, AIResponse, AIConfig
 from .openai_provider import OpenAIProvider
 from .anthropic_provider import AnthropicProvider
 from .groq_provider import GroqProvider
+from .conversation import Conversation
 from .ai_manager import AIManager, ai_manager
 
 __all__ = [
@@ -17,6 +18,7 @@ __all__ = [
     'OpenAIProvider',
     'AnthropicProvider',
     'GroqProvider',
+    'Conversation',
     'AIManager',
     'ai_manager'
 ]
@@ -5,11 +5,14 @@ from typing import Dict, Optional, List
 from enum import Enum
 
 from .base import AIProvider, AIMessage, AIResponse, AIConfig
+from .conversation import Conversation, ConversationStore
+from .cache import AIResponseCache, cache_key, request_params
 from .openai_provider import OpenAIProvider
 from .anthropic_provider import AnthropicProvider
 from .openrouter_provider import OpenRouterProvider, FREE_MODELS, RECOMMENDED_MODELS
 from .groq_provider import GroqProvider, GROQ_MODELS
 from .gemini_provider import GeminiProvider, GEMINI_MODELS
+from ...config import settings
 from ...utils.logger import bot_logger
 
 
@@ -32,10 +35,17 @@ class AIManager:
     _instance = None
     _providers: Dict[str, AIProvider] = {}
     _default_provider: Optional[str] = None
+    _conversations: Optional[ConversationStore] = None
+    _cache: Optional[AIResponseCache] = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._conversations = ConversationStore(
+                token_budget=settings.ai_history_token_budget,
+                idle_ttl=settings.ai_conversation_ttl,
+            )
+            cls._cache = AIResponseCache(max_entries=settings.ai_cache_max_entries)
         return cls._instance
 
     def register_provider(
@@ -277,6 +287,7 @@ class AIManager:
         self,
         messages: List[AIMessage],
         provider_name: Optional[str] = None,
+        cache: Optional[str] = None,
         **kwargs
     ) -> AIResponse:
         """
@@ -285,6 +296,8 @@ class AIManager:
         Args:
             messages: История сообщений
             provider_name: Имя провайдера (если None, использует default)
+            cache: Фича для кэша ответов ("problem_detector", "plane", ...);
+                None — всегда запрос к LLM
             **kwargs: Дополнительные параметры
 
         Returns:
@@ -298,22 +311,55 @@ class AIManager:
                 f"Provider: {provider_name or 'default'}"
             )
 
-        return await provider.complete(messages, **kwargs)
+        return await self._complete(provider, provider_name, messages, cache, **kwargs)
+
+    async def _complete(
+        self,
+        provider: AIProvider,
+        provider_name: Optional[str],
+        messages: List[AIMessage],
+        cache: Optional[str],
+        **kwargs
+    ) -> AIResponse:
+        """Запрос к провайдеру через кэш ответов"""
+        if not cache or not settings.ai_cache_enabled:
+            return await provider.complete(messages, **kwargs)
+
+        key = cache_key(
+            provider_name or self._default_provider or provider.provider_name,
+            kwargs.get("model", provider.config.model),
+            messages,
+            request_params(provider.config, **kwargs),
+        )
+        cached = await self._cache.get(key)
+        if cached:
+            return cached
+
+        response = await provider.complete(messages, **kwargs)
+        await self._cache.set(key, response, cache)
+        return response
 
     async def chat(
         self,
         user_message: str,
         system_prompt: Optional[str] = None,
         provider_name: Optional[str] = None,
+        conversation: Optional[Conversation] = None,
+        cache: Optional[str] = None,
         **kwargs
     ) -> AIResponse:
         """
         Простой чат с AI
 
+        Без conversation вызов stateless — промпт зависит только от аргументов.
+
         Args:
             user_message: Сообщение пользователя
             system_prompt: Системный промпт
             provider_name: Имя провайдера
+            conversation: Диалог из conversation() — история добавляется
+                в промпт (в пределах бюджета токенов) и пополняется ответом
+            cache: Фича для кэша ответов (см. complete)
             **kwargs: Дополнительные параметры
 
         Returns:
@@ -327,7 +373,42 @@ class AIManager:
                 f"Provider: {provider_name or 'default'}"
             )
 
-        return await provider.chat(user_message, system_prompt, **kwargs)
+        history = conversation.history() if conversation else None
+        messages = provider.build_messages(user_message, system_prompt, history)
+        response = await self._complete(provider, provider_name, messages, cache, **kwargs)
+
+        if conversation is not None:
+            conversation.add_exchange(user_message, response.content)
+
+        return response
+
+    def conversation(
+        self,
+        user_id: Optional[int],
+        chat_id: Optional[int],
+        feature: str
+    ) -> Conversation:
+        """
+        Получить диалог для (user, chat, feature)
+
+        Args:
+            user_id: Telegram ID пользователя
+            chat_id: ID чата
+            feature: Фича (например "ai_assistant")
+
+        Returns:
+            Conversation для передачи в chat(conversation=...)
+        """
+        return self._conversations.get(user_id, chat_id, feature)
+
+    def reset_conversation(
+        self,
+        user_id: Optional[int],
+        chat_id: Optional[int],
+        feature: str
+    ):
+        """Забыть историю диалога"""
+        self._conversations.drop(user_id, chat_id, feature)
 
     def list_providers(self) -> List[Dict[str, any]]:
         """
@@ -363,6 +444,10 @@ class AIManager:
         """Имя провайдера по умолчанию"""
         return self._default_provider
 
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Статистика кэша ответов (hits, misses, saved_tokens, entries)"""
+        return self._cache.get_stats()
+
     @property
     def providers_count(self) -> int:
         """Количество зарегистрированных провайдеров"""
@@ -7,6 +7,7 @@ import aiohttp
 
 from .base import AIProvider, AIMessage, AIResponse, AIConfig, AIRole
 from ...utils.logger import bot_logger
+from ...services.http_service import http_service
 
 
 class AnthropicProvider(AIProvider):
@@ -67,36 +68,36 @@ class AnthropicProvider(AIProvider):
         if system_prompt:
             payload["system"] = system_prompt
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.API_URL,
-                headers=headers,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    bot_logger.error(f"Anthropic API error: {error_text}")
-                    raise Exception(f"Anthropic API error: {response.status}")
-
-                data = await response.json()
-
-                processing_time = time.time() - start_time
-
-                # Claude возвращает контент в виде массива блоков
-                content = data["content"][0]["text"] if data["content"] else ""
-
-                return AIResponse(
-                    content=content,
-                    model=data["model"],
-                    tokens_used=data["usage"]["input_tokens"] + data["usage"]["output_tokens"],
-                    finish_reason=data.get("stop_reason", "end_turn"),
-                    processing_time=processing_time,
-                    metadata={
-                        "input_tokens": data["usage"]["input_tokens"],
-                        "output_tokens": data["usage"]["output_tokens"]
-                    }
-                )
+        session = http_service.session
+        async with session.post(
+            self.API_URL,
+            headers=headers,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                bot_logger.error(f"Anthropic API error: {error_text}")
+                raise Exception(f"Anthropic API error: {response.status}")
+
+            data = await response.json()
+
+            processing_time = time.time() - start_time
+
+            # Claude возвращает контент в виде массива блоков
+            content = data["content"][0]["text"] if data["content"] else ""
+
+            return AIResponse(
+                content=content,
+                model=data["model"],
+                tokens_used=data["usage"]["input_tokens"] + data["usage"]["output_tokens"],
+                finish_reason=data.get("stop_reason", "end_turn"),
+                processing_time=processing_time,
+                metadata={
+                    "input_tokens": data["usage"]["input_tokens"],
+                    "output_tokens": data["usage"]["output_tokens"]
+                }
+            )
 
     async def complete_stream(self, messages: List[AIMessage], **kwargs) -> AsyncGenerator[str, None]:
         """Потоковая генерация от Claude"""
@@ -119,32 +120,32 @@ class AnthropicProvider(AIProvider):
         if system_prompt:
             payload["system"] = system_prompt
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.API_URL,
-                headers=headers,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-            ) as response:
-                async for line in response.content:
-                    line = line.decode('utf-8').strip()
+        session = http_service.session
+        async with session.post(
+            self.API_URL,
+            headers=headers,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        ) as response:
+            async for line in response.content:
+                line = line.decode('utf-8').strip()
 
-                    if line.startswith("data: "):
-                        line = line[6:]
+                if line.startswith("data: "):
+                    line = line[6:]
 
-                    if not line:
-                        continue
+                if not line:
+                    continue
 
-                    try:
-                        import json
-                        data = json.loads(line)
+                try:
+                    import json
+                    data = json.loads(line)
 
-                        if data.get("type") == "content_block_delta":
-                            delta = data.get("delta", {})
-                            text = delta.get("text", "")
+                    if data.get("type") == "content_block_delta":
+                        delta = data.get("delta", {})
+                        text = delta.get("text", "")
 
-                            if text:
-                                yield text
+                        if text:
+                            yield text
 
-                    except json.JSONDecodeError:
-                        continue
+                except json.JSONDecodeError:
+                    continue
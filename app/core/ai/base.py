@@ -86,7 +86,6 @@ class AIProvider(ABC):
     def __init__(self, api_key: str, config: AIConfig):
         self.api_key = api_key
         self.config = config
-        self._conversation_history: List[AIMessage] = []
 
     @abstractmethod
     async def complete(
@@ -124,17 +123,38 @@ class AIProvider(ABC):
         """
         pass
 
-    async def chat(self, user_message: str, system_prompt: Optional[str] = None) -> AIResponse:
+    async def chat(
+        self,
+        user_message: str,
+        system_prompt: Optional[str] = None,
+        history: Optional[List[AIMessage]] = None,
+        **kwargs
+    ) -> AIResponse:
         """
-        Простой чат с AI
+        Простой чат с AI (stateless)
+
+        Провайдер не хранит историю: в промпт попадают только системный
+        промпт, переданная история и новое сообщение.
 
         Args:
             user_message: Сообщение пользователя
             system_prompt: Системный промпт (опционально)
+            history: Предыдущие сообщения диалога (опционально)
+            **kwargs: Параметры для complete (model, temperature, ...)
 
         Returns:
             AIResponse с ответом
         """
+        messages = self.build_messages(user_message, system_prompt, history)
+        return await self.complete(messages, **kwargs)
+
+    def build_messages(
+        self,
+        user_message: str,
+        system_prompt: Optional[str] = None,
+        history: Optional[List[AIMessage]] = None
+    ) -> List[AIMessage]:
+        """Собрать промпт: системный промпт + история + новое сообщение"""
         messages = []
 
         # Добавляем системный промпт
@@ -144,36 +164,11 @@ class AIProvider(ABC):
                 content=system_prompt or self.config.system_prompt
             ))
 
-        # Добавляем историю разговора
-        messages.extend(self._conversation_history)
-
-        # Добавляем новое сообщение пользователя
-        user_msg = AIMessage(role=AIRole.USER, content=user_message)
-        messages.append(user_msg)
-
-        # Получаем ответ
-        response = await self.complete(messages)
-
-        # Сохраняем в историю
-        self._conversation_history.append(user_msg)
-        self._conversation_history.append(AIMessage(
-            role=AIRole.ASSISTANT,
-            content=response.content
-        ))
-
-        # Ограничиваем историю (последние 20 сообщений)
-        if len(self._conversation_history) > 20:
-            self._conversation_history = self._conversation_history[-20:]
-
-        return response
-
-    def clear_history(self):
-        """Очистить историю диалога"""
-        self._conversation_history.clear()
+        if history:
+            messages.extend(history)
 
-    def get_history(self) -> List[AIMessage]:
-        """Получить историю диалога"""
-        return self._conversation_history.copy()
+        messages.append(AIMessage(role=AIRole.USER, content=user_message))
+        return messages
 
     @property
     @abstractmethod
@@ -0,0 +1,123 @@
+"""
+AI Response Cache - кэш ответов LLM по нормализованному промпту
+
+Ключ — sha256 от (provider, model, system prompt, messages и всех параметров
+генерации: temperature, max_tokens, top_p, ...) после схлопывания пробелов. Локальный LRU (ограничен по размеру) работает
+всегда, Redis через redis_service — вторым уровнем, если подключён.
+TTL задаётся по фиче: ответы детектора живут дольше, чем ответы /plane,
+которые зависят от быстро меняющихся данных Plane.
+"""
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...services.redis_service import redis_service
+from .base import AIConfig, AIMessage, AIResponse
+
+CACHE_KEY = "ai:cache:{digest}"
+
+FEATURE_TTLS: Dict[str, int] = {
+    "problem_detector": 6 * 3600,
+    "plane": 300,
+    "digest": 12 * 3600,
+    "audit": 12 * 3600,
+    "reconciliation": 3600,
+}
+DEFAULT_TTL = 900
+
+# Поля AIConfig, которые провайдеры передают в запрос и которые влияют на ответ
+OUTPUT_PARAMS = ("temperature", "max_tokens", "top_p", "frequency_penalty", "presence_penalty")
+
+_WS_RE = re.compile(r'\s+')
+
+
+def _normalize(text: Optional[str]) -> str:
+    return _WS_RE.sub(' ', text or '').strip()
+
+
+def request_params(config: AIConfig, **kwargs) -> Dict[str, Any]:
+    """Параметры генерации запроса: значения из конфига провайдера + все kwargs вызова"""
+    params = {name: getattr(config, name) for name in OUTPUT_PARAMS}
+    params.update({k: v for k, v in kwargs.items() if k != "model"})
+    return params
+
+
+def cache_key(
+    provider_name: str,
+    model: str,
+    messages: List[AIMessage],
+    params: Dict[str, Any]
+) -> str:
+    """Нормализованный ключ кэша для запроса"""
+    payload = json.dumps(
+        [
+            provider_name,
+            model,
+            params,
+            [(m.role.value, _normalize(m.content)) for m in messages],
+        ],
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return CACHE_KEY.format(digest=hashlib.sha256(payload.encode()).hexdigest())
+
+
+class AIResponseCache:
+    """Двухуровневый (LRU + Redis) кэш ответов AI"""
+
+    def __init__(self, max_entries: int = 500):
+        self.max_entries = max_entries
+        self._local: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "saved_tokens": 0}
+
+    async def get(self, key: str) -> Optional[AIResponse]:
+        """Найти ответ в кэше"""
+        data = None
+        entry = self._local.get(key)
+        if entry:
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                data = None
+            else:
+                self._local.move_to_end(key)
+
+        if data is None and redis_service.is_connected:
+            data = await redis_service.get_json(key)
+
+        if data is None:
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["hits"] += 1
+        self._stats["saved_tokens"] += data.get("tokens_used", 0)
+        response = AIResponse(**data)
+        response.processing_time = 0.0
+        response.metadata = {**response.metadata, "cached": True}
+        return response
+
+    async def set(self, key: str, response: AIResponse, feature: str) -> None:
+        """Сохранить ответ с TTL фичи"""
+        ttl = FEATURE_TTLS.get(feature, DEFAULT_TTL)
+        data = asdict(response)
+
+        self._local[key] = (time.monotonic() + ttl, data)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+        if redis_service.is_connected:
+            await redis_service.set_json(key, data, ttl=ttl)
+
+    def clear(self) -> None:
+        """Очистить локальный уровень"""
+        self._local.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Счётчики hit/miss и сэкономленные токены (для /diag)"""
+        return {**self._stats, "entries": len(self._local)}
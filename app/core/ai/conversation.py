@@ -0,0 +1,95 @@
+"""
+Диалоги с AI - история, привязанная к (user, chat, feature)
+
+Провайдеры stateless: в промпт попадает только то, что передал вызывающий.
+Фичи, которым нужен контекст диалога (например /ai), берут явный handle
+через ai_manager.conversation(...) — история обрезается по бюджету токенов.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .base import AIMessage, AIRole
+
+ConversationKey = Tuple[Optional[int], Optional[int], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Грубая оценка токенов (~3 символа на токен для смеси RU/EN)"""
+    return len(text) // 3 + 1
+
+
+@dataclass
+class Conversation:
+    """История одного диалога"""
+    key: ConversationKey
+    token_budget: int
+    max_messages: int = 20
+    messages: List[AIMessage] = field(default_factory=list)
+    last_used: float = field(default_factory=time.monotonic)
+
+    def history(self) -> List[AIMessage]:
+        """Последние сообщения, укладывающиеся в бюджет токенов"""
+        result: List[AIMessage] = []
+        used = 0
+        for msg in reversed(self.messages[-self.max_messages:]):
+            used += estimate_tokens(msg.content)
+            if used > self.token_budget:
+                break
+            result.append(msg)
+        result.reverse()
+        # Не начинаем историю с ответа ассистента без вопроса
+        while result and result[0].role == AIRole.ASSISTANT:
+            result.pop(0)
+        return result
+
+    def add_exchange(self, user_message: str, assistant_message: str) -> None:
+        """Сохранить пару вопрос/ответ"""
+        self.messages.append(AIMessage(role=AIRole.USER, content=user_message))
+        self.messages.append(AIMessage(role=AIRole.ASSISTANT, content=assistant_message))
+        if len(self.messages) > self.max_messages:
+            self.messages = self.messages[-self.max_messages:]
+        self.last_used = time.monotonic()
+
+    def clear(self) -> None:
+        """Очистить историю"""
+        self.messages.clear()
+
+
+class ConversationStore:
+    """In-memory реестр диалогов с LRU-вытеснением и idle TTL"""
+
+    def __init__(self, token_budget: int, idle_ttl: int, max_conversations: int = 1000):
+        self.token_budget = token_budget
+        self.idle_ttl = idle_ttl
+        self.max_conversations = max_conversations
+        self._items: "OrderedDict[ConversationKey, Conversation]" = OrderedDict()
+
+    def get(
+        self,
+        user_id: Optional[int],
+        chat_id: Optional[int],
+        feature: str
+    ) -> Conversation:
+        """Получить (или создать) диалог для (user, chat, feature)"""
+        key = (user_id, chat_id, feature)
+        conv = self._items.get(key)
+        if conv and time.monotonic() - conv.last_used > self.idle_ttl:
+            conv.clear()
+        if conv is None:
+            conv = Conversation(key=key, token_budget=self.token_budget)
+            self._items[key] = conv
+        self._items.move_to_end(key)
+        conv.last_used = time.monotonic()
+
+        while len(self._items) > self.max_conversations:
+            self._items.popitem(last=False)
+        return conv
+
+    def drop(self, user_id: Optional[int], chat_id: Optional[int], feature: str) -> None:
+        """Забыть диалог"""
+        self._items.pop((user_id, chat_id, feature), None)
+
+    def __len__(self) -> int:
+        return len(self._items)
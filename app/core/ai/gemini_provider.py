@@ -10,6 +10,7 @@ import aiohttp
 
 from .base import AIProvider, AIMessage, AIResponse, AIConfig
 from ...utils.logger import bot_logger
+from ...services.http_service import http_service
 
 
 GEMINI_MODELS = [
@@ -55,35 +56,35 @@ class GeminiProvider(AIProvider):
             "top_p": kwargs.get("top_p", self.config.top_p),
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.API_URL,
-                headers=headers,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    bot_logger.error(f"Gemini API error: {error_text}")
-                    raise Exception(f"Gemini API error: {response.status}")
-
-                data = await response.json()
-
-                processing_time = time.time() - start_time
-
-                usage = data.get("usage", {})
-                return AIResponse(
-                    content=data["choices"][0]["message"]["content"],
-                    model=data.get("model", self.config.model),
-                    tokens_used=usage.get("total_tokens", 0),
-                    finish_reason=data["choices"][0].get("finish_reason", "stop"),
-                    processing_time=processing_time,
-                    metadata={
-                        "prompt_tokens": usage.get("prompt_tokens", 0),
-                        "completion_tokens": usage.get("completion_tokens", 0),
-                        "gemini_id": data.get("id")
-                    }
-                )
+        session = http_service.session
+        async with session.post(
+            self.API_URL,
+            headers=headers,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                bot_logger.error(f"Gemini API error: {error_text}")
+                raise Exception(f"Gemini API error: {response.status}")
+
+            data = await response.json()
+
+            processing_time = time.time() - start_time
+
+            usage = data.get("usage", {})
+            return AIResponse(
+                content=data["choices"][0]["message"]["content"],
+                model=data.get("model", self.config.model),
+                tokens_used=usage.get("total_tokens", 0),
+                finish_reason=data["choices"][0].get("finish_reason", "stop"),
+                processing_time=processing_time,
+                metadata={
+                    "prompt_tokens": usage.get("prompt_tokens", 0),
+                    "completion_tokens": usage.get("completion_tokens", 0),
+                    "gemini_id": data.get("id")
+                }
+            )
 
     async def complete_stream(self, messages: List[AIMessage], **kwargs) -> AsyncGenerator[str, None]:
         """Потоковая генерация от Gemini"""
@@ -100,35 +101,35 @@ class GeminiProvider(AIProvider):
             "stream": True
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.API_URL,
-                headers=headers,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-            ) as response:
-                async for line in response.content:
-                    line = line.decode('utf-8').strip()
+        session = http_service.session
+        async with session.post(
+            self.API_URL,
+            headers=headers,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        ) as response:
+            async for line in response.content:
+                line = line.decode('utf-8').strip()
 
-                    if line.startswith("data: "):
-                        line = line[6:]
+                if line.startswith("data: "):
+                    line = line[6:]
 
-                    if line == "[DONE]":
-                        break
+                if line == "[DONE]":
+                    break
 
-                    if not line:
-                        continue
+                if not line:
+                    continue
 
-                    try:
-                        import json
-                        data = json.loads(line)
+                try:
+                    import json
+                    data = json.loads(line)
 
-                        if "choices" in data and len(data["choices"]) > 0:
-                            delta = data["choices"][0].get("delta", {})
-                            content = delta.get("content", "")
+                    if "choices" in data and len(data["choices"]) > 0:
+                        delta = data["choices"][0].get("delta", {})
+                        content = delta.get("content", "")
 
-                            if content:
-                                yield content
+                        if content:
+                            yield content
 
-                    except json.JSONDecodeError:
-                        continue
+                except json.JSONDecodeError:
+                    continue
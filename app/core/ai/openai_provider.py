@@ -7,6 +7,7 @@ import aiohttp
 
 from .base import AIProvider, AIMessage, AIResponse, AIConfig
 from ...utils.logger import bot_logger
+from ...services.http_service import http_service
 
 
 class OpenAIProvider(AIProvider):
@@ -47,33 +48,33 @@ class OpenAIProvider(AIProvider):
             "presence_penalty": kwargs.get("presence_penalty", self.config.presence_penalty)
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.API_URL,
-                headers=headers,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    bot_logger.error(f"OpenAI API error: {error_text}")
-                    raise Exception(f"OpenAI API error: {response.status}")
-
-                data = await response.json()
-
-                processing_time = time.time() - start_time
-
-                return AIResponse(
-                    content=data["choices"][0]["message"]["content"],
-                    model=data["model"],
-                    tokens_used=data["usage"]["total_tokens"],
-                    finish_reason=data["choices"][0]["finish_reason"],
-                    processing_time=processing_time,
-                    metadata={
-                        "prompt_tokens": data["usage"]["prompt_tokens"],
-                        "completion_tokens": data["usage"]["completion_tokens"]
-                    }
-                )
+        session = http_service.session
+        async with session.post(
+            self.API_URL,
+            headers=headers,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                bot_logger.error(f"OpenAI API error: {error_text}")
+                raise Exception(f"OpenAI API error: {response.status}")
+
+            data = await response.json()
+
+            processing_time = time.time() - start_time
+
+            return AIResponse(
+                content=data["choices"][0]["message"]["content"],
+                model=data["model"],
+                tokens_used=data["usage"]["total_tokens"],
+                finish_reason=data["choices"][0]["finish_reason"],
+                processing_time=processing_time,
+                metadata={
+                    "prompt_tokens": data["usage"]["prompt_tokens"],
+                    "completion_tokens": data["usage"]["completion_tokens"]
+                }
+            )
 
     async def complete_stream(self, messages: List[AIMessage], **kwargs) -> AsyncGenerator[str, None]:
         """Потоковая генерация от OpenAI"""
@@ -90,35 +91,35 @@ class OpenAIProvider(AIProvider):
             "stream": True
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.API_URL,
-                headers=headers,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-            ) as response:
-                async for line in response.content:
-                    line = line.decode('utf-8').strip()
+        session = http_service.session
+        async with session.post(
+            self.API_URL,
+            headers=headers,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        ) as response:
+            async for line in response.content:
+                line = line.decode('utf-8').strip()
 
-                    if line.startswith("data: "):
-                        line = line[6:]  # Remove "data: " prefix
+                if line.startswith("data: "):
+                    line = line[6:]  # Remove "data: " prefix
 
-                    if line == "[DONE]":
-                        break
+                if line == "[DONE]":
+                    break
 
-                    if not line:
-                        continue
+                if not line:
+                    continue
 
-                    try:
-                        import json
-                        data = json.loads(line)
+                try:
+                    import json
+                    data = json.loads(line)
 
-                        if "choices" in data and len(data["choices"]) > 0:
-                            delta = data["choices"][0].get("delta", {})
-                            content = delta.get("content", "")
+                    if "choices" in data and len(data["choices"]) > 0:
+                        delta = data["choices"][0].get("delta", {})
+                        content = delta.get("content", "")
 
-                            if content:
-                                yield content
+                        if content:
+                            yield content
 
-                    except json.JSONDecodeError:
-                        continue
+                except json.JSONDecodeError:
+                    continue
@@ -13,6 +13,7 @@ import aiohttp
 
 from .base import AIProvider, AIMessage, AIResponse, AIConfig
 from ...utils.logger import bot_logger
+from ...services.http_service import http_service
 
 
 # Бесплатные модели на OpenRouter (лимиты могут меняться)
@@ -107,49 +108,49 @@ class OpenRouterProvider(AIProvider):
             payload["route"] = "fallback"
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.API_URL,
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-                ) as response:
-                    response_text = await response.text()
-
-                    if response.status != 200:
-                        bot_logger.error(f"OpenRouter API error: {response.status} - {response_text}")
-
-                        # Попробуем fallback на другую бесплатную модель
-                        if ":free" in model:
-                            fallback_model = await self._get_fallback_model(model)
-                            if fallback_model:
-                                bot_logger.info(f"Trying fallback model: {fallback_model}")
-                                fallback_kwargs = {k: v for k, v in kwargs.items() if k != 'model'}
-                                return await self.complete(messages, model=fallback_model, **fallback_kwargs)
-
-                        raise Exception(f"OpenRouter API error: {response.status}")
-
-                    import json
-                    data = json.loads(response_text)
-
-                    processing_time = time.time() - start_time
-
-                    # OpenRouter может вернуть usage или нет
-                    usage = data.get("usage", {})
-
-                    return AIResponse(
-                        content=data["choices"][0]["message"]["content"],
-                        model=data.get("model", model),
-                        tokens_used=usage.get("total_tokens", 0),
-                        finish_reason=data["choices"][0].get("finish_reason", "stop"),
-                        processing_time=processing_time,
-                        metadata={
-                            "prompt_tokens": usage.get("prompt_tokens", 0),
-                            "completion_tokens": usage.get("completion_tokens", 0),
-                            "provider": "openrouter",
-                            "actual_model": data.get("model", model),
-                        }
-                    )
+            session = http_service.session
+            async with session.post(
+                self.API_URL,
+                headers=headers,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+            ) as response:
+                response_text = await response.text()
+
+                if response.status != 200:
+                    bot_logger.error(f"OpenRouter API error: {response.status} - {response_text}")
+
+                    # Попробуем fallback на другую бесплатную модель
+                    if ":free" in model:
+                        fallback_model = await self._get_fallback_model(model)
+                        if fallback_model:
+                            bot_logger.info(f"Trying fallback model: {fallback_model}")
+                            fallback_kwargs = {k: v for k, v in kwargs.items() if k != 'model'}
+                            return await self.complete(messages, model=fallback_model, **fallback_kwargs)
+
+                    raise Exception(f"OpenRouter API error: {response.status}")
+
+                import json
+                data = json.loads(response_text)
+
+                processing_time = time.time() - start_time
+
+                # OpenRouter может вернуть usage или нет
+                usage = data.get("usage", {})
+
+                return AIResponse(
+                    content=data["choices"][0]["message"]["content"],
+                    model=data.get("model", model),
+                    tokens_used=usage.get("total_tokens", 0),
+                    finish_reason=data["choices"][0].get("finish_reason", "stop"),
+                    processing_time=processing_time,
+                    metadata={
+                        "prompt_tokens": usage.get("prompt_tokens", 0),
+                        "completion_tokens": usage.get("completion_tokens", 0),
+                        "provider": "openrouter",
+                        "actual_model": data.get("model", model),
+                    }
+                )
 
         except aiohttp.ClientError as e:
             bot_logger.error(f"OpenRouter connection error: {e}")
@@ -174,38 +175,38 @@ class OpenRouterProvider(AIProvider):
             "stream": True
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.API_URL,
-                headers=headers,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-            ) as response:
-                async for line in response.content:
-                    line = line.decode('utf-8').strip()
+        session = http_service.session
+        async with session.post(
+            self.API_URL,
+            headers=headers,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        ) as response:
+            async for line in response.content:
+                line = line.decode('utf-8').strip()
 
-                    if line.startswith("data: "):
-                        line = line[6:]
+                if line.startswith("data: "):
+                    line = line[6:]
 
-                    if line == "[DONE]":
-                        break
+                if line == "[DONE]":
+                    break
 
-                    if not line:
-                        continue
+                if not line:
+                    continue
 
-                    try:
-                        import json
-                        data = json.loads(line)
+                try:
+                    import json
+                    data = json.loads(line)
 
-                        if "choices" in data and len(data["choices"]) > 0:
-                            delta = data["choices"][0].get("delta", {})
-                            content = delta.get("content", "")
+                    if "choices" in data and len(data["choices"]) > 0:
+                        delta = data["choices"][0].get("delta", {})
+                        content = delta.get("content", "")
 
-                            if content:
-                                yield content
+                        if content:
+                            yield content
 
-                    except json.JSONDecodeError:
-                        continue
+                except json.JSONDecodeError:
+                    continue
 
     async def _get_fallback_model(self, failed_model: str) -> Optional[str]:
         """Получить fallback модель если текущая недоступна"""
@@ -41,6 +41,7 @@ class ChatMessage(Base):
     is_question = Column(Boolean, default=False)
     is_answered = Column(Boolean, default=False)
     detected_intent = Column(String(50), nullable=True)  # task, problem, question, info
+    ai_verdict = Column(String(20), nullable=True)  # problem / none — only messages the LLM judged
 
     # Indexes
     __table_args__ = (
@@ -166,6 +167,7 @@ class DetectedIssue(Base):
     __table_args__ = (
         Index('idx_detected_issues_chat_status', 'chat_id', 'status'),
         Index('idx_detected_issues_type', 'issue_type'),
+        Index('idx_detected_issues_created', 'created_at'),
     )
 
     def __repr__(self):
@@ -48,6 +48,7 @@ async def init_db():
         from . import daily_tasks_models  # Импортируем чтобы таблицы зарегистрировались
         from . import user_tasks_models  # Импортируем модели кэша задач
         from . import plane_mappings_models  # Plane↔Telegram mapping tables
+        from . import scheduler_models  # Состояние планировщика задач
         
         async with engine.begin() as conn:
             # Создание всех таблиц
@@ -0,0 +1,31 @@
+"""
+Модели планировщика фоновых задач
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+
+from .models import Base
+
+
+class ScheduledJob(Base):
+    """Состояние периодической задачи (одна строка на job)"""
+    __tablename__ = "scheduled_jobs"
+
+    name = Column(String(100), primary_key=True)
+
+    # Расписание: следующее и последнее срабатывание (UTC)
+    next_run_at = Column(DateTime(timezone=True), nullable=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Результат последнего запуска
+    last_status = Column(String(20), nullable=True)  # running / ok / error / timeout / skipped
+    last_error = Column(Text, nullable=True)
+    last_duration_ms = Column(Integer, nullable=True)
+    run_count = Column(Integer, default=0, nullable=False)
+
+    # Реплика, захватившая последнее срабатывание
+    locked_by = Column(String(100), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ScheduledJob(name={self.name}, next_run_at={self.next_run_at}, status={self.last_status})>"
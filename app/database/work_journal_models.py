@@ -42,10 +42,16 @@ class WorkJournalEntry(Base):
     n8n_sync_attempts = Column(Integer, default=0, nullable=False)
     n8n_last_sync_at = Column(DateTime, nullable=True)
     n8n_error_message = Column(Text, nullable=True)
+
+    # Отпечаток содержимого (дата|компания|описание) для импорта из Google Sheets
+    content_fingerprint = Column(String(32), nullable=True)
     
     # Связи (без back_populates для избежания циклических зависимостей)
     user = relationship("BotUser", foreign_keys=[telegram_user_id])
     created_by = relationship("BotUser", foreign_keys=[created_by_user_id])
+    workers = relationship(
+        "WorkJournalEntryWorker", cascade="all, delete-orphan", passive_deletes=True, lazy="noload"
+    )
     
     # Индексы для оптимизации запросов
     __table_args__ = (
@@ -56,6 +62,7 @@ class WorkJournalEntry(Base):
         Index("idx_work_journal_created_at", "created_at"),
         Index("idx_work_journal_date_user", "work_date", "telegram_user_id"),  # Составной индекс
         Index("idx_work_journal_created_by", "created_by_user_id"),  # Новый индекс для создателя
+        Index("uq_work_journal_fingerprint", "content_fingerprint", unique=True),  # Дедупликация импорта
     )
     
     def __repr__(self):
@@ -64,6 +71,37 @@ class WorkJournalEntry(Base):
                 f"created_by={self.created_by_name})>")
 
 
+def normalize_worker_key(name: str) -> str:
+    """Ключ поиска исполнителя: нижний регистр, ё→е, без лишних пробелов"""
+    return " ".join((name or "").lower().replace("ё", "е").split())
+
+
+class WorkJournalEntryWorker(Base):
+    """Исполнитель записи журнала (нормализованная копия worker_names для поиска и статистики)"""
+    __tablename__ = "work_journal_entry_workers"
+
+    entry_id = Column(
+        Integer, ForeignKey("work_journal_entries.id", ondelete="CASCADE"), primary_key=True
+    )
+    worker_name = Column(String(255), primary_key=True)
+    worker_key = Column(String(255), nullable=False)  # normalize_worker_key(worker_name)
+
+    # В PostgreSQL дополнительно GIN-триграммные индексы на worker_key и
+    # work_journal_entries.company (миграция 018) — для поиска по подстроке
+    __table_args__ = (
+        Index("idx_journal_entry_workers_key", "worker_key", "entry_id"),
+    )
+
+    @classmethod
+    def for_names(cls, names) -> list:
+        """Строки связи для списка имён (без повторов)"""
+        unique = dict.fromkeys(n.strip() for n in names if n and n.strip())
+        return [cls(worker_name=n[:255], worker_key=normalize_worker_key(n)[:255]) for n in unique]
+
+    def __repr__(self):
+        return f"<WorkJournalEntryWorker(entry_id={self.entry_id}, worker='{self.worker_name}')>"
+
+
 class UserWorkJournalState(Base):
     """Модель состояния пользователя при заполнении журнала работ"""
     __tablename__ = "user_work_journal_states"
@@ -21,21 +21,10 @@ from .ai_edit_states import AIEditTaskStates
 
 router = Router(name="ai_callbacks")
 
-MEMBERS_CACHE_KEY = "plane:members"
-MEMBERS_CACHE_TTL = 3600  # 1 hour
-
-
 async def _get_cached_members() -> list:
-    """Get workspace members from cache or fetch from Plane API."""
-    cached = await redis_service.get_json(MEMBERS_CACHE_KEY)
-    if cached:
-        return cached
-
+    """Active workspace members (cached by the Plane metadata registry)."""
     members = await plane_api.get_workspace_members()
-    if not members:
-        return []
-
-    members_list = [
+    return [
         {
             "id": m.id,
             "display_name": m.display_name or f"{m.first_name} {m.last_name}".strip() or m.email,
@@ -45,9 +34,6 @@ async def _get_cached_members() -> list:
         if m.is_active
     ]
 
-    await redis_service.set_json(MEMBERS_CACHE_KEY, members_list, ttl=MEMBERS_CACHE_TTL)
-    return members_list
-
 
 async def _record_feedback(chat_id, message_id, feedback: str, **kwargs):
     """Record user feedback on a detected issue for training data."""
@@ -11,7 +11,7 @@ from collections import defaultdict
 from aiogram import Router
 from aiogram.types import Message
 from aiogram.filters import Command
-from sqlalchemy import select
+from sqlalchemy import and_, case, func, select
 
 from ..config import settings
 from ..utils.logger import bot_logger
@@ -21,28 +21,83 @@ from ..database.database import AsyncSessionLocal
 router = Router(name="ai_quality")
 
 
+# (low, high, label): confidence in [low, high)
+CONFIDENCE_BUCKETS = [
+    (0.0, 0.3, "0.0-0.3"),
+    (0.3, 0.5, "0.3-0.5"),
+    (0.5, 0.7, "0.5-0.7"),
+    (0.7, 0.9, "0.7-0.9"),
+    (0.9, 1.01, "0.9-1.0"),
+]
+
+
+def _bucket_expr():
+    """SQL CASE mapping confidence to its bucket label (NULL when outside all buckets)."""
+    return case(
+        *[
+            (and_(DetectedIssue.confidence >= low, DetectedIssue.confidence < high), label)
+            for low, high, label in CONFIDENCE_BUCKETS
+        ],
+        else_=None,
+    )
+
+
 async def compute_quality_metrics(days: int = 30) -> dict:
-    """Compute AI detection quality metrics from DetectedIssue records."""
+    """Compute AI detection quality metrics from DetectedIssue records.
+
+    A single grouped query (model x confidence bucket x feedback) returns at
+    most a few dozen rows however many detections the window holds; all
+    metrics are folded from those rows.
+    """
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    bucket = _bucket_expr().label("bucket")
 
     async with AsyncSessionLocal() as session:
         result = await session.execute(
-            select(DetectedIssue)
+            select(
+                DetectedIssue.ai_model_used,
+                bucket,
+                DetectedIssue.user_feedback,
+                func.count().label("n"),
+                func.count(DetectedIssue.correction_distance).label("n_corrected"),
+                func.sum(DetectedIssue.correction_distance).label("distance_sum"),
+            )
             .where(DetectedIssue.created_at >= cutoff)
-            .order_by(DetectedIssue.created_at)
+            .group_by(DetectedIssue.ai_model_used, bucket, DetectedIssue.user_feedback)
         )
-        issues = result.scalars().all()
+        groups = result.all()
 
-    if not issues:
+    total = sum(g.n for g in groups)
+    if not total:
         return {"total": 0, "days": days}
 
-    # Feedback distribution
     feedback_counts = defaultdict(int)
-    for issue in issues:
-        fb = issue.user_feedback or "no_feedback"
-        feedback_counts[fb] += 1
+    bucket_stats = defaultdict(lambda: {"count": 0, "accepted": 0, "decided": 0})
+    model_stats = defaultdict(lambda: {"total": 0, "accepted": 0, "rejected": 0})
+    distance_sum = 0.0
+    distance_count = 0
+
+    for g in groups:
+        fb = g.user_feedback
+        feedback_counts[fb or "no_feedback"] += g.n
+
+        if g.bucket is not None:
+            stats = bucket_stats[g.bucket]
+            stats["count"] += g.n
+            if fb == "accepted":
+                stats["accepted"] += g.n
+            if fb in ("accepted", "rejected"):
+                stats["decided"] += g.n
+
+        model = model_stats[g.ai_model_used or "unknown"]
+        model["total"] += g.n
+        if fb in ("accepted", "rejected"):
+            model[fb] += g.n
+
+        if g.n_corrected:
+            distance_sum += g.distance_sum
+            distance_count += g.n_corrected
 
-    total = len(issues)
     accepted = feedback_counts.get("accepted", 0)
     rejected = feedback_counts.get("rejected", 0)
     corrected = feedback_counts.get("corrected", 0)
@@ -55,54 +110,19 @@ async def compute_quality_metrics(days: int = 30) -> dict:
     # Detection rate
     detection_rate = total / days if days > 0 else 0
 
-    # Confidence buckets
-    buckets = [
-        (0.0, 0.3, "0.0-0.3"),
-        (0.3, 0.5, "0.3-0.5"),
-        (0.5, 0.7, "0.5-0.7"),
-        (0.7, 0.9, "0.7-0.9"),
-        (0.9, 1.01, "0.9-1.0"),
-    ]
     confidence_stats = []
-    for low, high, label in buckets:
-        bucket_issues = [
-            i for i in issues
-            if i.confidence is not None and low <= i.confidence < high
-        ]
-        if not bucket_issues:
+    for _, _, label in CONFIDENCE_BUCKETS:
+        stats = bucket_stats.get(label)
+        if not stats:
             continue
-        bucket_accepted = sum(1 for i in bucket_issues if i.user_feedback == "accepted")
-        bucket_decided = sum(
-            1 for i in bucket_issues if i.user_feedback in ("accepted", "rejected")
-        )
-        accept_rate = (bucket_accepted / bucket_decided * 100) if bucket_decided > 0 else None
+        accept_rate = (stats["accepted"] / stats["decided"] * 100) if stats["decided"] > 0 else None
         confidence_stats.append({
             "label": label,
-            "count": len(bucket_issues),
+            "count": stats["count"],
             "accept_rate": accept_rate,
         })
 
-    # Correction distance
-    correction_distances = [
-        i.correction_distance
-        for i in issues
-        if i.correction_distance is not None
-    ]
-    avg_correction = (
-        sum(correction_distances) / len(correction_distances)
-        if correction_distances
-        else None
-    )
-
-    # Per-model stats
-    model_stats = defaultdict(lambda: {"total": 0, "accepted": 0, "rejected": 0})
-    for issue in issues:
-        model = issue.ai_model_used or "unknown"
-        model_stats[model]["total"] += 1
-        if issue.user_feedback == "accepted":
-            model_stats[model]["accepted"] += 1
-        elif issue.user_feedback == "rejected":
-            model_stats[model]["rejected"] += 1
+    avg_correction = distance_sum / distance_count if distance_count else None
 
     return {
         "total": total,
@@ -163,6 +183,11 @@ def format_quality_report(metrics: dict) -> str:
         quality = "minor edits" if dist < 0.3 else "moderate edits" if dist < 0.6 else "major rewrites"
         lines.append(f"\nAvg correction: {dist} ({quality})")
 
+    # Local pre-filter (gate before AI detection)
+    prefilter = metrics.get("prefilter")
+    if prefilter:
+        lines.append(_format_prefilter(prefilter))
+
     # Models
     if metrics["models"]:
         lines.append("\nModels:")
@@ -177,6 +202,26 @@ def format_quality_report(metrics: dict) -> str:
     return "\n".join(lines)
 
 
+def _format_prefilter(stats: dict) -> str:
+    """Pre-filter gate counters and held-out precision/recall trade-off."""
+    if not stats["trained"]:
+        return "\nPre-filter: not trained (all messages go to AI)"
+
+    seen = stats["analyzed"] + stats["skipped"] + stats["audited"]
+    skip_pct = (stats["skipped"] + stats["audited"]) / seen * 100 if seen else 0
+    lines = [f"\nPre-filter: {skip_pct:.0f}% skipped ({stats['analyzed']} to AI / {seen})"]
+    if stats["audited"]:
+        lines.append(f"  Audit: {stats['audit_misses']}/{stats['audited']} skipped msgs were problems")
+    model = stats.get("model") or {}
+    if model:
+        precision = f"{model['precision']:.0%}" if model.get("precision") is not None else "N/A"
+        lines.append(
+            f"  Model: recall {model['recall']:.0%} | precision {precision} | "
+            f"skip {model['skip_rate']:.0%} on {model['samples']} samples"
+        )
+    return "\n".join(lines)
+
+
 @router.message(Command("ai_quality"))
 async def cmd_ai_quality(message: Message):
     """
@@ -200,6 +245,9 @@ async def cmd_ai_quality(message: Message):
 
     try:
         metrics = await compute_quality_metrics(days)
+        if metrics["total"]:
+            from ..services.problem_prefilter import problem_prefilter
+            metrics["prefilter"] = problem_prefilter.get_stats()
         report = format_quality_report(metrics)
         await status_msg.edit_text(report, parse_mode="HTML")
         bot_logger.info(f"AI quality report: {metrics['total']} issues, {days} days")
@@ -2,14 +2,25 @@
 AI Training Data Export — /ai_export command.
 
 Exports DetectedIssue records as JSONL for LLM fine-tuning.
+
+Rows are streamed from the database in batches (server-side cursor) straight
+into gzip files on disk, split into parts below Telegram's upload limit, so
+memory stays flat however much history is exported. `/ai_export since`
+exports only records added after the previous export.
 """
 
+import gzip
 import json
+import os
+import shutil
 import tempfile
+import zlib
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 
 from aiogram import Router
-from aiogram.types import Message, BufferedInputFile
+from aiogram.types import Message, FSInputFile
 from aiogram.filters import Command
 from sqlalchemy import select
 
@@ -17,112 +28,223 @@ from ..config import settings
 from ..utils.logger import bot_logger
 from ..database.chat_ai_models import DetectedIssue
 from ..database.database import AsyncSessionLocal
+from ..services.redis_service import redis_service
 
 router = Router(name="ai_training_export")
 
+LAST_EXPORT_KEY = "ai_export:last_id"
+LAST_EXPORT_TTL = 365 * 86400
+
+
+@dataclass
+class ExportResult:
+    """Written parts and counters of one export run"""
+    parts: List[str] = field(default_factory=list)
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        "total": 0, "accepted": 0, "rejected": 0, "corrected": 0, "no_feedback": 0,
+    })
+    first_id: Optional[int] = None
+    last_id: Optional[int] = None
+
+
+def _issue_record(issue: DetectedIssue, prefilter) -> dict:
+    """DetectedIssue -> training JSONL record"""
+    record = {
+        "prompt": {
+            "original_text": issue.original_text,
+            "chat_id": issue.chat_id,
+        },
+        "completion": {
+            "is_task": True,
+            "title": issue.title,
+            "description": issue.description,
+            "confidence": issue.confidence,
+        },
+        "metadata": {
+            "id": issue.id,
+            "issue_type": issue.issue_type,
+            "ai_model": issue.ai_model_used,
+            "user_feedback": issue.user_feedback,
+            "user_edited_title": issue.user_edited_title,
+            "user_edited_desc": issue.user_edited_desc,
+            "user_assigned_to": issue.user_assigned_to,
+            "correction_distance": issue.correction_distance,
+            "prefilter_score": (
+                prefilter.score(issue.original_text) if issue.original_text else None
+            ),
+            "plane_issue_id": issue.plane_issue_id,
+            "created_at": issue.created_at.isoformat() if issue.created_at else None,
+            "feedback_at": issue.feedback_at.isoformat() if issue.feedback_at else None,
+        },
+    }
+
+    # Include raw AI response if available
+    if issue.ai_response_json:
+        try:
+            record["ai_raw"] = json.loads(issue.ai_response_json)
+        except (json.JSONDecodeError, TypeError):
+            record["ai_raw"] = issue.ai_response_json
+
+    return record
+
+
+async def export_training_data(
+    out_dir: str,
+    prefix: str,
+    cutoff: Optional[datetime] = None,
+    since_id: Optional[int] = None,
+    part_size: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> ExportResult:
+    """
+    Stream DetectedIssue rows (ordered by id) into gzipped JSONL parts.
+
+    Args:
+        out_dir: Directory for the part files
+        prefix: Part file name prefix (parts are `{prefix}.partN.jsonl.gz`)
+        cutoff: Only rows created at/after this moment
+        since_id: Only rows with id greater than this
+        part_size: Max compressed bytes per part (default from settings)
+        batch_size: Rows fetched per cursor round-trip (default from settings)
+    """
+    from ..services.problem_prefilter import problem_prefilter
+
+    part_size = part_size or settings.ai_export_part_size_mb * 1024 * 1024
+    batch_size = batch_size or settings.ai_export_batch_size
+    result = ExportResult()
+
+    query = select(DetectedIssue).order_by(DetectedIssue.id).execution_options(yield_per=batch_size)
+    if cutoff is not None:
+        query = query.where(DetectedIssue.created_at >= cutoff)
+    if since_id is not None:
+        query = query.where(DetectedIssue.id > since_id)
+
+    raw = gz = None
+    unflushed = 0  # Bytes written since the last sync flush (may still sit in deflate)
+    try:
+        async with AsyncSessionLocal() as session:
+            rows = await session.stream_scalars(query)
+            async for issue in rows:
+                # raw.tell() lags behind while deflate buffers output: once the
+                # buffered input could reach the limit, sync-flush and measure
+                if gz is not None and raw.tell() + unflushed >= part_size:
+                    gz.flush(zlib.Z_SYNC_FLUSH)
+                    unflushed = 0
+                    # Roll over before the compressed part would pass the limit
+                    if raw.tell() >= part_size:
+                        gz.close()
+                        raw.close()
+                        gz = None
+                if gz is None:
+                    path = os.path.join(out_dir, f"{prefix}.part{len(result.parts) + 1}.jsonl.gz")
+                    raw = open(path, "wb")
+                    gz = gzip.GzipFile(fileobj=raw, mode="wb")
+                    result.parts.append(path)
+
+                line = json.dumps(_issue_record(issue, problem_prefilter), ensure_ascii=False, default=str)
+                data = line.encode("utf-8") + b"\n"
+                gz.write(data)
+                unflushed += len(data)
+
+                result.stats["total"] += 1
+                fb = issue.user_feedback or "no_feedback"
+                result.stats[fb] = result.stats.get(fb, 0) + 1
+                if result.first_id is None:
+                    result.first_id = issue.id
+                result.last_id = issue.id
+                # Detach the row so the session does not accumulate the whole history
+                session.expunge(issue)
+    finally:
+        if gz is not None:
+            gz.close()
+            raw.close()
+
+    return result
+
+
+async def get_last_export_id() -> Optional[int]:
+    data = await redis_service.get_json(LAST_EXPORT_KEY)
+    return int(data["last_id"]) if data else None
+
+
+async def set_last_export_id(last_id: int) -> None:
+    await redis_service.set_json(LAST_EXPORT_KEY, {"last_id": last_id}, ttl=LAST_EXPORT_TTL)
+
 
 @router.message(Command("ai_export"))
 async def cmd_ai_export(message: Message):
     """
-    /ai_export [days] — Export AI detection data as JSONL.
+    /ai_export [days] — Export AI detection data as JSONL (gzip).
+    /ai_export since [id] — Only records after the last export (or after id).
     Admin-only. Default: last 30 days.
     """
     if not settings.is_admin(message.from_user.id):
         await message.answer("❌ Команда доступна только администраторам")
         return
 
-    args = message.text.split(maxsplit=1)
+    args = message.text.split()[1:]
     days = 30
-    if len(args) > 1:
-        try:
-            days = int(args[1].strip())
-        except ValueError:
-            await message.answer("❌ Укажите число дней: /ai_export 30")
-            return
-
-    status_msg = await message.answer(f"⏳ Экспортирую данные за {days} дней...")
-
+    since_id = None
     try:
-        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        if args and args[0].lower() == "since":
+            since_id = int(args[1]) if len(args) > 1 else (await get_last_export_id() or 0)
+        elif args:
+            days = int(args[0])
+    except ValueError:
+        await message.answer("❌ Укажите число дней: /ai_export 30\nили: /ai_export since [id]")
+        return
 
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                select(DetectedIssue)
-                .where(DetectedIssue.created_at >= cutoff)
-                .order_by(DetectedIssue.created_at)
-            )
-            issues = result.scalars().all()
+    period = f"после ID {since_id}" if since_id is not None else f"{days} дней"
+    status_msg = await message.answer(f"⏳ Экспортирую данные ({period})...")
 
-        if not issues:
-            await status_msg.edit_text(f"📋 Нет данных за последние {days} дней")
+    out_dir = tempfile.mkdtemp(prefix="ai_export_")
+    try:
+        stamp = datetime.now().strftime('%Y%m%d')
+        if since_id is not None:
+            prefix = f"ai_training_data_since{since_id}_{stamp}"
+            result = await export_training_data(out_dir, prefix, since_id=since_id)
+        else:
+            prefix = f"ai_training_data_{days}d_{stamp}"
+            cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+            result = await export_training_data(out_dir, prefix, cutoff=cutoff)
+
+        if not result.parts:
+            await status_msg.edit_text(f"📋 Нет данных ({period})")
             return
 
-        # Build JSONL
-        lines = []
-        stats = {"total": 0, "accepted": 0, "rejected": 0, "corrected": 0, "no_feedback": 0}
-
-        for issue in issues:
-            stats["total"] += 1
-            fb = issue.user_feedback or "no_feedback"
-            stats[fb] = stats.get(fb, 0) + 1
-
-            record = {
-                "prompt": {
-                    "original_text": issue.original_text,
-                    "chat_id": issue.chat_id,
-                },
-                "completion": {
-                    "is_task": True,
-                    "title": issue.title,
-                    "description": issue.description,
-                    "confidence": issue.confidence,
-                },
-                "metadata": {
-                    "id": issue.id,
-                    "issue_type": issue.issue_type,
-                    "ai_model": issue.ai_model_used,
-                    "user_feedback": issue.user_feedback,
-                    "user_edited_title": issue.user_edited_title,
-                    "user_edited_desc": issue.user_edited_desc,
-                    "user_assigned_to": issue.user_assigned_to,
-                    "correction_distance": issue.correction_distance,
-                    "plane_issue_id": issue.plane_issue_id,
-                    "created_at": issue.created_at.isoformat() if issue.created_at else None,
-                    "feedback_at": issue.feedback_at.isoformat() if issue.feedback_at else None,
-                },
-            }
-
-            # Include raw AI response if available
-            if issue.ai_response_json:
-                try:
-                    record["ai_raw"] = json.loads(issue.ai_response_json)
-                except (json.JSONDecodeError, TypeError):
-                    record["ai_raw"] = issue.ai_response_json
-
-            lines.append(json.dumps(record, ensure_ascii=False, default=str))
-
-        content = "\n".join(lines)
-        filename = f"ai_training_data_{days}d_{datetime.now().strftime('%Y%m%d')}.jsonl"
-
-        await message.answer_document(
-            BufferedInputFile(content.encode("utf-8"), filename=filename),
-            caption=(
-                f"📊 <b>AI Training Export</b>\n\n"
-                f"📋 Записей: {stats['total']}\n"
-                f"✅ Accepted: {stats.get('accepted', 0)}\n"
-                f"❌ Rejected: {stats.get('rejected', 0)}\n"
-                f"✏️ Corrected: {stats.get('corrected', 0)}\n"
-                f"⏳ No feedback: {stats.get('no_feedback', 0)}\n\n"
-                f"📅 Период: {days} дней"
-            ),
-            parse_mode="HTML"
+        stats = result.stats
+        caption = (
+            f"📊 <b>AI Training Export</b>\n\n"
+            f"📋 Записей: {stats['total']}\n"
+            f"✅ Accepted: {stats.get('accepted', 0)}\n"
+            f"❌ Rejected: {stats.get('rejected', 0)}\n"
+            f"✏️ Corrected: {stats.get('corrected', 0)}\n"
+            f"⏳ No feedback: {stats.get('no_feedback', 0)}\n\n"
+            f"📅 Период: {period}\n"
+            f"🔢 ID: {result.first_id}–{result.last_id}\n"
+            f"<i>Следующий инкрементальный экспорт: /ai_export since</i>"
         )
 
+        for i, path in enumerate(result.parts, 1):
+            part_caption = caption if i == 1 else f"📦 Часть {i}/{len(result.parts)}"
+            if i == 1 and len(result.parts) > 1:
+                part_caption += f"\n📦 Частей: {len(result.parts)}"
+            await message.answer_document(
+                FSInputFile(path, filename=os.path.basename(path)),
+                caption=part_caption,
+                parse_mode="HTML"
+            )
+
+        await set_last_export_id(result.last_id)
         await status_msg.delete()
-        bot_logger.info(f"AI training data exported: {stats['total']} records, {days} days")
+        bot_logger.info(
+            f"AI training data exported: {stats['total']} records in {len(result.parts)} part(s), {period}"
+        )
 
     except Exception as e:
         bot_logger.error(f"Error in ai_export: {e}")
         import traceback
         bot_logger.error(traceback.format_exc())
         await status_msg.edit_text(f"❌ <b>Ошибка:</b> {e}", parse_mode="HTML")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
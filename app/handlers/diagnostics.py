@@ -8,6 +8,7 @@ import asyncio
 import time
 from datetime import datetime, timezone
 
+import pytz
 from aiogram import Router
 from aiogram.types import Message
 from aiogram.filters import Command
@@ -32,7 +33,17 @@ async def _check_database() -> dict:
         result = await session.execute(select(BotUser.id))
         user_count = len(result.all())
 
-    return {"ok": True, "details": f"{latency_ms}ms | Users: {user_count}"}
+    from ..middleware.database import db_time_stats
+
+    stats = db_time_stats.get_stats(top=3)
+    details = (
+        f"{latency_ms}ms | Users: {user_count} | "
+        f"Sessions: {stats['sessions_opened']}/{stats['updates']} updates"
+    )
+    for entry in stats["top_handlers"]:
+        name = entry["handler"].rsplit(".", 1)[-1]
+        details += f"\n  {name}: avg {entry['avg_ms']}ms, max {entry['max_ms']}ms ({entry['calls']} calls)"
+    return {"ok": True, "details": details}
 
 
 async def _check_redis() -> dict:
@@ -45,11 +56,7 @@ async def _check_redis() -> dict:
     await redis_service._redis.ping()
     db_size = await redis_service._redis.dbsize()
 
-    # Check specific cache keys
-    members_exists = await redis_service.exists("plane:members")
-    members_status = "active" if members_exists else "empty"
-
-    return {"ok": True, "details": f"Connected | Keys: {db_size} | Members cache: {members_status}"}
+    return {"ok": True, "details": f"Connected | Keys: {db_size}"}
 
 
 async def _check_plane() -> dict:
@@ -63,32 +70,132 @@ async def _check_plane() -> dict:
     if result.get("success"):
         projects = await plane_api.get_all_projects()
         project_count = len(projects) if projects else 0
+        index = plane_api.get_issue_index_stats()
+        meta = plane_api.get_metadata_stats()
         return {
             "ok": True,
-            "details": f"{settings.plane_workspace_slug} | Projects: {project_count}",
+            "details": (
+                f"{settings.plane_workspace_slug} | Projects: {project_count} | "
+                f"Index: {index.get('issues', 0)} issues, "
+                f"{index.get('hits', 0)} hits / {index.get('fetches', 0)} fetches\n"
+                f"Metadata: {meta.get('members', 0)} members, {meta.get('state_sets', 0)} state sets | "
+                f"{meta.get('hits', 0) + meta.get('stale_hits', 0)} hits / {meta.get('fetches', 0)} fetches, "
+                f"{meta.get('invalidations', 0)} invalidations"
+            ),
         }
     else:
         return {"ok": False, "details": result.get("error", "Connection failed")}
 
 
 async def _check_webhook() -> dict:
-    """Check internal webhook server."""
+    """Check internal webhook server and how Telegram updates arrive."""
     import aiohttp
+    from ..webhooks.telegram_updates import telegram_update_receiver
 
     try:
         async with aiohttp.ClientSession() as session:
             async with session.get(
-                "http://localhost:8080/health",
+                f"http://localhost:{settings.webhook_port}/health",
                 timeout=aiohttp.ClientTimeout(total=5),
             ) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return {"ok": True, "details": f"6 routes | {data.get('status', 'ok')}"}
-                else:
+                if resp.status != 200:
                     return {"ok": False, "details": f"HTTP {resp.status}"}
+                data = await resp.json()
     except Exception as e:
         return {"ok": False, "details": str(e)[:50]}
 
+    details = f"Port {settings.webhook_port} | {data.get('status', 'ok')}"
+    if not telegram_update_receiver.active:
+        return {"ok": True, "details": f"{details}\nTelegram updates: polling"}
+
+    stats = telegram_update_receiver.get_stats()
+    details += (
+        f"\nTelegram updates: webhook | {stats['handled']} handled, {stats['failed']} failed, "
+        f"{stats['rejected']} rejected | {stats['in_flight']} in flight "
+        f"(max {stats['max_in_flight']}/{telegram_update_receiver.max_concurrency})"
+    )
+    return {"ok": stats["ready"], "details": details}
+
+
+async def _check_ingest() -> dict:
+    """Check write-behind buffers (queue depth, flush errors)."""
+    from ..middleware.logging import message_log_writer
+    from ..services.chat_context_service import chat_message_writer
+
+    parts = []
+    dropped = 0
+    for label, writer in (("Chat messages", chat_message_writer), ("Audit log", message_log_writer)):
+        stats = writer.get_stats()
+        part = (
+            f"{label}: {stats['pending']} queued | {stats['written']} written "
+            f"in {stats['flushes']} flushes (last {stats['last_flush_ms']}ms)"
+        )
+        if stats["spilled"]:
+            part += f" | {stats['spilled']} spilled"
+        if stats["dropped"]:
+            part += f" | {stats['dropped']} dropped"
+        parts.append(part)
+        dropped += stats["dropped"]
+    return {"ok": not dropped, "details": "\n".join(parts)}
+
+
+async def _check_delivery() -> dict:
+    """Check outbound Telegram delivery queue (pacing, flood control)."""
+    from ..services.telegram_delivery import telegram_delivery
+
+    stats = telegram_delivery.get_stats()
+    by_priority = " ".join(f"{k.lower()}={v}" for k, v in stats["by_priority"].items() if v)
+    details = (
+        f"{stats['sent']} sent ({by_priority or 'none'}) | {stats['waiting']} waiting "
+        f"(max {stats['max_queue']})\n"
+        f"Queued {stats['queued']}: avg wait {stats['avg_wait_ms']}ms, max {stats['max_wait_ms']}ms\n"
+        f"Flood control: {stats['retry_after']} retry_after, {stats['paused_chats']} chats paused, "
+        f"{stats['failed']} failed"
+    )
+    return {"ok": not stats["failed"], "details": details}
+
+
+async def _check_scheduler() -> dict:
+    """Check persisted scheduler jobs (next run, last status)."""
+    from ..services.job_scheduler import job_scheduler
+
+    if not job_scheduler.running:
+        return {"ok": False, "details": "Not running"}
+
+    jobs = await job_scheduler.get_jobs()
+    tz = pytz.timezone(settings.daily_tasks_timezone)
+    lines = []
+    failed = 0
+    for job in sorted(jobs, key=lambda j: j["name"]):
+        next_run = job["next_run_at"].astimezone(tz).strftime("%d.%m %H:%M") if job["next_run_at"] else "—"
+        status = job["last_status"] or "never"
+        if status in ("error", "timeout"):
+            failed += 1
+        lines.append(f"{job['name']}: next {next_run} | last {status}")
+    return {"ok": not failed, "details": "\n".join(lines) or "No jobs"}
+
+
+async def _check_http_pool() -> dict:
+    """Check shared outbound HTTP pool and per-host stats."""
+    from ..services.http_service import http_service
+
+    stats = http_service.get_stats()
+    if not stats["open"]:
+        return {"ok": False, "details": "Not started"}
+
+    hosts = sorted(stats["hosts"].items(), key=lambda kv: kv[1]["requests"], reverse=True)[:4]
+    parts = [
+        f"{host}: {s['requests']} req, {s['avg_ms']}ms avg, "
+        f"{s['reused_connections']}/{s['new_connections'] + s['reused_connections']} reused"
+        + (f", {s['errors']} err" if s["errors"] else "")
+        for host, s in hosts
+    ]
+    dns = stats["dns"]
+    details = f"DNS cache {dns['hits']}/{dns['hits'] + dns['misses']} hits"
+    if parts:
+        details += " | " + " | ".join(parts)
+    return {"ok": True, "details": details}
+
 
 async def _check_ai() -> dict:
     """Check AI provider availability."""
@@ -105,7 +212,15 @@ async def _check_ai() -> dict:
             default_name = p.get("name", "unknown")
             break
 
-    return {"ok": True, "details": f"{default_name} (default) | {count} provider(s)"}
+    cache = ai_manager.get_cache_stats()
+    return {
+        "ok": True,
+        "details": (
+            f"{default_name} (default) | {count} provider(s) | "
+            f"Cache: {cache['hits']} hits / {cache['misses']} misses, "
+            f"~{cache['saved_tokens']} tokens saved"
+        ),
+    }
 
 
 async def _check_migrations() -> dict:
@@ -127,7 +242,7 @@ async def _check_migrations() -> dict:
 async def cmd_diag(message: Message):
     """
     /diag — Run system diagnostics (admin-only).
-    Checks: Database, Redis, Plane API, Webhook, AI, Migrations.
+    Checks: Database, Redis, Plane API, Webhook, Scheduler, HTTP pool, ingest buffers, AI, Migrations.
     """
     if not settings.is_admin(message.from_user.id):
         await message.answer("Admin only", parse_mode=None)
@@ -140,6 +255,10 @@ async def cmd_diag(message: Message):
         ("Redis", _check_redis),
         ("Plane API", _check_plane),
         ("Webhook", _check_webhook),
+        ("Scheduler", _check_scheduler),
+        ("HTTP Pool", _check_http_pool),
+        ("Ingest", _check_ingest),
+        ("Delivery", _check_delivery),
         ("AI Provider", _check_ai),
         ("Migrations", _check_migrations),
     ]
@@ -13,6 +13,7 @@ from aiogram.filters import Command
 
 from ..config import settings
 from ..utils.logger import bot_logger
+from ..services.http_service import http_service
 from ..integrations.plane import plane_api
 from ..core.ai.ai_manager import ai_manager
 
@@ -65,11 +66,10 @@ async def cmd_plane_status(message: Message):
             pname = proj.get('identifier') or proj.get('name', '?')
 
             try:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    tasks = await plane_api._tasks_manager._get_project_issues(
-                        session, pid, assigned_only=False
-                    )
+                session = http_service.session
+                tasks = await plane_api._tasks_manager._get_project_issues(
+                    session, pid, assigned_only=False
+                )
             except Exception as e:
                 bot_logger.warning(f"Failed to fetch issues for {pname}: {e}")
                 continue
@@ -14,6 +14,7 @@ from datetime import datetime
 
 from ..database.database import get_async_session
 from ..database.models import BotUser
+from ..services.user_cache import user_cache
 from ..utils.formatters import format_help_message, format_about_message, format_user_profile, escape_markdown
 from ..utils.logger import bot_logger, log_user_action
 from ..config import settings
@@ -120,6 +121,7 @@ async def get_or_create_user(session: AsyncSession, message: Message) -> BotUser
     
     session.add(new_user)
     await session.commit()
+    user_cache.put(new_user)
     
     bot_logger.info(f"New admin user registered: {telegram_user_id} (@{message.from_user.username})")
     
@@ -23,6 +23,7 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKe
 
 from ..config import settings
 from ..utils.logger import bot_logger
+from ..services.http_service import http_service
 from ..services.n8n_ai_service import n8n_ai_service
 from ..services.redis_service import redis_service
 
@@ -65,17 +66,17 @@ async def download_voice_file(bot: Bot, file_id: str) -> Optional[str]:
         # Download file
         file_url = f"https://api.telegram.org/file/bot{settings.telegram_token}/{file_path}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(file_url) as resp:
-                if resp.status != 200:
-                    bot_logger.error(f"Failed to download voice file: HTTP {resp.status}")
-                    return None
+        session = http_service.session
+        async with session.get(file_url) as resp:
+            if resp.status != 200:
+                bot_logger.error(f"Failed to download voice file: HTTP {resp.status}")
+                return None
 
-                # Save to temp file (Whisper accepts ogg, mp3, wav, etc.)
-                suffix = ".ogg" if file_path.endswith(".oga") else os.path.splitext(file_path)[1]
-                with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                    tmp.write(await resp.read())
-                    return tmp.name
+            # Save to temp file (Whisper accepts ogg, mp3, wav, etc.)
+            suffix = ".ogg" if file_path.endswith(".oga") else os.path.splitext(file_path)[1]
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+                tmp.write(await resp.read())
+                return tmp.name
 
     except Exception as e:
         bot_logger.error(f"Error downloading voice file: {e}")
@@ -167,14 +168,14 @@ Company aliases (use the OFFICIAL name on the right):
 """
 
     try:
-        async with aiohttp.ClientSession() as session:
-            url = "https://openrouter.ai/api/v1/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {openrouter_key}",
-                "Content-Type": "application/json"
-            }
-
-            system_prompt = f"""Extract work report data from voice transcription in Russian.
+        session = http_service.session
+        url = "https://openrouter.ai/api/v1/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {openrouter_key}",
+            "Content-Type": "application/json"
+        }
+
+        system_prompt = f"""Extract work report data from voice transcription in Russian.
 The transcription may contain MULTIPLE work entries (different companies/tasks).
 
 IMPORTANT: Try to match company and worker names to these valid values:
@@ -208,33 +209,33 @@ Rules:
 - ALWAYS return mentioned company/workers even if not in valid list
 - Set company_unmatched=true or add to workers_unmatched if not matched"""
 
-            payload = {
-                "model": "google/gemma-3-27b-it:free",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Extract from: {transcription}"}
-                ],
-                "temperature": 0.2,
-                "max_tokens": 500
-            }
-
-            async with session.post(url, headers=headers, json=payload) as resp:
-                if resp.status == 200:
-                    result = await resp.json()
-                    content = result.get("choices", [{}])[0].get("message", {}).get("content", "{}")
-
-                    # Clean up markdown code blocks if present
-                    if "```json" in content:
-                        content = content.split("```json")[1].split("```")[0]
-                    elif "```" in content:
-                        content = content.split("```")[1].split("```")[0]
-
-                    import json
-                    return json.loads(content.strip())
-                else:
-                    error_text = await resp.text()
-                    bot_logger.error(f"OpenRouter API error: {resp.status} - {error_text}")
-                    return None
+        payload = {
+            "model": "google/gemma-3-27b-it:free",
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Extract from: {transcription}"}
+            ],
+            "temperature": 0.2,
+            "max_tokens": 500
+        }
+
+        async with session.post(url, headers=headers, json=payload) as resp:
+            if resp.status == 200:
+                result = await resp.json()
+                content = result.get("choices", [{}])[0].get("message", {}).get("content", "{}")
+
+                # Clean up markdown code blocks if present
+                if "```json" in content:
+                    content = content.split("```json")[1].split("```")[0]
+                elif "```" in content:
+                    content = content.split("```")[1].split("```")[0]
+
+                import json
+                return json.loads(content.strip())
+            else:
+                error_text = await resp.text()
+                bot_logger.error(f"OpenRouter API error: {resp.status} - {error_text}")
+                return None
 
     except Exception as e:
         bot_logger.error(f"Error extracting with OpenRouter: {e}")
@@ -261,71 +262,71 @@ async def transcribe_with_whisper(file_path: str) -> Optional[str]:
         with open(file_path, "rb") as f:
             audio_data = f.read()
 
-        async with aiohttp.ClientSession() as session:
-            # Try HuggingFace first (free)
-            if hf_key:
-                bot_logger.info("Using HuggingFace Whisper for transcription")
-                # New endpoint (old api-inference.huggingface.co is deprecated as of 2025)
-                url = "https://router.huggingface.co/hf-inference/models/openai/whisper-large-v3"
-                # Determine content type from file extension
-                content_type = "audio/ogg"
-                if file_path.endswith(".wav"):
-                    content_type = "audio/wav"
-                elif file_path.endswith(".mp3"):
-                    content_type = "audio/mpeg"
-                elif file_path.endswith(".flac"):
-                    content_type = "audio/flac"
-                headers = {
-                    "Authorization": f"Bearer {hf_key}",
-                    "Content-Type": content_type
-                }
+        session = http_service.session
+        # Try HuggingFace first (free)
+        if hf_key:
+            bot_logger.info("Using HuggingFace Whisper for transcription")
+            # New endpoint (old api-inference.huggingface.co is deprecated as of 2025)
+            url = "https://router.huggingface.co/hf-inference/models/openai/whisper-large-v3"
+            # Determine content type from file extension
+            content_type = "audio/ogg"
+            if file_path.endswith(".wav"):
+                content_type = "audio/wav"
+            elif file_path.endswith(".mp3"):
+                content_type = "audio/mpeg"
+            elif file_path.endswith(".flac"):
+                content_type = "audio/flac"
+            headers = {
+                "Authorization": f"Bearer {hf_key}",
+                "Content-Type": content_type
+            }
+
+            async with session.post(url, headers=headers, data=audio_data) as resp:
+                if resp.status == 200:
+                    result = await resp.json()
+                    return result.get("text", "").strip()
+                else:
+                    error_text = await resp.text()
+                    bot_logger.warning(f"HuggingFace API error: {resp.status} - {error_text}")
+                    # Fall through to next provider
+
+        # Try Groq (paid but cheap)
+        if groq_key:
+            bot_logger.info("Using Groq Whisper for transcription")
+            url = "https://api.groq.com/openai/v1/audio/transcriptions"
+            headers = {"Authorization": f"Bearer {groq_key}"}
+
+            form = aiohttp.FormData()
+            form.add_field("file", audio_data, filename="voice.ogg", content_type="audio/ogg")
+            form.add_field("model", "whisper-large-v3-turbo")
+            form.add_field("language", "ru")
+            form.add_field("response_format", "text")
+
+            async with session.post(url, headers=headers, data=form) as resp:
+                if resp.status == 200:
+                    return (await resp.text()).strip()
+                else:
+                    error_text = await resp.text()
+                    bot_logger.warning(f"Groq API error: {resp.status} - {error_text}")
+
+        # Fallback to OpenAI (paid)
+        if openai_key:
+            bot_logger.info("Using OpenAI Whisper for transcription")
+            url = "https://api.openai.com/v1/audio/transcriptions"
+            headers = {"Authorization": f"Bearer {openai_key}"}
 
-                async with session.post(url, headers=headers, data=audio_data) as resp:
-                    if resp.status == 200:
-                        result = await resp.json()
-                        return result.get("text", "").strip()
-                    else:
-                        error_text = await resp.text()
-                        bot_logger.warning(f"HuggingFace API error: {resp.status} - {error_text}")
-                        # Fall through to next provider
-
-            # Try Groq (paid but cheap)
-            if groq_key:
-                bot_logger.info("Using Groq Whisper for transcription")
-                url = "https://api.groq.com/openai/v1/audio/transcriptions"
-                headers = {"Authorization": f"Bearer {groq_key}"}
-
-                form = aiohttp.FormData()
-                form.add_field("file", audio_data, filename="voice.ogg", content_type="audio/ogg")
-                form.add_field("model", "whisper-large-v3-turbo")
-                form.add_field("language", "ru")
-                form.add_field("response_format", "text")
-
-                async with session.post(url, headers=headers, data=form) as resp:
-                    if resp.status == 200:
-                        return (await resp.text()).strip()
-                    else:
-                        error_text = await resp.text()
-                        bot_logger.warning(f"Groq API error: {resp.status} - {error_text}")
-
-            # Fallback to OpenAI (paid)
-            if openai_key:
-                bot_logger.info("Using OpenAI Whisper for transcription")
-                url = "https://api.openai.com/v1/audio/transcriptions"
-                headers = {"Authorization": f"Bearer {openai_key}"}
-
-                form = aiohttp.FormData()
-                form.add_field("file", audio_data, filename="voice.ogg", content_type="audio/ogg")
-                form.add_field("model", "whisper-1")
-                form.add_field("language", "ru")
-                form.add_field("response_format", "text")
-
-                async with session.post(url, headers=headers, data=form) as resp:
-                    if resp.status == 200:
-                        return (await resp.text()).strip()
-                    else:
-                        error_text = await resp.text()
-                        bot_logger.error(f"OpenAI API error: {resp.status} - {error_text}")
+            form = aiohttp.FormData()
+            form.add_field("file", audio_data, filename="voice.ogg", content_type="audio/ogg")
+            form.add_field("model", "whisper-1")
+            form.add_field("language", "ru")
+            form.add_field("response_format", "text")
+
+            async with session.post(url, headers=headers, data=form) as resp:
+                if resp.status == 200:
+                    return (await resp.text()).strip()
+                else:
+                    error_text = await resp.text()
+                    bot_logger.error(f"OpenAI API error: {resp.status} - {error_text}")
 
         bot_logger.warning("No working Whisper API available")
         return None
@@ -845,29 +846,79 @@ async def callback_voice_ai_to_report(callback: CallbackQuery):
 
 @router.callback_query(F.data.startswith("voice_find_task:"))
 async def callback_voice_find_task(callback: CallbackQuery):
-    """Search for task in Plane based on AI extraction"""
+    """Search for task in Plane based on AI extraction (issue text index)"""
     try:
         parts = callback.data.split(":")
         admin_id = int(parts[1])
         message_id = int(parts[2])
 
-        cache_key = f"voice_report:{admin_id}:{message_id}"
-        cached = await redis_service.get_json(cache_key)
+        # n8n flow stores voice_task_select, local flow — voice_report
+        select_key = f"voice_task_select:{admin_id}:{message_id}"
+        cached = await redis_service.get_json(select_key)
+        if not cached:
+            cached = await redis_service.get_json(f"voice_report:{admin_id}:{message_id}")
 
         if not cached:
             await callback.answer("❌ Данные истекли", show_alert=True)
             return
 
-        extraction = cached.get("extraction", {})
+        extraction = cached.get("extraction") or (cached.get("entries") or [{}])[0]
         keywords = extraction.get("keywords", [])
         company = extraction.get("company", "")
+        query = " ".join(keywords) or extraction.get("work_description") or cached.get("transcription", "")
 
-        await callback.message.edit_text(
+        from ..modules.plane_assistant import plane_service
+        matches = []
+        if company:
+            matches = await plane_service.search_issues_by_name(query, company, min_coverage=0.3)
+        if not matches:
+            matches = await plane_service.search_issues_by_name(query, min_coverage=0.3)
+
+        header = (
             f"<b>🔍 Поиск задачи в Plane</b>\n\n"
             f"Компания: {company or 'любая'}\n"
             f"Ключевые слова: {', '.join(keywords) if keywords else 'нет'}\n\n"
-            f"<i>Функция в разработке.\n"
-            f"Используйте веб-интерфейс Plane для поиска задачи.</i>",
+        )
+
+        if not matches:
+            await callback.message.edit_text(
+                header + "<i>Подходящих открытых задач не найдено.\n"
+                         "Используйте веб-интерфейс Plane для поиска задачи.</i>",
+                parse_mode="HTML"
+            )
+            await callback.answer()
+            return
+
+        candidates = [
+            {
+                "id": issue["id"],
+                "project_id": project_id,
+                "sequence_id": issue["sequence_id"],
+                "title": issue["name"],
+            }
+            for project_id, _, issue in matches
+        ]
+        await redis_service.set_json(select_key, {
+            "transcription": cached.get("transcription", ""),
+            "extraction": extraction,
+            "candidates": candidates,
+        }, ttl=_ttl_for_key(select_key))
+
+        buttons = [
+            [InlineKeyboardButton(
+                text=f"#{c['sequence_id']} {c['title'][:30]}",
+                callback_data=f"voice_select:{admin_id}:{message_id}:{i}"
+            )]
+            for i, c in enumerate(candidates)
+        ]
+        buttons.append([InlineKeyboardButton(
+            text="❌ Отмена",
+            callback_data=f"voice_cancel:{admin_id}:{message_id}"
+        )])
+
+        await callback.message.edit_text(
+            header + "Выберите задачу:",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons),
             parse_mode="HTML"
         )
 
@@ -5,8 +5,10 @@ FIXES (2026-01-20):
 - Wrapped blocking gspread calls in run_in_executor to prevent event loop blocking
 - gspread is sync-only, so all I/O operations run in thread pool
 """
+import hashlib
 import json
 import logging
+import re
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date
 import asyncio
@@ -19,14 +21,30 @@ from google.oauth2.service_account import Credentials
 from gspread.exceptions import APIError, SpreadsheetNotFound, WorksheetNotFound
 
 from ..config import settings
-from ..database.database import get_async_session
-from ..database.work_journal_models import WorkJournalEntry, WorkJournalWorker, WorkJournalCompany
-from ..services.work_journal_service import WorkJournalService
+from ..database.database import AsyncSessionLocal
+from ..database.work_journal_models import WorkJournalEntry, WorkJournalEntryWorker, normalize_worker_key
+from ..services.redis_service import redis_service
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 
 logger = logging.getLogger(__name__)
 
+LAST_ROW_KEY = "sheets_sync:last_row:{sheet_id}"
+LAST_ROW_TTL = 365 * 86400
+INSERT_CHUNK = 500  # Строк в одном INSERT (лимит параметров PostgreSQL)
+
+_WS_RE = re.compile(r"\s+")
+
+
+def entry_fingerprint(work_date: date, company: str, description: str) -> str:
+    """Отпечаток записи журнала: дата + компания + описание (регистр/пробелы не важны)"""
+    def norm(value: str) -> str:
+        return _WS_RE.sub(" ", (value or "").strip().lower().replace("ё", "е"))
+
+    raw = f"{work_date.isoformat()}|{norm(company)}|{norm(description)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
 
 @dataclass
 class SheetWorkEntry:
@@ -67,6 +85,18 @@ class GoogleSheetsParser:
         """Sync method for thread pool - gets all records from worksheet"""
         return self.worksheet.get_all_records()
 
+    def _sync_get_records_from(self, start_row: int) -> List[Dict[str, Any]]:
+        """Sync method for thread pool - gets records from start_row (1-based, header is row 1)"""
+        header = self.worksheet.row_values(1)
+        if not header or start_row > self.worksheet.row_count:
+            return []
+        last_cell = gspread.utils.rowcol_to_a1(self.worksheet.row_count, len(header))
+        values = self.worksheet.get_values(f"A{start_row}:{last_cell}")
+        return [
+            dict(zip(header, row + [''] * (len(header) - len(row))))
+            for row in values
+        ]
+
     async def initialize(self) -> bool:
         """Инициализация Google Sheets клиента"""
         try:
@@ -168,6 +198,26 @@ class GoogleSheetsParser:
             logger.error(f"Failed to get entries from Google Sheets: {e}")
             return []
     
+    async def get_entries_from(self, start_row: int) -> List[Dict[str, Any]]:
+        """Получение записей начиная со строки start_row (для инкрементального импорта)"""
+        try:
+            if not self.worksheet:
+                if not await self.connect_to_sheet():
+                    return []
+
+            loop = asyncio.get_event_loop()
+            rows = await loop.run_in_executor(
+                self._executor,
+                self._sync_get_records_from,
+                start_row
+            )
+            logger.info(f"Retrieved {len(rows)} entries from Google Sheets starting at row {start_row}")
+            return rows
+
+        except Exception as e:
+            logger.error(f"Failed to get entries from Google Sheets: {e}")
+            return []
+
     def parse_sheet_entry(self, row_data: Dict[str, Any]) -> Optional[SheetWorkEntry]:
         """Парсинг одной записи из Google Sheets"""
         try:
@@ -251,8 +301,24 @@ class GoogleSheetsParser:
         # Если разделителей нет, возвращаем как один элемент
         return [workers_str.strip()]
     
-    async def sync_entries_to_database(self) -> Dict[str, int]:
-        """Синхронизация записей из Google Sheets в базу данных"""
+    async def _get_last_row(self) -> int:
+        data = await redis_service.get_json(LAST_ROW_KEY.format(sheet_id=self.spreadsheet_id))
+        return int(data["row"]) if data else 1
+
+    async def _set_last_row(self, row: int) -> None:
+        await redis_service.set_json(
+            LAST_ROW_KEY.format(sheet_id=self.spreadsheet_id), {"row": row}, ttl=LAST_ROW_TTL
+        )
+
+    async def sync_entries_to_database(self, full: bool = False) -> Dict[str, int]:
+        """
+        Синхронизация записей из Google Sheets в базу данных
+
+        Инкрементально: читаются только строки после последней обработанной
+        (full=True — весь лист). Дубликаты отсекаются по отпечатку содержимого:
+        существующие отпечатки за диапазон дат загружаются одним запросом,
+        новые записи вставляются пачками с ON CONFLICT DO NOTHING.
+        """
         stats = {
             'total_processed': 0,
             'new_entries': 0,
@@ -261,71 +327,76 @@ class GoogleSheetsParser:
         }
         
         try:
-            # Получаем данные из Google Sheets
-            sheet_data = await self.get_all_entries()
+            start_row = 2 if full else await self._get_last_row() + 1
+            sheet_data = await self.get_entries_from(start_row)
             if not sheet_data:
-                logger.warning("No data retrieved from Google Sheets")
+                logger.info(f"No new rows in Google Sheets after row {start_row - 1}")
                 return stats
             
             stats['total_processed'] = len(sheet_data)
-            
-            async with get_async_session() as session:
-                work_service = WorkJournalService(session)
-                
-                for row_data in sheet_data:
-                    try:
-                        # Парсим запись
-                        sheet_entry = self.parse_sheet_entry(row_data)
-                        if not sheet_entry:
-                            stats['skipped_entries'] += 1
-                            continue
-                        
-                        # Парсим дату
-                        work_date = self.parse_date(sheet_entry.work_date)
-                        if not work_date:
-                            logger.warning(f"Invalid date in entry: {sheet_entry.work_date}")
-                            stats['error_entries'] += 1
-                            continue
-                        
-                        # Парсим исполнителей
-                        workers = self.parse_workers(sheet_entry.workers)
-                        if not workers:
-                            logger.warning(f"No workers found in entry: {sheet_entry.workers}")
-                            stats['error_entries'] += 1
-                            continue
-                        
-                        # Проверяем, существует ли уже такая запись
-                        existing_entry = await self._find_existing_entry(
-                            session, 
-                            work_date, 
-                            sheet_entry.company, 
-                            sheet_entry.description,
-                            workers
-                        )
-                        
-                        if existing_entry:
-                            logger.debug(f"Entry already exists: {work_date} - {sheet_entry.company}")
-                            stats['skipped_entries'] += 1
-                            continue
-                        
-                        # Создаем новую запись
-                        await self._create_database_entry(
-                            session,
-                            sheet_entry,
-                            work_date,
-                            workers
-                        )
-                        
-                        stats['new_entries'] += 1
-                        logger.info(f"Created new entry: {work_date} - {sheet_entry.company}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing sheet entry: {e}, data: {row_data}")
+
+            # 1. Парсинг строк без обращений к БД
+            parsed = []
+            for row_data in sheet_data:
+                try:
+                    sheet_entry = self.parse_sheet_entry(row_data)
+                    if not sheet_entry:
+                        stats['skipped_entries'] += 1
+                        continue
+
+                    work_date = self.parse_date(sheet_entry.work_date)
+                    if not work_date:
+                        logger.warning(f"Invalid date in entry: {sheet_entry.work_date}")
                         stats['error_entries'] += 1
                         continue
-                
-                # Коммитим изменения
+
+                    workers = self.parse_workers(sheet_entry.workers)
+                    if not workers:
+                        logger.warning(f"No workers found in entry: {sheet_entry.workers}")
+                        stats['error_entries'] += 1
+                        continue
+
+                    fingerprint = entry_fingerprint(work_date, sheet_entry.company, sheet_entry.description)
+                    parsed.append((fingerprint, sheet_entry, work_date, workers))
+
+                except Exception as e:
+                    logger.error(f"Error processing sheet entry: {e}, data: {row_data}")
+                    stats['error_entries'] += 1
+
+            async with AsyncSessionLocal() as session:
+                # 2. Существующие отпечатки за диапазон дат — один запрос
+                seen = set()
+                if parsed:
+                    seen = await self._load_fingerprints(
+                        session,
+                        min(p[2] for p in parsed),
+                        max(p[2] for p in parsed)
+                    )
+
+                # 3. Только новые записи (в том числе без повторов внутри листа)
+                rows = []
+                workers_by_fingerprint = {}
+                for fingerprint, sheet_entry, work_date, workers in parsed:
+                    if fingerprint in seen:
+                        stats['skipped_entries'] += 1
+                        continue
+                    seen.add(fingerprint)
+                    rows.append(self._entry_row(sheet_entry, work_date, workers, fingerprint))
+                    workers_by_fingerprint[fingerprint] = workers
+
+                # 4. Пакетная вставка записей и их исполнителей
+                inserted = await self._bulk_insert(session, rows)
+                if inserted:
+                    await self._insert_entry_workers(session, workers_by_fingerprint)
                 await session.commit()
+
+            stats['new_entries'] = inserted
+            stats['skipped_entries'] += len(rows) - inserted
+            await self._set_last_row(start_row + len(sheet_data) - 1)
+            logger.info(
+                f"Sheets import: {inserted} new of {len(sheet_data)} rows "
+                f"(rows {start_row}-{start_row + len(sheet_data) - 1})"
+            )
                 
         except Exception as e:
             logger.error(f"Failed to sync entries to database: {e}")
@@ -333,68 +404,92 @@ class GoogleSheetsParser:
         
         return stats
     
-    async def _find_existing_entry(
-        self, 
-        session: AsyncSession, 
-        work_date: date, 
-        company: str, 
-        description: str,
-        workers: List[str]
-    ) -> Optional[WorkJournalEntry]:
-        """Поиск существующей записи в базе данных"""
-        try:
-            # Ищем по дате, компании и описанию
-            stmt = select(WorkJournalEntry).where(
-                WorkJournalEntry.work_date == work_date,
-                WorkJournalEntry.company == company,
-                WorkJournalEntry.work_description == description
-            )
-            
-            result = await session.execute(stmt)
-            existing_entry = result.scalar_one_or_none()
-            
-            return existing_entry
-            
-        except Exception as e:
-            logger.error(f"Error finding existing entry: {e}")
-            return None
-    
-    async def _create_database_entry(
+    async def _load_fingerprints(self, session: AsyncSession, date_from: date, date_to: date) -> set:
+        """Отпечатки всех записей журнала за диапазон дат (для записей без отпечатка — вычисляются)"""
+        result = await session.execute(
+            select(
+                WorkJournalEntry.content_fingerprint,
+                WorkJournalEntry.work_date,
+                WorkJournalEntry.company,
+                WorkJournalEntry.work_description,
+            ).where(WorkJournalEntry.work_date.between(date_from, date_to))
+        )
+        return {
+            fingerprint or entry_fingerprint(work_date, company, description)
+            for fingerprint, work_date, company, description in result.all()
+        }
+
+    def _entry_row(
         self,
-        session: AsyncSession,
         sheet_entry: SheetWorkEntry,
         work_date: date,
-        workers: List[str]
-    ):
-        """Создание записи в базе данных"""
-        try:
-            # Определяем telegram_user_id и created_by_user_id
-            # Поскольку данные из Google Sheets, используем системного пользователя
-            system_user_id = settings.admin_user_id_list[0] if settings.admin_user_id_list else 0
-            
-            # Определяем статус командировки
-            is_travel = sheet_entry.is_travel.lower() in ['да', 'yes', 'true', '1', 'командировка']
-            
-            # Создаем запись
-            new_entry = WorkJournalEntry(
-                telegram_user_id=system_user_id,
-                user_email=sheet_entry.email,
-                work_date=work_date,
-                company=sheet_entry.company,
-                work_duration=sheet_entry.duration,
-                work_description=sheet_entry.description,
-                is_travel=is_travel,
-                worker_names=json.dumps(workers, ensure_ascii=False),
-                created_by_user_id=system_user_id,
-                created_by_name=sheet_entry.created_by or "Google Sheets Import",
-                n8n_sync_status='imported_from_sheets'
+        workers: List[str],
+        fingerprint: str
+    ) -> Dict[str, Any]:
+        """Значения колонок новой записи журнала"""
+        # Поскольку данные из Google Sheets, используем системного пользователя
+        system_user_id = settings.admin_user_id_list[0] if settings.admin_user_id_list else 0
+        is_travel = sheet_entry.is_travel.lower() in ['да', 'yes', 'true', '1', 'командировка']
+        now = datetime.utcnow()
+
+        return {
+            'telegram_user_id': system_user_id,
+            'user_email': sheet_entry.email,
+            'work_date': work_date,
+            'company': sheet_entry.company,
+            'work_duration': sheet_entry.duration,
+            'work_description': sheet_entry.description,
+            'is_travel': is_travel,
+            'worker_names': json.dumps(workers, ensure_ascii=False),
+            'created_by_user_id': system_user_id,
+            'created_by_name': sheet_entry.created_by or "Google Sheets Import",
+            'created_at': now,
+            'updated_at': now,
+            'n8n_sync_status': 'imported_from_sheets',
+            'n8n_sync_attempts': 0,
+            'content_fingerprint': fingerprint,
+        }
+
+    async def _insert_entry_workers(self, session: AsyncSession, workers_by_fingerprint: Dict[str, List[str]]):
+        """Строки work_journal_entry_workers для только что вставленных записей"""
+        fingerprints = list(workers_by_fingerprint)
+        links = []
+        for i in range(0, len(fingerprints), INSERT_CHUNK):
+            result = await session.execute(
+                select(WorkJournalEntry.id, WorkJournalEntry.content_fingerprint)
+                .where(WorkJournalEntry.content_fingerprint.in_(fingerprints[i:i + INSERT_CHUNK]))
             )
-            
-            session.add(new_entry)
-            
-        except Exception as e:
-            logger.error(f"Error creating database entry: {e}")
-            raise
+            for entry_id, fingerprint in result.all():
+                for name in dict.fromkeys(workers_by_fingerprint[fingerprint]):
+                    links.append({
+                        'entry_id': entry_id,
+                        'worker_name': name[:255],
+                        'worker_key': normalize_worker_key(name)[:255],
+                    })
+
+        dialect = postgresql if session.bind.dialect.name == 'postgresql' else sqlite
+        for i in range(0, len(links), INSERT_CHUNK):
+            await session.execute(
+                dialect.insert(WorkJournalEntryWorker)
+                .values(links[i:i + INSERT_CHUNK])
+                .on_conflict_do_nothing()
+            )
+
+    async def _bulk_insert(self, session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """INSERT ... ON CONFLICT (content_fingerprint) DO NOTHING пачками; возвращает число вставленных"""
+        if not rows:
+            return 0
+        dialect = postgresql if session.bind.dialect.name == 'postgresql' else sqlite
+        inserted = 0
+        for i in range(0, len(rows), INSERT_CHUNK):
+            stmt = (
+                dialect.insert(WorkJournalEntry)
+                .values(rows[i:i + INSERT_CHUNK])
+                .on_conflict_do_nothing(index_elements=['content_fingerprint'])
+            )
+            result = await session.execute(stmt)
+            inserted += result.rowcount
+        return inserted
 
 
 class GoogleSheetsService:
@@ -403,8 +498,8 @@ class GoogleSheetsService:
     def __init__(self):
         self.parser = GoogleSheetsParser()
     
-    async def sync_from_sheets(self) -> Dict[str, int]:
-        """Синхронизация данных из Google Sheets в базу данных"""
+    async def sync_from_sheets(self, full: bool = False) -> Dict[str, int]:
+        """Синхронизация данных из Google Sheets в базу данных (full=True — перечитать весь лист)"""
         logger.info("Starting Google Sheets synchronization")
         
         try:
@@ -414,7 +509,7 @@ class GoogleSheetsService:
                 return {'total_processed': 0, 'new_entries': 0, 'skipped_entries': 0, 'error_entries': 0}
             
             # Синхронизируем данные
-            stats = await self.parser.sync_entries_to_database()
+            stats = await self.parser.sync_entries_to_database(full=full)
             
             logger.info(f"Google Sheets sync completed. Stats: {stats}")
             return stats
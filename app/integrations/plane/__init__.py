@@ -8,15 +8,21 @@ This module provides a clean interface to Plane.so API with:
 - Comprehensive logging and error handling
 - DIRECT PostgreSQL DATABASE ACCESS (bypasses rate-limited API)
 """
-import aiohttp
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 
 from ...utils.logger import bot_logger
+from ...utils.text_search import SearchHit
+from ...services.http_service import http_service
 from .client import PlaneAPIClient
 from .models import PlaneTask, PlaneProject, PlaneUser, PlaneState
 from .projects import PlaneProjectsManager
 from .users import PlaneUsersManager
 from .tasks import PlaneTasksManager
+from .index import PlaneIssueIndex, is_closed
+from .metadata import PlaneMetadataRegistry
+from .workload import MemberWorkload, aggregate_workload, UNASSIGNED
+from .issue_refs import IssueRef, issue_refs
 from .database import plane_db_client  # NEW: Direct DB access
 from .exceptions import (
     PlaneAPIError,
@@ -46,16 +52,23 @@ class PlaneAPI:
             self._client = PlaneAPIClient(self.api_url, self.api_token, self.workspace_slug)
             self._projects_manager = PlaneProjectsManager(self._client)
             self._users_manager = PlaneUsersManager(self._client)
-            self._tasks_manager = PlaneTasksManager(
+            self._metadata = PlaneMetadataRegistry(
                 self._client,
                 self._projects_manager,
                 self._users_manager
             )
+            self._tasks_manager = PlaneTasksManager(
+                self._client,
+                self._projects_manager,
+                self._users_manager,
+                metadata=self._metadata
+            )
             bot_logger.info(f"✅ Plane API initialized: {self.api_url}, workspace: {self.workspace_slug}")
         else:
             self._client = None
             self._projects_manager = None
             self._users_manager = None
+            self._metadata = None
             self._tasks_manager = None
             bot_logger.warning("⚠️ Plane API not configured (missing credentials)")
 
@@ -64,6 +77,11 @@ class PlaneAPI:
         """Check if API is properly configured"""
         return bool(self.api_url and self.api_token and self.workspace_slug)
 
+    @property
+    def metadata(self) -> Optional[PlaneMetadataRegistry]:
+        """Cached projects / states / members (None if not configured)"""
+        return self._metadata
+
     async def test_connection(self) -> Dict[str, Any]:
         """Test API connection and authentication"""
         if not self.configured:
@@ -73,16 +91,16 @@ class PlaneAPI:
             }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                # Test by fetching workspace info
-                endpoint = f"/api/v1/workspaces/{self.workspace_slug}/"
-                await self._client.get(session, endpoint)
-
-                return {
-                    'success': True,
-                    'message': 'Successfully connected to Plane API',
-                    'workspace': self.workspace_slug
-                }
+            session = http_service.session
+            # Test by fetching workspace info
+            endpoint = f"/api/v1/workspaces/{self.workspace_slug}/"
+            await self._client.get(session, endpoint)
+
+            return {
+                'success': True,
+                'message': 'Successfully connected to Plane API',
+                'workspace': self.workspace_slug
+            }
 
         except PlaneAuthError as e:
             return {
@@ -123,17 +141,7 @@ class PlaneAPI:
             return []
 
         try:
-            # ⚡ МАКСИМАЛЬНАЯ СКОРОСТЬ: коннектор с 50 одновременными соединениями
-            connector = aiohttp.TCPConnector(
-                limit=50,  # Максимум 50 одновременных запросов
-                limit_per_host=50,  # К одному хосту (Plane API)
-                ttl_dns_cache=300  # Кэш DNS на 5 минут
-            )
-            async with aiohttp.ClientSession(
-                connector=connector,
-                timeout=aiohttp.ClientTimeout(total=60, connect=5)  # Быстрые таймауты
-            ) as session:
-                return await self._tasks_manager.get_user_tasks(session, user_email)
+            return await self._tasks_manager.get_user_tasks(http_service.session, user_email)
 
         except ValueError as e:
             # Re-raise email validation errors
@@ -144,38 +152,39 @@ class PlaneAPI:
             return []
 
     async def get_workspace_members(self) -> List[PlaneUser]:
-        """Get all workspace members"""
+        """Get all workspace members (metadata registry)"""
         if not self.configured:
             return []
 
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._users_manager.get_workspace_members(session)
+            session = http_service.session
+            return await self._metadata.get_members(session)
         except Exception as e:
             bot_logger.error(f"Error getting workspace members: {e}")
             return []
 
     async def get_all_projects(self) -> List[Dict[str, Any]]:
-        """Get all projects in workspace (for backward compatibility)"""
+        """Get all projects in workspace (for backward compatibility; metadata registry)"""
         if not self.configured:
             return []
 
         try:
-            async with aiohttp.ClientSession() as session:
-                projects = await self._projects_manager.get_projects(session)
-                # Convert to dict format for backward compatibility
-                return [
-                    {
-                        'id': p.id,
-                        'name': p.name,
-                        'identifier': p.identifier,  # Add identifier (HARZL, HHIVP, etc.)
-                        'description': p.description,
-                        'workspace': p.workspace,
-                        'created_at': p.created_at,
-                        'updated_at': p.updated_at
-                    }
-                    for p in projects
-                ]
+            session = http_service.session
+            projects = await self._metadata.get_projects(session)
+            self._tasks_manager.index.set_project_names(projects)
+            # Convert to dict format for backward compatibility
+            return [
+                {
+                    'id': p.id,
+                    'name': p.name,
+                    'identifier': p.identifier,  # Add identifier (HARZL, HHIVP, etc.)
+                    'description': p.description,
+                    'workspace': p.workspace,
+                    'created_at': p.created_at,
+                    'updated_at': p.updated_at
+                }
+                for p in projects
+            ]
         except Exception as e:
             bot_logger.error(f"Error getting all projects: {e}")
             return []
@@ -186,8 +195,13 @@ class PlaneAPI:
             return None
 
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._users_manager.find_user_by_email(session, user_email)
+            session = http_service.session
+            email = user_email.lower().strip()
+            for member in await self._metadata.get_members(session):
+                if member.email.lower().strip() == email:
+                    return member
+            bot_logger.warning(f"⚠️ User not found with email: {user_email}")
+            return None
         except Exception as e:
             bot_logger.error(f"Error finding user by email: {e}")
             return None
@@ -222,17 +236,17 @@ class PlaneAPI:
             return None
 
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._tasks_manager.create_issue(
-                    session=session,
-                    project_id=project_id,
-                    name=name,
-                    description=description,
-                    priority=priority,
-                    labels=labels,
-                    assignees=assignees,
-                    target_date=target_date,
-                )
+            session = http_service.session
+            return await self._tasks_manager.create_issue(
+                session=session,
+                project_id=project_id,
+                name=name,
+                description=description,
+                priority=priority,
+                labels=labels,
+                assignees=assignees,
+                target_date=target_date,
+            )
         except Exception as e:
             bot_logger.error(f"Error creating issue: {e}")
             return None
@@ -257,12 +271,12 @@ class PlaneAPI:
             return None
 
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._tasks_manager.get_issue_details(
-                    session=session,
-                    project_id=project_id,
-                    issue_id=issue_id
-                )
+            session = http_service.session
+            return await self._tasks_manager.get_issue_details(
+                session=session,
+                project_id=project_id,
+                issue_id=issue_id
+            )
         except Exception as e:
             bot_logger.error(f"Error getting issue details: {e}")
             return None
@@ -287,12 +301,12 @@ class PlaneAPI:
             return []
 
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._tasks_manager.get_issue_comments(
-                    session=session,
-                    project_id=project_id,
-                    issue_id=issue_id
-                )
+            session = http_service.session
+            return await self._tasks_manager.get_issue_comments(
+                session=session,
+                project_id=project_id,
+                issue_id=issue_id
+            )
         except Exception as e:
             bot_logger.error(f"Error getting issue comments: {e}")
             return []
@@ -319,13 +333,13 @@ class PlaneAPI:
             return None
 
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._tasks_manager.create_issue_comment(
-                    session=session,
-                    project_id=project_id,
-                    issue_id=issue_id,
-                    comment=comment
-                )
+            session = http_service.session
+            return await self._tasks_manager.create_issue_comment(
+                session=session,
+                project_id=project_id,
+                issue_id=issue_id,
+                comment=comment
+            )
         except Exception as e:
             bot_logger.error(f"Error creating comment: {e}")
             return None
@@ -339,14 +353,166 @@ class PlaneAPI:
         if not self.configured:
             return []
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._tasks_manager.get_all_issues_for_audit(
-                    session, project_id, include_done_since_days
-                )
+            session = http_service.session
+            return await self._tasks_manager.get_all_issues_for_audit(
+                session, project_id, include_done_since_days
+            )
         except Exception as e:
             bot_logger.error(f"Error in get_all_issues_for_audit: {e}")
             return []
 
+    async def get_project_issues(
+        self,
+        project_id: str,
+        include_closed: bool = False
+    ) -> List[PlaneTask]:
+        """Get issues of one project from the shared issue index."""
+        if not self.configured:
+            return []
+        try:
+            session = http_service.session
+            tasks = await self._tasks_manager.index.get_project_tasks(session, project_id)
+            return tasks if include_closed else [t for t in tasks if not is_closed(t)]
+        except Exception as e:
+            bot_logger.error(f"Error getting project issues: {e}")
+            return []
+
+    async def iter_project_issues(
+        self,
+        project_id: str,
+        per_page: int = 100,
+        state_groups: Optional[List[str]] = None,
+        assignee_id: Optional[str] = None,
+        updated_after: Optional[datetime] = None
+    ) -> AsyncIterator[PlaneTask]:
+        """Stream issues of a project page by page (see PlaneTasksManager.iter_project_issues)."""
+        if not self.configured:
+            return
+
+        try:
+            session = http_service.session
+            async for task in self._tasks_manager.iter_project_issues(
+                session,
+                project_id,
+                per_page=per_page,
+                state_groups=state_groups,
+                assignee_id=assignee_id,
+                updated_after=updated_after,
+            ):
+                yield task
+        except Exception as e:
+            bot_logger.error(f"Error streaming project issues: {e}")
+
+    async def get_workspace_issues(
+        self,
+        project_ids: List[str],
+        include_closed: bool = False
+    ) -> List[PlaneTask]:
+        """Get issues of several projects from the shared issue index (stale projects fetched in parallel)."""
+        if not self.configured:
+            return []
+        try:
+            index = self._tasks_manager.index
+            session = http_service.session
+            await index.ensure_projects(session, project_ids)
+            tasks = index.tasks(project_ids)
+            return tasks if include_closed else [t for t in tasks if not is_closed(t)]
+        except Exception as e:
+            bot_logger.error(f"Error getting workspace issues: {e}")
+            return []
+
+    async def get_task(self, project_id: str, issue_id: str) -> Optional[PlaneTask]:
+        """Get one issue: from a fresh index snapshot, otherwise a single API request."""
+        if not self.configured:
+            return None
+        index = self._tasks_manager.index
+        task = index.get_task(project_id, issue_id)
+        if task is not None:
+            return task
+        issue = await self.get_issue_details(project_id, issue_id)
+        if not issue:
+            return None
+        try:
+            return index.parse(project_id, issue)
+        except Exception as e:
+            bot_logger.error(f"Error parsing issue {issue_id}: {e}")
+            return None
+
+    async def find_issues_by_sequence(
+        self,
+        sequence_id: int,
+        project_ids: List[str]
+    ) -> List[PlaneTask]:
+        """Find issues with given sequence_id in the listed projects (index lookup)."""
+        if not self.configured:
+            return []
+        try:
+            session = http_service.session
+            await self._tasks_manager.index.ensure_projects(session, project_ids)
+            return self._tasks_manager.index.find_by_sequence(sequence_id, project_ids)
+        except Exception as e:
+            bot_logger.error(f"Error finding issue #{sequence_id}: {e}")
+            return []
+
+    async def search_tasks(
+        self,
+        search_text: str,
+        project_ids: List[str],
+        limit: int = 5
+    ) -> List[Tuple[PlaneTask, SearchHit]]:
+        """Open issues best matching free text in the listed projects (text index lookup)."""
+        if not self.configured:
+            return []
+        try:
+            session = http_service.session
+            await self._tasks_manager.index.ensure_projects(session, project_ids)
+            return self._tasks_manager.index.search_text(search_text, project_ids, limit)
+        except Exception as e:
+            bot_logger.error(f"Error searching issues: {e}")
+            return []
+
+    async def get_team_workload(self) -> Tuple[List[PlaneUser], Dict[str, MemberWorkload]]:
+        """
+        Get open-task workload of every workspace member in one workspace scan
+
+        Returns:
+            (members, workload by assignee ID); unassigned tasks are under UNASSIGNED
+        """
+        if not self.configured:
+            return [], {}
+
+        try:
+            index = self._tasks_manager.index
+            session = http_service.session
+            projects = await self._metadata.get_projects(session)
+            index.set_project_names(projects)
+            members = await self._metadata.get_members(session)
+            project_ids = [p.id for p in projects]
+            await index.ensure_projects(session, project_ids)
+
+            open_tasks = (t for t in index.tasks(project_ids) if not is_closed(t))
+            return members, aggregate_workload(open_tasks)
+        except Exception as e:
+            bot_logger.error(f"Error getting team workload: {e}")
+            return [], {}
+
+    def get_issue_index_stats(self) -> Dict[str, int]:
+        """Issue index size and hit/fetch counters."""
+        if not self.configured:
+            return {}
+        return self._tasks_manager.index.get_stats()
+
+    def get_metadata_stats(self) -> Dict[str, int]:
+        """Metadata registry size and hit/fetch counters."""
+        if not self.configured:
+            return {}
+        return self._metadata.get_stats()
+
+    def apply_webhook(self, event: str, action: str, data: Dict[str, Any]) -> None:
+        """Drop cached metadata a Plane webhook event may have changed."""
+        if self.configured:
+            self._metadata.apply_webhook(event, action, data)
+
     async def search_issues(
         self,
         project_id: str,
@@ -368,13 +534,13 @@ class PlaneAPI:
             return []
 
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._tasks_manager.search_open_issues(
-                    session=session,
-                    project_id=project_id,
-                    search_text=search_text,
-                    limit=limit
-                )
+            session = http_service.session
+            return await self._tasks_manager.search_open_issues(
+                session=session,
+                project_id=project_id,
+                search_text=search_text,
+                limit=limit
+            )
         except Exception as e:
             bot_logger.error(f"Error searching issues: {e}")
             return []
@@ -389,10 +555,10 @@ class PlaneAPI:
         if not self.configured:
             return None
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._tasks_manager.update_issue(
-                    session, project_id, issue_id, **fields
-                )
+            session = http_service.session
+            return await self._tasks_manager.update_issue(
+                session, project_id, issue_id, **fields
+            )
         except Exception as e:
             bot_logger.error(f"Error updating issue: {e}")
             return None
@@ -402,8 +568,8 @@ class PlaneAPI:
         if not self.configured:
             return []
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._tasks_manager.get_project_states(session, project_id)
+            session = http_service.session
+            return await self._tasks_manager.get_project_states(session, project_id)
         except Exception as e:
             bot_logger.error(f"Error getting project states: {e}")
             return []
@@ -427,6 +593,12 @@ __all__ = [
     'PlaneProject',
     'PlaneUser',
     'PlaneState',
+    'PlaneIssueIndex',
+    'PlaneMetadataRegistry',
+    'MemberWorkload',
+    'UNASSIGNED',
+    'IssueRef',
+    'issue_refs',
     'PlaneAPIError',
     'PlaneAuthError',
     'PlaneNotFoundError',
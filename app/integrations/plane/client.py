@@ -3,7 +3,7 @@ Plane API HTTP Client
 """
 import asyncio
 import aiohttp
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator
 from ...utils.logger import bot_logger
 from .exceptions import PlaneAPIError, PlaneAuthError, PlaneNotFoundError, PlaneRateLimitError
 
@@ -79,6 +79,50 @@ class PlaneAPIClient:
         """GET request"""
         return await self._request(session, 'GET', endpoint, params=params)
 
+    async def iter_pages(
+        self,
+        session: aiohttp.ClientSession,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        per_page: int = 100,
+        max_pages: int = 500
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Follow Plane cursor pagination, yielding the results of each page as it arrives.
+
+        Plane cursors have the form "per_page:page:offset"; the response carries
+        next_cursor / next_page_results. Non-paginated responses (plain lists or
+        dicts without a cursor) are yielded as a single page.
+        """
+        params = dict(params or {})
+        params['per_page'] = per_page
+        cursor = f"{per_page}:0:0"
+
+        for _ in range(max_pages):
+            params['cursor'] = cursor
+            data = await self.get(session, endpoint, params=params)
+
+            if isinstance(data, list):
+                yield data
+                return
+            if not isinstance(data, dict):
+                return
+
+            if 'results' in data:
+                yield data['results']
+            elif 'grouped_by' in data:
+                yield [
+                    issue
+                    for group in data['grouped_by'].values() if isinstance(group, list)
+                    for issue in group
+                ]
+
+            next_cursor = data.get('next_cursor')
+            if not data.get('next_page_results') or not next_cursor or next_cursor == cursor:
+                return
+            cursor = next_cursor
+
+        bot_logger.warning(f"⚠️ Stopped paging {endpoint} after {max_pages} pages")
+
     async def post(
         self,
         session: aiohttp.ClientSession,
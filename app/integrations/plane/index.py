@@ -0,0 +1,309 @@
+"""
+Plane API Issue Index - shared in-process snapshot of workspace issues
+
+Every reader (my tasks, /plane, audit, reconciliation, search) used to download
+the full issue list of each project on its own. The index keeps one parsed
+snapshot per project and re-downloads it at most once per refresh period.
+Concurrent readers of a stale project wait for the same download.
+
+Each project snapshot also carries a TextIndex over issue names and
+descriptions. It is carried over between refreshes and only changed issues
+are re-tokenised, so text search never scans or re-lowercases all tasks.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from ...config import settings
+from ...utils.logger import bot_logger
+from ...utils.text_search import SearchHit, TextIndex
+from .client import PlaneAPIClient
+from .models import PlaneTask
+
+CLOSED_STATE_GROUPS = ('completed', 'cancelled')
+_CLOSED_STATE_NAMES = {
+    'done': 'completed',
+    'completed': 'completed',
+    'cancelled': 'cancelled',
+    'canceled': 'cancelled',
+}
+
+
+def state_group_of(issue: Dict) -> str:
+    """Resolve Plane state group (backlog/unstarted/started/completed/cancelled)"""
+    state = issue.get('state')
+    if not isinstance(state, dict):
+        state = issue.get('state_detail') or {}
+    group = state.get('group')
+    if group:
+        return group
+    return _CLOSED_STATE_NAMES.get((state.get('name') or '').lower(), 'unknown')
+
+
+def is_closed(task: PlaneTask) -> bool:
+    """Check if task is in a completed/cancelled state"""
+    return task.state_group in CLOSED_STATE_GROUPS
+
+
+def parse_issue(issue: Dict, project_name: Optional[str] = None) -> PlaneTask:
+    """Enrich raw issue in place (state, assignee names, project) and parse it"""
+    state = issue.get('state')
+    if isinstance(state, dict):
+        issue['state_detail'] = state
+        issue['state_name'] = state.get('name', 'Unknown')
+    issue['state_group'] = state_group_of(issue)
+
+    names = [
+        a.get('display_name') or a.get('email', '?')
+        for a in issue.get('assignees') or []
+        if isinstance(a, dict)
+    ]
+    issue['assignee_names'] = names
+    issue['assignee_name'] = ', '.join(names) if names else 'Unassigned'
+
+    if project_name:
+        issue['project_name'] = project_name
+
+    return PlaneTask(**issue)
+
+
+@dataclass
+class _ProjectSlice:
+    """Parsed issues of one project plus its secondary indexes"""
+    tasks: List[PlaneTask]
+    fetched_at: float
+    text: TextIndex = field(default_factory=TextIndex)
+    by_id: Dict[str, PlaneTask] = field(default_factory=dict)
+    by_seq: Dict[int, PlaneTask] = field(default_factory=dict)
+    by_assignee: Dict[str, List[PlaneTask]] = field(default_factory=dict)
+    by_state_group: Dict[str, List[PlaneTask]] = field(default_factory=dict)
+
+
+class PlaneIssueIndex:
+    """Workspace issue snapshot indexed by project, sequence_id, assignee and state group"""
+
+    def __init__(self, client: PlaneAPIClient, refresh_seconds: Optional[int] = None):
+        self.client = client
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None else settings.plane_issue_index_ttl
+        )
+        self._slices: Dict[str, _ProjectSlice] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._project_names: Dict[str, str] = {}
+        self._text_indexes: Dict[str, TextIndex] = {}
+        self._stats = {'hits': 0, 'fetches': 0, 'errors': 0}
+
+    # --- Snapshot maintenance ---
+
+    def set_project_names(self, projects: Iterable) -> None:
+        """Remember project names used to enrich parsed tasks"""
+        for project in projects:
+            if isinstance(project, dict):
+                self._project_names[project.get('id', '')] = project.get('name', 'Unknown')
+            else:
+                self._project_names[project.id] = project.name
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        """Drop snapshot of one project (or all projects) so next read re-fetches it"""
+        if project_id is None:
+            self._slices.clear()
+        else:
+            self._slices.pop(project_id, None)
+
+    def _is_fresh(self, project_id: str) -> bool:
+        snapshot = self._slices.get(project_id)
+        return bool(snapshot) and time.monotonic() - snapshot.fetched_at < self.refresh_seconds
+
+    async def get_project_tasks(
+        self,
+        session: aiohttp.ClientSession,
+        project_id: str
+    ) -> List[PlaneTask]:
+        """Get all issues of a project (including closed), fetching if stale"""
+        if self._is_fresh(project_id):
+            self._stats['hits'] += 1
+            return self._slices[project_id].tasks
+
+        lock = self._locks.setdefault(project_id, asyncio.Lock())
+        async with lock:
+            # Another reader may have refreshed it while we were waiting
+            if self._is_fresh(project_id):
+                self._stats['hits'] += 1
+                return self._slices[project_id].tasks
+
+            try:
+                issues = await self._fetch_project_issues(session, project_id)
+            except Exception as e:
+                self._stats['errors'] += 1
+                stale = self._slices.get(project_id)
+                if stale is None:
+                    raise
+                bot_logger.warning(f"⚠️ [INDEX] Refresh of project {project_id[:8]} failed, serving stale snapshot: {e}")
+                return stale.tasks
+
+            self._stats['fetches'] += 1
+            self._slices[project_id] = self._build_slice(project_id, issues)
+            bot_logger.debug(f"📇 [INDEX] Project {project_id[:8]}: indexed {len(issues)} issues")
+            return self._slices[project_id].tasks
+
+    async def ensure_projects(
+        self,
+        session: aiohttp.ClientSession,
+        project_ids: Iterable[str]
+    ) -> None:
+        """Make sure all given projects have a fresh snapshot (stale ones fetched in parallel)"""
+        stale = [pid for pid in project_ids if not self._is_fresh(pid)]
+        if not stale:
+            return
+        results = await asyncio.gather(
+            *(self.get_project_tasks(session, pid) for pid in stale),
+            return_exceptions=True
+        )
+        for pid, result in zip(stale, results):
+            if isinstance(result, Exception):
+                bot_logger.error(f"❌ [INDEX] Failed to index project {pid[:8]}: {result}")
+
+    async def _fetch_project_issues(
+        self,
+        session: aiohttp.ClientSession,
+        project_id: str
+    ) -> List[Dict]:
+        endpoint = f"/api/v1/workspaces/{self.client.workspace_slug}/projects/{project_id}/issues/"
+        issues = []
+        async for page in self.client.iter_pages(session, endpoint, params={"expand": "assignees,state"}):
+            issues.extend(page)
+        return issues
+
+    def _build_slice(self, project_id: str, issues: List[Dict]) -> _ProjectSlice:
+        # Text index outlives invalidate(): unchanged issues are not re-tokenised
+        text = self._text_indexes.setdefault(project_id, TextIndex())
+        snapshot = _ProjectSlice(tasks=[], fetched_at=time.monotonic(), text=text)
+        project_name = self._project_names.get(project_id)
+
+        for issue in issues:
+            try:
+                task = parse_issue(issue, project_name)
+            except Exception as e:
+                bot_logger.error(f"Failed to parse issue {issue.get('id', 'unknown')}: {e}")
+                continue
+
+            snapshot.tasks.append(task)
+            snapshot.by_id[task.id] = task
+            text.add(task.id, task.name or '', issue.get('description_stripped') or task.description or '')
+            if task.sequence_id is not None:
+                snapshot.by_seq[task.sequence_id] = task
+            snapshot.by_state_group.setdefault(task.state_group, []).append(task)
+            for key in self._assignee_keys(issue):
+                snapshot.by_assignee.setdefault(key, []).append(task)
+
+        text.retain(snapshot.by_id)
+        return snapshot
+
+    @staticmethod
+    def _assignee_keys(issue: Dict) -> set:
+        keys = set()
+        for assignee in issue.get('assignees') or []:
+            if isinstance(assignee, dict):
+                if assignee.get('id'):
+                    keys.add(assignee['id'])
+                if assignee.get('email'):
+                    keys.add(assignee['email'].lower())
+            elif isinstance(assignee, str):
+                keys.add(assignee)
+        details = issue.get('assignee_details')
+        if isinstance(details, dict) and details.get('email'):
+            keys.add(details['email'].lower())
+        return keys
+
+    # --- Lookups (answer from the current snapshot only) ---
+
+    def _iter_slices(self, project_ids: Optional[Iterable[str]] = None):
+        if project_ids is None:
+            return list(self._slices.values())
+        return [self._slices[pid] for pid in project_ids if pid in self._slices]
+
+    def tasks(self, project_ids: Optional[Iterable[str]] = None) -> List[PlaneTask]:
+        """All indexed tasks (optionally limited to given projects)"""
+        return [task for s in self._iter_slices(project_ids) for task in s.tasks]
+
+    def get_task(self, project_id: str, issue_id: str) -> Optional[PlaneTask]:
+        """Issue from a fresh project snapshot (None if not indexed or stale)"""
+        if not self._is_fresh(project_id):
+            return None
+        return self._slices[project_id].by_id.get(issue_id)
+
+    def parse(self, project_id: str, issue: Dict) -> PlaneTask:
+        """Parse a raw issue of a project the same way snapshot tasks are parsed"""
+        return parse_issue(issue, self._project_names.get(project_id))
+
+    def find_by_sequence(
+        self,
+        sequence_id: int,
+        project_ids: Optional[Iterable[str]] = None
+    ) -> List[PlaneTask]:
+        """Tasks with given sequence_id (one per project at most)"""
+        return [
+            s.by_seq[sequence_id]
+            for s in self._iter_slices(project_ids)
+            if sequence_id in s.by_seq
+        ]
+
+    def tasks_for_assignee(
+        self,
+        keys: Iterable[str],
+        project_ids: Optional[Iterable[str]] = None
+    ) -> List[PlaneTask]:
+        """Tasks assigned to any of the given user IDs / emails"""
+        keys = {k.lower() if '@' in k else k for k in keys if k}
+        result = []
+        for snapshot in self._iter_slices(project_ids):
+            seen = set()
+            for key in keys:
+                for task in snapshot.by_assignee.get(key, ()):
+                    if task.id not in seen:
+                        seen.add(task.id)
+                        result.append(task)
+        return result
+
+    def tasks_in_state_groups(
+        self,
+        groups: Iterable[str],
+        project_ids: Optional[Iterable[str]] = None
+    ) -> List[PlaneTask]:
+        """Tasks whose state belongs to one of the given state groups"""
+        groups = list(groups)
+        result = []
+        for snapshot in self._iter_slices(project_ids):
+            for group in groups:
+                result.extend(snapshot.by_state_group.get(group, ()))
+        return result
+
+    def search_text(
+        self,
+        query: str,
+        project_ids: Optional[Iterable[str]] = None,
+        limit: int = 5,
+        open_only: bool = True
+    ) -> List[Tuple[PlaneTask, SearchHit]]:
+        """Tasks whose name/description best match free text (BM25, typo tolerant)"""
+        results = []
+        for snapshot in self._iter_slices(project_ids):
+            # Over-fetch a little so closed tasks can be filtered out
+            for hit in snapshot.text.search(query, limit=limit * 3 if open_only else limit):
+                task = snapshot.by_id.get(hit.doc_id)
+                if task is None or (open_only and is_closed(task)):
+                    continue
+                results.append((task, hit))
+        results.sort(key=lambda pair: pair[1].score, reverse=True)
+        return results[:limit]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Index size and hit/fetch counters (for /diag)"""
+        return {
+            'projects': len(self._slices),
+            'issues': sum(len(s.tasks) for s in self._slices.values()),
+            **self._stats,
+        }
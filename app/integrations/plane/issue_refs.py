@@ -0,0 +1,173 @@
+"""
+Plane API Issue References - persistent `#123` / `PROJ-123` lookup table
+
+Maps issue references to (project_id, issue_id) in Redis so that `/plane`
+and other features resolve them with one key lookup instead of scanning
+every project. The table is filled incrementally from /webhooks/plane-direct
+events and refreshed by a periodic background sweep over the issue index.
+
+Per-sequence entries live in a Redis hash (one field per project), so
+concurrent webhooks update them with HSET instead of racing on a JSON list.
+Every key expires after a few sweep intervals: issues that vanish without a
+`deleted` webhook drop out once the sweep stops refreshing them.
+"""
+import asyncio
+import re
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+from ...config import settings
+from ...services.redis_service import redis_service
+from ...utils.logger import bot_logger
+
+REF_KEY = "plane:ref:{ident}-{seq}"
+SEQ_KEY = "plane:ref:seqmap:{seq}"  # hash: project_id -> IssueRef
+PROJECTS_KEY = "plane:ref:projects"
+
+# Keys outlive a few missed sweeps but not a deleted issue
+REF_TTL_SWEEPS = 3
+
+_IDENT_REF_RE = re.compile(r'^\s*#?([A-Za-z][A-Za-z0-9]*)-(\d+)\s*$')
+_SEQ_REF_RE = re.compile(r'^\s*#?(\d+)\s*$')
+
+
+@dataclass
+class IssueRef:
+    """Location of a Plane issue"""
+    project_id: str
+    issue_id: str
+    sequence_id: int
+    project_ident: Optional[str] = None
+
+
+class PlaneIssueRefStore:
+    """Redis-backed sequence_id / identifier -> issue location map"""
+
+    def __init__(self):
+        self._project_idents: Dict[str, str] = {}
+
+    # --- Lookups ---
+
+    async def resolve(self, ref: str) -> List[IssueRef]:
+        """Resolve 'PROJ-123', '#123' or '123' to matching issue locations"""
+        match = _IDENT_REF_RE.match(ref)
+        if match:
+            data = await redis_service.get_json(
+                REF_KEY.format(ident=match.group(1).upper(), seq=int(match.group(2)))
+            )
+            return [IssueRef(**data)] if data else []
+
+        match = _SEQ_REF_RE.match(ref)
+        if match:
+            return await self.resolve_sequence(int(match.group(1)))
+        return []
+
+    async def resolve_sequence(self, sequence_id: int) -> List[IssueRef]:
+        """All issues with given sequence_id (one per project)"""
+        data = await redis_service.hget_all_json(SEQ_KEY.format(seq=sequence_id))
+        return [IssueRef(**item) for item in data.values()]
+
+    # --- Incremental updates ---
+
+    @staticmethod
+    def _ttl() -> int:
+        return settings.plane_issue_ref_sweep_interval * REF_TTL_SWEEPS
+
+    async def _project_ident(self, project_id: str) -> Optional[str]:
+        if project_id not in self._project_idents:
+            self._project_idents.update(await redis_service.get_json(PROJECTS_KEY) or {})
+        return self._project_idents.get(project_id)
+
+    async def record(self, ref: IssueRef) -> None:
+        """Add or update one issue reference"""
+        if ref.project_ident is None:
+            ref.project_ident = await self._project_ident(ref.project_id)
+
+        await redis_service.hset_json(
+            SEQ_KEY.format(seq=ref.sequence_id), ref.project_id, asdict(ref), ttl=self._ttl()
+        )
+        if ref.project_ident:
+            await redis_service.set_json(
+                REF_KEY.format(ident=ref.project_ident.upper(), seq=ref.sequence_id),
+                asdict(ref), ttl=self._ttl(),
+            )
+
+    async def remove(self, project_id: str, sequence_id: int) -> None:
+        """Forget a deleted issue"""
+        await redis_service.hdel(SEQ_KEY.format(seq=sequence_id), project_id)
+
+        ident = await self._project_ident(project_id)
+        if ident:
+            await redis_service.delete(REF_KEY.format(ident=ident.upper(), seq=sequence_id))
+
+    async def record_from_webhook(self, action: str, issue_data: Dict) -> None:
+        """Keep the table in sync with a Plane `issue` webhook event"""
+        project_id = issue_data.get('project')
+        sequence_id = issue_data.get('sequence_id')
+        if not project_id or sequence_id is None:
+            return
+
+        try:
+            if action == 'deleted':
+                await self.remove(project_id, int(sequence_id))
+            elif issue_data.get('id'):
+                await self.record(IssueRef(
+                    project_id=project_id,
+                    issue_id=issue_data['id'],
+                    sequence_id=int(sequence_id),
+                ))
+        except Exception as e:
+            bot_logger.warning(f"⚠️ Failed to update issue ref {project_id[:8]}#{sequence_id}: {e}")
+
+    # --- Full sweep ---
+
+    async def sweep(self) -> int:
+        """Rebuild the table from the issue index. Returns number of indexed issues."""
+        from . import plane_api
+
+        projects = await plane_api.get_all_projects()
+        if not projects:
+            return 0
+
+        self._project_idents = {p['id']: p.get('identifier') for p in projects if p.get('identifier')}
+        project_ids = [p['id'] for p in projects]
+        tasks = await plane_api.get_workspace_issues(project_ids, include_closed=True)
+
+        items = {PROJECTS_KEY: self._project_idents}
+        by_seq: Dict[int, Dict[str, Dict]] = {}
+        for task in tasks:
+            if task.sequence_id is None:
+                continue
+            ref = IssueRef(
+                project_id=task.project,
+                issue_id=task.id,
+                sequence_id=task.sequence_id,
+                project_ident=self._project_idents.get(task.project),
+            )
+            by_seq.setdefault(task.sequence_id, {})[task.project] = asdict(ref)
+            if ref.project_ident:
+                items[REF_KEY.format(ident=ref.project_ident.upper(), seq=ref.sequence_id)] = asdict(ref)
+
+        # Whole hashes are replaced so projects that lost a sequence id drop
+        # out; keys not refreshed here expire on their own
+        await redis_service.set_many_json(items, ttl=self._ttl())
+        await redis_service.replace_hashes_json(
+            {SEQ_KEY.format(seq=seq): refs for seq, refs in by_seq.items()}, ttl=self._ttl()
+        )
+        bot_logger.info(f"📇 Issue refs sweep: {len(tasks)} issues in {len(projects)} projects")
+        return len(tasks)
+
+
+async def issue_ref_sweep_loop():
+    """Background loop — periodically re-sweep issue references."""
+    while True:
+        try:
+            await issue_refs.sweep()
+        except Exception as e:
+            bot_logger.error(f"Issue refs sweep error: {e}")
+
+        await asyncio.sleep(settings.plane_issue_ref_sweep_interval)
+
+
+# Global instance
+issue_refs = PlaneIssueRefStore()
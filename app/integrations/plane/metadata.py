@@ -0,0 +1,201 @@
+"""
+Plane API Metadata Registry - cached projects, per-project states and members
+
+Projects, workflow states and workspace members change rarely, yet every
+"close task", "my tasks" or report generation used to download them again
+before doing its one real request. The registry keeps each category with its
+own TTL:
+
+- fresh entry: answered from memory
+- expired entry: answered from memory while one background refresh runs
+- missing entry: fetched once, concurrent readers wait for the same request
+
+Plane webhooks drop the affected entries (`apply_webhook`), so edits made in
+Plane show up on the next read instead of after the TTL. Empty results and
+errors are never cached.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from ...config import settings
+from ...utils.logger import bot_logger
+from .client import PlaneAPIClient
+from .models import PlaneProject, PlaneUser
+from .projects import PlaneProjectsManager
+from .users import PlaneUsersManager
+
+PROJECTS = 'projects'
+STATES = 'states'
+MEMBERS = 'members'
+
+_Key = Tuple[str, Optional[str]]
+
+
+@dataclass
+class _Entry:
+    value: List[Any]
+    fetched_at: float
+
+
+class PlaneMetadataRegistry:
+    """TTL cache of workspace metadata with background refresh and webhook invalidation"""
+
+    def __init__(
+        self,
+        client: PlaneAPIClient,
+        projects_manager: PlaneProjectsManager,
+        users_manager: PlaneUsersManager,
+        projects_ttl: Optional[int] = None,
+        states_ttl: Optional[int] = None,
+        members_ttl: Optional[int] = None
+    ):
+        self.client = client
+        self.projects_manager = projects_manager
+        self.users_manager = users_manager
+        self.ttls = {
+            PROJECTS: projects_ttl if projects_ttl is not None else settings.plane_projects_ttl,
+            STATES: states_ttl if states_ttl is not None else settings.plane_states_ttl,
+            MEMBERS: members_ttl if members_ttl is not None else settings.plane_members_ttl,
+        }
+        self._entries: Dict[_Key, _Entry] = {}
+        self._locks: Dict[_Key, asyncio.Lock] = {}
+        self._generations: Dict[_Key, int] = {}
+        self._refreshing: Dict[_Key, asyncio.Task] = {}
+        self._stats = {'hits': 0, 'stale_hits': 0, 'fetches': 0, 'errors': 0, 'invalidations': 0}
+
+    # --- Public lookups ---
+
+    async def get_projects(self, session: aiohttp.ClientSession) -> List[PlaneProject]:
+        """All workspace projects"""
+        return await self._get((PROJECTS, None), lambda: self.projects_manager.get_projects(session))
+
+    async def get_members(self, session: aiohttp.ClientSession) -> List[PlaneUser]:
+        """All workspace members"""
+        async def fetch():
+            projects = await self.get_projects(session)
+            return await self.users_manager.get_workspace_members(session, projects=projects)
+        return await self._get((MEMBERS, None), fetch)
+
+    async def get_states(self, session: aiohttp.ClientSession, project_id: str) -> List[Dict]:
+        """Workflow states of a project (dicts with id, name, group)"""
+        return await self._get((STATES, project_id), lambda: self._fetch_states(session, project_id))
+
+    async def _fetch_states(self, session: aiohttp.ClientSession, project_id: str) -> List[Dict]:
+        endpoint = f"/api/v1/workspaces/{self.client.workspace_slug}/projects/{project_id}/states/"
+        data = await self.client.get(session, endpoint)
+        if isinstance(data, dict):
+            return data.get('results', [])
+        return data if isinstance(data, list) else []
+
+    # --- Cache mechanics ---
+
+    async def _get(self, key: _Key, fetch: Callable[[], Awaitable[List[Any]]]) -> List[Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.monotonic() - entry.fetched_at < self.ttls[key[0]]:
+                self._stats['hits'] += 1
+            else:
+                self._stats['stale_hits'] += 1
+                self._refresh_in_background(key, fetch)
+            return list(entry.value)
+        return list(await self._load(key, fetch))
+
+    async def _load(self, key: _Key, fetch: Callable[[], Awaitable[List[Any]]]) -> List[Any]:
+        requested_at = time.monotonic()
+        generation = self._generations.get(key, 0)
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            # Another reader may have loaded it while we were waiting
+            entry = self._entries.get(key)
+            if entry is not None and entry.fetched_at >= requested_at:
+                return entry.value
+
+            try:
+                value = await fetch()
+            except Exception:
+                self._stats['errors'] += 1
+                raise
+            self._stats['fetches'] += 1
+            # Keep neither empty answers nor ones invalidated while in flight
+            if value and self._generations.get(key, 0) == generation:
+                self._entries[key] = _Entry(value=value, fetched_at=time.monotonic())
+            return value
+
+    def _refresh_in_background(self, key: _Key, fetch: Callable[[], Awaitable[List[Any]]]) -> None:
+        task = self._refreshing.get(key)
+        if task is not None and not task.done():
+            return
+
+        async def refresh():
+            try:
+                await self._load(key, fetch)
+            except Exception as e:
+                bot_logger.warning(f"⚠️ [METADATA] Refresh of {key[0]} {key[1] or ''} failed, serving stale: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    # --- Invalidation ---
+
+    def invalidate(self, category: Optional[str] = None, project_id: Optional[str] = None) -> None:
+        """Drop cached entries: everything, one category, or the states of one project"""
+        def matches(key: _Key) -> bool:
+            return (category is None or key[0] == category) and (project_id is None or key[1] == project_id)
+
+        # Loads in flight for these keys must not store what they fetched
+        for key in filter(matches, self._locks):
+            self._generations[key] = self._generations.get(key, 0) + 1
+        keys = [key for key in self._entries if matches(key)]
+        for key in keys:
+            del self._entries[key]
+        if keys:
+            self._stats['invalidations'] += 1
+            names = ', '.join(f"{kind}:{pid or '*'}" for kind, pid in keys)
+            bot_logger.debug(f"🗑️ [METADATA] Invalidated {names}")
+
+    def apply_webhook(self, event: str, action: str, data: Dict) -> None:
+        """Invalidate what a Plane webhook event may have changed"""
+        if event == 'project':
+            project_id = data.get('id')
+            self.invalidate(PROJECTS)
+            self.invalidate(MEMBERS)  # Project membership is edited via project settings
+            if project_id:
+                self.invalidate(STATES, project_id)
+            return
+
+        if event != 'issue':
+            return
+
+        project_id = data.get('project')
+        state = data.get('state')
+        state_id = state.get('id') if isinstance(state, dict) else state
+        if project_id and state_id and not self._known((STATES, project_id), [state_id]):
+            self.invalidate(STATES, project_id)
+
+        assignee_ids = [
+            a.get('id') if isinstance(a, dict) else a
+            for a in data.get('assignees') or []
+        ]
+        if not self._known((MEMBERS, None), assignee_ids):
+            self.invalidate(MEMBERS)
+
+    def _known(self, key: _Key, ids: Iterable[Optional[str]]) -> bool:
+        """Whether all ids are present in a cached entry (True if nothing is cached)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return True
+        cached = {item.get('id') if isinstance(item, dict) else item.id for item in entry.value}
+        return all(i in cached for i in ids if i)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Cached entries and hit/fetch counters (for /diag)"""
+        return {
+            'projects': len(self._entries[(PROJECTS, None)].value) if (PROJECTS, None) in self._entries else 0,
+            'members': len(self._entries[(MEMBERS, None)].value) if (MEMBERS, None) in self._entries else 0,
+            'state_sets': sum(1 for key in self._entries if key[0] == STATES),
+            **self._stats,
+        }
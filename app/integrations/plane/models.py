@@ -51,6 +51,7 @@ class PlaneTask(BaseModel):
     description: Optional[str] = None
     state: Union[str, Dict[str, Any]]  # State ID or expanded state object
     state_name: str = "Unknown"
+    state_group: Optional[str] = None  # backlog, unstarted, started, completed, cancelled
     priority: Optional[str] = "none"
     project: str  # Project ID
     project_name: str = "Unknown"
@@ -62,6 +63,7 @@ class PlaneTask(BaseModel):
     # Assignee information (can be list of IDs or list of expanded objects)
     assignees: Union[List[str], List[Dict[str, Any]]] = Field(default_factory=list)
     assignee_name: str = "Unassigned"
+    assignee_names: List[str] = Field(default_factory=list)
     assignee_email: Optional[str] = None
 
     # Expanded details (when using expand parameter)
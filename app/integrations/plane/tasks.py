@@ -1,14 +1,16 @@
 """
 Plane API Tasks Module - Task retrieval and filtering logic
 """
-import asyncio
 import aiohttp
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Dict, Optional
 from ...utils.logger import bot_logger
 from .client import PlaneAPIClient
 from .models import PlaneTask, PlaneProject
 from .projects import PlaneProjectsManager
 from .users import PlaneUsersManager
+from .index import PlaneIssueIndex, is_closed, parse_issue
+from .metadata import PlaneMetadataRegistry
 from .exceptions import PlaneAPIError
 
 
@@ -23,12 +25,15 @@ class PlaneTasksManager:
         self,
         client: PlaneAPIClient,
         projects_manager: PlaneProjectsManager,
-        users_manager: PlaneUsersManager
+        users_manager: PlaneUsersManager,
+        index: Optional[PlaneIssueIndex] = None,
+        metadata: Optional[PlaneMetadataRegistry] = None
     ):
         self.client = client
         self.projects_manager = projects_manager
         self.users_manager = users_manager
-        self._projects_cache = []
+        self.index = index or PlaneIssueIndex(client)
+        self.metadata = metadata or PlaneMetadataRegistry(client, projects_manager, users_manager)
 
     async def get_issue_details(
         self,
@@ -150,75 +155,38 @@ class PlaneTasksManager:
     ) -> List[PlaneTask]:
         """Get all tasks assigned to user by email"""
         try:
-            # 1. Get all projects
-            projects = await self.projects_manager.get_projects(session)
+            # 1. Get all projects (metadata registry)
+            projects = await self.metadata.get_projects(session)
             if not projects:
                 bot_logger.warning("No projects found")
                 return []
 
             bot_logger.info(f"Processing {len(projects)} projects for assigned tasks of user {user_email}")
+            self.index.set_project_names(projects)
 
-            # Cache projects for enrichment
-            self._projects_cache = [
-                {'id': p.id, 'name': p.name, 'description': p.description}
-                for p in projects
-            ]
-
-            # 2. Get workspace members (once for all projects)
-            bot_logger.info(f"🔍 Fetching workspace members")
-            workspace_members = await self.users_manager.get_workspace_members(session)
+            # 2. Get workspace members (metadata registry)
+            workspace_members = await self.metadata.get_members(session)
             user_id_to_email = self.users_manager.create_user_id_to_email_map(workspace_members)
 
             bot_logger.info(f"📥 Retrieved {len(workspace_members)} workspace members")
 
             # Check if target email exists
-            email_found = user_email in user_id_to_email.values()
-            if email_found:
+            user_ids = [uid for uid, email in user_id_to_email.items() if email == user_email]
+            if user_ids:
                 bot_logger.info(f"✅ Found target user {user_email} in workspace")
             else:
                 bot_logger.warning(f"❌ Email {user_email} not found in workspace")
                 raise ValueError(f"Email {user_email} не найден в Plane. Проверьте правильность email адреса.")
 
-            bot_logger.info(f"Built user mapping with {len(user_id_to_email)} users")
-
-            # 3. Get assigned tasks from all projects (NO states needed - comes in expand!)
-            bot_logger.info(f"🔄 Fetching tasks from {len(projects)} projects for {user_email}")
-
-            # PARALLEL processing - fetch all projects simultaneously for maximum speed
-            bot_logger.info(f"⚡ Using parallel API requests for {len(projects)} projects")
-            all_tasks = []
-
-            # Create tasks for all projects at once
-            fetch_tasks = []
-            for project in projects:
-                fetch_tasks.append(
-                    self._get_project_issues(
-                        session=session,
-                        project_id=project.id,
-                        user_email=user_email,
-                        user_id_to_email=user_id_to_email,
-                        project_states={},  # Not needed - state comes in expand
-                        assigned_only=True
-                    )
-                )
-
-            # Execute all requests in parallel
-            results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
-
-            # Process results
-            for idx, (project, result) in enumerate(zip(projects, results), 1):
-                if isinstance(result, Exception):
-                    bot_logger.error(f"  ❌ Error in project '{project.name}': {result}")
-                    continue
-
-                if result:
-                    bot_logger.info(f"  ✅ Found {len(result)} tasks in '{project.name}'")
-                    all_tasks.extend(result)
-                else:
-                    bot_logger.debug(f"  ⏭️ No tasks in '{project.name}'")
+            # 3. Refresh stale project snapshots (in parallel), then answer from the index
+            project_ids = [p.id for p in projects]
+            await self.index.ensure_projects(session, project_ids)
+            all_tasks = [
+                task for task in self.index.tasks_for_assignee([user_email, *user_ids], project_ids)
+                if not is_closed(task)
+            ]
 
             # Sort by priority
-            bot_logger.info(f"🔄 Sorting {len(all_tasks)} tasks by priority")
             all_tasks = self._sort_tasks_by_priority(all_tasks)
 
             bot_logger.info(f"✅ FINAL RESULT: {len(all_tasks)} total tasks for user {user_email}")
@@ -240,160 +208,28 @@ class PlaneTasksManager:
         project_states: Optional[Dict[str, Dict]] = None,
         assigned_only: bool = True
     ) -> List[PlaneTask]:
-        """Get issues for a specific project with filtering"""
+        """Get open issues for a specific project with filtering (served from the issue index)"""
         try:
-            bot_logger.info(f"🔍 [PROJECT {project_id[:8]}] Starting to fetch issues, user_email={user_email}, assigned_only={assigned_only}")
-
-            # Use expand to get detailed assignee and state information
-            endpoint = f"/api/v1/workspaces/{self.client.workspace_slug}/projects/{project_id}/issues/"
-            params = {"expand": "assignees,state"}
-
-            bot_logger.debug(f"🔍 [PROJECT {project_id[:8]}] API request: {endpoint}")
-            data = await self.client.get(session, endpoint, params=params)
+            issues = await self.index.get_project_tasks(session, project_id)
 
-            if not data:
-                bot_logger.warning(f"⚠️ [PROJECT {project_id[:8]}] API returned no data")
-                return []
-
-            # Extract issues from response
-            issues = []
-            if 'results' in data:
-                issues = data['results']
-            elif 'grouped_by' in data:
-                for group in data['grouped_by'].values():
-                    if isinstance(group, list):
-                        issues.extend(group)
-            elif isinstance(data, list):
-                issues = data
-
-            bot_logger.info(f"📋 [PROJECT {project_id[:8]}] API returned {len(issues)} total issues")
-
-            # Filter tasks
-            bot_logger.info(f"🔄 [PROJECT {project_id[:8]}] Starting to filter {len(issues)} issues")
             filtered_tasks = []
-            skipped_done = 0
-            skipped_no_assignee = 0
-            skipped_wrong_assignee = 0
-
-            for idx, issue in enumerate(issues):
-                task_seq = issue.get('sequence_id', 'unknown')
-
-                # Check if task is not completed
-                state = issue.get('state', {})
-                state_name = ''
-                if isinstance(state, dict):
-                    state_name = state.get('name', '').lower()
-                elif issue.get('state_detail'):
-                    state_name = issue.get('state_detail', {}).get('name', '').lower()
-
-                bot_logger.debug(f"    🔍 [TASK {task_seq}] State check: state_name='{state_name}'")
-
-                if state_name in ['done', 'completed', 'cancelled', 'canceled']:
-                    bot_logger.debug(f"    ⏭️ [TASK {task_seq}] SKIP: State is '{state_name}'")
-                    skipped_done += 1
+            for task in issues:
+                if is_closed(task):
                     continue
 
-                assignee_details = issue.get('assignee_details')
-                assignees = issue.get('assignees', [])
-
-                bot_logger.debug(f"    🔍 [TASK {task_seq}] Assignee check: has_details={bool(assignee_details)}, assignees_count={len(assignees) if assignees else 0}")
-
-                # Filter for assigned tasks only
                 if assigned_only:
-                    if not assignee_details and not assignees:
-                        bot_logger.debug(f"    ⏭️ [TASK {task_seq}] SKIP: No assignees")
-                        skipped_no_assignee += 1
+                    if not task.assignees and not task.assignee_details:
                         continue
 
-                    # Filter by email if specified
-                    if user_email:
-                        bot_logger.debug(f"    🔍 [TASK {task_seq}] Email matching for: {user_email}")
-                        task_matched = False
-
-                        # Check expanded assignees list
-                        if assignees:
-                            bot_logger.info(f"    📧 [TASK {task_seq}] Checking assignees: {[a.get('email') for a in assignees if isinstance(a, dict)]}")
-
-                        # Match via expanded assignees (full objects)
-                        if assignees and isinstance(assignees, list):
-                            for assignee in assignees:
-                                if isinstance(assignee, dict) and assignee.get('email') == user_email:
-                                    bot_logger.info(f"✅ Found match via expanded assignee dict: {assignee}")
-                                    bot_logger.info(f"🔍 Task {task_seq} state_name='{state_name}' (from state={state})")
-                                    task_matched = True
-                                    break
-
-                        # Fallback: check via assignees (list of IDs) and mapping
-                        if not task_matched and user_id_to_email:
-                            bot_logger.debug(f"🔍 Checking assignee IDs against mapping")
-                            for assignee_id in (assignees if isinstance(assignees, list) and all(isinstance(x, str) for x in assignees) else []):
-                                email = user_id_to_email.get(assignee_id)
-                                bot_logger.debug(f"🔍 Assignee ID {assignee_id[:8]}... -> email {email}")
-                                if email == user_email:
-                                    bot_logger.info(f"✅ Found match via user mapping: {assignee_id[:8]}... -> {email}")
-                                    task_matched = True
-                                    break
-
-                        # Check via assignee_details (direct email)
-                        if not task_matched and assignee_details:
-                            if assignee_details.get('email') == user_email:
-                                bot_logger.info(f"✅ Found match via assignee_details: {assignee_details}")
-                                task_matched = True
-
-                        bot_logger.info(f"🎯 Task {task_seq} final task_matched={task_matched}")
-
-                        # Skip if task doesn't match email
-                        if not task_matched:
-                            skipped_wrong_assignee += 1
-                            continue
-
-                bot_logger.info(f"    ✅ [TASK {task_seq}] ADDING to filtered_tasks (passed all filters)")
-
-                try:
-                    # Enrich with project information
-                    enriched_issue = issue.copy()
-
-                    if self._projects_cache:
-                        for project in self._projects_cache:
-                            if project.get('id') == project_id:
-                                enriched_issue['project_detail'] = project
-                                enriched_issue['project_name'] = project.get('name', 'Unknown')
-                                break
-
-                    # Add state information - use expanded state from API
-                    state_obj = issue.get('state')
-                    if isinstance(state_obj, dict):
-                        # State expanded from API (via expand=state)
-                        enriched_issue['state_detail'] = state_obj
-                        enriched_issue['state_name'] = state_obj.get('name', 'Unknown')
-                        bot_logger.debug(f"    🔧 [TASK {task_seq}] Enriched with state_name='{enriched_issue['state_name']}' from expanded API")
-                    elif project_states and state_obj:
-                        # Fallback: use project_states if provided
-                        state_info = project_states.get(state_obj)
-                        if state_info:
-                            enriched_issue['state_detail'] = state_info
-                            enriched_issue['state_name'] = state_info.get('name', 'Unknown')
-
-                    bot_logger.debug(f"    🔧 [TASK {task_seq}] Creating PlaneTask object")
-                    plane_task = PlaneTask(**enriched_issue)
-                    filtered_tasks.append(plane_task)
-                    bot_logger.info(f"    ✅ [TASK {task_seq}] Successfully added to filtered_tasks (total now: {len(filtered_tasks)})")
-
-                except Exception as parse_error:
-                    import traceback
-                    bot_logger.error(f"Failed to parse issue {issue.get('id', 'unknown')}: {parse_error}")
-                    bot_logger.error(f"Full traceback: {traceback.format_exc()}")
-                    continue
+                    if user_email and not self._is_assigned_to(task, user_email, user_id_to_email):
+                        continue
 
-            # Log filtering statistics
-            bot_logger.info(f"📊 [PROJECT {project_id[:8]}] FILTERING COMPLETE:")
-            bot_logger.info(f"  📥 Input: {len(issues)} total issues")
-            bot_logger.info(f"  ✅ Output: {len(filtered_tasks)} filtered tasks")
-            bot_logger.info(f"  ❌ Skipped (done): {skipped_done}")
-            bot_logger.info(f"  ❌ Skipped (no assignee): {skipped_no_assignee}")
-            bot_logger.info(f"  ❌ Skipped (wrong assignee): {skipped_wrong_assignee}")
-            bot_logger.info(f"  📤 RETURNING {len(filtered_tasks)} tasks from project {project_id[:8]}")
+                filtered_tasks.append(task)
 
+            bot_logger.debug(
+                f"📋 [PROJECT {project_id[:8]}] {len(filtered_tasks)}/{len(issues)} issues "
+                f"(user_email={user_email}, assigned_only={assigned_only})"
+            )
             return filtered_tasks
 
         except PlaneAPIError as e:
@@ -403,6 +239,86 @@ class PlaneTasksManager:
             bot_logger.error(f"❌ Error getting project {project_id[:8]} issues: {e}")
             return []
 
+    async def iter_project_issues(
+        self,
+        session: aiohttp.ClientSession,
+        project_id: str,
+        per_page: int = 100,
+        state_groups: Optional[Iterable[str]] = None,
+        assignee_id: Optional[str] = None,
+        updated_after: Optional[datetime] = None
+    ) -> AsyncIterator[PlaneTask]:
+        """
+        Stream project issues page by page, bypassing the issue index
+
+        Filters are sent to Plane as query params and re-checked locally, since
+        older Plane versions ignore unknown filters. Callers that only need a
+        count or the first match can stop iterating early; no further pages
+        are requested then.
+
+        Args:
+            session: aiohttp session
+            project_id: Plane project UUID
+            per_page: Page size for cursor pagination
+            state_groups: Only issues in these state groups (e.g. ['started'])
+            assignee_id: Only issues assigned to this user UUID
+            updated_after: Only issues updated after this moment (tz-aware)
+        """
+        endpoint = f"/api/v1/workspaces/{self.client.workspace_slug}/projects/{project_id}/issues/"
+        params = {"expand": "assignees,state"}
+        groups = set(state_groups or ())
+        if groups:
+            params['state_group'] = ','.join(sorted(groups))
+        if assignee_id:
+            params['assignees'] = assignee_id
+        if updated_after:
+            params['updated_at'] = f"{updated_after.date().isoformat()};after"
+
+        async for page in self.client.iter_pages(session, endpoint, params=params, per_page=per_page):
+            for issue in page:
+                try:
+                    task = parse_issue(issue)
+                except Exception as e:
+                    bot_logger.error(f"Failed to parse issue {issue.get('id', 'unknown')}: {e}")
+                    continue
+
+                if groups and task.state_group not in groups:
+                    continue
+                if assignee_id and not self._is_assigned_to_id(task, assignee_id):
+                    continue
+                if updated_after and not self._updated_after(task, updated_after):
+                    continue
+                yield task
+
+    @staticmethod
+    def _is_assigned_to_id(task: PlaneTask, assignee_id: str) -> bool:
+        return any(
+            (a.get('id') if isinstance(a, dict) else a) == assignee_id
+            for a in task.assignees
+        )
+
+    @staticmethod
+    def _updated_after(task: PlaneTask, moment: datetime) -> bool:
+        try:
+            return datetime.fromisoformat(task.updated_at.replace('Z', '+00:00')) > moment
+        except (ValueError, TypeError, AttributeError):
+            return False
+
+    @staticmethod
+    def _is_assigned_to(
+        task: PlaneTask,
+        user_email: str,
+        user_id_to_email: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """Match task assignees (expanded objects, IDs or assignee_details) against email"""
+        for assignee in task.assignees:
+            if isinstance(assignee, dict):
+                if assignee.get('email') == user_email:
+                    return True
+            elif user_id_to_email and user_id_to_email.get(assignee) == user_email:
+                return True
+        return bool(task.assignee_details and task.assignee_details.get('email') == user_email)
+
     def _sort_tasks_by_priority(self, tasks: List[PlaneTask]) -> List[PlaneTask]:
         """Sort tasks by priority and due date"""
         priority_order = {
@@ -480,6 +396,7 @@ class PlaneTasksManager:
             response = await self.client.post(session, endpoint, json_data=issue_data)
 
             if response:
+                self.index.invalidate(project_id)
                 issue_id = response.get('id', 'unknown')
                 sequence_id = response.get('sequence_id', 'unknown')
                 bot_logger.info(f"✅ Issue created successfully: #{sequence_id} (id={issue_id[:8]})")
@@ -505,44 +422,23 @@ class PlaneTasksManager:
         """
         Search for open issues by text match in name/description.
 
+        Served from the issue index's full-text index (stemmed RU/EN tokens,
+        transliteration, typo tolerant BM25) — no per-call scan of the project.
+
         Args:
             session: aiohttp session
             project_id: Plane project UUID
-            search_text: Text to search for (case-insensitive substring)
+            search_text: Free text to search for
             limit: Max results to return
 
         Returns:
             List of matching issues (id, sequence_id, name, state, assignees)
         """
         try:
-            issues = await self._get_project_issues(
-                session, project_id, assigned_only=False
-            )
-
-            if not issues:
-                return []
-
-            search_lower = search_text.lower()
-            # Split search into keywords for better matching
-            keywords = [w for w in search_lower.split() if len(w) > 2]
-
-            scored = []
-            for task in issues:
-                name_lower = (task.name or "").lower()
-                desc_lower = (task.description or "").lower()
-                text = f"{name_lower} {desc_lower}"
-
-                # Count keyword matches
-                score = sum(1 for kw in keywords if kw in text)
-                if score > 0:
-                    scored.append((score, task))
-
-            # Sort by score descending, take top N
-            scored.sort(key=lambda x: x[0], reverse=True)
+            await self.index.get_project_tasks(session, project_id)
 
-            results = []
-            for score, task in scored[:limit]:
-                results.append({
+            return [
+                {
                     "id": task.id,
                     "sequence_id": task.sequence_id,
                     "name": task.name,
@@ -550,10 +446,10 @@ class PlaneTasksManager:
                     "assignee_names": task.assignee_names,
                     "priority": task.priority,
                     "updated_at": task.updated_at,
-                    "score": score
-                })
-
-            return results
+                    "score": hit.matched,
+                }
+                for task, hit in self.index.search_text(search_text, [project_id], limit)
+            ]
 
         except Exception as e:
             bot_logger.error(f"Error searching issues: {e}")
@@ -568,60 +464,25 @@ class PlaneTasksManager:
         """Get ALL issues for audit — including recently completed/cancelled.
 
         Unlike _get_project_issues, this doesn't skip done/cancelled tasks
-        if they were updated within include_done_since_days.
+        if they were updated within include_done_since_days. Served from the
+        same issue index snapshot.
         """
         try:
-            endpoint = f"/api/v1/workspaces/{self.client.workspace_slug}/projects/{project_id}/issues/"
-            params = {"expand": "assignees,state"}
-            data = await self.client.get(session, endpoint, params=params)
-
-            if not data:
-                return []
-
-            issues = []
-            if 'results' in data:
-                issues = data['results']
-            elif 'grouped_by' in data:
-                for group in data['grouped_by'].values():
-                    if isinstance(group, list):
-                        issues.extend(group)
-            elif isinstance(data, list):
-                issues = data
-
             from datetime import datetime, timedelta, timezone
             cutoff = datetime.now(timezone.utc) - timedelta(days=include_done_since_days)
             tasks = []
 
-            for issue in issues:
-                state = issue.get('state', {})
-                state_name = ''
-                if isinstance(state, dict):
-                    state_name = state.get('name', '').lower()
-                    issue['state_detail'] = state
-                    issue['state_name'] = state.get('name', 'Unknown')
-
+            for task in await self.index.get_project_tasks(session, project_id):
                 # Skip old done/cancelled tasks
-                if state_name in ('done', 'completed', 'cancelled', 'canceled'):
-                    updated = issue.get('updated_at', '')
+                if is_closed(task):
                     try:
-                        dt = datetime.fromisoformat(updated.replace('Z', '+00:00'))
+                        dt = datetime.fromisoformat(task.updated_at.replace('Z', '+00:00'))
                         if dt < cutoff:
                             continue
                     except (ValueError, TypeError, AttributeError):
                         continue
 
-                # Enrich assignee names
-                assignees = issue.get('assignees', [])
-                names = []
-                for a in assignees:
-                    if isinstance(a, dict):
-                        names.append(a.get('display_name') or a.get('email', '?'))
-                issue['assignee_name'] = ', '.join(names) if names else 'Unassigned'
-
-                try:
-                    tasks.append(PlaneTask(**issue))
-                except Exception:
-                    continue
+                tasks.append(task)
 
             return tasks
 
@@ -646,7 +507,9 @@ class PlaneTasksManager:
                 f"/api/v1/workspaces/{self.client.workspace_slug}"
                 f"/projects/{project_id}/issues/{issue_id}/"
             )
-            return await self.client.patch(session, endpoint, json_data=fields)
+            result = await self.client.patch(session, endpoint, json_data=fields)
+            self.index.invalidate(project_id)
+            return result
         except Exception as e:
             bot_logger.error(f"Error updating issue {issue_id}: {e}")
             return None
@@ -659,16 +522,10 @@ class PlaneTasksManager:
         """Get all workflow states for a project.
 
         Returns list of dicts with id, name, group (backlog/unstarted/started/completed/cancelled).
+        Served from the metadata registry.
         """
         try:
-            endpoint = (
-                f"/api/v1/workspaces/{self.client.workspace_slug}"
-                f"/projects/{project_id}/states/"
-            )
-            data = await self.client.get(session, endpoint)
-            if isinstance(data, dict):
-                return data.get('results', [])
-            return data if isinstance(data, list) else []
+            return await self.metadata.get_states(session, project_id)
         except Exception as e:
             bot_logger.error(f"Error getting states for project {project_id}: {e}")
             return []
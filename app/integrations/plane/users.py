@@ -5,7 +5,7 @@ import aiohttp
 from typing import List, Dict, Optional
 from ...utils.logger import bot_logger
 from .client import PlaneAPIClient
-from .models import PlaneUser
+from .models import PlaneProject, PlaneUser
 from .exceptions import PlaneAPIError
 
 
@@ -15,19 +15,24 @@ class PlaneUsersManager:
     def __init__(self, client: PlaneAPIClient):
         self.client = client
 
-    async def get_workspace_members(self, session: aiohttp.ClientSession) -> List[PlaneUser]:
+    async def get_workspace_members(
+        self,
+        session: aiohttp.ClientSession,
+        projects: Optional[List[PlaneProject]] = None
+    ) -> List[PlaneUser]:
         """Get all workspace members from all accessible projects
 
         Note: Plane API v1 doesn't have a direct workspace-members endpoint that works.
         Instead, we collect members from all projects (some may return 403, which we ignore).
+        Pass already known projects to skip fetching them again.
         """
         try:
             bot_logger.info(f"🔍 Fetching workspace members for '{self.client.workspace_slug}'")
 
-            # First get all projects
-            from .projects import PlaneProjectsManager
-            projects_manager = PlaneProjectsManager(self.client)
-            projects = await projects_manager.get_projects(session)
+            if projects is None:
+                from .projects import PlaneProjectsManager
+                projects_manager = PlaneProjectsManager(self.client)
+                projects = await projects_manager.get_projects(session)
 
             if not projects:
                 bot_logger.warning("⚠️ No projects found, cannot get workspace members")
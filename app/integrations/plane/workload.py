@@ -0,0 +1,80 @@
+"""
+Plane API Workload Module - single-pass team workload aggregation
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from .models import PlaneTask
+
+UNASSIGNED = "__unassigned__"
+STALE_DAYS = 14
+
+
+@dataclass
+class MemberWorkload:
+    """Open-task counters for one assignee"""
+    total: int = 0
+    overdue: int = 0
+    stale: int = 0
+    by_priority: Counter = field(default_factory=Counter)
+    by_state: Counter = field(default_factory=Counter)
+
+    @property
+    def urgent(self) -> int:
+        """Urgent + high priority tasks"""
+        return self.by_priority['urgent'] + self.by_priority['high']
+
+
+def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, TypeError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _assignee_ids(task: PlaneTask) -> set:
+    ids = set()
+    for assignee in task.assignees:
+        if isinstance(assignee, dict):
+            if assignee.get('id'):
+                ids.add(assignee['id'])
+        elif assignee:
+            ids.add(assignee)
+    return ids
+
+
+def aggregate_workload(
+    tasks: Iterable[PlaneTask],
+    stale_days: int = STALE_DAYS,
+    now: Optional[datetime] = None
+) -> Dict[str, MemberWorkload]:
+    """Group open tasks by assignee ID in one pass.
+
+    A task with several assignees counts for each of them; tasks without
+    assignees are collected under UNASSIGNED.
+    """
+    now = now or datetime.now(timezone.utc)
+    workload: Dict[str, MemberWorkload] = {}
+
+    for task in tasks:
+        target = _parse_dt(task.target_date)
+        updated = _parse_dt(task.updated_at)
+        overdue = bool(target and target < now)
+        stale = bool(updated and (now - updated).days > stale_days)
+        priority = task.priority or 'none'
+        state = task.get_state_name()
+
+        for assignee_id in _assignee_ids(task) or {UNASSIGNED}:
+            stats = workload.setdefault(assignee_id, MemberWorkload())
+            stats.total += 1
+            stats.overdue += overdue
+            stats.stale += stale
+            stats.by_priority[priority] += 1
+            stats.by_state[state] += 1
+
+    return workload
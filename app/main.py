@@ -2,7 +2,9 @@
 Основной файл Telegram бота HHIVP IT Management - ПОЛНАЯ РЕФАКТОРИРОВАННАЯ ВЕРСИЯ
 """
 import asyncio
+import signal
 import sys
+from contextlib import suppress
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
@@ -16,6 +18,8 @@ from .middleware.logging import LoggingMiddleware, GroupMonitoringMiddleware, Pe
 from .middleware.database import DatabaseSessionMiddleware
 from .middleware.event_publisher import EventPublisherMiddleware
 from .middleware.rate_limit import RateLimitMiddleware
+from .services.telegram_delivery import DeliveryRequestMiddleware, Priority, delivery_priority
+from .webhooks.telegram_updates import ALLOWED_UPDATES, telegram_update_receiver
 
 # Core системы
 from .core.events.event_bus import event_bus
@@ -36,7 +40,7 @@ async def setup_bot_commands(bot: Bot):
         bot_logger.error(f"Failed to set bot commands: {e}")
 
 
-async def on_startup(bot: Bot):
+async def on_startup(bot: Bot, dispatcher: Dispatcher):
     """Действия при запуске бота"""
     bot_logger.info("🚀 Bot startup initiated - ENTERPRISE ARCHITECTURE")
 
@@ -50,11 +54,26 @@ async def on_startup(bot: Bot):
         await redis_service.connect(settings.redis_url)
         bot_logger.info(f"✅ Redis initialized (connected={redis_service.is_connected})")
 
-        # Запуск webhook server для n8n
+        # Буфер записи сообщений чатов (multi-row INSERT)
+        from .services.chat_context_service import chat_message_writer
+        await chat_message_writer.start()
+
+        # Очередь аудита сообщений (MessageLog)
+        from .middleware.logging import message_log_writer
+        await message_log_writer.start()
+
+        # Общий HTTP пул для Plane / AI / Whisper
+        from .services.http_service import http_service
+        await http_service.start()
+
+        # Запуск webhook server для n8n (и для апдейтов Telegram в webhook режиме)
         from .webhooks.server import WebhookServer
         global webhook_server
         webhook_server = WebhookServer(bot)
-        webhook_port = getattr(settings, 'webhook_port', 8080)
+        if settings.use_webhook:
+            path = telegram_update_receiver.register(webhook_server.app, dispatcher, bot)
+            bot_logger.info(f"✅ Telegram updates route registered: {path}")
+        webhook_port = settings.webhook_port
         await webhook_server.start_server(host='0.0.0.0', port=webhook_port)
         bot_logger.info(f"✅ Webhook server started on port {webhook_port}")
 
@@ -166,8 +185,21 @@ async def on_startup(bot: Bot):
             bot_logger.error(f"Scheduler error: {e}")
             bot_logger.info("Daily tasks scheduler disabled due to error")
         
-        # Morning digest loop (AI-powered daily summary at 09:00 MSK)
         from .integrations.plane import plane_api
+
+        # Periodic sweep of #123 / PROJ-123 issue references
+        if plane_api.configured:
+            from .integrations.plane.issue_refs import issue_ref_sweep_loop
+            asyncio.create_task(issue_ref_sweep_loop())
+            bot_logger.info("✅ Plane issue refs sweep loop started")
+
+        # Local pre-filter for AI problem detection (load + periodic retrain)
+        if ai_initialized and settings.problem_prefilter_enabled:
+            from .services.problem_prefilter import problem_prefilter_loop
+            asyncio.create_task(problem_prefilter_loop())
+            bot_logger.info("✅ Problem pre-filter loop started")
+
+        # Morning digest loop (AI-powered daily summary at 09:00 MSK)
         if ai_initialized and plane_api.configured:
             from .modules.plane_assistant.daily_digest import digest_loop
             asyncio.create_task(digest_loop(bot))
@@ -175,6 +207,11 @@ async def on_startup(bot: Bot):
 
         # Настройка команд бота
         await setup_bot_commands(bot)
+
+        # Всё готово — принимаем апдейты (накопленные за время рестарта тоже)
+        if settings.use_webhook:
+            await telegram_update_receiver.set_webhook()
+            telegram_update_receiver.open()
         
         # Получаем информацию о боте
         bot_info = await bot.get_me()
@@ -217,7 +254,7 @@ async def on_startup(bot: Bot):
             [InlineKeyboardButton(text="🚀 Старт", callback_data="start_menu")]
         ])
 
-        for admin_id in settings.admin_user_id_list:
+        async def notify_startup(admin_id: int):
             try:
                 await bot.send_message(
                     chat_id=admin_id,
@@ -227,6 +264,10 @@ async def on_startup(bot: Bot):
                 )
             except Exception as e:
                 bot_logger.warning(f"Could not notify admin {admin_id} about startup: {e}")
+
+        # Рассылка идёт через очередь доставки — она и соблюдает лимиты Telegram
+        with delivery_priority(Priority.NORMAL):
+            await asyncio.gather(*(notify_startup(a) for a in settings.admin_user_id_list))
             
     except Exception as e:
         bot_logger.error(f"Startup failed: {e}")
@@ -244,7 +285,7 @@ async def on_shutdown(bot: Bot):
             "🛑 Все процессы будут остановлены\\."
         )
         
-        for admin_id in settings.admin_user_id_list:
+        async def notify_shutdown(admin_id: int):
             try:
                 await bot.send_message(
                     chat_id=admin_id,
@@ -253,6 +294,14 @@ async def on_shutdown(bot: Bot):
                 )
             except Exception as e:
                 bot_logger.warning(f"Could not notify admin {admin_id} about shutdown: {e}")
+
+        with delivery_priority(Priority.NORMAL):
+            await asyncio.gather(*(notify_shutdown(a) for a in settings.admin_user_id_list))
+
+        # Дожидаемся апдейтов, принятых через webhook (сам webhook не удаляем —
+        # новые апдейты подождут у Telegram до следующего запуска)
+        if telegram_update_receiver.active:
+            await telegram_update_receiver.close()
         
         # Остановка планировщика
         global scheduler
@@ -260,10 +309,24 @@ async def on_shutdown(bot: Bot):
             await scheduler.stop()
             bot_logger.info("Daily tasks scheduler stopped")
         
+        # Досылаем накопленные батчи детектора проблем
+        from .services.problem_batcher import problem_batcher
+        await problem_batcher.flush_all()
+
+        # Сбрасываем буфер сообщений чатов до закрытия БД
+        from .services.chat_context_service import chat_message_writer
+        await chat_message_writer.stop()
+        from .middleware.logging import message_log_writer
+        await message_log_writer.stop()
+
         # Закрываем Redis
         from .services.redis_service import redis_service
         await redis_service.close()
 
+        # Закрываем общий HTTP пул
+        from .services.http_service import http_service
+        await http_service.close()
+
         # Закрываем подключение к базе данных
         await close_db()
         bot_logger.info("Database connection closed")
@@ -274,6 +337,28 @@ async def on_shutdown(bot: Bot):
     bot_logger.info("Bot shutdown completed")
 
 
+async def run_webhook(dp: Dispatcher, bot: Bot):
+    """Webhook режим: апдейты приходят на aiohttp сервер, работаем до SIGINT/SIGTERM"""
+    if not settings.webhook_url:
+        raise RuntimeError("USE_WEBHOOK=true requires WEBHOOK_URL")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+
+    workflow_data = {"dispatcher": dp, "bots": [bot], **dp.workflow_data}
+    await dp.emit_startup(bot=bot, **workflow_data)
+    try:
+        await stop.wait()
+    finally:
+        try:
+            await dp.emit_shutdown(bot=bot, **workflow_data)
+        finally:
+            await bot.session.close()
+
+
 async def main():
     """Основная функция запуска бота"""
     
@@ -284,16 +369,18 @@ async def main():
     try:
         # Создание бота и диспетчера с правильными timeout настройками
         from aiohttp import ClientTimeout
-        from aiogram.fsm.storage.memory import MemoryStorage
+        from .services.fsm_storage import RedisFSMStorage
 
         bot = Bot(
             token=settings.telegram_token,
             default=DefaultBotProperties(parse_mode=ParseMode.MARKDOWN_V2),
             session=None  # Используем сессию по умолчанию с настройками timeout
         )
+        # Все исходящие сообщения — через общую очередь доставки (лимиты Telegram, retry_after)
+        bot.session.middleware(DeliveryRequestMiddleware())
 
-        # FSM storage с поддержкой групп (user_id + chat_id)
-        storage = MemoryStorage()
+        # FSM storage в Redis (user_id + chat_id): состояния переживают рестарт и общие для реплик
+        storage = RedisFSMStorage()
         dp = Dispatcher(storage=storage)
         
         # Регистрация middleware (порядок важен!)
@@ -422,14 +509,15 @@ async def main():
         dp.startup.register(on_startup)
         dp.shutdown.register(on_shutdown)
         
-        bot_logger.info("Bot configuration completed, starting polling...")
-        
-        # Запуск бота
-        await dp.start_polling(
-            bot,
-            allowed_updates=["message", "callback_query", "inline_query"],
-            drop_pending_updates=True
-        )
+        # Запуск бота. Апдейты, пришедшие во время рестарта, не сбрасываем
+        if settings.use_webhook:
+            bot_logger.info("Bot configuration completed, starting in webhook mode...")
+            await run_webhook(dp, bot)
+        else:
+            bot_logger.info("Bot configuration completed, starting polling...")
+            # Снимаем webhook от прошлого запуска, иначе getUpdates не работает
+            await bot.delete_webhook(drop_pending_updates=False)
+            await dp.start_polling(bot, allowed_updates=ALLOWED_UPDATES)
         
     except KeyboardInterrupt:
         bot_logger.info("Bot stopped by user")
@@ -5,10 +5,9 @@ from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Message, CallbackQuery
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from ..database.database import get_async_session
-from ..database.models import BotUser
+from ..services.user_cache import user_cache
 from ..utils.logger import bot_logger, log_user_action
 from ..config import settings
 
@@ -76,27 +75,14 @@ class AuthMiddleware(BaseMiddleware):
         
         # Если пользователь админ, продолжаем обработку
         
-        # Получаем информацию о пользователе из базы
+        # Получаем информацию о пользователе (кэш ролей, БД только при промахе)
         try:
-            # Используем сессию из DatabaseSessionMiddleware
-            session = data.get('db_session')
-            if not session:
-                bot_logger.error("No database session available in auth middleware")
-                # Fallback для админов
-                data['db_user'] = None
-                data['user_role'] = 'admin' if settings.is_admin(user.id) else 'guest'
-                data['is_admin'] = settings.is_admin(user.id)
-                return await handler(event, data)
-            
-            result = await session.execute(
-                select(BotUser).where(BotUser.telegram_user_id == user.id)
-            )
-            db_user = result.scalar_one_or_none()
+            db_user = await user_cache.get(user.id, data.get('db_session'))
             
             # Добавляем информацию о пользователе в данные
             data['db_user'] = db_user
             data['user_role'] = db_user.role if db_user else 'guest'
-            data['is_admin'] = db_user.role == 'admin' if db_user else False
+            data['is_admin'] = db_user.is_admin if db_user else False
             
             # Проверяем активность пользователя
             if db_user and not db_user.is_active:
@@ -1,46 +1,159 @@
 """
 Database Session Middleware - управление сессиями базы данных
+
+Сессия создаётся лениво: LazySession открывает AsyncSession (и берёт
+соединение из пула) только при первом обращении. Апдейты, которые не
+трогают БД (rate limit, ответы из Redis, мониторинг чатов), не занимают
+соединение и не делают commit. Время работы с БД учитывается по хендлерам.
 """
-from typing import Callable, Dict, Any, Awaitable
+import time
+from typing import Callable, Dict, Any, Awaitable, Optional
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database.database import get_async_session
+from ..database.database import AsyncSessionLocal
 from ..utils.logger import bot_logger
 
 
+# Методы AsyncSession, которые ходят в БД (их время учитывается)
+_TIMED_METHODS = frozenset({
+    "execute", "scalar", "scalars", "get", "stream", "stream_scalars",
+    "flush", "commit", "refresh", "merge", "delete", "run_sync",
+})
+
+
+class LazySession:
+    """Прокси AsyncSession: сессия создаётся при первом использовании"""
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._factory = session_factory
+        self._session: Optional[AsyncSession] = None
+        self.db_calls = 0
+        self.db_time = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.session, name)
+        if name in _TIMED_METHODS:
+            return self._timed(attr)
+        return attr
+
+    def _timed(self, method):
+        async def wrapper(*args, **kwargs):
+            start = time.monotonic()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self.db_calls += 1
+                self.db_time += time.monotonic() - start
+        return wrapper
+
+    async def finish(self, success: bool) -> None:
+        """Commit (если были изменения) или rollback, затем закрыть сессию"""
+        if self._session is None:
+            return
+        session = self._session
+        try:
+            if not success:
+                await session.rollback()
+            elif session.in_transaction() or session.new or session.dirty or session.deleted:
+                await self._timed(session.commit)()
+        finally:
+            await session.close()
+
+
+class DBTimeStats:
+    """Время в БД по хендлерам (для /diag)"""
+
+    def __init__(self):
+        self._handlers: Dict[str, Dict[str, float]] = {}
+        self.updates = 0
+        self.sessions_opened = 0
+
+    def record(self, handler_name: str, lazy: LazySession) -> None:
+        self.updates += 1
+        if not lazy.started:
+            return
+        self.sessions_opened += 1
+        entry = self._handlers.setdefault(
+            handler_name, {"calls": 0, "db_calls": 0, "db_ms": 0.0, "max_ms": 0.0}
+        )
+        db_ms = lazy.db_time * 1000
+        entry["calls"] += 1
+        entry["db_calls"] += lazy.db_calls
+        entry["db_ms"] += db_ms
+        entry["max_ms"] = max(entry["max_ms"], db_ms)
+
+    def get_stats(self, top: int = 5) -> Dict[str, Any]:
+        handlers = sorted(self._handlers.items(), key=lambda kv: kv[1]["db_ms"], reverse=True)
+        return {
+            "updates": self.updates,
+            "sessions_opened": self.sessions_opened,
+            "top_handlers": [
+                {
+                    "handler": name,
+                    "calls": int(entry["calls"]),
+                    "db_calls": int(entry["db_calls"]),
+                    "avg_ms": round(entry["db_ms"] / entry["calls"], 1),
+                    "max_ms": round(entry["max_ms"], 1),
+                }
+                for name, entry in handlers[:top]
+            ],
+        }
+
+
+def _handler_name(data: Dict[str, Any]) -> str:
+    handler = data.get('handler')
+    callback = getattr(handler, 'callback', None)
+    if callback is None:
+        return "unknown"
+    return f"{getattr(callback, '__module__', '?')}.{getattr(callback, '__qualname__', repr(callback))}"
+
+
 class DatabaseSessionMiddleware(BaseMiddleware):
     """Middleware для управления сессиями базы данных"""
-    
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
         event: TelegramObject,
         data: Dict[str, Any]
     ) -> Any:
-        """Создает одну сессию для всего request lifecycle"""
-        
+        """Одна ленивая сессия на весь request lifecycle"""
+
         # Проверяем, не создана ли уже сессия
         if 'db_session' in data:
             return await handler(event, data)
-        
-        async for session in get_async_session():
-            try:
-                # Добавляем сессию в data для использования в других middleware и handlers
-                data['db_session'] = session
-                
-                # Вызываем следующий middleware/handler
-                result = await handler(event, data)
-                
-                # Если все прошло успешно, коммитим транзакцию
-                await session.commit()
-                return result
-                
-            except Exception as e:
-                # В случае ошибки, откатываем транзакцию
-                await session.rollback()
+
+        lazy = LazySession()
+        data['db_session'] = lazy
+        success = False
+        try:
+            # Вызываем следующий middleware/handler
+            result = await handler(event, data)
+            success = True
+            return result
+        except Exception as e:
+            if lazy.started:
                 bot_logger.error(f"Database session error: {e}")
-                raise
+            raise
+        finally:
+            try:
+                # Commit только если сессия использовалась, иначе rollback при ошибке
+                await lazy.finish(success)
             finally:
-                # Сессия закроется автоматически благодаря async context manager
-                pass
+                db_time_stats.record(_handler_name(data), lazy)
+
+
+# Global instance
+db_time_stats = DBTimeStats()
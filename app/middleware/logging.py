@@ -4,13 +4,25 @@ Middleware для логирования сообщений
 from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Message, CallbackQuery
-from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
-from ..database.database import get_async_session
-from ..database.models import MessageLog, BotUser
+from ..config import settings
+from ..database.models import MessageLog
+from ..services.buffered_writer import BufferedWriter
+from ..services.user_cache import user_cache
 from ..utils.logger import bot_logger
-from sqlalchemy import select
+
+
+# Очередь аудита: запись MessageLog пакетами вне транзакции апдейта
+message_log_writer = BufferedWriter(
+    MessageLog,
+    name="message_logs",
+    flush_size=settings.message_log_flush_size,
+    flush_interval=settings.message_log_flush_interval,
+    max_pending=settings.message_log_max_pending,
+    overflow=settings.message_log_overflow,
+    spill_path=settings.message_log_spill_path,
+)
 
 
 class LoggingMiddleware(BaseMiddleware):
@@ -97,17 +109,8 @@ class LoggingMiddleware(BaseMiddleware):
             if message.reply_to_message:
                 metadata["reply_to_message_id"] = message.reply_to_message.message_id
             
-            # Используем сессию из DatabaseSessionMiddleware
-            session = data.get('db_session')
-            if not session:
-                bot_logger.debug("No database session available for message logging")
-                return
-            
-            # Проверяем, существует ли пользователь в базе
-            user_result = await session.execute(
-                select(BotUser).where(BotUser.telegram_user_id == message.from_user.id)
-            )
-            user_exists = user_result.scalar_one_or_none()
+            # Проверяем, существует ли пользователь в базе (через кэш ролей)
+            user_exists = await user_cache.get(message.from_user.id, data.get('db_session'))
             
             # Если пользователь не существует, пропускаем логирование
             # (пользователь будет создан в обработчике команд)
@@ -115,18 +118,17 @@ class LoggingMiddleware(BaseMiddleware):
                 bot_logger.debug(f"Skipping message log for new user {message.from_user.id}")
                 return
             
-            log_entry = MessageLog(
+            await message_log_writer.put(
                 telegram_message_id=str(message.message_id),
                 telegram_user_id=message.from_user.id,
                 chat_id=message.chat.id,
                 chat_type=message.chat.type,
                 message_type=message_type,
                 text_content=text_content,
-                message_metadata=metadata
+                message_metadata=metadata,
+                created_at=datetime.utcnow()
             )
-            
-            session.add(log_entry)
-            # Не делаем commit здесь - он будет в DatabaseSessionMiddleware
+            # Запись в БД — пакетом в фоне (message_log_writer)
                 
         except Exception as e:
             bot_logger.error(f"Message logging error: {e}")
@@ -139,35 +141,25 @@ class LoggingMiddleware(BaseMiddleware):
                 "message_id": callback.message.message_id if callback.message else None
             }
             
-            # Используем сессию из DatabaseSessionMiddleware
-            session = data.get('db_session')
-            if not session:
-                bot_logger.debug("No database session available for callback logging")
-                return
-            
-            # Проверяем, существует ли пользователь в базе
-            user_result = await session.execute(
-                select(BotUser).where(BotUser.telegram_user_id == callback.from_user.id)
-            )
-            user_exists = user_result.scalar_one_or_none()
+            # Проверяем, существует ли пользователь в базе (через кэш ролей)
+            user_exists = await user_cache.get(callback.from_user.id, data.get('db_session'))
             
             # Если пользователь не существует, пропускаем логирование
             if not user_exists:
                 bot_logger.debug(f"Skipping callback log for new user {callback.from_user.id}")
                 return
             
-            log_entry = MessageLog(
+            await message_log_writer.put(
                 telegram_message_id=str(callback.id),  # Используем ID callback query
                 telegram_user_id=callback.from_user.id,
                 chat_id=callback.message.chat.id if callback.message else callback.from_user.id,
                 chat_type="callback",
                 message_type="callback_query",
                 text_content=callback.data,
-                message_metadata=metadata
+                message_metadata=metadata,
+                created_at=datetime.utcnow()
             )
-            
-            session.add(log_entry)
-            # Не делаем commit здесь - он будет в DatabaseSessionMiddleware
+            # Запись в БД — пакетом в фоне (message_log_writer)
                 
         except Exception as e:
             bot_logger.error(f"Callback logging error: {e}")
@@ -41,7 +41,8 @@ async def ai_command(message: Message):
                 "Ты - AI ассистент для Telegram бота управления проектами. "
                 "Ты помогаешь пользователям с задачами, проектами и вопросами. "
                 "Отвечай кратко и по делу. Используй markdown для форматирования."
-            )
+            ),
+            conversation=ai_manager.conversation(user_id, message.chat.id, "ai_assistant")
         )
 
         # Обновляем сообщение с ответом
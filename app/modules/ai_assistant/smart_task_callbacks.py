@@ -102,7 +102,7 @@ async def callback_create_smart_task(callback: CallbackQuery, bot: Bot):
             # Use default workspace project if no mapping found
             if not project_id:
                 # Get first available project
-                projects = await plane_api.get_projects()
+                projects = await plane_api.get_all_projects()
                 if projects:
                     project_id = projects[0].get("id")
 
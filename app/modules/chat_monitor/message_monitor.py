@@ -7,6 +7,8 @@
 3. Детектирует проблемы (ProblemDetector)
 4. Отправляет на AI анализ через n8n (детекция задач)
 """
+import asyncio
+
 from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.filters import BaseFilter
@@ -16,56 +18,26 @@ from ...core.events.event_bus import event_bus, EventHandler, Event
 from ...core.events.events import MessageReceivedEvent
 from ...services.n8n_ai_service import n8n_ai_service
 from ...services.chat_context_service import chat_context_service
-from ...services.problem_detector_service import problem_detector
+from ...services.problem_batcher import problem_batcher
+from ...services.telegram_delivery import Priority, delivery_priority
 from ...utils.logger import bot_logger
 from ...config import settings
 
 router = Router()
 
+# Фоновые задачи детекции (держим ссылки, чтобы их не собрал GC)
+_detection_tasks: set = set()
+
 
 class NotInSupportRequestFilter(BaseFilter):
     """Filter to exclude messages when user has active support request (FSM state)"""
 
-    async def __call__(self, message: Message) -> bool:
-        # Import here to avoid circular dependency
-        from ..chat_support.states import SupportRequestStates
-        from aiogram.fsm.context import FSMContext
-        from aiogram.fsm.storage.base import StorageKey
-
-        # Access FSM storage through message bot
-        try:
-            # Get current state for this user in this chat
-            state_key = StorageKey(
-                bot_id=message.bot.id,
-                chat_id=message.chat.id,
-                user_id=message.from_user.id
-            )
-
-            # Get FSM storage from bot
-            storage = message.bot.fsm.storage if hasattr(message.bot, 'fsm') else None
-            if not storage:
-                # No FSM storage available, allow message
-                return True
-
-            # Get current state
-            state_data = await storage.get_state(state_key)
-
-            # Check if user is in support request state
-            is_in_support_state = (
-                state_data is not None and
-                state_data.startswith('SupportRequestStates:')
-            )
-
-            if is_in_support_state:
-                bot_logger.info(f"🚫 Chat Monitor: Skipping message (user in FSM state: {state_data})")
-
-            # Return True if NOT in support state (allow Chat Monitor)
-            return not is_in_support_state
-
-        except Exception as e:
-            bot_logger.error(f"Error checking FSM state in filter: {e}")
-            # On error, allow message to be processed
-            return True
+    async def __call__(self, message: Message, raw_state: Optional[str] = None) -> bool:
+        # raw_state is read from the dispatcher's FSM storage for this chat and user
+        if raw_state and raw_state.startswith('SupportRequestStates:'):
+            bot_logger.info(f"🚫 Chat Monitor: Skipping message (user in FSM state: {raw_state})")
+            return False
+        return True
 
 
 async def _get_thread_mapping_for_client(client_chat_id: int) -> Optional[dict]:
@@ -105,7 +77,8 @@ async def _detect_and_notify_problem(message: Message):
     """
     Detect problems in message using AI and forward alert to admin thread.
 
-    Uses AI-only detection (no keyword matching requirement).
+    Uses AI-only detection (no keyword matching requirement), batched per chat
+    by problem_batcher — one LLM call per short window instead of per message.
     Alerts go to the mapped admin work group thread (NOT to client chat).
     """
     try:
@@ -121,14 +94,12 @@ async def _detect_and_notify_problem(message: Message):
             bot_logger.debug(f"No thread mapping for chat {message.chat.id}, skipping problem detection")
             return
 
-        # Analyze message with AI-only detection
-        detection_result = await problem_detector.analyze_message(
+        # AI-only detection, batched with other messages of this chat
+        detection_result = await problem_batcher.analyze(
             chat_id=message.chat.id,
-            user_id=message.from_user.id,
             username=message.from_user.full_name or message.from_user.username,
             message_text=message.text,
-            use_ai=True,
-            ai_only=True  # AI-only detection (no keyword requirement)
+            message_id=message.message_id,
         )
 
         if not detection_result:
@@ -156,13 +127,14 @@ async def _detect_and_notify_problem(message: Message):
 
         # Send alert to admin work group thread (NOT to client chat)
         try:
-            await message.bot.send_message(
-                chat_id=thread_mapping["work_group_id"],
-                message_thread_id=thread_mapping["thread_id"],
-                text=alert_text,
-                parse_mode="HTML",
-                disable_notification=False  # Notify admins
-            )
+            with delivery_priority(Priority.ALERT):
+                await message.bot.send_message(
+                    chat_id=thread_mapping["work_group_id"],
+                    message_thread_id=thread_mapping["thread_id"],
+                    text=alert_text,
+                    parse_mode="HTML",
+                    disable_notification=False  # Notify admins
+                )
             bot_logger.info(
                 f"Problem alert sent to admin thread {thread_mapping['thread_id']} "
                 f"for client {thread_mapping['client_name']}"
@@ -353,7 +325,7 @@ async def monitor_group_message(message: Message):
         bot_logger.info(f"📨 Chat Monitor: message from {message.from_user.full_name} in {message.chat.title}" +
                        (f" [thread {thread_id}]" if thread_id else ""))
         try:
-            await chat_context_service.store_message(
+            chat_context_service.queue_message(
                 chat_id=message.chat.id,
                 message_id=message.message_id,
                 user_id=message.from_user.id,
@@ -364,10 +336,10 @@ async def monitor_group_message(message: Message):
                 reply_to_message_id=message.reply_to_message.message_id if message.reply_to_message else None,
                 thread_id=thread_id
             )
-            bot_logger.info(f"✅ Message stored in DB: chat_id={message.chat.id}" +
+            bot_logger.debug(f"✅ Message queued for DB: chat_id={message.chat.id}" +
                            (f" thread_id={thread_id}" if thread_id else ""))
         except Exception as e:
-            bot_logger.warning(f"Failed to store message in DB: {e}")
+            bot_logger.warning(f"Failed to queue message for DB: {e}")
 
         # ==================== 2. EVENT BUS ====================
         # NOTE: Event publishing is handled by EventPublisherMiddleware
@@ -383,8 +355,11 @@ async def monitor_group_message(message: Message):
 
         # ==================== 3. PROBLEM DETECTION ====================
         # Детектируем проблемы в текстовых сообщениях
+        # (в фоне: вердикт приходит после окна батча, не держим обработчик)
         if message_type == "text" and message.text:
-            await _detect_and_notify_problem(message)
+            task = asyncio.create_task(_detect_and_notify_problem(message))
+            _detection_tasks.add(task)
+            task.add_done_callback(_detection_tasks.discard)
 
         # ==================== 2. AI TASK DETECTION ====================
         # Проверяем, включена ли AI детекция
@@ -12,6 +12,7 @@ import json
 import re
 import os
 import tempfile
+from typing import Optional, Tuple
 
 from aiogram import Router, F, Bot
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
@@ -227,6 +228,7 @@ async def _ai_chat(user_message: str, system_prompt: str) -> str:
                     user_message=user_message,
                     system_prompt=system_prompt,
                     provider_name=provider_name,
+                    cache="plane",
                 ),
                 timeout=AI_TIMEOUT,
             )
@@ -245,26 +247,48 @@ async def _ai_chat(user_message: str, system_prompt: str) -> str:
 
 # ---- Data gathering ----
 
+async def _find_referenced_issue(user_message: str) -> Optional[Tuple[int, tuple]]:
+    """First '#123' / 'PROJ-123' mention that resolves to an issue: (seq_id, find_issue_by_seq result).
+
+    'PROJ-' prefixes count only for known project identifiers, so words like
+    'windows-10' are skipped instead of hiding a later '#45'.
+    """
+    matches = list(re.finditer(r'\b([A-Za-z][A-Za-z0-9]{1,11})-(\d+)\b|#(\d+)', user_message))
+    if not matches:
+        return None
+
+    known = set()
+    if any(m.group(1) for m in matches):
+        known = {(p.get('identifier') or '').upper() for p in await plane_api.get_all_projects()}
+
+    for m in matches:
+        project_ident = m.group(1)
+        if project_ident and project_ident.upper() not in known:
+            continue
+        seq_id = int(m.group(2) or m.group(3))
+        result = await plane_service.find_issue_by_seq(seq_id, project_ident)
+        if result:
+            return seq_id, result
+    return None
+
+
 async def _gather_plane_data(user_message: str, user_email: str) -> str:
     """Gather Plane data based on the user's question."""
     msg_lower = user_message.lower()
     data_parts = []
 
-    # Sequence ID reference (#123)
-    seq_match = re.search(r'#(\d+)', user_message)
+    # Issue reference (#123 or PROJ-123)
+    seq_match = await _find_referenced_issue(user_message)
     if seq_match:
-        seq_id = int(seq_match.group(1))
-        result = await plane_service.find_issue_by_seq(seq_id)
-        if result:
-            _, _, issue = result
-            data_parts.append(f"Задача #{seq_id}: {json.dumps(issue, ensure_ascii=False)}")
-            try:
-                comments = await plane_api.get_issue_comments(result[0], issue['id'])
-                if comments:
-                    lines = [f"  - {c.get('comment_stripped', c.get('comment_html', ''))[:100]}" for c in comments[:5]]
-                    data_parts.append(f"Комментарии к #{seq_id}:\n" + "\n".join(lines))
-            except Exception:
-                pass
+        seq_id, (project_id, _, issue) = seq_match
+        data_parts.append(f"Задача #{seq_id}: {json.dumps(issue, ensure_ascii=False)}")
+        try:
+            comments = await plane_api.get_issue_comments(project_id, issue['id'])
+            if comments:
+                lines = [f"  - {c.get('comment_stripped', c.get('comment_html', ''))[:100]}" for c in comments[:5]]
+                data_parts.append(f"Комментарии к #{seq_id}:\n" + "\n".join(lines))
+        except Exception:
+            pass
 
     # Keyword categories
     kw_tasks = ['мои', 'мне', 'заняться', 'задач', 'дела', 'todo', 'сделать', 'срочн', 'приоритет']
@@ -273,6 +297,7 @@ async def _gather_plane_data(user_message: str, user_email: str) -> str:
     kw_workload = ['нагрузк', 'workload', 'команд', 'кто чем', 'кто занят']
     kw_status = ['обзор', 'сводк', 'итог']
     kw_mutation = ['смени', 'поменяй', 'измени', 'переведи', 'статус', 'в работе', 'в работу']
+    kw_task_name = [' про ', 'по поводу', 'насчет', 'насчёт', 'тикет', 'таск', 'issue']
 
     if any(kw in msg_lower for kw in kw_tasks) or not data_parts:
         data_parts.append(await plane_service.get_my_tasks_summary(user_email))
@@ -283,6 +308,8 @@ async def _gather_plane_data(user_message: str, user_email: str) -> str:
     if any(kw in msg_lower for kw in kw_workload):
         data_parts.append(await plane_service.get_workload_summary())
 
+    project_found = False
+
     # Fuzzy project matching
     if any(kw in msg_lower for kw in kw_project) or any(alias in msg_lower for alias in PROJECT_ALIASES):
         project_id = _fuzzy_match_project(user_message)
@@ -290,20 +317,39 @@ async def _gather_plane_data(user_message: str, user_email: str) -> str:
             result = await plane_service.get_project_tasks_summary(project_id)
             if 'не найден' not in result:
                 data_parts.append(result)
+                project_found = True
 
     # Status mutation request — load project tasks for the mentioned project
-    if any(kw in msg_lower for kw in kw_mutation):
+    if any(kw in msg_lower for kw in kw_mutation) and not project_found:
         project_id = _fuzzy_match_project(user_message)
         if project_id:
             result = await plane_service.get_project_tasks_summary(project_id)
             if 'не найден' not in result:
                 data_parts.append(result)
+                project_found = True
 
     if any(kw in msg_lower for kw in kw_status):
         data_parts.append(await plane_service.get_projects_list())
         if not any(kw in msg_lower for kw in kw_tasks):
             data_parts.append(await plane_service.get_my_tasks_summary(user_email))
 
+    # No explicit reference — look the task up by name, but only when the
+    # question seems to name one (quoted title, "задача про ...") or nothing
+    # else matched; a workspace-wide search otherwise just adds noise
+    quoted = re.search(r'[«"“]([^»"”]{3,})[»"”]', user_message)
+    names_task = bool(quoted) or any(kw in f" {msg_lower} " for kw in kw_task_name)
+    matched_category = any(
+        kw in msg_lower
+        for kw in kw_tasks + kw_overdue + kw_workload + kw_status
+    )
+    if not seq_match and (names_task or not (project_found or matched_category)):
+        search_text = quoted.group(1) if quoted else user_message
+        matches = await plane_service.search_issues_by_name(search_text, limit=3)
+        if matches:
+            lines = [f"  - {pident}-{issue['sequence_id']}: {json.dumps(issue, ensure_ascii=False)}"
+                     for _, pident, issue in matches]
+            data_parts.append("Задачи, похожие на запрос:\n" + "\n".join(lines))
+
     if not data_parts:
         data_parts.append(await plane_service.get_my_tasks_summary(user_email))
 
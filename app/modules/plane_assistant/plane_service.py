@@ -4,16 +4,14 @@ Collects data from Plane API and prepares it for AI analysis.
 Uses Redis caching to avoid 27 API calls per request.
 """
 
-import aiohttp
 import json
 from datetime import datetime, timezone
 from typing import List, Dict, Optional, Tuple
 
-from ...integrations.plane import plane_api, PlaneTask
+from ...integrations.plane import plane_api, PlaneTask, UNASSIGNED, IssueRef, issue_refs
 from ...services.redis_service import redis_service
 from ...utils.logger import bot_logger
 
-CACHE_TTL = 300  # 5 min
 DATA_CACHE_TTL = 120  # 2 min for formatted task data
 
 
@@ -98,13 +96,7 @@ async def get_project_tasks_summary(project_identifier: str) -> str:
     pid = project['id']
     pname = project.get('identifier', '?')
 
-    try:
-        async with aiohttp.ClientSession() as session:
-            tasks = await plane_api._tasks_manager._get_project_issues(
-                session, pid, assigned_only=False
-            )
-    except Exception as e:
-        return f"Ошибка загрузки задач проекта {pname}: {e}"
+    tasks = await plane_api.get_project_issues(pid)
 
     if not tasks:
         return f"В проекте {pname} нет открытых задач."
@@ -193,23 +185,28 @@ async def get_workload_summary() -> str:
 
 
 async def _build_workload_summary() -> str:
-    members = await plane_api.get_workspace_members()
+    members, workload = await plane_api.get_team_workload()
     if not members:
         return "Не удалось загрузить участников."
 
     lines = []
     for member in members:
-        email = member.email if hasattr(member, 'email') else member.get('email', '')
-        name = member.display_name if hasattr(member, 'display_name') else member.get('display_name', email)
-        if not email or email == 'info@hhivp.com':
+        if not member.email or member.email == 'info@hhivp.com':
+            continue
+        stats = workload.get(member.id)
+        if not stats:
+            lines.append(f"- {member.display_name or member.email}: 0 задач")
             continue
-        try:
-            tasks = await plane_api.get_user_tasks(email)
-            count = len(tasks) if tasks else 0
-            urgent = sum(1 for t in (tasks or []) if t.priority in ('urgent', 'high'))
-            lines.append(f"- {name}: {count} задач ({urgent} срочных)")
-        except Exception:
-            lines.append(f"- {name}: ошибка загрузки")
+        states = ", ".join(f"{name} {count}" for name, count in stats.by_state.most_common())
+        lines.append(
+            f"- {member.display_name or member.email}: {stats.total} задач "
+            f"({stats.urgent} срочных, просрочено {stats.overdue}, "
+            f"без обновлений >14 дн {stats.stale}) | {states}"
+        )
+
+    unassigned = workload.get(UNASSIGNED)
+    if unassigned:
+        lines.append(f"- Без исполнителя: {unassigned.total} задач ({unassigned.urgent} срочных)")
 
     return "Нагрузка команды:\n" + "\n".join(lines)
 
@@ -226,49 +223,62 @@ async def get_projects_list() -> str:
     return f"Проекты ({len(projects)}):\n" + "\n".join(lines)
 
 
-async def find_issue_by_seq(seq_id: int) -> Optional[Tuple[str, str, dict]]:
-    """Find issue across all projects by sequence_id.
+def _issue_summary(t: PlaneTask, pident: str) -> dict:
+    return {
+        "id": t.id,
+        "name": t.name,
+        "state": t.get_state_name(),
+        "priority": t.priority,
+        "assignee": t.assignee_name,
+        "target_date": t.target_date,
+        "project_name": pident,
+    }
+
+
+async def find_issue_by_seq(
+    seq_id: int,
+    project_identifier: Optional[str] = None
+) -> Optional[Tuple[str, str, dict]]:
+    """Find issue by sequence_id (optionally within a project: PROJ-123).
+
+    Resolves the reference through the persistent issue ref table first
+    (fetching only the referenced issue) and falls back to scanning the
+    issue index.
 
     Returns (project_id, project_identifier, issue_data) or None.
     """
-    cache_key = f"plane_seq:{seq_id}"
-    cached = await redis_service.get_json(cache_key)
-    if cached:
-        return cached["project_id"], cached["project_ident"], cached["issue"]
-
     projects = await plane_api.get_all_projects()
     if not projects:
         return None
+    if project_identifier:
+        ident = project_identifier.upper()
+        projects = [p for p in projects if p.get('identifier', '').upper() == ident]
+
+    # Sequence IDs are per-project: prefer the first project in list order
+    idents = {p['id']: p.get('identifier', '?') for p in projects}
+    order = {p['id']: i for i, p in enumerate(projects)}
+
+    ref = f"{project_identifier}-{seq_id}" if project_identifier else str(seq_id)
+    refs = [r for r in await issue_refs.resolve(ref) if r.project_id in order]
+    for hit in sorted(refs, key=lambda r: order[r.project_id]):
+        t = await plane_api.get_task(hit.project_id, hit.issue_id)
+        if t is not None:
+            pident = hit.project_ident or idents.get(hit.project_id, '?')
+            return hit.project_id, pident, _issue_summary(t, pident)
+
+    matches = await plane_api.find_issues_by_sequence(seq_id, [p['id'] for p in projects])
+    if not matches:
+        return None
 
-    for p in projects:
-        pid = p['id']
-        pident = p.get('identifier', '?')
-        try:
-            async with aiohttp.ClientSession() as session:
-                tasks = await plane_api._tasks_manager._get_project_issues(
-                    session, pid, assigned_only=False
-                )
-                for t in tasks:
-                    if t.sequence_id == seq_id:
-                        issue_data = {
-                            "id": t.id,
-                            "name": t.name,
-                            "state": t.get_state_name(),
-                            "priority": t.priority,
-                            "assignee": t.assignee_name,
-                            "target_date": t.target_date,
-                            "project_name": pident,
-                        }
-                        await redis_service.set_json(cache_key, {
-                            "project_id": pid,
-                            "project_ident": pident,
-                            "issue": issue_data
-                        }, ttl=CACHE_TTL)
-                        return pid, pident, issue_data
-        except Exception:
-            continue
+    for m in matches:
+        await issue_refs.record(IssueRef(
+            project_id=m.project, issue_id=m.id, sequence_id=seq_id,
+            project_ident=idents.get(m.project),
+        ))
 
-    return None
+    t = min(matches, key=lambda m: order.get(m.project, len(order)))
+    pident = idents.get(t.project, '?')
+    return t.project, pident, _issue_summary(t, pident)
 
 
 async def close_issue(project_id: str, issue_id: str) -> bool:
@@ -381,14 +391,20 @@ async def set_start_date(project_id: str, issue_id: str, start_date: str) -> boo
     return result is not None
 
 
-async def find_issue_by_name(search_text: str, project_identifier: str = None) -> Optional[Tuple[str, str, dict]]:
-    """Find issue by name substring (fuzzy match across projects).
+async def search_issues_by_name(
+    search_text: str,
+    project_identifier: str = None,
+    limit: int = 5,
+    min_coverage: float = 0.5
+) -> List[Tuple[str, str, dict]]:
+    """Open issues whose name/description match free text (issue text index, typo tolerant).
 
-    Returns (project_id, project_identifier, issue_data) or None.
+    Only hits containing at least `min_coverage` of the query words are kept.
+    Returns [(project_id, project_identifier, issue_data)], best match first.
     """
     projects = await plane_api.get_all_projects()
     if not projects:
-        return None
+        return []
 
     # If project specified, filter to it
     if project_identifier:
@@ -397,33 +413,24 @@ async def find_issue_by_name(search_text: str, project_identifier: str = None) -
             p.get('identifier', '').upper(), p.get('name', '').upper()
         )]
 
-    query = search_text.lower()
-
-    for p in projects:
-        pid = p['id']
-        pident = p.get('identifier', '?')
-        try:
-            async with aiohttp.ClientSession() as session:
-                tasks = await plane_api._tasks_manager._get_project_issues(
-                    session, pid, assigned_only=False
-                )
-                for t in tasks:
-                    if query in t.name.lower():
-                        issue_data = {
-                            "id": t.id,
-                            "name": t.name,
-                            "state": t.get_state_name(),
-                            "priority": t.priority,
-                            "assignee": t.assignee_name,
-                            "target_date": t.target_date,
-                            "project_name": pident,
-                            "sequence_id": t.sequence_id,
-                        }
-                        return pid, pident, issue_data
-        except Exception:
+    idents = {p['id']: p.get('identifier', '?') for p in projects}
+    results = []
+    # Over-fetch: the top BM25 hits may fail the coverage filter
+    for t, hit in await plane_api.search_tasks(search_text, list(idents), max(limit * 3, 5)):
+        if hit.coverage < min_coverage:
             continue
+        pident = idents.get(t.project, '?')
+        results.append((t.project, pident, {**_issue_summary(t, pident), "sequence_id": t.sequence_id}))
+    return results[:limit]
+
+
+async def find_issue_by_name(search_text: str, project_identifier: str = None) -> Optional[Tuple[str, str, dict]]:
+    """Find the issue best matching a name (fuzzy match across projects).
 
-    return None
+    Returns (project_id, project_identifier, issue_data) or None.
+    """
+    matches = await search_issues_by_name(search_text, project_identifier, limit=1)
+    return matches[0] if matches else None
 
 
 async def add_comment(project_id: str, issue_id: str, comment_text: str) -> bool:
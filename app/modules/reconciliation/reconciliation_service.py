@@ -4,6 +4,11 @@ Daily Chat Reconciliation Service.
 Analyzes today's messages from linked group chats,
 extracts incidents via AI, matches to Plane tasks,
 and proposes actions (close/create).
+
+Chats are processed concurrently (`reconciliation_concurrency`), Plane
+issues are fetched once per project per run, and a per-chat high-water
+mark (last analysed ChatMessage.id) makes repeated runs on the same day
+analyse only messages that arrived since the previous run.
 """
 
 import asyncio
@@ -13,7 +18,6 @@ from dataclasses import dataclass, field
 from datetime import datetime, date, time, timezone
 from typing import Optional
 
-import aiohttp
 import pytz
 
 from ...config import settings
@@ -25,12 +29,18 @@ from ...integrations.plane import plane_api
 from ..plane_assistant import plane_service
 from ...core.ai.ai_manager import ai_manager
 from ...utils.logger import bot_logger
+from ...services.http_service import http_service
+from ...services.redis_service import redis_service
 from .ai_prompts import EXTRACTION_PROMPT
 
 
 AI_TIMEOUT = 45
 AI_PROVIDERS = ["groq", "openrouter"]
 
+HWM_KEY = "recon:hwm:{chat_id}"
+HWM_TTL = 2 * 86400
+CONTEXT_MESSAGES = 10  # Already analysed messages shown before the new ones
+
 
 @dataclass
 class ExtractedIncident:
@@ -98,10 +108,19 @@ def deserialize_item(data: dict) -> ReconciliationItem:
 
 class ReconciliationService:
 
-    async def run(self) -> list[ReconciliationItem]:
-        """Main entry: analyze all linked chats for today."""
-        items = []
+    def __init__(self, concurrency: Optional[int] = None):
+        self.concurrency = concurrency or settings.reconciliation_concurrency
+        self._project_tasks: dict[str, asyncio.Task] = {}
+        self._company_names: dict[str, asyncio.Task] = {}
+        self._project_identifiers: dict[str, asyncio.Task] = {}
 
+    async def run(self, incremental: bool = True) -> list[ReconciliationItem]:
+        """
+        Main entry: analyze all linked chats for today.
+
+        With incremental=True only messages newer than the chat's high-water
+        mark are analysed; incremental=False re-analyses the whole day.
+        """
         async for session in get_async_session():
             mappings = await support_requests_service.list_all_mappings(
                 session, only_active=True
@@ -111,31 +130,89 @@ class ReconciliationService:
             bot_logger.info("Reconciliation: no linked chats found")
             return []
 
-        bot_logger.info(f"Reconciliation: processing {len(mappings)} linked chats")
+        bot_logger.info(
+            f"Reconciliation: processing {len(mappings)} linked chats "
+            f"({'incremental' if incremental else 'full day'}, concurrency {self.concurrency})"
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
 
-        for mapping in mappings:
-            try:
-                chat_items = await self._process_chat(mapping)
-                items.extend(chat_items)
-            except Exception as e:
-                bot_logger.error(
-                    f"Reconciliation error for chat {mapping.chat_title}: {e}"
-                )
+        async def process(mapping) -> list[ReconciliationItem]:
+            async with semaphore:
+                try:
+                    return await self._process_chat(mapping, incremental)
+                except Exception as e:
+                    bot_logger.error(
+                        f"Reconciliation error for chat {mapping.chat_title}: {e}"
+                    )
+                    return []
+
+        results = await asyncio.gather(*(process(m) for m in mappings))
+        items = [item for chat_items in results for item in chat_items]
 
         bot_logger.info(
-            f"Reconciliation done: {len(items)} incidents from {len(mappings)} chats"
+            f"Reconciliation done: {len(items)} incidents from {len(mappings)} chats "
+            f"({len(self._project_tasks)} project fetches)"
         )
         return items
 
-    async def _process_chat(self, mapping) -> list[ReconciliationItem]:
-        """Process a single linked chat."""
+    @staticmethod
+    def _local_today() -> date:
+        return datetime.now(pytz.timezone(settings.daily_tasks_timezone)).date()
+
+    def _today_start_utc(self) -> datetime:
         tz = pytz.timezone(settings.daily_tasks_timezone)
-        today_start = datetime.combine(date.today(), time.min, tzinfo=tz)
-        today_start_utc = today_start.astimezone(timezone.utc).replace(tzinfo=None)
+        today_start = tz.localize(datetime.combine(self._local_today(), time.min))
+        return today_start.astimezone(timezone.utc).replace(tzinfo=None)
+
+    async def _get_high_water_mark(self, chat_id: int) -> int:
+        data = await redis_service.get_json(HWM_KEY.format(chat_id=chat_id))
+        if not data or data.get("date") != self._local_today().isoformat():
+            return 0
+        return int(data.get("last_id", 0))
+
+    async def _set_high_water_mark(self, chat_id: int, last_id: int) -> None:
+        await redis_service.set_json(
+            HWM_KEY.format(chat_id=chat_id),
+            {"last_id": last_id, "date": self._local_today().isoformat()},
+            ttl=HWM_TTL,
+        )
 
-        chat_log = await chat_context_service.get_context_as_text(
-            chat_id=mapping.chat_id, since=today_start_utc
+    @staticmethod
+    def _format_lines(messages: list[dict]) -> str:
+        lines = []
+        for msg in messages:
+            time_str = f"[{msg['time']}]" if msg['time'] else ""
+            text = msg['text'] or f"[{msg['type']}]"
+            lines.append(f"{time_str} {msg['user']}: {text}")
+        return "\n".join(lines)
+
+    async def _load_chat_log(self, chat_id: int, incremental: bool) -> tuple[str, int]:
+        """Chat log to analyse and the id of its newest message (0 if none)."""
+        since = self._today_start_utc()
+        hwm = await self._get_high_water_mark(chat_id) if incremental else 0
+
+        new_messages = await chat_context_service.get_messages_after(
+            chat_id, after_id=hwm, since=since
         )
+        if not new_messages:
+            return "", 0
+
+        chat_log = self._format_lines(new_messages)
+        if hwm:
+            earlier = await chat_context_service.get_messages_up_to(
+                chat_id, up_to_id=hwm, since=since, limit=CONTEXT_MESSAGES
+            )
+            if earlier:
+                chat_log = (
+                    f"(Ранее, уже проанализировано:)\n{self._format_lines(earlier)}\n\n"
+                    f"(Новые сообщения:)\n{chat_log}"
+                )
+        return chat_log, new_messages[-1]["id"]
+
+    async def _process_chat(self, mapping, incremental: bool = True) -> list[ReconciliationItem]:
+        """Process a single linked chat."""
+        chat_log, last_id = await self._load_chat_log(mapping.chat_id, incremental)
 
         if not chat_log or len(chat_log.strip()) < 30:
             return []
@@ -143,20 +220,23 @@ class ReconciliationService:
         incidents = await self._extract_incidents(
             chat_log, mapping.chat_title or str(mapping.chat_id)
         )
+        if incidents is None:
+            return []  # AI failed — keep the high-water mark for the next run
+
+        await self._set_high_water_mark(mapping.chat_id, last_id)
         if not incidents:
             return []
 
-        project_tasks = await self._get_project_tasks(mapping.plane_project_id)
+        project_tasks, company_name, project_identifier = await asyncio.gather(
+            self._shared(self._project_tasks, mapping.plane_project_id,
+                         lambda: self._get_project_tasks(mapping.plane_project_id)),
+            self._shared(self._company_names, mapping.plane_project_name or "",
+                         lambda: self._get_company_name(mapping.plane_project_name)),
+            self._shared(self._project_identifiers, mapping.plane_project_id,
+                         lambda: self._get_project_identifier(mapping.plane_project_id)),
+        )
 
-        company_name = None
-        try:
-            async for session in get_async_session():
-                svc = PlaneMappingsService(session)
-                company_name = await svc.get_company_display_name(
-                    mapping.plane_project_name or ""
-                )
-        except Exception:
-            company_name = mapping.plane_project_name
+        tasks_by_seq = {t["sequence_id"]: t for t in project_tasks}
 
         items = []
         for incident in incidents:
@@ -169,7 +249,11 @@ class ReconciliationService:
                 work_journal_company=company_name,
             )
 
-            matched = self._fuzzy_match_task(incident.title, project_tasks)
+            matched = self._match_task_reference(
+                incident, tasks_by_seq, project_identifier
+            ) or await self._fuzzy_match_task(
+                incident.title, mapping.plane_project_id, project_tasks
+            )
             if matched:
                 item.matching_plane_task = matched
                 item.proposed_action = (
@@ -185,10 +269,35 @@ class ReconciliationService:
 
         return items
 
+    @staticmethod
+    async def _shared(cache: dict, key: str, factory):
+        """Run factory() once per key per run; concurrent callers await the same task."""
+        if key not in cache:
+            cache[key] = asyncio.ensure_future(factory())
+        return await cache[key]
+
+    async def _get_company_name(self, plane_project_name: Optional[str]) -> Optional[str]:
+        try:
+            async for session in get_async_session():
+                svc = PlaneMappingsService(session)
+                return await svc.get_company_display_name(plane_project_name or "")
+        except Exception:
+            return plane_project_name
+
+    async def _get_project_identifier(self, project_id: str) -> Optional[str]:
+        """Project prefix (HARZL, HHIVP, ...) used in PROJ-123 references."""
+        try:
+            for project in await plane_api.get_all_projects():
+                if project.get("id") == project_id:
+                    return project.get("identifier")
+        except Exception as e:
+            bot_logger.warning(f"Reconciliation: failed to get project identifier: {e}")
+        return None
+
     async def _extract_incidents(
         self, chat_log: str, chat_title: str
-    ) -> list[ExtractedIncident]:
-        """Call AI to extract incidents from chat log."""
+    ) -> Optional[list[ExtractedIncident]]:
+        """Call AI to extract incidents from chat log (None if AI failed)."""
         system = EXTRACTION_PROMPT.format(chat_title=chat_title)
 
         response_text = await self._call_ai(
@@ -197,7 +306,7 @@ class ReconciliationService:
         )
 
         if not response_text:
-            return []
+            return None
 
         return self._parse_incidents_json(response_text)
 
@@ -213,6 +322,7 @@ class ReconciliationService:
                         user_message=user_message,
                         system_prompt=system_prompt,
                         provider_name=provider_name,
+                        cache="reconciliation",
                     ),
                     timeout=AI_TIMEOUT,
                 )
@@ -269,48 +379,55 @@ class ReconciliationService:
     async def _get_project_tasks(self, project_id: str) -> list[dict]:
         """Get open tasks from Plane for a project."""
         try:
-            async with aiohttp.ClientSession() as session:
-                tasks = await plane_api._tasks_manager._get_project_issues(
-                    session, project_id, assigned_only=False
-                )
-                return [
-                    {
-                        "id": t.id,
-                        "name": t.name,
-                        "sequence_id": t.sequence_id,
-                        "state": t.get_state_name(),
-                        "priority": t.priority,
-                    }
-                    for t in (tasks or [])
-                ]
+            session = http_service.session
+            tasks = await plane_api._tasks_manager._get_project_issues(
+                session, project_id, assigned_only=False
+            )
+            return [
+                {
+                    "id": t.id,
+                    "name": t.name,
+                    "sequence_id": t.sequence_id,
+                    "state": t.get_state_name(),
+                    "priority": t.priority,
+                }
+                for t in (tasks or [])
+            ]
         except Exception as e:
             bot_logger.warning(f"Reconciliation: failed to get project tasks: {e}")
             return []
 
-    def _fuzzy_match_task(
-        self, incident_title: str, tasks: list[dict]
+    def _match_task_reference(
+        self,
+        incident: ExtractedIncident,
+        tasks_by_seq: dict[int, dict],
+        project_identifier: Optional[str] = None,
     ) -> Optional[dict]:
-        """Fuzzy match incident title to existing Plane tasks."""
-        title_lower = incident_title.lower()
-        words = [w for w in title_lower.split() if len(w) > 3]
-
-        best_match = None
-        best_score = 0
-
-        for task in tasks:
-            task_name_lower = task["name"].lower()
-
-            # Exact substring
-            if title_lower in task_name_lower or task_name_lower in title_lower:
+        """Match explicit '#123' / 'PROJ-123' mentions in the incident to project tasks.
+
+        Only the mapped project's own prefix counts: 'Windows-10' or
+        'Office-365' are not task references.
+        """
+        text = f"{incident.title} {incident.description}"
+        prefix = "#"
+        if project_identifier:
+            prefix = rf"(?:#|\b{re.escape(project_identifier)}-)"
+        for m in re.finditer(rf"{prefix}(\d+)\b", text, re.IGNORECASE):
+            task = tasks_by_seq.get(int(m.group(1)))
+            if task:
                 return task
+        return None
 
-            # Word overlap
-            score = sum(1 for w in words if w in task_name_lower)
-            if score > best_score and score >= max(2, len(words) // 2):
-                best_score = score
-                best_match = task
-
-        return best_match
+    async def _fuzzy_match_task(
+        self, incident_title: str, project_id: str, tasks: list[dict]
+    ) -> Optional[dict]:
+        """Fuzzy match incident title to open Plane tasks via the issue text index."""
+        tasks_by_id = {t["id"]: t for t in tasks}
+        for task, hit in await plane_api.search_tasks(incident_title, [project_id], limit=3):
+            # Most of the title must be present, at least two words for longer titles
+            if hit.coverage >= 0.5 and hit.matched >= min(2, hit.terms) and task.id in tasks_by_id:
+                return tasks_by_id[task.id]
+        return None
 
     # === Action execution ===
 
@@ -91,16 +91,22 @@ def _format_item_detail(idx: int, item: dict, total: int) -> str:
 
 @router.message(Command("plane_reconcile"))
 async def cmd_reconcile(message: Message, state: FSMContext):
-    """Manual trigger for daily chat reconciliation."""
+    """
+    Manual trigger for daily chat reconciliation.
+
+    /plane_reconcile — only messages since the previous run
+    /plane_reconcile full — re-analyse the whole day
+    """
     if not settings.is_admin(message.from_user.id):
         await message.answer("Только для админов.")
         return
 
+    full_day = "full" in (message.text or "").split()[1:]
     status_msg = await message.answer("⏳ Анализирую привязанные чаты...")
 
     try:
         service = ReconciliationService()
-        items = await service.run()
+        items = await service.run(incremental=not full_day)
     except Exception as e:
         bot_logger.error(f"Reconciliation run error: {e}", exc_info=True)
         await status_msg.edit_text(f"✗ Ошибка: {str(e)[:100]}")
@@ -108,7 +114,9 @@ async def cmd_reconcile(message: Message, state: FSMContext):
 
     if not items:
         await status_msg.edit_text(
-            "📋 Сверка завершена — сегодня инцидентов в привязанных чатах не найдено."
+            "📋 Сверка завершена — новых инцидентов в привязанных чатах не найдено."
+            + ("" if full_day else "\n<i>/plane_reconcile full — пересверить весь день</i>"),
+            parse_mode="HTML",
         )
         return
 
@@ -0,0 +1,355 @@
+"""
+Buffered (write-behind) table writer.
+
+Rows are queued in memory and flushed with one multi-row INSERT when the
+buffer reaches `flush_size` or every `flush_interval` seconds, instead of one
+session + commit per row. A failed flush keeps the rows for the next attempt.
+
+The buffer is bounded by `max_pending`. put() applies back-pressure (waits
+for a flush up to `put_timeout`), then the overflow policy decides:
+  - "drop_oldest": discard the oldest buffered rows
+  - "drop_newest": discard the incoming row
+  - "spill": append overflow rows to a JSONL file, replayed after the next
+    successful flush
+
+After `max_failures` consecutive failed flushes the database is probed with
+a trivial query. If it does not answer, the batch is kept as before;
+otherwise the batch is retried in chunks of `isolate_chunk` rows, then row by
+row, so one row the database always rejects (e.g. a NUL byte in text) cannot
+block everything queued after it. Rows that still fail are logged and dropped
+(appended to `<spill_path>.rejected` when spilling is configured); a
+connection-level error ends the isolation and keeps the rest.
+stop() lets the flusher finish its current flush and then performs a final flush (called from on_shutdown).
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from ..database.database import AsyncSessionLocal
+from ..utils.logger import bot_logger
+
+
+class BufferedWriter:
+    """Write-behind multi-row INSERT buffer for one ORM model."""
+
+    def __init__(
+        self,
+        model,
+        name: str,
+        flush_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        overflow: str = "drop_oldest",
+        spill_path: Optional[str] = None,
+        put_timeout: float = 0.5,
+        max_failures: int = 3,
+        isolate_chunk: int = 10,
+    ):
+        if overflow not in ("drop_oldest", "drop_newest", "spill"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if overflow == "spill" and not spill_path:
+            raise ValueError("spill overflow policy requires spill_path")
+
+        self.model = model
+        self.name = name
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.put_timeout = put_timeout
+        self.max_failures = max_failures
+        self.isolate_chunk = isolate_chunk
+        self._failures = 0
+        self._rows: List[Dict[str, Any]] = []
+        self._in_flight: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._stats = {
+            "queued": 0, "written": 0, "flushes": 0, "errors": 0,
+            "dropped": 0, "spilled": 0, "rejected": 0, "last_flush_ms": 0,
+        }
+
+    # --- Lifecycle ---
+
+    async def start(self) -> None:
+        """Start periodic flusher (idempotent)."""
+        self._stopping.clear()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop flusher (after its current flush) and write everything still buffered."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._task:
+            try:
+                await self._task
+            except Exception as e:
+                bot_logger.error(f"{self.name}: flusher failed: {e}")
+            self._task = None
+        await self.flush()
+        if self._rows:
+            bot_logger.error(f"{self.name}: {len(self._rows)} rows lost on shutdown")
+
+    # --- Queue ---
+
+    def add(self, **row: Any) -> None:
+        """Queue one row (column=value kwargs). Never touches the database."""
+        self._stats["queued"] += 1
+        if len(self._rows) >= self.max_pending and self.overflow == "drop_newest":
+            self._stats["dropped"] += 1
+        else:
+            self._rows.append(row)
+            self._apply_overflow()
+
+        if len(self._rows) >= self.flush_size:
+            self._wakeup.set()
+        if (self._task is None or self._task.done()) and not self._stopping.is_set():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                pass
+
+    async def put(self, **row: Any) -> None:
+        """Queue one row; when the buffer is full wait (up to put_timeout) for a flush first."""
+        if len(self._rows) >= self.max_pending:
+            self._wakeup.set()
+            deadline = time.monotonic() + self.put_timeout
+            while len(self._rows) >= self.max_pending and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+        self.add(**row)
+
+    def _apply_overflow(self) -> None:
+        overflow = len(self._rows) - self.max_pending
+        if overflow <= 0:
+            return
+        excess, self._rows[:overflow] = self._rows[:overflow], []
+        if self.overflow == "spill" and self._spill(excess):
+            self._stats["spilled"] += len(excess)
+        else:
+            self._stats["dropped"] += len(excess)
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def pending_rows(self) -> List[Dict[str, Any]]:
+        """Rows not yet committed (being flushed + buffered), oldest first."""
+        return self._in_flight + self._rows
+
+    async def update_rows(self, match: Callable[[Dict[str, Any]], bool], **values: Any) -> List[Dict[str, Any]]:
+        """
+        Set values on buffered rows matching match(row), after any running flush.
+
+        Returns the updated rows; every other row is committed by then, so the
+        caller can UPDATE those in the database.
+        """
+        async with self._flush_lock:
+            rows = [row for row in self._rows if match(row)]
+            for row in rows:
+                row.update(values)
+        return rows
+
+    # --- Spill file ---
+
+    @staticmethod
+    def _encode(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return {"__dt__": value.isoformat()}
+        return str(value)
+
+    @staticmethod
+    def _decode(obj: Dict[str, Any]) -> Any:
+        if set(obj) == {"__dt__"}:
+            return datetime.fromisoformat(obj["__dt__"])
+        return obj
+
+    def _spill(self, rows: List[Dict[str, Any]], path: Optional[str] = None) -> bool:
+        path = path or self.spill_path
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False, default=self._encode) + "\n")
+            return True
+        except OSError as e:
+            bot_logger.error(f"{self.name}: spill to {path} failed: {e}")
+            return False
+
+    def _replay_spill(self) -> None:
+        """Move spilled rows back into the buffer (as much as fits)."""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        if len(self._rows) >= self.max_pending // 2:
+            return
+        replay_path = f"{self.spill_path}.replay"
+        try:
+            os.replace(self.spill_path, replay_path)
+            with open(replay_path, encoding="utf-8") as f:
+                rows = [json.loads(line, object_hook=self._decode) for line in f if line.strip()]
+            os.remove(replay_path)
+        except (OSError, ValueError) as e:
+            bot_logger.error(f"{self.name}: replay of {self.spill_path} failed: {e}")
+            return
+
+        self._rows.extend(rows)
+        self._apply_overflow()
+        bot_logger.info(f"{self.name}: replaying {len(rows)} spilled rows")
+
+    # --- Flushing ---
+
+    async def _flush_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.execute(insert(self.model), rows)
+            await session.commit()
+
+    async def flush(self) -> int:
+        """Write buffered rows in one INSERT. Returns number of rows written."""
+        async with self._flush_lock:
+            if not self._rows:
+                return 0
+            rows, self._rows = self._rows, []
+            self._in_flight = rows
+            try:
+                return await self._write(rows)
+            finally:
+                self._in_flight = []
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> int:
+        start = time.monotonic()
+        try:
+            await self._insert(rows)
+        except asyncio.CancelledError:
+            self._requeue(rows)
+            raise
+        except Exception as e:
+            self._failures += 1
+            self._stats["errors"] += 1
+            bot_logger.warning(f"{self.name}: flush of {len(rows)} rows failed: {e}")
+            if self._failures < self.max_failures:
+                return self._requeue(rows)
+            if not await self._database_available():
+                # Outage rather than bad rows: keep everything
+                return self._requeue(rows)
+            written = await self._flush_isolated(rows)
+            if not written:
+                return 0
+        else:
+            written = len(rows)
+
+        self._failures = 0
+        self._stats["written"] += written
+        self._stats["flushes"] += 1
+        self._stats["last_flush_ms"] = int((time.monotonic() - start) * 1000)
+        self._replay_spill()
+        return written
+
+    def _requeue(self, rows: List[Dict[str, Any]]) -> int:
+        # Keep rows for the next attempt (bounded by max_pending)
+        self._rows[:0] = rows
+        self._apply_overflow()
+        return 0
+
+    async def _flush_isolated(self, rows: List[Dict[str, Any]]) -> int:
+        """Retry a repeatedly failing batch in chunks, then row by row; returns rows written."""
+        written = 0
+        failed: List[Dict[str, Any]] = []
+        last_error: Optional[Exception] = None
+        for i in range(0, len(rows), self.isolate_chunk):
+            chunk = rows[i:i + self.isolate_chunk]
+            try:
+                await self._insert(chunk)
+                written += len(chunk)
+                continue
+            except asyncio.CancelledError:
+                self._requeue(rows[i:])
+                raise
+            except Exception as e:
+                if self._is_connection_error(e):
+                    return self._keep_after_outage(rows[i:], failed, last_error, written, e)
+            for j, row in enumerate(chunk):
+                try:
+                    await self._insert([row])
+                    written += 1
+                except asyncio.CancelledError:
+                    self._requeue(chunk[j:] + rows[i + len(chunk):])
+                    raise
+                except Exception as e:
+                    if self._is_connection_error(e):
+                        rest = chunk[j:] + rows[i + len(chunk):]
+                        return self._keep_after_outage(rest, failed, last_error, written, e)
+                    failed.append(row)
+                    last_error = e
+
+        if failed:
+            self._reject(failed, last_error)
+        return written
+
+    def _keep_after_outage(
+        self,
+        rest: List[Dict[str, Any]],
+        failed: List[Dict[str, Any]],
+        last_error: Optional[Exception],
+        written: int,
+        error: Exception,
+    ) -> int:
+        """Connection lost while isolating: keep the untried rows, give up only on rejected ones."""
+        bot_logger.warning(f"{self.name}: connection lost while isolating bad rows: {error}")
+        self._requeue(rest)
+        if failed:
+            self._reject(failed, last_error)
+        return written
+
+    @staticmethod
+    def _is_connection_error(error: Exception) -> bool:
+        """Error of the connection rather than of the rows being written."""
+        if isinstance(error, (OSError, asyncio.TimeoutError)):
+            return True
+        if isinstance(error, DBAPIError) and error.connection_invalidated:
+            return True
+        return isinstance(error, InterfaceError) or (
+            isinstance(error, OperationalError) and isinstance(error.orig, (OSError, ConnectionError))
+        )
+
+    async def _database_available(self) -> bool:
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
+
+    def _reject(self, rows: List[Dict[str, Any]], error: Optional[Exception]) -> None:
+        """Give up on rows the database keeps refusing (spilled aside if possible)."""
+        self._stats["rejected"] += len(rows)
+        target = f"{self.spill_path}.rejected" if self.spill_path else None
+        saved = bool(target) and self._spill(rows, target)
+        for row in rows:
+            bot_logger.error(
+                f"{self.name}: rejected row {json.dumps(row, ensure_ascii=False, default=self._encode)[:300]}"
+            )
+        outcome = f"saved to {target}" if saved else "dropped"
+        bot_logger.error(f"{self.name}: {len(rows)} rows rejected by the database ({outcome}): {error}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Queue depth and flush counters (for /diag)."""
+        return {**self._stats, "pending": len(self._rows)}
@@ -5,16 +5,27 @@ Persistent storage and retrieval of chat messages for AI context.
 Replaces in-memory MessageContextBuilder with database-backed storage.
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, Any
-from sqlalchemy import select, delete, func, desc, and_
+from sqlalchemy import select, delete, func, desc, and_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database.database import get_async_session, AsyncSessionLocal
 from ..database.chat_ai_models import ChatMessage, ChatAISettings, DetectedIssue, ThreadClientMapping
+from ..config import settings as cfg
+from ..services.buffered_writer import BufferedWriter
 from ..utils.logger import bot_logger
 
 
+# Write-behind buffer for monitored group traffic (flushed in multi-row INSERTs)
+chat_message_writer = BufferedWriter(
+    ChatMessage,
+    name="chat_messages",
+    flush_size=cfg.chat_message_flush_size,
+    flush_interval=cfg.chat_message_flush_interval,
+)
+
+
 class ChatContextService:
     """
     Service for managing persistent chat context.
@@ -84,6 +95,69 @@ class ChatContextService:
                            (f" thread {thread_id}" if thread_id else ""))
             return message
 
+    def queue_message(
+        self,
+        chat_id: int,
+        message_id: int,
+        user_id: int,
+        username: Optional[str],
+        display_name: Optional[str],
+        message_text: Optional[str],
+        message_type: str = 'text',
+        reply_to_message_id: Optional[int] = None,
+        thread_id: Optional[int] = None
+    ) -> None:
+        """
+        Queue a message for buffered insert (same args as store_message).
+
+        No DB round trip on the hot path: chat_message_writer flushes queued
+        rows on size/time triggers and on shutdown. created_at is taken now,
+        so ordering is kept even though rows land in the DB a bit later.
+        """
+        chat_message_writer.add(
+            chat_id=chat_id,
+            thread_id=thread_id,
+            message_id=message_id,
+            user_id=user_id,
+            username=username,
+            display_name=display_name,
+            message_text=message_text,
+            message_type=message_type,
+            reply_to_message_id=reply_to_message_id,
+            created_at=datetime.now(timezone.utc),
+            ai_verdict=None,
+        )
+
+    async def record_ai_verdicts(self, chat_id: int, verdicts: Dict[int, str]) -> None:
+        """
+        Store LLM verdicts ('problem' / 'none') of messages, keyed by message_id.
+
+        Only messages the LLM actually judged get a verdict; the problem
+        pre-filter trains on them. Rows still queued are updated in the buffer.
+        """
+        if not verdicts:
+            return
+        stored: Dict[str, List[int]] = {}
+        for verdict in set(verdicts.values()):
+            ids = {mid for mid, v in verdicts.items() if v == verdict}
+            queued = await chat_message_writer.update_rows(
+                lambda row: row.get('chat_id') == chat_id and row.get('message_id') in ids,
+                ai_verdict=verdict,
+            )
+            ids -= {row['message_id'] for row in queued}
+            if ids:
+                stored[verdict] = sorted(ids)
+        if not stored:
+            return
+        async with AsyncSessionLocal() as session:
+            for verdict, ids in stored.items():
+                await session.execute(
+                    update(ChatMessage)
+                    .where(ChatMessage.chat_id == chat_id, ChatMessage.message_id.in_(ids))
+                    .values(ai_verdict=verdict)
+                )
+            await session.commit()
+
     async def get_context(
         self,
         chat_id: int,
@@ -142,6 +216,25 @@ class ChatContextService:
 
             return context
 
+    def get_pending_context(self, chat_id: int) -> List[Dict[str, Any]]:
+        """
+        Messages of a chat queued in chat_message_writer but not committed yet.
+
+        Same entry format as get_context(include_metadata=False) plus
+        'message_id', oldest first.
+        """
+        return [
+            {
+                'user': row.get('display_name') or row.get('username') or str(row.get('user_id')),
+                'text': row.get('message_text'),
+                'time': row['created_at'].strftime('%H:%M') if row.get('created_at') else '',
+                'type': row.get('message_type'),
+                'message_id': row.get('message_id'),
+            }
+            for row in chat_message_writer.pending_rows()
+            if row.get('chat_id') == chat_id
+        ]
+
     async def get_context_as_text(
         self,
         chat_id: int,
@@ -168,6 +261,63 @@ class ChatContextService:
 
         return "\n".join(lines)
 
+    async def get_messages_after(
+        self,
+        chat_id: int,
+        after_id: int = 0,
+        since: Optional[datetime] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Messages with id > after_id (oldest first), for incremental analysis.
+
+        Returns:
+            List of dicts with id, user, text, time, type
+        """
+        query = self._message_rows_query(chat_id, since).where(
+            ChatMessage.id > after_id
+        ).order_by(ChatMessage.id).limit(limit)
+        return await self._fetch_message_rows(query)
+
+    async def get_messages_up_to(
+        self,
+        chat_id: int,
+        up_to_id: int,
+        since: Optional[datetime] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Last `limit` messages with id <= up_to_id (oldest first)."""
+        query = self._message_rows_query(chat_id, since).where(
+            ChatMessage.id <= up_to_id
+        ).order_by(desc(ChatMessage.id)).limit(limit)
+        return list(reversed(await self._fetch_message_rows(query)))
+
+    @staticmethod
+    def _message_rows_query(chat_id: int, since: Optional[datetime]):
+        query = select(
+            ChatMessage.id, ChatMessage.display_name, ChatMessage.username, ChatMessage.user_id,
+            ChatMessage.message_text, ChatMessage.message_type, ChatMessage.created_at
+        ).where(ChatMessage.chat_id == chat_id)
+        if since:
+            query = query.where(ChatMessage.created_at >= since)
+        return query
+
+    @staticmethod
+    async def _fetch_message_rows(query) -> List[Dict[str, Any]]:
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        return [
+            {
+                'id': row.id,
+                'user': row.display_name or row.username or str(row.user_id),
+                'text': row.message_text,
+                'time': row.created_at.strftime('%H:%M') if row.created_at else '',
+                'type': row.message_type,
+            }
+            for row in rows
+        ]
+
     async def get_chat_settings(
         self,
         chat_id: int,
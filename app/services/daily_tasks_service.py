@@ -231,6 +231,11 @@ class DailyTasksService:
                 self.admin_settings[admin_id][key] = value
                 
                 bot_logger.info(f"Updated setting {key}={value} for admin {admin_id}")
+
+                # Пересчитываем время следующей отправки
+                if key in ['time', 'notification_time', 'notifications_enabled', 'enabled', 'timezone']:
+                    from .job_scheduler import job_scheduler
+                    await job_scheduler.reschedule("daily_tasks")
                 return True
                 
         except Exception as e:
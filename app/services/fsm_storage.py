@@ -0,0 +1,63 @@
+"""
+FSM storage on the shared Redis connection.
+
+States and data survive restarts and are visible to every bot replica. Each
+(bot, chat, user[, thread]) gets its own pair of keys:
+
+    fsm:{bot_id}:{chat_id}:{user_id}:state   -> "TaskReportStates:filling_report"
+    fsm:{bot_id}:{chat_id}:{user_id}:data    -> {"task_report_id":42}
+
+Values are compact JSON written through `redis_service`, so both keys expire
+(`fsm_state_ttl` / `fsm_data_ttl`, refreshed on every write) and, when Redis is
+unavailable, the service's in-memory fallback keeps single-process behaviour.
+Clearing a state or data removes its key instead of storing an empty value.
+"""
+
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+
+from ..config import settings
+from .redis_service import RedisService, redis_service
+
+
+class RedisFSMStorage(BaseStorage):
+    """aiogram storage backed by `redis_service` (JSON values with TTL)."""
+
+    def __init__(
+        self,
+        redis: Optional[RedisService] = None,
+        key_builder: Optional[KeyBuilder] = None,
+        state_ttl: Optional[int] = None,
+        data_ttl: Optional[int] = None,
+    ):
+        self.redis = redis or redis_service
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True)
+        self.state_ttl = state_ttl or settings.fsm_state_ttl
+        self.data_ttl = data_ttl or settings.fsm_data_ttl
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        redis_key = self.key_builder.build(key, "state")
+        value = state.state if isinstance(state, State) else state
+        if value is None:
+            await self.redis.delete(redis_key)
+        else:
+            await self.redis.set_json(redis_key, value, ttl=self.state_ttl)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return await self.redis.get_json(self.key_builder.build(key, "state"))
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        redis_key = self.key_builder.build(key, "data")
+        if not data:
+            await self.redis.delete(redis_key)
+        else:
+            await self.redis.set_json(redis_key, dict(data), ttl=self.data_ttl)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        # Copy: the in-memory fallback hands out the stored object itself
+        return dict(await self.redis.get_json(self.key_builder.build(key, "data")) or {})
+
+    async def close(self) -> None:
+        """The connection belongs to redis_service, which closes it on shutdown."""
@@ -0,0 +1,164 @@
+"""
+Shared HTTP client for all outbound integrations (Plane, AI providers, Whisper).
+
+One long-lived aiohttp session with a keep-alive connection pool per host
+and a DNS cache, so repeated calls to api.groq.com or the Plane host reuse
+TLS connections instead of paying a fresh handshake every time.
+
+Created in on_startup and closed in on_shutdown; if used before start()
+(tests, scripts) the session is created lazily.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import aiohttp
+
+from ..config import settings
+from ..utils.logger import bot_logger
+
+
+class HostStats:
+    """Per-host request/connection counters."""
+
+    __slots__ = ("requests", "errors", "total_ms", "max_ms", "new_connections", "reused_connections")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.new_connections = 0
+        self.reused_connections = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_ms": int(self.total_ms / self.requests) if self.requests else 0,
+            "max_ms": int(self.max_ms),
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+        }
+
+
+class HTTPService:
+    """Process-wide pooled aiohttp session with connection/latency stats."""
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hosts: dict[str, HostStats] = defaultdict(HostStats)
+        self._dns = {"hits": 0, "misses": 0}
+
+    async def start(self) -> None:
+        """Create the shared session (idempotent)."""
+        if not self._is_usable():
+            self._session = self._create_session()
+            bot_logger.info(
+                f"HTTP pool started (limit={settings.http_pool_limit}, "
+                f"per_host={settings.http_pool_limit_per_host})"
+            )
+
+    async def close(self) -> None:
+        """Close the shared session and its pooled connections."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+            bot_logger.info("HTTP pool closed")
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared session. Do not close it — it is owned by HTTPService."""
+        if not self._is_usable():
+            self._session = self._create_session()
+        return self._session
+
+    def _is_usable(self) -> bool:
+        # A session is bound to the loop it was created in (tests run one loop per case)
+        if self._session is None or self._session.closed:
+            return False
+        try:
+            return self._loop is asyncio.get_running_loop()
+        except RuntimeError:
+            return True
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        connector = aiohttp.TCPConnector(
+            limit=settings.http_pool_limit,
+            limit_per_host=settings.http_pool_limit_per_host,
+            ttl_dns_cache=300,
+            keepalive_timeout=settings.http_keepalive_timeout,
+            enable_cleanup_closed=True,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=300, sock_connect=10),
+            trace_configs=[self._trace_config()],
+        )
+
+    # --- Stats ---
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig(trace_config_ctx_factory=lambda trace_request_ctx: SimpleNamespace())
+
+        async def on_request_start(session, ctx, params):
+            ctx.start = time.monotonic()
+            ctx.host = params.url.host or "?"
+
+        async def on_request_end(session, ctx, params):
+            self._record(ctx, error=False)
+
+        async def on_request_exception(session, ctx, params):
+            self._record(ctx, error=True)
+
+        async def on_connection_create_end(session, ctx, params):
+            self._hosts[getattr(ctx, "host", "?")].new_connections += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._hosts[getattr(ctx, "host", "?")].reused_connections += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self._dns["hits"] += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self._dns["misses"] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    def _record(self, ctx, error: bool) -> None:
+        if not hasattr(ctx, "start"):
+            return
+        elapsed_ms = (time.monotonic() - ctx.start) * 1000
+        stats = self._hosts[ctx.host]
+        stats.requests += 1
+        stats.errors += int(error)
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Pool state plus per-host counters (for /diag)."""
+        connector = self._session.connector if self._session and not self._session.closed else None
+        return {
+            "open": connector is not None,
+            "dns": dict(self._dns),
+            "hosts": {host: stats.as_dict() for host, stats in self._hosts.items()},
+        }
+
+
+# Global singleton
+http_service = HTTPService()
@@ -0,0 +1,396 @@
+"""
+Persistent job scheduler.
+
+Jobs are registered in code (name, schedule, coroutine); their state lives in
+the `scheduled_jobs` table (next/last fire time, status, duration). A timer
+heap sleeps until the nearest fire time instead of waking every minute.
+
+Before running, a replica claims the fire time:
+  - Redis SET NX lock on (job, fire time) when Redis is connected
+  - conditional UPDATE of the job row (next_run_at must still match)
+so two bot replicas never run the same fire twice. A claim that fails
+without anyone advancing the row (Redis lock left by a crashed replica, DB
+error) is retried after `CLAIM_RETRY` seconds for the same fire time,
+relying on the row CAS alone. A fire missed while the
+bot was down runs once on start if it is younger than the job's `catch_up`
+window. Jobs run with bounded concurrency (`scheduler_max_concurrency`).
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import socket
+import time as monotonic_time
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+import pytz
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..config import settings
+from ..database.database import AsyncSessionLocal
+from ..database.scheduler_models import ScheduledJob
+from ..utils.logger import bot_logger
+from .redis_service import redis_service
+
+LOCK_KEY = "scheduler:lock:{name}:{fire}"
+LOCK_TTL = 86400
+MAX_SLEEP = 3600  # Re-check the heap at least hourly (wall clock jumps)
+CLAIM_RETRY = 60  # Seconds before retrying a fire nobody could claim
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """DB drivers may return naive datetimes (SQLite) — treat them as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+# --- Schedules ---
+
+class Interval:
+    """Fire every `seconds`."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        return moment + timedelta(seconds=self.seconds)
+
+
+class Daily:
+    """Fire at hour:minute local time, optionally only on given weekdays (Mon=0)."""
+
+    def __init__(self, hour: int, minute: int = 0, tz: Optional[str] = None,
+                 weekdays: Optional[FrozenSet[int]] = None):
+        self.hour = hour
+        self.minute = minute
+        self.tz = pytz.timezone(tz or settings.daily_tasks_timezone)
+        self.weekdays = weekdays
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        local = moment.astimezone(self.tz)
+        for offset in range(8):
+            day = local.date() + timedelta(days=offset)
+            if self.weekdays is not None and day.weekday() not in self.weekdays:
+                continue
+            candidate = self.tz.localize(datetime.combine(day, time(self.hour, self.minute)))
+            if candidate > local:
+                return candidate.astimezone(timezone.utc)
+        return None
+
+
+@dataclass
+class Job:
+    """Registered job: `func` receives the (UTC) fire time it runs for."""
+    name: str
+    func: Callable[[datetime], Awaitable[Any]]
+    schedule: Any
+    catch_up: float = 0  # Seconds: missed fires younger than this run on start
+    timeout: float = 3600
+
+
+class JobScheduler:
+    """Timer-heap scheduler with DB-persisted state and per-fire claims."""
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency or settings.scheduler_max_concurrency
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._jobs: Dict[str, Job] = {}
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._next: Dict[str, datetime] = {}
+        self._retries: Dict[str, datetime] = {}  # name -> fire time retried at _next[name]
+        self._seq = itertools.count()
+        self._active: Dict[str, asyncio.Task] = {}
+        self._fires: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {"fired": 0, "claimed_elsewhere": 0, "claim_retries": 0, "errors": 0, "caught_up": 0}
+
+    def register(self, job: Job) -> None:
+        self._jobs[job.name] = job
+
+    # --- Lifecycle ---
+
+    async def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._heap.clear()
+        self._next.clear()
+        self._retries.clear()
+        await self._load_state()
+        self._task = asyncio.create_task(self._loop())
+        bot_logger.info(f"⏰ Job scheduler started: {', '.join(self._jobs)} ({self.instance_id})")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        tasks = list(self._fires)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._fires.clear()
+        self._active.clear()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _load_state(self) -> None:
+        """Read persisted next fire times; create rows for new jobs."""
+        if not self._jobs:
+            return
+        now = _utcnow()
+        async with AsyncSessionLocal() as session:
+            # Another replica starting at the same time may insert the same rows
+            dialect = postgresql if session.bind.dialect.name == 'postgresql' else sqlite
+            await session.execute(
+                dialect.insert(ScheduledJob)
+                .values([{"name": name, "run_count": 0} for name in self._jobs])
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+
+            result = await session.execute(
+                select(ScheduledJob).where(ScheduledJob.name.in_(list(self._jobs)))
+            )
+            rows = {row.name: row for row in result.scalars()}
+
+            for name, job in self._jobs.items():
+                row = rows[name]
+                planned = _as_utc(row.next_run_at)
+
+                if planned is not None and planned <= now:
+                    if (now - planned).total_seconds() <= job.catch_up:
+                        bot_logger.info(f"⏰ Catching up missed run of {name} ({planned.isoformat()})")
+                        self._stats["caught_up"] += 1
+                    else:
+                        bot_logger.info(f"⏰ Skipping stale run of {name} ({planned.isoformat()})")
+                        planned = None
+
+                if planned is None:
+                    planned = job.schedule.next_after(now)
+                    row.next_run_at = planned
+
+                self._push(name, planned)
+
+            await session.commit()
+
+    # --- Heap ---
+
+    def _push(self, name: str, when: Optional[datetime], retry_of: Optional[datetime] = None) -> None:
+        """Schedule name at when; retry_of is the fire time a claim retry runs for."""
+        if retry_of is None:
+            self._retries.pop(name, None)
+        else:
+            self._retries[name] = retry_of
+        if when is None:
+            self._next.pop(name, None)
+            return
+        self._next[name] = when
+        heapq.heappush(self._heap, (when, next(self._seq), name))
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = _utcnow()
+            while self._heap and self._heap[0][0] <= now:
+                when, _, name = heapq.heappop(self._heap)
+                if self._next.get(name) != when:
+                    continue  # Superseded by reschedule()
+                del self._next[name]
+                retry_of = self._retries.pop(name, None)
+                task = asyncio.create_task(
+                    self._fire(self._jobs[name], retry_of or when, retry=retry_of is not None)
+                )
+                self._fires.add(task)
+                task.add_done_callback(self._fires.discard)
+
+            delay = MAX_SLEEP
+            if self._heap:
+                delay = min(delay, max((self._heap[0][0] - now).total_seconds(), 0))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    # --- Running ---
+
+    async def _fire(self, job: Job, when: datetime, retry: bool = False) -> None:
+        next_at = job.schedule.next_after(max(when, _utcnow()))
+        try:
+            claimed = await self._claim(job.name, when, next_at, skip_lock=retry)
+        except Exception as e:
+            bot_logger.error(f"⏰ Claim of {job.name} failed: {e}")
+            self._retry_claim(job.name, when)
+            return
+
+        if not claimed:
+            persisted = await self._persisted_next(job, next_at)
+            if persisted is not None and persisted <= _utcnow():
+                # Nobody advanced the row: the lock holder died or is still claiming
+                bot_logger.warning(f"⏰ {job.name} fire {persisted.isoformat()} not claimed, retrying")
+                self._retry_claim(job.name, persisted)
+                return
+            self._stats["claimed_elsewhere"] += 1
+            self._push(job.name, persisted)
+            return
+
+        self._push(job.name, next_at)
+
+        if job.name in self._active:
+            bot_logger.warning(f"⏰ {job.name} still running, skipping fire {when.isoformat()}")
+            await self._record(job.name, "skipped", None, 0)
+            return
+
+        self._active[job.name] = asyncio.current_task()
+        try:
+            async with self._semaphore:
+                self._stats["fired"] += 1
+                start = monotonic_time.monotonic()
+                status, error = "ok", None
+                try:
+                    await asyncio.wait_for(job.func(when), timeout=job.timeout)
+                except asyncio.TimeoutError:
+                    status, error = "timeout", f"Timed out after {job.timeout}s"
+                except Exception as e:
+                    status, error = "error", str(e)[:1000]
+                    self._stats["errors"] += 1
+                    bot_logger.error(f"⏰ Job {job.name} failed: {e}")
+                duration_ms = int((monotonic_time.monotonic() - start) * 1000)
+            await self._record(job.name, status, error, duration_ms)
+        finally:
+            self._active.pop(job.name, None)
+
+    def _retry_claim(self, name: str, when: datetime) -> None:
+        self._stats["claim_retries"] += 1
+        self._push(name, _utcnow() + timedelta(seconds=CLAIM_RETRY), retry_of=when)
+
+    async def _claim(
+        self, name: str, when: datetime, next_at: Optional[datetime], skip_lock: bool = False
+    ) -> bool:
+        """Take this fire time for the current replica (Redis lock + row CAS).
+
+        skip_lock: retry of a fire whose lock was never followed by a row
+        update, the CAS alone decides.
+        """
+        key = None
+        if redis_service.is_connected and not skip_lock:
+            key = LOCK_KEY.format(name=name, fire=int(when.timestamp()))
+            if not await redis_service._redis.set(key, self.instance_id, nx=True, ex=LOCK_TTL):
+                return False
+
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    update(ScheduledJob)
+                    .where(ScheduledJob.name == name, ScheduledJob.next_run_at == when)
+                    .values(
+                        next_run_at=next_at,
+                        last_run_at=when,
+                        last_status="running",
+                        locked_by=self.instance_id,
+                    )
+                )
+                await session.commit()
+                claimed = result.rowcount == 1
+        except BaseException:
+            if key:
+                await self._release_lock(key)
+            raise
+        if not claimed and key:
+            await self._release_lock(key)
+        return claimed
+
+    async def _release_lock(self, key: str) -> None:
+        try:
+            await redis_service._redis.delete(key)
+        except Exception as e:
+            bot_logger.warning(f"⏰ Could not release {key}: {e}")
+
+    async def _persisted_next(self, job: Job, fallback: Optional[datetime]) -> Optional[datetime]:
+        try:
+            async with AsyncSessionLocal() as session:
+                row = await session.get(ScheduledJob, job.name)
+                if row and row.next_run_at:
+                    return _as_utc(row.next_run_at)
+        except Exception as e:
+            bot_logger.warning(f"⏰ Could not reload {job.name} state: {e}")
+        return fallback
+
+    async def _record(self, name: str, status: str, error: Optional[str], duration_ms: int) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(ScheduledJob)
+                    .where(ScheduledJob.name == name)
+                    .values(
+                        last_status=status,
+                        last_error=error,
+                        last_duration_ms=duration_ms,
+                        run_count=ScheduledJob.run_count + 1,
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            bot_logger.warning(f"⏰ Could not record {name} result: {e}")
+
+    async def reschedule(self, name: str) -> None:
+        """Recompute next fire time (e.g. after schedule settings changed)."""
+        job = self._jobs.get(name)
+        if job is None or not self.running:
+            return
+        next_at = job.schedule.next_after(_utcnow())
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(ScheduledJob).where(ScheduledJob.name == name).values(next_run_at=next_at)
+            )
+            await session.commit()
+        self._push(name, next_at)
+
+    # --- Introspection ---
+
+    async def get_jobs(self) -> List[Dict[str, Any]]:
+        """Persisted state of registered jobs (for /diag)."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(ScheduledJob).where(ScheduledJob.name.in_(list(self._jobs)))
+            )
+            return [
+                {
+                    "name": row.name,
+                    "next_run_at": _as_utc(row.next_run_at),
+                    "last_run_at": _as_utc(row.last_run_at),
+                    "last_status": row.last_status,
+                    "last_duration_ms": row.last_duration_ms,
+                    "run_count": row.run_count,
+                    "locked_by": row.locked_by,
+                }
+                for row in result.scalars()
+            ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "jobs": len(self._jobs), "active": list(self._active)}
+
+
+# Global instance
+job_scheduler = JobScheduler()
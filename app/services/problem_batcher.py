@@ -0,0 +1,300 @@
+"""
+Problem Detection Batcher
+
+Micro-batching front end for ProblemDetectorService in group chats.
+Messages of one chat are collected for a short window and analysed with a
+single LLM prompt that returns a verdict per message. Recent chat context is
+kept in an in-memory sliding window (seeded once from the DB and the
+write-behind queue), so each batch no longer re-reads the last messages from
+PostgreSQL. A batch raises at most one alert per chat (its most confident
+problem), and none while the chat's detection cooldown is running.
+"""
+
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from ..config import settings
+from ..core.ai.ai_manager import ai_manager
+from ..services.chat_context_service import chat_context_service
+from ..services.problem_detector_service import DetectionResult, problem_detector
+from ..services.problem_prefilter import AUDIT, SKIP, problem_prefilter
+from ..utils.logger import bot_logger
+
+BATCH_SYSTEM_PROMPT = """You are a support issue detector. You get recent chat context and a numbered list of NEW messages. For EACH new message decide if it describes a problem or issue that needs attention.
+
+Respond ONLY with a JSON array (no markdown), one object per new message:
+[
+  {
+    "id": <message number>,
+    "is_problem": true/false,
+    "confidence": 0.0-1.0,
+    "type": "problem|urgent|question|complaint|info",
+    "title": "short summary (max 50 chars)",
+    "description": "what the issue is about",
+    "action": "notify|create_task|ignore"
+  }
+]
+
+Rules:
+- "urgent" = needs immediate attention (mentions срочно, критично, etc.)
+- "problem" = technical issue or something broken
+- "question" = user asking for help/info
+- "complaint" = user expressing frustration
+- "info" = just information, not an issue
+
+- action "create_task" = high confidence real issue
+- action "notify" = might need attention
+- action "ignore" = not a real issue"""
+
+# LLMs sometimes answer "confidence": "high" instead of a number
+_CONFIDENCE_WORDS = {'high': 0.9, 'medium': 0.7, 'low': 0.3}
+
+
+@dataclass
+class _Pending:
+    """Message waiting for the batch verdict"""
+    username: str
+    text: str
+    future: asyncio.Future
+    audit: bool = False
+    message_id: Optional[int] = None
+
+
+@dataclass
+class _ChatBatch:
+    """Per-chat buffer and sliding context window"""
+    context: Deque[Tuple[str, str]]
+    pending: List[_Pending] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+    seeded: bool = False
+
+
+class ProblemDetectionBatcher:
+    """Collects group messages per chat and analyses them in one AI call"""
+
+    def __init__(
+        self,
+        window_seconds: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        context_size: int = 10
+    ):
+        self.window_seconds = (
+            window_seconds if window_seconds is not None else settings.problem_detection_batch_window
+        )
+        self.max_batch = max_batch if max_batch is not None else settings.problem_detection_batch_size
+        self.context_size = context_size
+        self._chats: Dict[int, _ChatBatch] = {}
+        self._flushes: Set[asyncio.Task] = set()
+        self._stats = {'messages': 0, 'batches': 0, 'errors': 0}
+
+    async def analyze(
+        self,
+        chat_id: int,
+        username: str,
+        message_text: str,
+        message_id: Optional[int] = None
+    ) -> Optional[DetectionResult]:
+        """Queue a message and wait for its verdict (None if not a problem)"""
+        batch = self._chats.get(chat_id)
+        if batch is None:
+            batch = self._chats[chat_id] = _ChatBatch(context=deque(maxlen=self.context_size))
+        if not batch.seeded:
+            await self._seed_context(chat_id, batch, message_text)
+
+        if not message_text or len(message_text) < 10 or not problem_detector._check_rate_limit(chat_id):
+            batch.context.append((username, message_text or ''))
+            return None
+
+        # Cheap local gate: obvious chatter never reaches the LLM
+        decision = problem_prefilter.decide(message_text)
+        if decision == SKIP:
+            batch.context.append((username, message_text))
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        batch.pending.append(_Pending(
+            username=username, text=message_text, future=future, audit=decision == AUDIT,
+            message_id=message_id,
+        ))
+        self._stats['messages'] += 1
+
+        if len(batch.pending) >= self.max_batch:
+            self._schedule_flush(chat_id, delay=0)
+        elif batch.timer is None:
+            self._schedule_flush(chat_id, delay=self.window_seconds)
+
+        return await future
+
+    async def _seed_context(self, chat_id: int, batch: _ChatBatch, current_text: str) -> None:
+        batch.seeded = True
+        # Queued rows first: a row flushed in between then shows up in both
+        queued = chat_context_service.get_pending_context(chat_id)
+        try:
+            rows = await chat_context_service.get_context(
+                chat_id, limit=self.context_size + 1, include_metadata=True
+            )
+        except Exception as e:
+            bot_logger.warning(f"Problem batcher: failed to seed context for {chat_id}: {e}")
+            return
+        stored = {row.get('message_id') for row in rows if row.get('message_id') is not None}
+        rows += [row for row in queued if row.get('message_id') is None or row['message_id'] not in stored]
+        # The chat monitor queues the current message before analysing it
+        if rows and rows[-1].get('text') == current_text:
+            rows = rows[:-1]
+        for row in rows[-self.context_size:]:
+            batch.context.append((row.get('user') or '?', row.get('text') or f"[{row.get('type')}]"))
+
+    def _schedule_flush(self, chat_id: int, delay: float) -> None:
+        batch = self._chats[chat_id]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        batch.timer = asyncio.get_running_loop().call_later(delay, self._start_flush, chat_id)
+
+    def _start_flush(self, chat_id: int) -> None:
+        task = asyncio.ensure_future(self.flush(chat_id))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self, chat_id: int) -> None:
+        """Analyse everything pending for a chat"""
+        batch = self._chats.get(chat_id)
+        if not batch or not batch.pending:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+            batch.timer = None
+
+        pending, batch.pending = batch.pending, []
+        context = list(batch.context)
+        batch.context.extend((p.username, p.text) for p in pending)
+        self._stats['batches'] += 1
+
+        try:
+            verdicts = await self._ai_analyze_batch(context, pending)
+        except Exception as e:
+            self._stats['errors'] += 1
+            bot_logger.warning(f"Batched AI analysis failed for chat {chat_id}: {e}")
+            verdicts = {}
+
+        judged: Dict[int, str] = {}
+        try:
+            results: List[Optional[DetectionResult]] = []
+            for idx, item in enumerate(pending, start=1):
+                try:
+                    result = self._to_result(item.text, verdicts.get(idx))
+                except Exception as e:
+                    self._stats['errors'] += 1
+                    bot_logger.warning(f"Bad verdict #{idx} for chat {chat_id}: {e}")
+                    results.append(None)
+                    continue
+                if idx in verdicts:
+                    if item.audit:
+                        problem_prefilter.record_audit(result is not None)
+                    if item.message_id is not None:
+                        judged[item.message_id] = 'problem' if result is not None else 'none'
+                results.append(result)
+
+            # One alert per chat and cooldown, like the per-message detector
+            best = None
+            if problem_detector._check_rate_limit(chat_id):
+                found = [i for i, r in enumerate(results) if r is not None]
+                if found:
+                    best = max(found, key=lambda i: results[i].confidence)
+                    problem_detector.mark_detected(chat_id)
+
+            for i, item in enumerate(pending):
+                if not item.future.done():
+                    item.future.set_result(results[i] if i == best else None)
+        finally:
+            # Nobody may be left waiting on a verdict
+            for item in pending:
+                if not item.future.done():
+                    item.future.set_result(None)
+
+        # Training labels for the pre-filter: only what the LLM actually saw
+        try:
+            await chat_context_service.record_ai_verdicts(chat_id, judged)
+        except Exception as e:
+            bot_logger.warning(f"Problem batcher: failed to record verdicts for {chat_id}: {e}")
+
+    async def flush_all(self) -> None:
+        """Flush every chat (on shutdown)"""
+        for chat_id in list(self._chats):
+            await self.flush(chat_id)
+
+    async def _ai_analyze_batch(
+        self,
+        context: List[Tuple[str, str]],
+        pending: List[_Pending]
+    ) -> Dict[int, Dict[str, Any]]:
+        context_text = "\n".join(f"{user}: {text}" for user, text in context) or "(empty)"
+        new_text = "\n".join(
+            f'{idx}. {p.username}: "{p.text}"' for idx, p in enumerate(pending, start=1)
+        )
+        user_prompt = f"""Recent chat context:
+{context_text}
+
+New messages:
+{new_text}
+
+Analyze each new message."""
+
+        response = await ai_manager.chat(
+            user_message=user_prompt,
+            system_prompt=BATCH_SYSTEM_PROMPT,
+            cache="problem_detector"
+        )
+        if not response or not response.content:
+            return {}
+
+        content = response.content.strip()
+        if content.startswith("```"):
+            content = content.split("```")[1]
+            if content.startswith("json"):
+                content = content[4:]
+
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = [data]
+        return {
+            int(item['id']): item
+            for item in data
+            if isinstance(item, dict) and str(item.get('id', '')).isdigit()
+        }
+
+    @staticmethod
+    def _to_result(message_text: str, verdict: Optional[Dict[str, Any]]) -> Optional[DetectionResult]:
+        if not verdict or not verdict.get('is_problem'):
+            return None
+        confidence = _CONFIDENCE_WORDS.get(str(verdict.get('confidence')).strip().lower())
+        if confidence is None:
+            try:
+                confidence = float(verdict.get('confidence', 0.5))
+            except (TypeError, ValueError):
+                confidence = 0.5
+        if confidence < problem_detector.MIN_CONFIDENCE:
+            return None
+        return DetectionResult(
+            is_problem=True,
+            confidence=confidence,
+            problem_type=verdict.get('type', 'problem'),
+            title=verdict.get('title', message_text[:50]),
+            description=verdict.get('description', message_text),
+            suggested_action=verdict.get('action', 'notify'),
+            keywords_matched=problem_detector._match_keywords(message_text.lower()),
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        """Queued messages / AI batches counters"""
+        return {
+            **self._stats,
+            'chats': len(self._chats),
+            'pending': sum(len(b.pending) for b in self._chats.values()),
+        }
+
+
+# Global instance
+problem_batcher = ProblemDetectionBatcher()
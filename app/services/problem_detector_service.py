@@ -158,7 +158,7 @@ class ProblemDetectorService:
             return None
 
         # Update rate limit
-        self._last_detection[chat_id] = datetime.utcnow()
+        self.mark_detected(chat_id)
 
         return DetectionResult(
             is_problem=True,
@@ -204,6 +204,10 @@ class ProblemDetectorService:
 
         return min(score, 1.0)
 
+    def mark_detected(self, chat_id: int) -> None:
+        """Start detection cooldown for chat"""
+        self._last_detection[chat_id] = datetime.utcnow()
+
     def _check_rate_limit(self, chat_id: int) -> bool:
         """Check if detection is allowed (rate limiting)"""
         last = self._last_detection.get(chat_id)
@@ -266,7 +270,8 @@ Analyze this message."""
 
             response = await ai_manager.chat(
                 user_message=user_prompt,
-                system_prompt=system_prompt
+                system_prompt=system_prompt,
+                cache="problem_detector"
             )
 
             if response and response.content:
@@ -0,0 +1,282 @@
+"""
+Problem Pre-filter
+
+Local, network-free scoring stage in front of batched AI problem detection.
+A small logistic model over hashed character trigrams plus the keyword /
+question / urgency heuristics of ProblemDetectorService is trained from
+DetectedIssue history (positives) and chat messages the LLM judged not to be
+a problem (negatives, `ChatMessage.ai_verdict == 'none'`). Messages the gate
+skipped or the detection cooldown held back were never judged and are left
+out, so retraining does not learn the previous gate's own decisions. The
+decision threshold is the highest score that
+keeps held-out recall above `problem_prefilter_min_recall`; messages below it
+skip the LLM.
+
+A small share of skipped messages is still sent to the LLM ("audit") to
+measure recall online. Until a model has been trained every message goes to
+the LLM, so the gate never lowers recall on a fresh install.
+"""
+
+import asyncio
+import math
+import random
+import re
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from ..config import settings
+from ..database.chat_ai_models import ChatMessage, DetectedIssue
+from ..database.database import AsyncSessionLocal
+from ..services.problem_detector_service import problem_detector
+from ..services.redis_service import redis_service
+from ..utils.logger import bot_logger
+
+MODEL_KEY = "ai:prefilter:model"
+DIM = 1 << 18
+MIN_POSITIVES = 30
+
+ANALYZE = "analyze"
+SKIP = "skip"
+AUDIT = "audit"
+
+_WS_RE = re.compile(r'\s+')
+_KEYWORDS_RE = re.compile(
+    "|".join(re.escape(k.lower()) for k in problem_detector.PROBLEM_KEYWORDS)
+)
+
+
+def _normalize(text: str) -> str:
+    return _WS_RE.sub(' ', text.lower().replace('ё', 'е')).strip()
+
+
+def extract_features(text: str) -> Dict[int, float]:
+    """Hashed char-trigram + heuristic features"""
+    norm = f" {_normalize(text)} "
+    grams: Dict[int, float] = {}
+    for i in range(len(norm) - 2):
+        idx = zlib.crc32(norm[i:i + 3].encode()) % DIM
+        grams[idx] = grams.get(idx, 0.0) + 1.0
+
+    scale = 1.0 / math.sqrt(sum(v * v for v in grams.values()) or 1.0)
+    features = {idx: v * scale for idx, v in grams.items()}
+
+    # Heuristic features live in the first few slots
+    features[0] = 1.0  # bias
+    features[1] = min(len(_KEYWORDS_RE.findall(norm)), 3) / 3
+    features[2] = 1.0 if problem_detector._is_question(text) else 0.0
+    features[3] = problem_detector._calculate_urgency(text)
+    features[4] = min(len(norm), 400) / 400
+    return features
+
+
+def _sigmoid(z: float) -> float:
+    if z < -30:
+        return 0.0
+    if z > 30:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def _score(weights: Dict[int, float], features: Dict[int, float]) -> float:
+    return _sigmoid(sum(weights.get(idx, 0.0) * v for idx, v in features.items()))
+
+
+def train_model(
+    samples: List[Tuple[str, int]],
+    min_recall: float,
+    epochs: int = 10,
+    lr: float = 0.5
+) -> Optional[Dict]:
+    """
+    Train logistic model and pick recall-preserving threshold.
+
+    Every 5th sample is held out for threshold selection.
+
+    Returns:
+        Model dict (weights, threshold, report) or None if not enough data
+    """
+    train = [s for i, s in enumerate(samples) if i % 5]
+    holdout = [s for i, s in enumerate(samples) if not i % 5]
+    positives = sum(label for _, label in train)
+    if positives < MIN_POSITIVES or positives == len(train) or not any(l for _, l in holdout):
+        return None
+
+    pos_weight = (len(train) - positives) / positives
+    data = [(extract_features(text), label) for text, label in train]
+    weights: Dict[int, float] = {}
+    rng = random.Random(42)
+    for _ in range(epochs):
+        rng.shuffle(data)
+        for features, label in data:
+            grad = _score(weights, features) - label
+            if label:
+                grad *= pos_weight
+            for idx, v in features.items():
+                weights[idx] = weights.get(idx, 0.0) - lr * grad * v
+
+    scored = sorted(
+        ((_score(weights, extract_features(text)), label) for text, label in holdout),
+        key=lambda x: x[0]
+    )
+    total_pos = sum(label for _, label in scored)
+
+    # Highest threshold whose held-out recall still meets the target
+    threshold, missed = 0.0, 0
+    for i, (score, label) in enumerate(scored):
+        if label and (total_pos - missed - 1) / total_pos < min_recall:
+            break
+        missed += label
+        threshold = (score + scored[i + 1][0]) / 2 if i + 1 < len(scored) else score
+
+    passed = [(s, l) for s, l in scored if s >= threshold]
+    passed_pos = sum(l for _, l in passed)
+    report = {
+        'samples': len(samples),
+        'positives': positives + total_pos,
+        'threshold': round(threshold, 4),
+        'recall': round(passed_pos / total_pos, 3),
+        'precision': round(passed_pos / len(passed), 3) if passed else None,
+        'skip_rate': round(1 - len(passed) / len(scored), 3),
+        'trained_at': datetime.now(timezone.utc).isoformat(),
+    }
+    return {
+        'weights': {str(k): round(v, 5) for k, v in weights.items() if abs(v) > 1e-4},
+        'threshold': threshold,
+        'report': report,
+    }
+
+
+class ProblemPrefilter:
+    """Local gate deciding which messages need an LLM verdict"""
+
+    def __init__(self):
+        self._weights: Optional[Dict[int, float]] = None
+        self._threshold = 0.0
+        self._report: Dict = {}
+        self._rng = random.Random()
+        self._stats = {'analyzed': 0, 'skipped': 0, 'audited': 0, 'audit_misses': 0}
+
+    @property
+    def trained(self) -> bool:
+        return self._weights is not None
+
+    def score(self, text: str) -> Optional[float]:
+        """Problem probability (None while untrained)"""
+        if self._weights is None:
+            return None
+        return _score(self._weights, extract_features(text))
+
+    def decide(self, text: str) -> str:
+        """ANALYZE, SKIP or AUDIT (skipped, but sampled for recall tracking)"""
+        if not settings.problem_prefilter_enabled:
+            return ANALYZE
+        score = self.score(text)
+        if score is None or score >= self._threshold:
+            self._stats['analyzed'] += 1
+            return ANALYZE
+        if self._rng.random() < settings.problem_prefilter_audit_rate:
+            self._stats['audited'] += 1
+            return AUDIT
+        self._stats['skipped'] += 1
+        return SKIP
+
+    def record_audit(self, is_problem: bool) -> None:
+        """LLM verdict for an audited message (gate would have missed it if True)"""
+        if is_problem:
+            self._stats['audit_misses'] += 1
+
+    def load(self, model: Dict) -> None:
+        self._weights = {int(k): v for k, v in model['weights'].items()}
+        self._threshold = model['threshold']
+        self._report = model.get('report', {})
+
+    async def load_saved(self) -> bool:
+        """Load last trained model from Redis"""
+        model = await redis_service.get_json(MODEL_KEY)
+        if model:
+            self.load(model)
+        return model is not None
+
+    async def train_from_history(self, days: int = 180) -> Optional[Dict]:
+        """Retrain on DetectedIssue + ChatMessage history and persist the model"""
+        samples = await self._load_samples(days)
+        model = await asyncio.get_running_loop().run_in_executor(
+            None, train_model, samples, settings.problem_prefilter_min_recall
+        )
+        if model is None:
+            bot_logger.info(f"🧮 Problem pre-filter: not enough history to train ({len(samples)} samples)")
+            return None
+
+        self.load(model)
+        await redis_service.set_json(MODEL_KEY, model, ttl=None)
+        report = model['report']
+        bot_logger.info(
+            f"🧮 Problem pre-filter trained: {report['samples']} samples, "
+            f"recall {report['recall']:.0%}, skip {report['skip_rate']:.0%}"
+        )
+        return report
+
+    @staticmethod
+    async def _load_samples(days: int) -> List[Tuple[str, int]]:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        async with AsyncSessionLocal() as session:
+            issues = (await session.execute(
+                select(
+                    DetectedIssue.chat_id,
+                    DetectedIssue.message_id,
+                    DetectedIssue.original_text,
+                    DetectedIssue.user_feedback,
+                ).where(
+                    DetectedIssue.created_at >= cutoff,
+                    DetectedIssue.original_text.isnot(None),
+                )
+            )).all()
+            if not issues:
+                return []
+
+            detected_ids = {(row.chat_id, row.message_id) for row in issues}
+            messages = (await session.execute(
+                select(ChatMessage.chat_id, ChatMessage.message_id, ChatMessage.message_text)
+                .where(
+                    ChatMessage.ai_verdict == 'none',
+                    ChatMessage.created_at >= cutoff,
+                    ChatMessage.message_text.isnot(None),
+                )
+                .limit(len(issues) * 20)
+            )).all()
+
+        samples = [(row.original_text, 0 if row.user_feedback == 'rejected' else 1) for row in issues]
+        samples += [
+            (row.message_text, 0)
+            for row in messages
+            if len(row.message_text) >= 10 and (row.chat_id, row.message_id) not in detected_ids
+        ]
+        random.Random(7).shuffle(samples)
+        return samples
+
+    def get_stats(self) -> Dict:
+        """Gate counters plus held-out precision/recall of the current model"""
+        return {'trained': self.trained, **self._stats, 'model': self._report}
+
+
+async def problem_prefilter_loop():
+    """Background loop — load saved model, then retrain periodically."""
+    try:
+        await problem_prefilter.load_saved()
+    except Exception as e:
+        bot_logger.warning(f"Problem pre-filter: failed to load saved model: {e}")
+
+    while True:
+        try:
+            await problem_prefilter.train_from_history()
+        except Exception as e:
+            bot_logger.error(f"Problem pre-filter training error: {e}")
+
+        await asyncio.sleep(settings.problem_prefilter_retrain_interval)
+
+
+# Global instance
+problem_prefilter = ProblemPrefilter()
@@ -13,6 +13,11 @@ import redis.asyncio as aioredis
 from ..utils.logger import bot_logger
 
 
+def _dumps(data: Any) -> str:
+    """Compact JSON (no whitespace, non-ASCII kept as is)."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
 class RedisService:
     """Async Redis wrapper with in-memory fallback."""
 
@@ -64,16 +69,31 @@ class RedisService:
                 bot_logger.warning(f"Redis GET error for {key}: {e}")
         return self._fallback.get(key)
 
-    async def set_json(self, key: str, data: Any, ttl: int = DEFAULT_TTL) -> None:
-        """Set JSON value with TTL (seconds)."""
+    async def set_json(self, key: str, data: Any, ttl: Optional[int] = DEFAULT_TTL) -> None:
+        """Set JSON value with TTL (seconds; None keeps it forever)."""
         if self._redis:
             try:
-                await self._redis.set(key, json.dumps(data, ensure_ascii=False, default=str), ex=ttl)
+                await self._redis.set(key, _dumps(data), ex=ttl)
                 return
             except Exception as e:
                 bot_logger.warning(f"Redis SET error for {key}: {e}")
         self._fallback[key] = data
 
+    async def set_many_json(self, items: dict[str, Any], ttl: Optional[int] = DEFAULT_TTL) -> None:
+        """Set several JSON values in one round trip (ttl=None keeps them forever)."""
+        if not items:
+            return
+        if self._redis:
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for key, data in items.items():
+                        pipe.set(key, _dumps(data), ex=ttl)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                bot_logger.warning(f"Redis pipeline SET error ({len(items)} keys): {e}")
+        self._fallback.update(items)
+
     async def delete(self, key: str) -> None:
         """Delete key."""
         if self._redis:
@@ -93,6 +113,64 @@ class RedisService:
                 bot_logger.warning(f"Redis EXISTS error for {key}: {e}")
         return key in self._fallback
 
+    # --- Hashes ---
+
+    async def hget_all_json(self, key: str) -> dict[str, Any]:
+        """Get all fields of a hash with JSON-parsed values."""
+        if self._redis:
+            try:
+                raw = await self._redis.hgetall(key)
+                return {field: json.loads(value) for field, value in raw.items()}
+            except Exception as e:
+                bot_logger.warning(f"Redis HGETALL error for {key}: {e}")
+        return dict(self._fallback.get(key) or {})
+
+    async def hset_json(self, key: str, field: str, data: Any, ttl: Optional[int] = DEFAULT_TTL) -> None:
+        """Set one hash field atomically (no read-modify-write); ttl applies to the whole hash."""
+        if self._redis:
+            try:
+                async with self._redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(key, field, _dumps(data))
+                    if ttl is not None:
+                        pipe.expire(key, ttl)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                bot_logger.warning(f"Redis HSET error for {key}: {e}")
+        self._fallback.setdefault(key, {})[field] = data
+
+    async def hdel(self, key: str, field: str) -> None:
+        """Delete one hash field (Redis drops the key with its last field)."""
+        if self._redis:
+            try:
+                await self._redis.hdel(key, field)
+                return
+            except Exception as e:
+                bot_logger.warning(f"Redis HDEL error for {key}: {e}")
+        fields = self._fallback.get(key)
+        if fields is not None:
+            fields.pop(field, None)
+            if not fields:
+                del self._fallback[key]
+
+    async def replace_hashes_json(self, items: dict[str, dict[str, Any]], ttl: Optional[int] = DEFAULT_TTL) -> None:
+        """Replace whole hashes in one transaction, so readers never see a half-written one."""
+        if not items:
+            return
+        if self._redis:
+            try:
+                async with self._redis.pipeline(transaction=True) as pipe:
+                    for key, fields in items.items():
+                        pipe.delete(key)
+                        pipe.hset(key, mapping={f: _dumps(v) for f, v in fields.items()})
+                        if ttl is not None:
+                            pipe.expire(key, ttl)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                bot_logger.warning(f"Redis pipeline HSET error ({len(items)} keys): {e}")
+        self._fallback.update({key: dict(fields) for key, fields in items.items()})
+
 
 # Global singleton
 redis_service = RedisService()
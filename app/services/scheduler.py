@@ -1,342 +1,256 @@
 """
 Планировщик для ежедневных задач
+
+Задачи регистрируются в job_scheduler (app/services/job_scheduler.py):
+состояние хранится в таблице scheduled_jobs, срабатывание захватывается
+одной репликой, пропущенные за время простоя запуски догоняются.
 """
-import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-import pytz
+from typing import Dict, Optional
 
-from ..services.daily_tasks_service import daily_tasks_service
+from . import daily_tasks_service as daily_tasks_module
 # CACHE DISABLED: user_tasks_cache_service removed - using direct Plane API calls
-from ..services.task_reports_service import task_reports_service
+from ..services.task_reports_service import reminder_level, task_reports_service
+from ..utils.markdown import escape_markdown_v2
 from ..utils.logger import bot_logger
+from .http_service import http_service
 from ..config import settings
 from ..database.database import get_async_session
+from .job_scheduler import Daily, Interval, Job, job_scheduler
+from .telegram_delivery import DeliveryRequestMiddleware, Priority, delivery_priority
+
+
+REMINDER_MAX_BUTTONS = 10  # Отчётов в одном сообщении-напоминании
+
+
+def _with_priority(priority: Priority, func):
+    """Сообщения задачи уходят в очередь доставки с заданным приоритетом"""
+    async def run(fire_at: datetime):
+        with delivery_priority(priority):
+            return await func(fire_at)
+    return run
+
+
+def _daily_tasks_service():
+    """Сервис создаётся в main.py после импорта модуля — читаем актуальное значение"""
+    return daily_tasks_module.daily_tasks_service
+
+
+class DailyAdminTasksSchedule:
+    """Ближайшее время отправки ежедневных задач среди включённых админов"""
+
+    @staticmethod
+    def _slots() -> Dict[int, Daily]:
+        slots = {}
+        daily_tasks_service = _daily_tasks_service()
+        if not daily_tasks_service:
+            return slots
+        admin_ids = set(settings.admin_user_id_list)
+        for admin_id, admin_settings in daily_tasks_service.admin_settings.items():
+            if admin_id not in admin_ids:
+                continue
+            # update_admin_setting() пишет в кэш под ключами notifications_enabled / notification_time
+            enabled = admin_settings.get('notifications_enabled', admin_settings.get('enabled', False))
+            if not enabled:
+                continue
+            try:
+                send_time = admin_settings.get('notification_time') or admin_settings.get('time') or '09:00'
+                hour, minute = map(int, str(send_time).split(':')[:2])
+                slots[admin_id] = Daily(hour, minute, tz=admin_settings.get('timezone') or 'Europe/Moscow')
+            except Exception as e:
+                bot_logger.error(f"Invalid daily tasks schedule for admin {admin_id}: {e}")
+        return slots
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        times = [t for t in (slot.next_after(moment) for slot in self._slots().values()) if t]
+        return min(times) if times else None
+
+    def admins_due(self, fire_at: datetime) -> list:
+        """Админы, чьё время отправки совпадает с fire_at"""
+        before = fire_at - timedelta(seconds=1)
+        return [admin_id for admin_id, slot in self._slots().items() if slot.next_after(before) == fire_at]
 
 
 class DailyTasksScheduler:
-    """Планировщик для ежедневной отправки задач и синхронизации кэша"""
-    
+    """Планировщик ежедневной отправки задач, напоминаний и отчётов Plane"""
+
     def __init__(self):
         self.running = False
-        self.task: Optional[asyncio.Task] = None
-        self.sync_task: Optional[asyncio.Task] = None
-        self.reminder_task: Optional[asyncio.Task] = None
-        self.check_interval = 60  # Проверка каждые 60 секунд
-        self.cache_sync_interval = 1800  # Синхронизация кэша каждые 30 минут
         self.reminder_interval = 1800  # Проверка напоминаний каждые 30 минут
-        self.plane_analysis_task: Optional[asyncio.Task] = None
         self.plane_analysis_hour = 9  # 09:00 MSK
-        self._last_plane_analysis_date = None
-        self.weekly_audit_task: Optional[asyncio.Task] = None
-        self._last_weekly_audit_date = None
-        self.reconciliation_task: Optional[asyncio.Task] = None
+        self.weekly_audit_hour = 9  # Понедельник 09:00 MSK
         self.reconciliation_hour = 18  # 18:00 MSK
-        self._last_reconciliation_date = None
-    
+        self.daily_tasks_schedule = DailyAdminTasksSchedule()
+        self._own_bot = None
+
+    def _jobs(self) -> list:
+        return [
+            Job("daily_tasks", _with_priority(Priority.BULK, self._send_daily_tasks),
+                self.daily_tasks_schedule, catch_up=3600),
+            Job("report_reminders", _with_priority(Priority.NORMAL, self._send_report_reminders),
+                Interval(self.reminder_interval), catch_up=self.reminder_interval),
+            Job("plane_analysis", _with_priority(Priority.BULK, self._run_plane_analysis),
+                Daily(self.plane_analysis_hour), catch_up=6 * 3600),
+            Job("weekly_audit", _with_priority(Priority.BULK, self._run_weekly_audit),
+                Daily(self.weekly_audit_hour, weekdays=frozenset({0})), catch_up=12 * 3600),
+            Job("reconciliation", _with_priority(Priority.BULK, self._run_reconciliation),
+                Daily(self.reconciliation_hour), catch_up=3 * 3600),
+        ]
+
     async def start(self):
         """Запустить планировщик"""
         if self.running:
             bot_logger.warning("Daily tasks scheduler already running")
             return
 
+        for job in self._jobs():
+            job_scheduler.register(job)
+        await job_scheduler.start()
         self.running = True
-        self.task = asyncio.create_task(self._scheduler_loop())
-        # CACHE DISABLED: Direct API calls instead (rate limit 600/min)
-        # self.sync_task = asyncio.create_task(self._cache_sync_loop())
-        self.reminder_task = asyncio.create_task(self._reminders_loop())
-        self.plane_analysis_task = asyncio.create_task(self._plane_analysis_loop())
-        self.weekly_audit_task = asyncio.create_task(self._weekly_audit_loop())
-        self.reconciliation_task = asyncio.create_task(self._reconciliation_loop())
         bot_logger.info("Daily tasks scheduler, reminders, plane analysis, weekly audit and reconciliation started")
-    
+
     async def stop(self):
         """Остановить планировщик"""
         if not self.running:
             return
-        
-        self.running = False
-        if self.task:
-            self.task.cancel()
-            try:
-                await self.task
-            except asyncio.CancelledError:
-                pass
-        
-        if self.sync_task:
-            self.sync_task.cancel()
-            try:
-                await self.sync_task
-            except asyncio.CancelledError:
-                pass
-
-        if self.reminder_task:
-            self.reminder_task.cancel()
-            try:
-                await self.reminder_task
-            except asyncio.CancelledError:
-                pass
-
-        if self.plane_analysis_task:
-            self.plane_analysis_task.cancel()
-            try:
-                await self.plane_analysis_task
-            except asyncio.CancelledError:
-                pass
 
-        if self.weekly_audit_task:
-            self.weekly_audit_task.cancel()
-            try:
-                await self.weekly_audit_task
-            except asyncio.CancelledError:
-                pass
-
-        if self.reconciliation_task:
-            self.reconciliation_task.cancel()
-            try:
-                await self.reconciliation_task
-            except asyncio.CancelledError:
-                pass
+        self.running = False
+        await job_scheduler.stop()
+        if self._own_bot:
+            await self._own_bot.session.close()
+            self._own_bot = None
 
         bot_logger.info("All scheduler tasks stopped")
-    
-    async def _scheduler_loop(self):
-        """Основной цикл планировщика"""
-        last_check_date = None
-
-        while self.running:
-            try:
-                # Проверяем наличие daily_tasks_service
-                if not daily_tasks_service:
-                    bot_logger.debug("Daily tasks service not initialized yet, waiting...")
-                    await asyncio.sleep(self.check_interval)
-                    continue
-
-                current_time = datetime.now()
-                current_date = current_time.date()
-
-                # Проверяем только один раз в день
-                if last_check_date != current_date:
-                    await self._check_and_send_daily_tasks()
-                    last_check_date = current_date
 
-                # Ждем следующую проверку
-                await asyncio.sleep(self.check_interval)
+    def _bot(self):
+        """Общий экземпляр бота (из daily_tasks_service или один на планировщик)"""
+        daily_tasks_service = _daily_tasks_service()
+        if daily_tasks_service and daily_tasks_service.bot_instance:
+            return daily_tasks_service.bot_instance
+        if self._own_bot is None:
+            from aiogram import Bot
+            self._own_bot = Bot(token=settings.telegram_token)
+            self._own_bot.session.middleware(DeliveryRequestMiddleware())
+        return self._own_bot
 
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                bot_logger.error(f"Error in scheduler loop: {e}")
-                await asyncio.sleep(self.check_interval)
-    
-    async def _check_and_send_daily_tasks(self):
-        """Проверить и отправить ежедневные задачи админам"""
+    async def _send_daily_tasks(self, fire_at: datetime):
+        """Отправить ежедневные задачи админам, у которых наступило время"""
+        daily_tasks_service = _daily_tasks_service()
         if not daily_tasks_service:
             return
-        
-        admins_to_notify = []
-        
-        # Проверяем каждого админа
-        for admin_id in settings.admin_user_id_list:
-            if daily_tasks_service.should_send_now(admin_id):
-                admins_to_notify.append(admin_id)
-        
+
+        admins_to_notify = self.daily_tasks_schedule.admins_due(fire_at)
         if not admins_to_notify:
             return
-        
+
         bot_logger.info(f"Sending daily tasks to {len(admins_to_notify)} admins")
-        
+
         # Отправляем задачи
         results = {}
         for admin_id in admins_to_notify:
             results[admin_id] = await daily_tasks_service.send_daily_tasks_to_admin(admin_id)
-        
+
         # Логируем результаты
         successful = sum(1 for success in results.values() if success)
         bot_logger.info(f"Daily tasks sent successfully to {successful}/{len(results)} admins")
-    
-    async def _cache_sync_loop(self):
-        """Цикл синхронизации кэша пользовательских задач каждые 30 минут"""
-        while self.running:
-            try:
-                bot_logger.info("🔄 Starting automatic cache sync for all users")
-                synced_count = await user_tasks_cache_service.sync_all_users()
-
-                if synced_count > 0:
-                    bot_logger.info(f"✅ Automatic cache sync completed for {synced_count} users")
-                else:
-                    bot_logger.debug("📊 No users needed cache sync")
 
-                # Ждем 30 минут до следующей синхронизации
-                await asyncio.sleep(self.cache_sync_interval)
+    async def _send_report_reminders(self, fire_at: datetime):
+        """Напоминания об отчётах (каждые 30 минут): только «созревшие» отчёты, одно сообщение на админа"""
+        bot_logger.info("🔔 Starting task reports reminder check")
+        bot = self._bot()
+        now = datetime.now(timezone.utc)
 
-            except asyncio.CancelledError:
+        async for session in get_async_session():
+            due_reports = await task_reports_service.get_due_reminders(session, now)
+            if not due_reports:
+                bot_logger.debug("📊 No pending task reports need reminders")
                 break
-            except Exception as e:
-                bot_logger.error(f"Error in cache sync loop: {e}")
-                # При ошибке ждем 5 минут и пробуем снова
-                await asyncio.sleep(300)
-
-    async def _reminders_loop(self):
-        """Цикл проверки и отправки напоминаний об отчётах каждые 30 минут"""
-        from aiogram import Bot
-        from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-
-        while self.running:
-            try:
-                bot_logger.info("🔔 Starting task reports reminder check")
 
-                # Получаем бота из daily_tasks_service (он уже инициализирован)
-                if not daily_tasks_service or not daily_tasks_service.bot_instance:
-                    bot_logger.debug("Daily tasks service or bot instance not initialized yet, waiting...")
-                    await asyncio.sleep(self.reminder_interval)
-                    continue
-
-                bot = daily_tasks_service.bot_instance
-
-                # Получаем pending отчёты
-                async for session in get_async_session():
-                    pending_reports = await task_reports_service.get_pending_reports(session)
-
-                    if not pending_reports:
-                        bot_logger.debug("📊 No pending task reports need reminders")
-                        break
-
-                    bot_logger.info(f"📨 Found {len(pending_reports)} pending task reports")
+            # Группируем отчёты по получателям
+            levels = {}
+            by_admin: Dict[int, list] = {}
+            for report in due_reports:
+                level, _, _ = reminder_level(report.hours_since_closed)
+                levels[report.id] = level
+                # 6+ часов или закрывший неизвестен — уведомляем ВСЕХ админов
+                if level >= 3 or not report.closed_by_telegram_id:
+                    admins = settings.admin_user_id_list
+                else:
+                    admins = [report.closed_by_telegram_id]
+                for admin_id in admins:
+                    by_admin.setdefault(admin_id, []).append(report)
 
-                    for report in pending_reports:
-                        try:
-                            hours_elapsed = report.hours_since_closed
-
-                            # Определяем уровень напоминания
-                            reminder_level = 0
-                            urgency_emoji = "💬"
-                            urgency_text = "Напоминание"
-
-                            if hours_elapsed >= 6:
-                                reminder_level = 3
-                                urgency_emoji = "🚨"
-                                urgency_text = "КРИТИЧНО"
-                            elif hours_elapsed >= 3:
-                                reminder_level = 2
-                                urgency_emoji = "⚠️"
-                                urgency_text = "СРОЧНО"
-                            elif hours_elapsed >= 1:
-                                reminder_level = 1
-                                urgency_emoji = "⏰"
-                                urgency_text = "Напоминание"
-                            else:
-                                # Ещё не прошёл 1 час - пропускаем
-                                continue
-
-                            # Проверяем - не отправляли ли недавно напоминание
-                            if report.last_reminder_at:
-                                time_since_reminder = (datetime.now(timezone.utc) - report.last_reminder_at).total_seconds() / 60
-                                if time_since_reminder < 25:  # Минимум 25 минут между напоминаниями
-                                    bot_logger.debug(
-                                        f"⏭️ Skipping reminder for TaskReport #{report.id} "
-                                        f"(last reminder {time_since_reminder:.0f}min ago)"
-                                    )
-                                    continue
-
-                            # Формируем сообщение
-                            hours_str = f"{hours_elapsed:.1f}" if hours_elapsed < 2 else f"{int(hours_elapsed)}"
-
-                            message_text = (
-                                f"{urgency_emoji} **{urgency_text}\\!** Требуется отчёт о задаче\n\n"
-                                f"**Задача:** \\#{report.plane_sequence_id}\n"
-                                f"**Название:** {report.task_title or 'Не указано'}\n"
-                                f"**Закрыто:** {hours_str} ч назад\n"
-                                f"**Напоминаний:** {report.reminder_count + 1}"
-                            )
-
-                            # Кнопка
-                            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                                [InlineKeyboardButton(
-                                    text="📝 Заполнить отчёт",
-                                    callback_data=f"fill_report:{report.id}"
-                                )]
-                            ])
-
-                            # Кому отправлять
-                            admin_to_notify = report.closed_by_telegram_id
-
-                            # Если 6+ часов - уведомляем ВСЕХ админов
-                            if reminder_level >= 3:
-                                admins_list = settings.admin_user_id_list
-                            else:
-                                admins_list = [admin_to_notify] if admin_to_notify else settings.admin_user_id_list
-
-                            # Отправляем напоминание
-                            sent_count = 0
-                            for admin_id in admins_list:
-                                try:
-                                    await bot.send_message(
-                                        chat_id=admin_id,
-                                        text=message_text,
-                                        reply_markup=keyboard,
-                                        parse_mode="MarkdownV2"
-                                    )
-                                    sent_count += 1
-                                except Exception as e:
-                                    bot_logger.warning(f"⚠️ Failed to send reminder to admin {admin_id}: {e}")
-
-                            if sent_count > 0:
-                                # Обновляем статистику напоминаний
-                                await task_reports_service.update_reminder_sent(
-                                    session=session,
-                                    task_report_id=report.id,
-                                    reminder_level=reminder_level
-                                )
-
-                                bot_logger.info(
-                                    f"✅ Sent reminder for TaskReport #{report.id} "
-                                    f"(level {reminder_level}, {sent_count} admins)"
-                                )
-
-                        except Exception as e:
-                            bot_logger.error(f"❌ Error sending reminder for TaskReport #{report.id}: {e}")
-
-                    # Выходим из цикла async for
-                    break
-
-                # Ждём 30 минут до следующей проверки
-                await asyncio.sleep(self.reminder_interval)
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                bot_logger.error(f"Error in reminders loop: {e}")
-                import traceback
-                bot_logger.error(traceback.format_exc())
-                # При ошибке ждем 5 минут и пробуем снова
-                await asyncio.sleep(300)
+            sent_ids = set()
+            for admin_id, reports in by_admin.items():
+                text, keyboard = self._format_reminder(reports)
+                try:
+                    await bot.send_message(
+                        chat_id=admin_id,
+                        text=text,
+                        reply_markup=keyboard,
+                        parse_mode="MarkdownV2"
+                    )
+                    # Отчёты без кнопки остаются «созревшими» до следующего запуска
+                    sent_ids.update(r.id for r in reports[:REMINDER_MAX_BUTTONS])
+                except Exception as e:
+                    bot_logger.warning(f"⚠️ Failed to send reminder to admin {admin_id}: {e}")
 
-    async def _plane_analysis_loop(self):
-        """Daily Plane analysis at 09:00 MSK."""
-        tz = pytz.timezone(settings.daily_tasks_timezone)
+            # Статистика напоминаний — одним UPDATE на всю пачку
+            await task_reports_service.mark_reminders_sent(
+                session, {rid: lvl for rid, lvl in levels.items() if rid in sent_ids}, now
+            )
+            bot_logger.info(
+                f"✅ Reminders: {len(sent_ids)}/{len(due_reports)} reports, {len(by_admin)} admins"
+            )
 
-        while self.running:
-            try:
-                now = datetime.now(tz)
-                today = now.date()
+            # Выходим из цикла async for
+            break
 
-                if (
-                    now.hour == self.plane_analysis_hour
-                    and self._last_plane_analysis_date != today
-                ):
-                    self._last_plane_analysis_date = today
-                    await self._run_plane_analysis()
+    @staticmethod
+    def _format_reminder(reports: list):
+        """Сообщение-напоминание (MarkdownV2) и кнопки для одного или нескольких отчётов"""
+        from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
-                await asyncio.sleep(60)
+        def hours_str(hours: float) -> str:
+            return escape_markdown_v2(f"{hours:.1f}" if hours < 2 else f"{int(hours)}")
+
+        # Самый срочный отчёт задаёт заголовок
+        oldest = max(reports, key=lambda r: r.hours_since_closed)
+        _, emoji, title = reminder_level(oldest.hours_since_closed)
+
+        if len(reports) == 1:
+            report = oldest
+            text = (
+                f"{emoji} *{escape_markdown_v2(title)}\\!* Требуется отчёт о задаче\n\n"
+                f"*Задача:* \\#{report.plane_sequence_id}\n"
+                f"*Название:* {escape_markdown_v2(report.task_title or 'Не указано')}\n"
+                f"*Закрыто:* {hours_str(report.hours_since_closed)} ч назад\n"
+                f"*Напоминаний:* {report.reminder_count + 1}"
+            )
+        else:
+            lines = [
+                f"{reminder_level(r.hours_since_closed)[1]} \\#{r.plane_sequence_id} "
+                f"{escape_markdown_v2((r.task_title or 'Не указано')[:60])} "
+                f"\\({hours_str(r.hours_since_closed)} ч\\)"
+                for r in reports[:REMINDER_MAX_BUTTONS]
+            ]
+            if len(reports) > REMINDER_MAX_BUTTONS:
+                lines.append(f"…и ещё {len(reports) - REMINDER_MAX_BUTTONS}")
+            text = (
+                f"{emoji} *{escape_markdown_v2(title)}\\!* Требуются отчёты по {len(reports)} задачам\n\n"
+                + "\n".join(lines)
+            )
 
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                bot_logger.error(f"Error in plane analysis loop: {e}")
-                await asyncio.sleep(300)
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(
+                text="📝 Заполнить отчёт" + (f" #{r.plane_sequence_id}" if len(reports) > 1 else ""),
+                callback_data=f"fill_report:{r.id}"
+            )]
+            for r in reports[:REMINDER_MAX_BUTTONS]
+        ])
+        return text, keyboard
 
-    async def _run_plane_analysis(self):
+    async def _run_plane_analysis(self, fire_at: Optional[datetime] = None):
         """Fetch open issues and post AI summary to admin chat."""
         from ..integrations.plane import plane_api
         from ..core.ai.ai_manager import ai_manager
@@ -356,7 +270,6 @@ class DailyTasksScheduler:
             if not projects:
                 return
 
-            import aiohttp
             now = datetime.now(timezone.utc)
             stale_threshold = now - timedelta(days=7)
             report_parts = []
@@ -368,10 +281,10 @@ class DailyTasksScheduler:
                 pname = proj.get('identifier') or proj.get('name', '?')
 
                 try:
-                    async with aiohttp.ClientSession() as session:
-                        tasks = await plane_api._tasks_manager._get_project_issues(
-                            session, pid, assigned_only=False
-                        )
+                    session = http_service.session
+                    tasks = await plane_api._tasks_manager._get_project_issues(
+                        session, pid, assigned_only=False
+                    )
                 except Exception:
                     continue
 
@@ -419,7 +332,8 @@ class DailyTasksScheduler:
                             f"Ежедневный отчёт:\n{summary_text}\n\n"
                             f"Кратко (2-3 предложения): что требует внимания?"
                         ),
-                        system_prompt="Ты помощник руководителя IT. Анализируй кратко."
+                        system_prompt="Ты помощник руководителя IT. Анализируй кратко.",
+                        cache="digest"
                     )
                     if ai_response and ai_response.content:
                         summary_text += f"\n\n🤖 <b>AI:</b> {ai_response.content}"
@@ -427,48 +341,16 @@ class DailyTasksScheduler:
                     bot_logger.warning(f"Scheduled AI analysis failed: {e}")
 
             # Send to admin chat
-            from aiogram import Bot
-            from ..config import settings as cfg
-            bot = Bot(token=cfg.telegram_token)
-            try:
-                kwargs = {"chat_id": chat_id, "text": summary_text, "parse_mode": "HTML"}
-                if topic_id:
-                    kwargs["message_thread_id"] = topic_id
-                await bot.send_message(**kwargs)
-                bot_logger.info("Scheduled Plane analysis sent")
-            finally:
-                await bot.session.close()
+            kwargs = {"chat_id": chat_id, "text": summary_text, "parse_mode": "HTML"}
+            if topic_id:
+                kwargs["message_thread_id"] = topic_id
+            await self._bot().send_message(**kwargs)
+            bot_logger.info("Scheduled Plane analysis sent")
 
         except Exception as e:
             bot_logger.error(f"Error in scheduled plane analysis: {e}")
 
-    async def _weekly_audit_loop(self):
-        """Weekly Plane audit on Monday at 09:00 MSK."""
-        tz = pytz.timezone(settings.daily_tasks_timezone)
-
-        while self.running:
-            try:
-                now = datetime.now(tz)
-                today = now.date()
-
-                # Monday = 0
-                if (
-                    now.weekday() == 0
-                    and now.hour == 9
-                    and self._last_weekly_audit_date != today
-                ):
-                    self._last_weekly_audit_date = today
-                    await self._run_weekly_audit()
-
-                await asyncio.sleep(60)
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                bot_logger.error(f"Error in weekly audit loop: {e}")
-                await asyncio.sleep(300)
-
-    async def _run_weekly_audit(self):
+    async def _run_weekly_audit(self, fire_at: Optional[datetime] = None):
         """Execute weekly audit and send to admin chat."""
         from ..handlers.plane_audit import generate_audit_report_text
         from ..core.ai.ai_manager import ai_manager
@@ -492,52 +374,24 @@ class DailyTasksScheduler:
                             f"Еженедельный аудит Plane:\n{report}\n\n"
                             f"Кратко (3-5 предложений): ключевые проблемы и рекомендации на неделю."
                         ),
-                        system_prompt="Ты помощник руководителя IT. Кратко и конкретно."
+                        system_prompt="Ты помощник руководителя IT. Кратко и конкретно.",
+                        cache="audit"
                     )
                     if ai_response and ai_response.content:
                         report += f"\n\n🤖 <b>AI:</b> {ai_response.content}"
                 except Exception as e:
                     bot_logger.warning(f"Weekly audit AI failed: {e}")
 
-            from aiogram import Bot
-            bot = Bot(token=settings.telegram_token)
-            try:
-                kwargs = {"chat_id": chat_id, "text": report, "parse_mode": "HTML"}
-                if topic_id:
-                    kwargs["message_thread_id"] = topic_id
-                await bot.send_message(**kwargs)
-                bot_logger.info("Weekly Plane audit sent")
-            finally:
-                await bot.session.close()
+            kwargs = {"chat_id": chat_id, "text": report, "parse_mode": "HTML"}
+            if topic_id:
+                kwargs["message_thread_id"] = topic_id
+            await self._bot().send_message(**kwargs)
+            bot_logger.info("Weekly Plane audit sent")
 
         except Exception as e:
             bot_logger.error(f"Error in weekly audit: {e}")
 
-    async def _reconciliation_loop(self):
-        """Daily chat reconciliation at 18:00 MSK."""
-        tz = pytz.timezone(settings.daily_tasks_timezone)
-
-        while self.running:
-            try:
-                now = datetime.now(tz)
-                today = now.date()
-
-                if (
-                    now.hour == self.reconciliation_hour
-                    and self._last_reconciliation_date != today
-                ):
-                    self._last_reconciliation_date = today
-                    await self._run_reconciliation()
-
-                await asyncio.sleep(60)
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                bot_logger.error(f"Error in reconciliation loop: {e}")
-                await asyncio.sleep(300)
-
-    async def _run_reconciliation(self):
+    async def _run_reconciliation(self, fire_at: Optional[datetime] = None):
         """Run daily chat reconciliation and send summary to admins."""
         from ..modules.reconciliation.reconciliation_service import (
             ReconciliationService,
@@ -563,25 +417,21 @@ class DailyTasksScheduler:
             summary += "\n\n<i>Запустите /plane_reconcile для действий</i>"
 
             # Send to admins
-            from aiogram import Bot
-            bot = Bot(token=settings.telegram_token)
-            try:
-                for admin_id in settings.admin_user_id_list:
-                    try:
-                        await bot.send_message(
-                            chat_id=admin_id,
-                            text=summary,
-                            parse_mode="HTML",
-                        )
-                    except Exception as e:
-                        bot_logger.warning(
-                            f"Failed to send reconciliation to admin {admin_id}: {e}"
-                        )
-                bot_logger.info(
-                    f"Scheduled reconciliation sent: {len(items)} incidents"
-                )
-            finally:
-                await bot.session.close()
+            bot = self._bot()
+            for admin_id in settings.admin_user_id_list:
+                try:
+                    await bot.send_message(
+                        chat_id=admin_id,
+                        text=summary,
+                        parse_mode="HTML",
+                    )
+                except Exception as e:
+                    bot_logger.warning(
+                        f"Failed to send reconciliation to admin {admin_id}: {e}"
+                    )
+            bot_logger.info(
+                f"Scheduled reconciliation sent: {len(items)} incidents"
+            )
 
         except Exception as e:
             bot_logger.error(f"Error in scheduled reconciliation: {e}")
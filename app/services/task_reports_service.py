@@ -12,7 +12,7 @@ When a task is completed in Plane, this service:
 
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, update, case, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 import json
 
@@ -23,6 +23,24 @@ from ..utils.logger import bot_logger
 from ..config import settings
 from .plane_mappings_service import PlaneMappingsService
 
+REMINDER_MIN_AGE = timedelta(hours=1)  # Первое напоминание — через час после закрытия
+REMINDER_COOLDOWN = timedelta(minutes=25)  # Минимум между напоминаниями по одному отчёту
+
+# (часов с закрытия, уровень, эмодзи, заголовок) — от самого срочного
+REMINDER_LEVELS = [
+    (6, 3, "🚨", "КРИТИЧНО"),
+    (3, 2, "⚠️", "СРОЧНО"),
+    (1, 1, "⏰", "Напоминание"),
+]
+
+
+def reminder_level(hours_elapsed: float) -> Tuple[int, str, str]:
+    """Уровень напоминания по времени с закрытия: (level, emoji, title)"""
+    for min_hours, level, emoji, title in REMINDER_LEVELS:
+        if hours_elapsed >= min_hours:
+            return level, emoji, title
+    return 0, "💬", "Напоминание"
+
 
 class TaskReportsService:
     """Service for managing task reports lifecycle"""
@@ -1002,44 +1020,79 @@ class TaskReportsService:
             bot_logger.error(f"❌ Error getting pending reports: {e}")
             return []
 
-    async def update_reminder_sent(
+    async def get_due_reminders(
         self,
         session: AsyncSession,
-        task_report_id: int,
-        reminder_level: int
-    ) -> Optional[TaskReport]:
+        now: Optional[datetime] = None,
+        limit: int = 500
+    ) -> List[TaskReport]:
         """
-        Update reminder count and level after sending reminder
+        Pending reports that need a reminder now (one indexed query)
 
-        Args:
-            task_report_id: TaskReport ID
-            reminder_level: New reminder level (0-3)
+        Due = closed at least REMINDER_MIN_AGE ago and not reminded within
+        REMINDER_COOLDOWN. Served by idx_task_reports_reminders (status, last_reminder_at).
 
         Returns:
-            Updated TaskReport or None
+            Due TaskReport objects, oldest closed first
         """
+        now = now or datetime.now(timezone.utc)
         try:
-            task_report = await self.get_task_report(session, task_report_id)
-            if not task_report:
-                return None
+            result = await session.execute(
+                select(TaskReport)
+                .where(
+                    TaskReport.status == "pending",
+                    or_(
+                        TaskReport.last_reminder_at.is_(None),
+                        TaskReport.last_reminder_at <= now - REMINDER_COOLDOWN,
+                    ),
+                    TaskReport.closed_at <= now - REMINDER_MIN_AGE,
+                )
+                .order_by(TaskReport.closed_at.asc())
+                .limit(limit)
+            )
+            return result.scalars().all()
 
-            task_report.reminder_count += 1
-            task_report.last_reminder_at = datetime.now(timezone.utc)
-            task_report.reminder_level = reminder_level
+        except Exception as e:
+            bot_logger.error(f"❌ Error getting due reminders: {e}")
+            return []
 
-            await session.commit()
-            await session.refresh(task_report)
+    async def mark_reminders_sent(
+        self,
+        session: AsyncSession,
+        levels: Dict[int, int],
+        now: Optional[datetime] = None
+    ) -> int:
+        """
+        Record sent reminders for a batch of reports in one UPDATE
 
-            bot_logger.info(
-                f"📨 Updated reminder for TaskReport #{task_report_id}: "
-                f"count={task_report.reminder_count}, level={reminder_level}"
+        Args:
+            levels: TaskReport ID -> reminder level (0-3) just sent
+
+        Returns:
+            Number of updated reports
+        """
+        if not levels:
+            return 0
+        now = now or datetime.now(timezone.utc)
+        try:
+            result = await session.execute(
+                update(TaskReport)
+                .where(TaskReport.id.in_(list(levels)))
+                .values(
+                    reminder_count=TaskReport.reminder_count + 1,
+                    last_reminder_at=now,
+                    reminder_level=case(levels, value=TaskReport.id, else_=TaskReport.reminder_level),
+                )
+                .execution_options(synchronize_session=False)
             )
-            return task_report
+            await session.commit()
+            bot_logger.info(f"📨 Recorded reminders for {result.rowcount} task reports")
+            return result.rowcount
 
         except Exception as e:
-            bot_logger.error(f"❌ Error updating reminder: {e}")
+            bot_logger.error(f"❌ Error recording reminders: {e}")
             await session.rollback()
-            return None
+            return 0
 
     # ═══════════════════════════════════════════════════════════
     # QUERY HELPERS
@@ -0,0 +1,278 @@
+"""
+Outbound Telegram delivery: shared pacing for every send.
+
+All bot API calls that post into a chat (send*/copy/forward/edit) pass through
+`DeliveryRequestMiddleware`, installed on the bot session, so no call site has
+to be rewritten. Each request:
+  - waits for a token from the global bucket (Telegram: ~30 msg/s per bot)
+    and from its chat's bucket (~1 msg/s private, ~20 msg/min groups);
+  - is queued by priority while throttled — alerts go before interactive
+    replies, replies before notifications, notifications before bulk digests;
+  - on TelegramRetryAfter the chat is paused for `retry_after` and the
+    request is retried automatically (up to `telegram_delivery_max_retries`).
+
+Background code marks its sends with `delivery_priority(...)`:
+
+    with delivery_priority(Priority.BULK):
+        await bot.send_message(...)
+"""
+
+import asyncio
+import contextvars
+import itertools
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+from ..config import settings
+from ..utils.logger import bot_logger
+
+ChatId = Union[int, str]
+
+IDLE_BUCKET_TTL = 300  # Seconds before an idle, full chat bucket is forgotten
+PACED_PREFIXES = ("Send", "Copy", "Forward", "Edit")
+
+
+class Priority(IntEnum):
+    """Lower value is delivered first."""
+    ALERT = 0
+    INTERACTIVE = 1
+    NORMAL = 2
+    BULK = 3
+
+
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "delivery_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def delivery_priority(priority: Priority):
+    """Sends made inside the block are queued with this priority."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def ready_in(self, now: float) -> float:
+        """Seconds until a token is available (0 — available now)."""
+        self._refill(now)
+        if self.tokens >= 1 - 1e-9:  # Float drift must not cost an extra sleep
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and now - self.updated > IDLE_BUCKET_TTL
+
+
+class TelegramDelivery:
+    """Token-bucket pacing with a priority wait queue and retry_after handling."""
+
+    def __init__(
+        self,
+        global_rate: Optional[float] = None,
+        private_rate: Optional[float] = None,
+        group_rate_per_minute: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_retries: Optional[int] = None,
+    ):
+        self.global_rate = global_rate or settings.telegram_global_rate
+        self.private_rate = private_rate or settings.telegram_private_chat_rate
+        self.group_rate = (group_rate_per_minute or settings.telegram_group_rate_per_minute) / 60
+        self.burst = burst or settings.telegram_chat_burst
+        self.max_retries = settings.telegram_delivery_max_retries if max_retries is None else max_retries
+
+        self._global = TokenBucket(self.global_rate, self.global_rate)
+        self._chats: Dict[ChatId, TokenBucket] = {}
+        self._paused_until: Dict[ChatId, float] = {}
+        self._waiting: List[Tuple[int, int, ChatId, asyncio.Future, float]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "sent": 0, "queued": 0, "retry_after": 0, "failed": 0,
+            "max_queue": 0, "max_wait_ms": 0, "total_wait_ms": 0,
+        }
+        self._sent_by_priority = {p.name: 0 for p in Priority}
+
+    # --- Buckets ---
+
+    @staticmethod
+    def _is_group(chat_id: ChatId) -> bool:
+        return isinstance(chat_id, str) or chat_id < 0
+
+    def _bucket(self, chat_id: ChatId) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            rate = self.group_rate if self._is_group(chat_id) else self.private_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, self.burst)
+        return bucket
+
+    def _ready_in(self, chat_id: ChatId, now: float) -> float:
+        paused = self._paused_until.get(chat_id, 0) - now
+        if paused > 0:
+            return paused
+        self._paused_until.pop(chat_id, None)
+        return self._bucket(chat_id).ready_in(now)
+
+    def _take(self, chat_id: ChatId, now: float) -> None:
+        self._global.take(now)
+        self._bucket(chat_id).take(now)
+
+    def _prune(self, now: float) -> None:
+        waiting = {w[2] for w in self._waiting}
+        for chat_id in [c for c, b in self._chats.items() if c not in waiting and b.idle(now)]:
+            del self._chats[chat_id]
+
+    # --- Queue ---
+
+    async def acquire(self, chat_id: ChatId, priority: Priority = Priority.NORMAL) -> None:
+        """Wait until a message may be sent to chat_id."""
+        now = time.monotonic()
+        if not self._waiting and self._global.ready_in(now) == 0 and self._ready_in(chat_id, now) == 0:
+            self._take(chat_id, now)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append((int(priority), next(self._seq), chat_id, future, now))
+        self._stats["queued"] += 1
+        self._stats["max_queue"] = max(self._stats["max_queue"], len(self._waiting))
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        await future
+
+    def _ensure_dispatcher(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        """Grant tokens to waiters in priority order as buckets refill; exit when idle."""
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            self._waiting = [w for w in self._waiting if not w[3].done()]
+            delay = None
+
+            if not self._waiting:
+                self._prune(now)
+                self._task = None
+                return
+            if self._global.ready_in(now) > 0:
+                delay = self._global.ready_in(now)
+            else:
+                granted = False
+                for waiter in sorted(self._waiting, key=lambda w: (w[0], w[1])):
+                    wait = self._ready_in(waiter[2], now)
+                    if wait == 0:
+                        self._grant(waiter, now)
+                        granted = True
+                        break
+                    delay = wait if delay is None else min(delay, wait)
+                if granted:
+                    continue  # Look for the next waiter straight away
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _grant(self, waiter: Tuple[int, int, ChatId, asyncio.Future, float], now: float) -> None:
+        self._waiting.remove(waiter)
+        self._take(waiter[2], now)
+        wait_ms = int((now - waiter[4]) * 1000)
+        self._stats["total_wait_ms"] += wait_ms
+        self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+        waiter[3].set_result(None)
+
+    def pause_chat(self, chat_id: ChatId, seconds: float) -> None:
+        """Hold all sends to chat_id (Telegram asked to retry after `seconds`)."""
+        until = time.monotonic() + seconds
+        self._paused_until[chat_id] = max(until, self._paused_until.get(chat_id, 0))
+        if self._wakeup:
+            self._wakeup.set()
+
+    # --- Sending ---
+
+    async def deliver(
+        self,
+        chat_id: ChatId,
+        send: Callable[[], Awaitable[Any]],
+        priority: Optional[Priority] = None,
+    ) -> Any:
+        """Run `send` when chat_id may receive a message; retry on flood control."""
+        priority = _current_priority.get() if priority is None else priority
+        attempt = 0
+        while True:
+            await self.acquire(chat_id, priority)
+            try:
+                result = await send()
+            except TelegramRetryAfter as e:
+                self._stats["retry_after"] += 1
+                self.pause_chat(chat_id, e.retry_after)
+                attempt += 1
+                if attempt > self.max_retries:
+                    self._stats["failed"] += 1
+                    raise
+                bot_logger.warning(
+                    f"📮 Flood control for chat {chat_id}: retry in {e.retry_after}s "
+                    f"(attempt {attempt}/{self.max_retries})"
+                )
+                continue
+            self._stats["sent"] += 1
+            self._sent_by_priority[priority.name] += 1
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        queued = self._stats["queued"]
+        return {
+            **self._stats,
+            "avg_wait_ms": int(self._stats["total_wait_ms"] / queued) if queued else 0,
+            "waiting": len(self._waiting),
+            "paused_chats": len(self._paused_until),
+            "chats": len(self._chats),
+            "by_priority": dict(self._sent_by_priority),
+        }
+
+
+class DeliveryRequestMiddleware(BaseRequestMiddleware):
+    """Bot session middleware routing chat-posting API calls through the delivery queue."""
+
+    def __init__(self, delivery: Optional[TelegramDelivery] = None):
+        self.delivery = delivery
+
+    async def __call__(self, make_request, bot, method):
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None or not type(method).__name__.startswith(PACED_PREFIXES):
+            return await make_request(bot, method)
+        delivery = self.delivery or telegram_delivery
+        return await delivery.deliver(chat_id, lambda: make_request(bot, method))
+
+
+# Global instance
+telegram_delivery = TelegramDelivery()
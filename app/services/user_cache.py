@@ -0,0 +1,96 @@
+"""
+User identity cache.
+
+Hot-path cache of BotUser role / active flags shared by AuthMiddleware and
+LoggingMiddleware, so an update no longer needs `select(BotUser)` twice.
+Entries (including "no such user") expire after `user_cache_ttl` seconds and
+are invalidated explicitly when a profile is created or changed.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database.database import AsyncSessionLocal
+from ..database.models import BotUser
+from ..utils.logger import bot_logger
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Role and flags of a registered bot user"""
+    id: int
+    telegram_user_id: int
+    role: str
+    is_active: bool
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == 'admin'
+
+
+class UserIdentityCache:
+    """TTL cache telegram_user_id -> CachedUser (or None for unknown users)"""
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else settings.user_cache_ttl
+        self._entries: Dict[int, Tuple[float, Optional[CachedUser]]] = {}
+        self._stats = {'hits': 0, 'misses': 0}
+
+    async def get(
+        self,
+        telegram_user_id: int,
+        session: Optional[AsyncSession] = None
+    ) -> Optional[CachedUser]:
+        """Cached identity; loads from DB on miss (using given session if any)"""
+        entry = self._entries.get(telegram_user_id)
+        if entry and entry[0] > time.monotonic():
+            self._stats['hits'] += 1
+            return entry[1]
+
+        self._stats['misses'] += 1
+        user = await self._load(telegram_user_id, session)
+        self._entries[telegram_user_id] = (time.monotonic() + self.ttl, user)
+        return user
+
+    @staticmethod
+    async def _load(telegram_user_id: int, session: Optional[AsyncSession]) -> Optional[CachedUser]:
+        query = select(
+            BotUser.id, BotUser.telegram_user_id, BotUser.role, BotUser.is_active
+        ).where(BotUser.telegram_user_id == telegram_user_id)
+
+        if session is not None:
+            row = (await session.execute(query)).first()
+        else:
+            async with AsyncSessionLocal() as own_session:
+                row = (await own_session.execute(query)).first()
+
+        if row is None:
+            return None
+        return CachedUser(id=row.id, telegram_user_id=row.telegram_user_id, role=row.role, is_active=row.is_active)
+
+    def put(self, user: BotUser) -> None:
+        """Prime cache after creating / updating a user"""
+        self._entries[user.telegram_user_id] = (
+            time.monotonic() + self.ttl,
+            CachedUser(id=user.id, telegram_user_id=user.telegram_user_id, role=user.role, is_active=user.is_active),
+        )
+
+    def invalidate(self, telegram_user_id: Optional[int] = None) -> None:
+        """Forget one user (or everyone) — call when role / is_active changes"""
+        if telegram_user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(telegram_user_id, None)
+        bot_logger.debug(f"User cache invalidated: {telegram_user_id or 'all'}")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, 'entries': len(self._entries)}
+
+
+# Global instance
+user_cache = UserIdentityCache()
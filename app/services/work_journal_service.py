@@ -10,9 +10,11 @@ from sqlalchemy.orm import selectinload
 from ..database.models import BotUser
 from ..database.work_journal_models import (
     WorkJournalEntry, 
+    WorkJournalEntryWorker,
     UserWorkJournalState,
     WorkJournalCompany,
-    WorkJournalWorker
+    WorkJournalWorker,
+    normalize_worker_key
 )
 from ..utils.work_journal_constants import (
     WorkJournalState, 
@@ -154,7 +156,8 @@ class WorkJournalService:
             worker_names=json.dumps(worker_names, ensure_ascii=False),  # Сохраняем как JSON
             created_by_user_id=created_by_user_id,
             created_by_name=created_by_name,
-            n8n_sync_status=N8nSyncStatus.PENDING.value
+            n8n_sync_status=N8nSyncStatus.PENDING.value,
+            workers=WorkJournalEntryWorker.for_names(worker_names)
         )
         
         self.session.add(entry)
@@ -207,6 +210,7 @@ class WorkJournalService:
             created_by_user_id=telegram_user_id,
             created_by_name=user_name,
             n8n_sync_status=N8nSyncStatus.PENDING.value,
+            workers=WorkJournalEntryWorker.for_names(worker_names),
         )
 
         self.session.add(entry)
@@ -243,11 +247,16 @@ class WorkJournalService:
             query = query.where(WorkJournalEntry.work_date <= date_to)
         
         if company:
+            # В PostgreSQL обслуживается триграммным GIN-индексом
             query = query.where(WorkJournalEntry.company.ilike(f"%{company}%"))
         
         if worker_name:
-            # Ищем по любому из исполнителей в JSON массиве
-            query = query.where(WorkJournalEntry.worker_names.like(f"%{worker_name}%"))
+            # Ищем по таблице исполнителей записи (индекс по worker_key), а не по JSON-тексту
+            query = query.where(WorkJournalEntry.id.in_(
+                select(WorkJournalEntryWorker.entry_id).where(
+                    WorkJournalEntryWorker.worker_key.like(f"%{normalize_worker_key(worker_name)}%")
+                )
+            ))
         
         if is_travel is not None:
             query = query.where(WorkJournalEntry.is_travel == is_travel)
@@ -271,25 +280,30 @@ class WorkJournalService:
         date_from: Optional[date] = None,
         date_to: Optional[date] = None
     ) -> Dict[str, Any]:
-        """Получить статистику по работам"""
+        """Получить статистику по работам (агрегация на стороне БД)"""
         
-        query = select(WorkJournalEntry)
-        
-        # Применяем фильтры
+        filters = []
         if telegram_user_id:
-            query = query.where(WorkJournalEntry.telegram_user_id == telegram_user_id)
+            filters.append(WorkJournalEntry.telegram_user_id == telegram_user_id)
         
         if date_from:
-            query = query.where(WorkJournalEntry.work_date >= date_from)
+            filters.append(WorkJournalEntry.work_date >= date_from)
         
         if date_to:
-            query = query.where(WorkJournalEntry.work_date <= date_to)
-        
-        # Получаем все записи для статистики
-        result = await self.session.execute(query)
-        entries = result.scalars().all()
-        
-        if not entries:
+            filters.append(WorkJournalEntry.work_date <= date_to)
+        
+        # Итоги одним запросом
+        totals = (await self.session.execute(
+            select(
+                func.count(WorkJournalEntry.id),
+                func.count(WorkJournalEntry.id).filter(WorkJournalEntry.is_travel.is_(True)),
+                func.min(WorkJournalEntry.work_date),
+                func.max(WorkJournalEntry.work_date),
+            ).where(*filters)
+        )).one()
+        total_entries, travel_count, first_date, last_date = totals
+        
+        if not total_entries:
             return {
                 "total_entries": 0,
                 "total_time_hours": 0,
@@ -300,38 +314,25 @@ class WorkJournalService:
                 "date_range": None
             }
         
-        # Подсчитываем статистику
-        total_entries = len(entries)
-        travel_count = sum(1 for e in entries if e.is_travel)
         remote_count = total_entries - travel_count
         
-        # Группировка по компаниям и исполнителям
-        companies = {}
-        workers = {}
-        
-        for entry in entries:
-            # Компании
-            if entry.company not in companies:
-                companies[entry.company] = 0
-            companies[entry.company] += 1
-            
-            # Исполнители (теперь это JSON массив)
-            try:
-                import json
-                worker_list = json.loads(entry.worker_names)
-                for worker in worker_list:
-                    if worker not in workers:
-                        workers[worker] = 0
-                    workers[worker] += 1
-            except (json.JSONDecodeError, TypeError):
-                # Для совместимости со старыми записями
-                if entry.worker_names and entry.worker_names not in workers:
-                    workers[entry.worker_names] = 0
-                    workers[entry.worker_names] += 1
-        
-        # Сортируем по количеству
-        companies = dict(sorted(companies.items(), key=lambda x: x[1], reverse=True))
-        workers = dict(sorted(workers.items(), key=lambda x: x[1], reverse=True))
+        # Группировка по компаниям и исполнителям (отсортировано по количеству)
+        entries_count = func.count(WorkJournalEntry.id)
+        company_rows = await self.session.execute(
+            select(WorkJournalEntry.company, entries_count)
+            .where(*filters)
+            .group_by(WorkJournalEntry.company)
+            .order_by(entries_count.desc())
+        )
+        worker_rows = await self.session.execute(
+            select(WorkJournalEntryWorker.worker_name, entries_count)
+            .join(WorkJournalEntry, WorkJournalEntry.id == WorkJournalEntryWorker.entry_id)
+            .where(*filters)
+            .group_by(WorkJournalEntryWorker.worker_name)
+            .order_by(entries_count.desc())
+        )
+        companies = dict(company_rows.all())
+        workers = dict(worker_rows.all())
         
         return {
             "total_entries": total_entries,
@@ -342,8 +343,8 @@ class WorkJournalService:
             "companies": companies,
             "workers": workers,
             "date_range": {
-                "from": min(e.work_date for e in entries),
-                "to": max(e.work_date for e in entries)
+                "from": first_date,
+                "to": last_date
             }
         }
     
@@ -0,0 +1,217 @@
+"""
+In-memory full-text index for short documents (task titles, worker names)
+
+Tokens are normalised for mixed Russian/English text: lowercase, ё→е,
+light suffix stemming, Cyrillic→Latin transliteration (so "принтер" and
+"printer" meet), then scored with BM25. Query words missing from the
+vocabulary are expanded to similar indexed words by character trigrams,
+which covers typos and partial words. Documents can be added, replaced and
+removed one at a time, so an index is built once and kept in sync cheaply.
+"""
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+_WORD_RE = re.compile(r"[0-9a-zа-я]+")
+
+_TRANSLIT = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ж': 'zh',
+    'з': 'z', 'и': 'i', 'й': 'i', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n',
+    'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f',
+    'х': 'h', 'ц': 'c', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '', 'ы': 'y',
+    'ь': '', 'э': 'e', 'ю': 'u', 'я': 'a',
+})
+
+# Same word written in different scripts after transliteration
+_ALIASES = {'1c': '1s'}
+
+_STOPWORDS = {
+    'и', 'в', 'во', 'не', 'на', 'с', 'со', 'что', 'как', 'по', 'к', 'ко', 'у', 'о', 'об',
+    'от', 'до', 'за', 'из', 'для', 'это', 'то', 'же', 'ли', 'бы', 'но', 'а', 'или', 'при',
+    'the', 'a', 'an', 'of', 'to', 'in', 'on', 'for', 'and', 'or', 'is', 'are', 'be', 'with',
+}
+
+_RU_ENDINGS = sorted([
+    'ением', 'анием', 'ение', 'ание', 'ения', 'ания', 'ению', 'анию',
+    'ить', 'ать', 'ять', 'еть', 'иями', 'ями', 'ами', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'иях', 'ией',
+    'ях', 'ах', 'ов', 'ев', 'ей', 'ой', 'ий', 'ый', 'ая', 'яя', 'ое', 'ее', 'ые',
+    'ие', 'ом', 'ем', 'ам', 'ям', 'ую', 'юю', 'ых', 'их', 'ет', 'ит', 'ут', 'ют',
+    'ат', 'ят', 'ил', 'ел', 'ла', 'ло', 'ли',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+], key=len, reverse=True)
+_RU_VOWELS = set('аеиоуыэюяь')
+_EN_ENDINGS = ('ing', 'ed', 'es', 's')
+_MIN_STEM = 3
+
+
+def _stem(word: str) -> str:
+    if word.isascii():
+        for ending in _EN_ENDINGS:
+            if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+                return word[:-len(ending)]
+        return word
+
+    for ending in _RU_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            word = word[:-len(ending)]
+            break
+    # работает -> работа -> работ
+    if len(word) > _MIN_STEM + 1 and word[-1] in _RU_VOWELS:
+        word = word[:-1]
+    return word
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Text -> normalised search terms (stemmed, transliterated, no stopwords)"""
+    terms = []
+    for word in _WORD_RE.findall((text or '').lower().replace('ё', 'е')):
+        if word in _STOPWORDS or (len(word) < 2 and not word.isdigit()):
+            continue
+        term = _stem(word).translate(_TRANSLIT)
+        terms.append(_ALIASES.get(term, term))
+    return terms
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class SearchHit:
+    """One matching document"""
+    doc_id: Hashable
+    score: float
+    matched: int  # Query terms found in the document
+    terms: int  # Query terms in total
+
+    @property
+    def coverage(self) -> float:
+        return self.matched / self.terms if self.terms else 0.0
+
+
+class TextIndex:
+    """Incremental BM25 index with trigram expansion of unknown query terms"""
+
+    TITLE_WEIGHT = 2
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, fuzzy_threshold: float = 0.6):
+        self.k1 = k1
+        self.b = b
+        self.fuzzy_threshold = fuzzy_threshold
+        self._docs: Dict[Hashable, Dict[str, int]] = {}
+        self._fingerprints: Dict[Hashable, int] = {}
+        self._lengths: Dict[Hashable, int] = {}
+        self._postings: Dict[str, Dict[Hashable, int]] = {}
+        self._trigram_terms: Dict[str, Set[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._docs
+
+    # --- Maintenance ---
+
+    def add(self, doc_id: Hashable, title: str, body: str = '') -> None:
+        """Index (or re-index) a document; unchanged documents are skipped"""
+        fingerprint = hash((title, body))
+        if self._fingerprints.get(doc_id) == fingerprint:
+            return
+        self.remove(doc_id)
+
+        freqs: Dict[str, int] = {}
+        for term in normalize_tokens(title):
+            freqs[term] = freqs.get(term, 0) + self.TITLE_WEIGHT
+        for term in normalize_tokens(body):
+            freqs[term] = freqs.get(term, 0) + 1
+
+        self._docs[doc_id] = freqs
+        self._fingerprints[doc_id] = fingerprint
+        self._lengths[doc_id] = sum(freqs.values())
+        self._total_length += self._lengths[doc_id]
+        for term, tf in freqs.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                for gram in _trigrams(term):
+                    self._trigram_terms.setdefault(gram, set()).add(term)
+            postings[doc_id] = tf
+
+    def remove(self, doc_id: Hashable) -> None:
+        freqs = self._docs.pop(doc_id, None)
+        if freqs is None:
+            return
+        self._fingerprints.pop(doc_id, None)
+        self._total_length -= self._lengths.pop(doc_id, 0)
+        for term in freqs:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                for gram in _trigrams(term):
+                    terms = self._trigram_terms.get(gram)
+                    if terms:
+                        terms.discard(term)
+                        if not terms:
+                            del self._trigram_terms[gram]
+
+    def retain(self, doc_ids: Iterable[Hashable]) -> None:
+        """Drop every document not in doc_ids"""
+        keep = set(doc_ids)
+        for doc_id in [d for d in self._docs if d not in keep]:
+            self.remove(doc_id)
+
+    # --- Search ---
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Indexed terms matching a query term: exact, else by trigram similarity"""
+        if term in self._postings:
+            return [(term, 1.0)]
+        grams = _trigrams(term)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._trigram_terms.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        expansions = []
+        for candidate, count in shared.items():
+            similarity = 2 * count / (len(grams) + len(_trigrams(candidate)))
+            if similarity >= self.fuzzy_threshold:
+                expansions.append((candidate, similarity))
+        expansions.sort(key=lambda x: x[1], reverse=True)
+        return expansions[:3]
+
+    def search(self, query: str, limit: int = 5, fuzzy: bool = True) -> List[SearchHit]:
+        """Best matching documents, highest BM25 score first"""
+        query_terms = list(dict.fromkeys(normalize_tokens(query)))
+        if not query_terms or not self._docs:
+            return []
+
+        n_docs = len(self._docs)
+        avg_length = self._total_length / n_docs or 1
+        scores: Dict[Hashable, float] = {}
+        matched: Dict[Hashable, int] = {}
+
+        for query_term in query_terms:
+            expansions = self._expand(query_term) if fuzzy else (
+                [(query_term, 1.0)] if query_term in self._postings else []
+            )
+            seen_docs = set()
+            for term, weight in expansions:
+                postings = self._postings[term]
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    length = self._lengths[doc_id]
+                    norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf * norm
+                    seen_docs.add(doc_id)
+            for doc_id in seen_docs:
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:limit]
+        return [
+            SearchHit(doc_id=doc_id, score=score, matched=matched[doc_id], terms=len(query_terms))
+            for doc_id, score in ranked
+        ]
@@ -1,6 +1,7 @@
 """
 Webhook сервер для получения уведомлений от внешних систем
 """
+import asyncio
 import json
 import hmac
 import hashlib
@@ -15,6 +16,7 @@ from ..utils.logger import bot_logger
 # from ..services.plane_n8n_handler import PlaneN8nHandler, PlaneWebhookData
 from ..config import settings
 from ..database.database import get_async_session
+from ..services.telegram_delivery import Priority, delivery_priority
 
 
 class WebhookServer:
@@ -443,6 +445,10 @@ class WebhookServer:
                 f"📨 Plane direct webhook: event={event}, action={action}"
             )
 
+            # Cached projects / states / members may be outdated by this event
+            from ..integrations.plane import plane_api
+            plane_api.apply_webhook(event, action, data.get('data') or {})
+
             # Route: comment on issue → lightweight notification
             if event == 'issue_comment' and action == 'created':
                 return await self._notify_plane_event(data, event, action)
@@ -456,6 +462,10 @@ class WebhookServer:
             state = issue_data.get('state', {})
             state_group = state.get('group', '')
 
+            # Keep #123 / PROJ-123 lookup table in sync
+            from ..integrations.plane import issue_refs
+            await issue_refs.record_from_webhook(action, issue_data)
+
             # Route: new issue or non-completion update → lightweight notification
             if action == 'created' or state_group != 'completed':
                 return await self._notify_plane_event(data, event, action)
@@ -1186,8 +1196,8 @@ class WebhookServer:
 
         # Send notifications
         from aiogram.types import LinkPreviewOptions
-        sent = 0
-        for rid in recipients:
+
+        async def notify(rid: int) -> bool:
             try:
                 await self.bot.send_message(
                     chat_id=rid,
@@ -1195,9 +1205,14 @@ class WebhookServer:
                     parse_mode="HTML",
                     link_preview_options=LinkPreviewOptions(is_disabled=True),
                 )
-                sent += 1
+                return True
             except Exception as e:
                 bot_logger.warning(f"Failed to send Plane notification to {rid}: {e}")
+                return False
+
+        # Pacing is done by the delivery queue, recipients are sent to concurrently
+        with delivery_priority(Priority.NORMAL):
+            sent = sum(await asyncio.gather(*(notify(rid) for rid in recipients)))
 
         bot_logger.info(f"📨 Plane event {event}/{action} #{seq_id}: notified {sent} users")
         return web.json_response({'status': 'notified', 'event': event, 'action': action, 'recipients': sent})
@@ -0,0 +1,190 @@
+"""
+Telegram webhook ingestion on the shared aiohttp server.
+
+With `use_webhook` enabled, Telegram POSTs updates to `webhook_url`, whose
+path is routed on the same `WebhookServer` app that serves n8n and Plane.
+Each request:
+  - must carry `X-Telegram-Bot-Api-Secret-Token` equal to the configured
+    secret (401 otherwise);
+  - waits for a free processing slot (`webhook_max_concurrency`) — while all
+    slots are busy Telegram simply holds its next delivery, so load is pushed
+    back to Telegram instead of piling up tasks in memory;
+  - gets 503 if no slot frees up within `webhook_slot_timeout`, well before
+    Telegram gives up on the request, so Telegram redelivers it later instead
+    of the update running both here and on redelivery;
+  - is acknowledged with 200 as soon as its slot is taken, and fed to the
+    dispatcher in the background. Recently accepted update ids are
+    remembered, so a redelivered update is acknowledged but not run again.
+
+Updates arriving before the bot finishes startup wait until `open()` (within
+the same timeout). The
+webhook is never deleted on shutdown, so updates sent during a restart stay
+queued on Telegram's side and are delivered once the bot is back.
+"""
+
+import asyncio
+import hashlib
+import hmac
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+from aiohttp import web
+from pydantic import ValidationError
+
+from ..config import settings
+from ..utils.logger import bot_logger
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+DEFAULT_PATH = "/webhooks/telegram"
+ALLOWED_UPDATES = ["message", "callback_query", "inline_query"]
+SEEN_UPDATES = 10000  # Accepted update ids remembered for de-duplication
+
+
+def webhook_path(url: Optional[str] = None) -> str:
+    """Route path of the webhook URL Telegram posts to."""
+    return urlparse(url or settings.webhook_url or "").path or DEFAULT_PATH
+
+
+def webhook_secret(token: Optional[str] = None) -> str:
+    """Configured secret, or one derived from the bot token (stable across restarts and replicas)."""
+    if settings.webhook_secret:
+        return settings.webhook_secret
+    return hashlib.sha256((token or settings.telegram_token).encode()).hexdigest()
+
+
+class TelegramUpdateReceiver:
+    """aiohttp handler feeding webhook updates to the dispatcher with bounded concurrency."""
+
+    def __init__(self, max_concurrency: Optional[int] = None, slot_timeout: Optional[float] = None):
+        self.max_concurrency = max_concurrency or settings.webhook_max_concurrency
+        self.slot_timeout = slot_timeout if slot_timeout is not None else settings.webhook_slot_timeout
+        self.dispatcher: Optional[Dispatcher] = None
+        self.bot: Optional[Bot] = None
+        self.secret: Optional[str] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._ready = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+        self._seen: Dict[int, None] = {}  # Insertion-ordered: oldest first
+        self._stats = {
+            "received": 0, "handled": 0, "failed": 0, "rejected": 0,
+            "busy": 0, "duplicates": 0, "max_in_flight": 0,
+        }
+
+    @property
+    def active(self) -> bool:
+        return self.dispatcher is not None
+
+    def register(
+        self,
+        app: web.Application,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        path: Optional[str] = None,
+        secret: Optional[str] = None,
+    ) -> str:
+        """Add the update route to app; returns the path."""
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.secret = secret or webhook_secret(bot.token)
+        path = path or webhook_path()
+        app.router.add_post(path, self.handle)
+        return path
+
+    def open(self) -> None:
+        """Start feeding updates (startup finished)."""
+        self._ready.set()
+
+    async def set_webhook(self, url: Optional[str] = None) -> None:
+        """Point Telegram at url, keeping updates queued while the bot was down."""
+        url = url or settings.webhook_url
+        await self.bot.set_webhook(
+            url=url,
+            secret_token=self.secret,
+            allowed_updates=ALLOWED_UPDATES,
+            max_connections=self.max_concurrency,
+            drop_pending_updates=False,
+        )
+        bot_logger.info(f"✅ Telegram webhook set: {url} (max {self.max_concurrency} in flight)")
+
+    # --- Request handling ---
+
+    async def handle(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not self.secret or not hmac.compare_digest(token, self.secret):
+            self._stats["rejected"] += 1
+            bot_logger.warning(f"Rejected Telegram webhook request from {request.remote}: bad secret token")
+            return web.json_response({"error": "Invalid secret token"}, status=401)
+
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except (ValueError, ValidationError) as e:
+            bot_logger.error(f"Invalid Telegram update payload: {e}")
+            return web.json_response({"error": "Invalid update"}, status=400)
+
+        self._stats["received"] += 1
+        if update.update_id in self._seen:
+            self._stats["duplicates"] += 1
+            return web.Response(status=200)
+
+        try:
+            await asyncio.wait_for(self._take_slot(), timeout=self.slot_timeout)
+        except asyncio.TimeoutError:
+            self._stats["busy"] += 1
+            bot_logger.warning(f"No free slot for update {update.update_id}, asking Telegram to retry")
+            return web.json_response({"error": "Busy"}, status=503, headers={"Retry-After": "1"})
+
+        # Redelivered while we were waiting for the slot
+        if update.update_id in self._seen:
+            self._semaphore.release()
+            self._stats["duplicates"] += 1
+            return web.Response(status=200)
+        self._remember(update.update_id)
+
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._stats["max_in_flight"] = max(self._stats["max_in_flight"], len(self._tasks))
+        return web.Response(status=200)
+
+    async def _take_slot(self) -> None:
+        await self._ready.wait()
+        await self._semaphore.acquire()
+
+    def _remember(self, update_id: int) -> None:
+        self._seen[update_id] = None
+        if len(self._seen) > SEEN_UPDATES:
+            del self._seen[next(iter(self._seen))]
+
+    async def _process(self, update: Update) -> None:
+        try:
+            result = await self.dispatcher.feed_update(self.bot, update)
+            if isinstance(result, TelegramMethod):
+                await self.dispatcher.silent_call_request(bot=self.bot, result=result)
+            self._stats["handled"] += 1
+        except Exception as e:
+            self._stats["failed"] += 1
+            bot_logger.error(f"Failed to process update {update.update_id}: {e}")
+        finally:
+            self._semaphore.release()
+
+    async def close(self, timeout: float = 30) -> None:
+        """Let in-flight updates finish (up to timeout), then cancel the rest."""
+        tasks: List[asyncio.Task] = list(self._tasks)
+        if not tasks:
+            return
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            bot_logger.warning(f"Cancelled {len(pending)} updates still running at shutdown")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "in_flight": len(self._tasks), "ready": self._ready.is_set()}
+
+
+# Global instance
+telegram_update_receiver = TelegramUpdateReceiver()
@@ -143,3 +143,65 @@ class TestPlaneAPIClientHeaders:
 
     def test_workspace_slug(self, client):
         assert client.workspace_slug == WORKSPACE
+
+
+class TestPlaneAPIClientPagination:
+    """Tests for cursor pagination via iter_pages() / iter_project_issues()."""
+
+    @pytest.mark.asyncio
+    async def test_follows_next_cursor(self, client):
+        import re
+        url = re.compile(rf"{API_URL}/api/issues\?.*")
+        with aioresponses() as mocked:
+            mocked.get(url, payload={
+                "results": [{"id": "1"}, {"id": "2"}],
+                "next_cursor": "2:1:0",
+                "next_page_results": True,
+            })
+            mocked.get(url, payload={
+                "results": [{"id": "3"}],
+                "next_cursor": "2:2:0",
+                "next_page_results": False,
+            })
+            async with aiohttp.ClientSession() as session:
+                pages = [page async for page in client.iter_pages(session, "/api/issues", per_page=2)]
+
+        assert pages == [[{"id": "1"}, {"id": "2"}], [{"id": "3"}]]
+
+    @pytest.mark.asyncio
+    async def test_plain_list_is_single_page(self, client):
+        with aioresponses() as mocked:
+            mocked.get(f"{API_URL}/api/issues?cursor=100:0:0&per_page=100", payload=[{"id": "1"}])
+            async with aiohttp.ClientSession() as session:
+                pages = [page async for page in client.iter_pages(session, "/api/issues")]
+
+        assert pages == [[{"id": "1"}]]
+
+    @pytest.mark.asyncio
+    async def test_iter_project_issues_early_stop_and_filters(self, client):
+        import re
+        from unittest.mock import MagicMock
+        from app.integrations.plane.tasks import PlaneTasksManager
+
+        manager = PlaneTasksManager(client, MagicMock(), MagicMock())
+        url = re.compile(rf"{API_URL}/api/v1/workspaces/{WORKSPACE}/projects/p1/issues/\?.*")
+        page1 = {
+            "results": [
+                {"id": "a", "name": "A", "project": "p1", "state": {"name": "Done", "group": "completed"}},
+                {"id": "b", "name": "B", "project": "p1", "state": {"name": "Todo", "group": "unstarted"}},
+            ],
+            "next_cursor": "2:1:0",
+            "next_page_results": True,
+        }
+        with aioresponses() as mocked:
+            mocked.get(url, payload=page1)
+            async with aiohttp.ClientSession() as session:
+                async for task in manager.iter_project_issues(
+                    session, "p1", per_page=2, state_groups=["unstarted"]
+                ):
+                    first = task
+                    break
+
+        # Server ignored the filter: the done issue is dropped locally,
+        # and the second page is never requested.
+        assert first.id == "b"
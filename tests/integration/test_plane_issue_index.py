@@ -0,0 +1,119 @@
+"""
+Integration tests for the shared Plane issue index with mocked HTTP responses.
+
+Source: app/integrations/plane/index.py
+"""
+
+import re
+
+import pytest
+import aiohttp
+from aioresponses import aioresponses
+
+from app.integrations.plane.client import PlaneAPIClient
+from app.integrations.plane.index import PlaneIssueIndex, is_closed
+
+
+API_URL = "https://plane.test.local"
+WORKSPACE = "test-workspace"
+ISSUES_URL = re.compile(rf"{API_URL}/api/v1/workspaces/{WORKSPACE}/projects/proj-1/issues/.*")
+
+ISSUES = [
+    {
+        "id": "issue-1",
+        "name": "Fix printer",
+        "project": "proj-1",
+        "sequence_id": 7,
+        "priority": "high",
+        "state": {"id": "s1", "name": "In Progress", "group": "started"},
+        "assignees": [{"id": "user-1", "email": "Zardes@hhivp.com", "display_name": "Zardes"}],
+    },
+    {
+        "id": "issue-2",
+        "name": "Old ticket",
+        "project": "proj-1",
+        "sequence_id": 8,
+        "state": {"id": "s2", "name": "Done"},
+        "assignees": ["user-2"],
+    },
+]
+
+
+@pytest.fixture
+def index():
+    return PlaneIssueIndex(PlaneAPIClient(API_URL, "token", WORKSPACE), refresh_seconds=60)
+
+
+class TestPlaneIssueIndex:
+    """Tests for snapshot reuse and secondary lookups."""
+
+    @pytest.mark.asyncio
+    async def test_project_fetched_once_within_refresh_period(self, index):
+        with aioresponses() as mocked:
+            mocked.get(ISSUES_URL, payload={"results": [dict(i) for i in ISSUES]})
+            async with aiohttp.ClientSession() as session:
+                first = await index.get_project_tasks(session, "proj-1")
+                second = await index.get_project_tasks(session, "proj-1")
+
+        assert first is second
+        assert index.get_stats()["fetches"] == 1
+        assert index.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lookups(self, index):
+        index.set_project_names([{"id": "proj-1", "name": "HHIVP"}])
+        with aioresponses() as mocked:
+            mocked.get(ISSUES_URL, payload={"results": [dict(i) for i in ISSUES]})
+            async with aiohttp.ClientSession() as session:
+                await index.ensure_projects(session, ["proj-1"])
+
+        [task] = index.find_by_sequence(7)
+        assert task.id == "issue-1"
+        assert task.project_name == "HHIVP"
+        assert task.assignee_names == ["Zardes"]
+
+        assert [t.id for t in index.tasks_for_assignee(["zardes@hhivp.com"])] == ["issue-1"]
+        assert [t.id for t in index.tasks_for_assignee(["user-2"])] == ["issue-2"]
+        assert [t.id for t in index.tasks_in_state_groups(["completed"])] == ["issue-2"]
+
+        done = index.find_by_sequence(8)[0]
+        assert is_closed(done)
+        assert not is_closed(task)
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_refetch(self, index):
+        with aioresponses() as mocked:
+            mocked.get(ISSUES_URL, payload={"results": []})
+            mocked.get(ISSUES_URL, payload={"results": [dict(ISSUES[0])]})
+            async with aiohttp.ClientSession() as session:
+                assert await index.get_project_tasks(session, "proj-1") == []
+                index.invalidate("proj-1")
+                tasks = await index.get_project_tasks(session, "proj-1")
+
+        assert [t.id for t in tasks] == ["issue-1"]
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_served_on_error(self, index):
+        index.refresh_seconds = 0
+        with aioresponses() as mocked:
+            mocked.get(ISSUES_URL, payload={"results": [dict(ISSUES[0])]})
+            mocked.get(ISSUES_URL, status=500, body="boom")
+            async with aiohttp.ClientSession() as session:
+                await index.get_project_tasks(session, "proj-1")
+                tasks = await index.get_project_tasks(session, "proj-1")
+
+        assert [t.id for t in tasks] == ["issue-1"]
+        assert index.get_stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_text_search_skips_closed_and_tolerates_typos(self, index):
+        with aioresponses() as mocked:
+            mocked.get(ISSUES_URL, payload={"results": [dict(i) for i in ISSUES]})
+            async with aiohttp.ClientSession() as session:
+                await index.ensure_projects(session, ["proj-1"])
+
+        [(task, hit)] = index.search_text("printr fix")
+        assert task.id == "issue-1"
+        assert hit.matched == 2
+        assert index.search_text("old ticket") == []
+        assert [t.id for t, _ in index.search_text("old ticket", open_only=False)] == ["issue-2"]
@@ -0,0 +1,70 @@
+"""
+Tests for the AI response cache.
+
+Source: app/core/ai/cache.py
+Redis is not connected in tests, so only the local LRU level is used.
+"""
+
+import pytest
+
+from app.core.ai.base import AIConfig, AIMessage, AIResponse, AIRole
+from app.core.ai.cache import AIResponseCache, cache_key, request_params
+
+
+def _messages(user_text):
+    return [
+        AIMessage(role=AIRole.SYSTEM, content="You are a detector"),
+        AIMessage(role=AIRole.USER, content=user_text),
+    ]
+
+
+def _response(content="ok"):
+    return AIResponse(content=content, model="m", tokens_used=42, finish_reason="stop", processing_time=1.5)
+
+
+class TestCacheKey:
+    """Tests for prompt normalisation."""
+
+    def test_whitespace_is_normalised(self):
+        params = {"temperature": 0.7}
+        assert cache_key("groq", "m", _messages("сервер  упал\n"), params) == \
+            cache_key("groq", "m", _messages("сервер упал"), params)
+
+    def test_model_and_temperature_are_part_of_key(self):
+        base = cache_key("groq", "m", _messages("x"), {"temperature": 0.7})
+        assert cache_key("groq", "m2", _messages("x"), {"temperature": 0.7}) != base
+        assert cache_key("groq", "m", _messages("x"), {"temperature": 0.2}) != base
+
+    def test_all_generation_params_are_part_of_key(self):
+        config = AIConfig(model="m")
+        base = cache_key("groq", "m", _messages("x"), request_params(config))
+
+        assert cache_key("groq", "m", _messages("x"), request_params(config, temperature=0.7)) == base
+        assert cache_key("groq", "m", _messages("x"), request_params(config, max_tokens=50)) != base
+        assert cache_key("groq", "m", _messages("x"), request_params(config, top_p=0.5)) != base
+        assert cache_key("groq", "m", _messages("x"), request_params(config, response_format="json")) != base
+
+
+class TestAIResponseCache:
+    """Tests for hit/miss accounting and LRU eviction."""
+
+    @pytest.mark.asyncio
+    async def test_hit_marks_response_cached(self):
+        cache = AIResponseCache()
+        assert await cache.get("k") is None
+
+        await cache.set("k", _response(), "plane")
+        hit = await cache.get("k")
+
+        assert hit.content == "ok"
+        assert hit.metadata["cached"] is True
+        assert cache.get_stats() == {"hits": 1, "misses": 1, "saved_tokens": 42, "entries": 1}
+
+    @pytest.mark.asyncio
+    async def test_lru_bound(self):
+        cache = AIResponseCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            await cache.set(key, _response(key), "plane")
+
+        assert await cache.get("a") is None
+        assert (await cache.get("c")).content == "c"
@@ -0,0 +1,82 @@
+"""
+Tests for per-conversation AI history.
+
+Source: app/core/ai/conversation.py, app/core/ai/base.py
+"""
+
+import pytest
+
+from app.core.ai.base import AIProvider, AIResponse, AIConfig, AIRole
+from app.core.ai.conversation import ConversationStore, estimate_tokens
+
+
+class EchoProvider(AIProvider):
+    """Provider that records the prompts it receives."""
+
+    def __init__(self):
+        super().__init__(api_key="test", config=AIConfig(model="echo"))
+        self.calls = []
+
+    async def complete(self, messages, **kwargs):
+        self.calls.append(messages)
+        return AIResponse(
+            content=f"re: {messages[-1].content}",
+            model="echo",
+            tokens_used=0,
+            finish_reason="stop",
+            processing_time=0.0,
+        )
+
+    async def complete_stream(self, messages, **kwargs):
+        yield ""
+
+    @property
+    def provider_name(self):
+        return "echo"
+
+    @property
+    def supported_models(self):
+        return ["echo"]
+
+
+class TestStatelessChat:
+    """Provider.chat no longer leaks history between callers."""
+
+    @pytest.mark.asyncio
+    async def test_chat_does_not_accumulate_history(self):
+        provider = EchoProvider()
+        await provider.chat("first", system_prompt="sys")
+        await provider.chat("second", system_prompt="sys")
+
+        assert [m.content for m in provider.calls[1]] == ["sys", "second"]
+
+
+class TestConversationStore:
+    """Tests for keyed conversations and token-budget trimming."""
+
+    def test_conversations_are_isolated_by_key(self):
+        store = ConversationStore(token_budget=1000, idle_ttl=60)
+        store.get(1, 10, "ai").add_exchange("q", "a")
+
+        assert store.get(1, 10, "ai").history()
+        assert store.get(2, 10, "ai").history() == []
+        assert store.get(1, 10, "plane").history() == []
+
+    def test_history_trimmed_to_budget(self):
+        text = "x" * 300
+        store = ConversationStore(token_budget=estimate_tokens(text) * 3, idle_ttl=60)
+        conv = store.get(1, 1, "ai")
+        for _ in range(5):
+            conv.add_exchange(text, text)
+
+        history = conv.history()
+        assert len(history) == 2
+        assert history[0].role == AIRole.USER
+
+    def test_lru_eviction(self):
+        store = ConversationStore(token_budget=1000, idle_ttl=60, max_conversations=2)
+        store.get(1, 1, "ai")
+        store.get(2, 2, "ai")
+        store.get(3, 3, "ai")
+
+        assert len(store) == 2
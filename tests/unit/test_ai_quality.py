@@ -0,0 +1,71 @@
+"""
+Tests for SQL-side /ai_quality aggregation.
+
+Source: app/handlers/ai_quality.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.chat_ai_models import DetectedIssue
+from app.handlers.ai_quality import compute_quality_metrics
+
+
+@pytest.fixture
+async def detected_issues_table():
+    async with engine.begin() as conn:
+        await conn.run_sync(DetectedIssue.__table__.create, checkfirst=True)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(DetectedIssue.__table__.drop)
+
+
+async def _add_issues(rows):
+    async with AsyncSessionLocal() as session:
+        for confidence, feedback, model, distance, age_days in rows:
+            session.add(DetectedIssue(
+                chat_id=-1, issue_type="problem", confidence=confidence,
+                user_feedback=feedback, ai_model_used=model, correction_distance=distance,
+                created_at=datetime.now(timezone.utc) - timedelta(days=age_days),
+            ))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+class TestComputeQualityMetrics:
+    """Grouped aggregation matches per-row semantics."""
+
+    async def test_empty_window(self, detected_issues_table):
+        assert await compute_quality_metrics(7) == {"total": 0, "days": 7}
+
+    async def test_metrics(self, detected_issues_table):
+        await _add_issues([
+            (0.95, "accepted", "gpt", None, 1),
+            (0.92, "rejected", "gpt", None, 1),
+            (0.91, "corrected", "gpt", 0.2, 2),
+            (0.6, "accepted", "claude", None, 3),
+            (0.4, None, None, 0.4, 3),
+            (None, "accepted", "claude", None, 4),
+            (0.95, "accepted", "gpt", None, 40),  # Outside the window
+        ])
+
+        metrics = await compute_quality_metrics(30)
+
+        assert metrics["total"] == 6
+        assert metrics["feedback"] == {"accepted": 3, "rejected": 1, "corrected": 1, "no_feedback": 1}
+        assert metrics["precision"] == 75.0
+        assert metrics["detection_rate"] == 0.2
+        assert metrics["avg_correction_distance"] == 0.3
+        assert metrics["confidence_buckets"] == [
+            {"label": "0.3-0.5", "count": 1, "accept_rate": None},
+            {"label": "0.5-0.7", "count": 1, "accept_rate": 100.0},
+            {"label": "0.9-1.0", "count": 3, "accept_rate": 50.0},
+        ]
+        assert metrics["models"] == {
+            "gpt": {"total": 3, "accepted": 1, "rejected": 1},
+            "claude": {"total": 2, "accepted": 2, "rejected": 0},
+            "unknown": {"total": 1, "accepted": 0, "rejected": 0},
+        }
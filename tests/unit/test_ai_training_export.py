@@ -0,0 +1,77 @@
+"""
+Tests for streaming, size-split /ai_export.
+
+Source: app/handlers/ai_training_export.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.chat_ai_models import DetectedIssue
+from app.handlers.ai_training_export import export_training_data
+
+
+@pytest.fixture
+async def detected_issues(tmp_path):
+    async with engine.begin() as conn:
+        await conn.run_sync(DetectedIssue.__table__.create, checkfirst=True)
+    async with AsyncSessionLocal() as session:
+        for i in range(5):
+            session.add(DetectedIssue(
+                chat_id=-1, issue_type="problem", title=f"Issue {i}", original_text="не работает",
+                user_feedback="accepted" if i % 2 else None,
+                ai_response_json='{"is_problem": true}',
+                created_at=datetime.now(timezone.utc) - timedelta(days=10 * i),
+            ))
+        await session.commit()
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(DetectedIssue.__table__.drop)
+
+
+def _read(paths):
+    records = []
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+@pytest.mark.asyncio
+class TestExportTrainingData:
+    """Streaming export to gzip parts."""
+
+    async def test_window_export_single_part(self, detected_issues, tmp_path):
+        cutoff = datetime.now(timezone.utc) - timedelta(days=25)
+        result = await export_training_data(str(tmp_path), "export", cutoff=cutoff)
+
+        assert len(result.parts) == 1
+        records = _read(result.parts)
+        assert [r["completion"]["title"] for r in records] == ["Issue 0", "Issue 1", "Issue 2"]
+        assert records[0]["ai_raw"] == {"is_problem": True}
+        assert result.stats["total"] == 3
+        assert result.stats["accepted"] == 1
+        assert result.stats["no_feedback"] == 2
+        assert (result.first_id, result.last_id) == (1, 3)
+
+    async def test_since_id_and_size_split(self, detected_issues, tmp_path):
+        result = await export_training_data(str(tmp_path), "export", since_id=2, part_size=1, batch_size=2)
+
+        assert len(result.parts) == 3
+        assert [r["metadata"]["id"] for r in _read(result.parts)] == [3, 4, 5]
+
+        empty = await export_training_data(str(tmp_path), "empty", since_id=result.last_id)
+        assert empty.parts == [] and empty.last_id is None
+
+    async def test_split_accounts_for_buffered_deflate_output(self, detected_issues, tmp_path):
+        # The whole export compresses to ~450 bytes that deflate keeps buffered until
+        # a flush; measured without one, all rows would land in one oversized part
+        result = await export_training_data(str(tmp_path), "export", part_size=300)
+
+        assert len(result.parts) > 1
+        assert [r["metadata"]["id"] for r in _read(result.parts)] == [1, 2, 3, 4, 5]
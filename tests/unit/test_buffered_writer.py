@@ -0,0 +1,190 @@
+"""
+Tests for the write-behind table buffer (ChatMessage as sample model).
+
+Source: app/services/buffered_writer.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.chat_ai_models import ChatMessage
+from app.services.buffered_writer import BufferedWriter
+
+
+@pytest.fixture
+async def chat_messages_table():
+    async with engine.begin() as conn:
+        await conn.run_sync(ChatMessage.__table__.create, checkfirst=True)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(ChatMessage.__table__.drop)
+
+
+async def _count():
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(select(func.count(ChatMessage.id)))).scalar()
+
+
+def _row(i):
+    return dict(chat_id=-100, message_id=i, user_id=1, message_text=f"msg {i}", message_type="text")
+
+
+class TestBufferedWriter:
+    """Rows are written in bulk and never lost on stop()."""
+
+    @pytest.mark.asyncio
+    async def test_flush_on_stop(self, chat_messages_table):
+        writer = BufferedWriter(ChatMessage, "test", flush_size=100, flush_interval=60)
+        for i in range(5):
+            writer.add(**_row(i))
+
+        assert await _count() == 0
+        await writer.stop()
+
+        assert await _count() == 5
+        assert writer.get_stats()["flushes"] == 1
+        assert writer.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_bounded_buffer_drops_oldest(self):
+        writer = BufferedWriter(ChatMessage, "test", flush_size=100, flush_interval=60, max_pending=3)
+        for i in range(5):
+            writer.add(**_row(i))
+
+        assert writer.pending == 3
+        assert writer.get_stats()["dropped"] == 2
+        assert writer._rows[0]["message_id"] == 2
+        writer._rows.clear()
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_drop_newest_keeps_buffer(self):
+        writer = BufferedWriter(
+            ChatMessage, "test", flush_size=100, flush_interval=60, max_pending=3, overflow="drop_newest"
+        )
+        for i in range(5):
+            writer.add(**_row(i))
+
+        assert [row["message_id"] for row in writer._rows] == [0, 1, 2]
+        assert writer.get_stats()["dropped"] == 2
+        writer._rows.clear()
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_spill_is_replayed_after_flush(self, chat_messages_table, tmp_path):
+        spill = tmp_path / "spill.jsonl"
+        writer = BufferedWriter(
+            ChatMessage, "test", flush_size=100, flush_interval=60, max_pending=4,
+            overflow="spill", spill_path=str(spill),
+        )
+        for i in range(6):
+            writer.add(**_row(i), created_at=datetime(2026, 1, 1, 12, 0))
+
+        assert writer.get_stats()["spilled"] == 2
+        assert spill.exists()
+
+        await writer.flush()
+        assert not spill.exists()
+        assert writer.pending == 2
+
+        await writer.stop()
+        assert await _count() == 6
+        assert writer.get_stats()["dropped"] == 0
+
+    @pytest.mark.asyncio
+    async def test_poison_row_is_isolated(self, chat_messages_table, tmp_path):
+        spill = tmp_path / "spill.jsonl"
+        writer = BufferedWriter(
+            ChatMessage, "test", flush_size=100, flush_interval=60,
+            overflow="spill", spill_path=str(spill), max_failures=2, isolate_chunk=2,
+        )
+        for i in range(5):
+            writer.add(**_row(i))
+        writer.add(chat_id=-100, message_id=99, user_id=None, message_text="bad")  # NOT NULL violation
+
+        assert await writer.flush() == 0
+        assert writer.pending == 6
+
+        assert await writer.flush() == 5
+        assert writer.pending == 0
+        assert await _count() == 5
+        assert writer.get_stats()["rejected"] == 1
+        assert '"message_id": 99' in (tmp_path / "spill.jsonl.rejected").read_text()
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_outage_keeps_rows_without_isolating(self):
+        writer = BufferedWriter(ChatMessage, "test", flush_size=100, flush_interval=60, max_failures=1)
+        for i in range(30):
+            writer.add(**_row(i))
+        inserts = []
+
+        async def insert(rows):
+            inserts.append(len(rows))
+            raise OSError("connection refused")
+
+        async def unavailable():
+            return False
+
+        writer._insert = insert
+        writer._database_available = unavailable
+        assert await writer.flush() == 0
+        assert inserts == [30]
+        assert writer.pending == 30
+        assert writer.get_stats()["rejected"] == 0
+        writer._rows.clear()
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_connection_error_stops_isolation(self):
+        writer = BufferedWriter(
+            ChatMessage, "test", flush_size=100, flush_interval=60, max_failures=1, isolate_chunk=2
+        )
+        for i in range(6):
+            writer.add(**_row(i))
+        inserts = []
+
+        async def insert(rows):
+            inserts.append([row["message_id"] for row in rows])
+            if len(inserts) == 2:
+                return  # First chunk goes through, then the connection drops
+            raise OSError("connection reset")
+
+        async def available():
+            return True
+
+        writer._insert = insert
+        writer._database_available = available
+        assert await writer.flush() == 2
+        assert inserts == [[0, 1, 2, 3, 4, 5], [0, 1], [2, 3]]
+        assert [row["message_id"] for row in writer._rows] == [2, 3, 4, 5]
+        assert writer.get_stats()["rejected"] == 0
+        writer._rows.clear()
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_running_flush(self, chat_messages_table):
+        writer = BufferedWriter(ChatMessage, "test", flush_size=2, flush_interval=60)
+        insert = writer._insert
+        started = asyncio.Event()
+
+        async def slow_insert(rows):
+            started.set()
+            await asyncio.sleep(0.05)
+            await insert(rows)
+
+        writer._insert = slow_insert
+        await writer.start()
+        for i in range(3):
+            writer.add(**_row(i))
+        await started.wait()
+
+        await writer.stop()
+
+        assert await _count() == 3
+        assert writer.pending == 0
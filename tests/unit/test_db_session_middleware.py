@@ -0,0 +1,69 @@
+"""
+Tests for the lazy per-update database session.
+
+Source: app/middleware/database.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.models import BotUser
+from app.middleware.database import DatabaseSessionMiddleware, db_time_stats
+
+
+@pytest.fixture
+async def bot_users_table():
+    async with engine.begin() as conn:
+        await conn.run_sync(BotUser.__table__.create, checkfirst=True)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(BotUser.__table__.drop)
+
+
+def _data(callback):
+    return {"handler": SimpleNamespace(callback=callback)}
+
+
+class TestDatabaseSessionMiddleware:
+    """Session is opened only on first use and committed only when used."""
+
+    @pytest.mark.asyncio
+    async def test_unused_session_is_never_opened(self):
+        async def no_db_handler(event, data):
+            return "ok"
+
+        data = _data(no_db_handler)
+        assert await DatabaseSessionMiddleware()(no_db_handler, object(), data) == "ok"
+        assert not data["db_session"].started
+
+    @pytest.mark.asyncio
+    async def test_used_session_commits_and_records_db_time(self, bot_users_table):
+        async def create_user(event, data):
+            data["db_session"].add(BotUser(telegram_user_id=42, role="user", is_active=True))
+            await data["db_session"].flush()
+
+        await DatabaseSessionMiddleware()(create_user, object(), _data(create_user))
+
+        async with AsyncSessionLocal() as session:
+            assert (await session.execute(select(func.count(BotUser.id)))).scalar() == 1
+
+        handlers = {h["handler"]: h for h in db_time_stats.get_stats(top=100)["top_handlers"]}
+        entry = next(h for name, h in handlers.items() if name.endswith("create_user"))
+        assert entry["calls"] == 1 and entry["db_calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_error_rolls_back(self, bot_users_table):
+        async def failing(event, data):
+            data["db_session"].add(BotUser(telegram_user_id=43, role="user", is_active=True))
+            await data["db_session"].flush()
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await DatabaseSessionMiddleware()(failing, object(), _data(failing))
+
+        async with AsyncSessionLocal() as session:
+            assert (await session.execute(select(func.count(BotUser.id)))).scalar() == 0
@@ -0,0 +1,95 @@
+"""
+Tests for the Redis-backed FSM storage.
+
+Source: app/services/fsm_storage.py
+"""
+
+import pytest
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+
+from app.modules.chat_monitor.message_monitor import NotInSupportRequestFilter
+from app.services.fsm_storage import RedisFSMStorage
+from app.services.redis_service import RedisService
+
+
+class FlowStates(StatesGroup):
+    editing = State()
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio.Redis: values plus the TTL they were written with."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def _key(chat_id=-100, user_id=7):
+    return StorageKey(bot_id=1, chat_id=chat_id, user_id=user_id)
+
+
+@pytest.fixture
+def fake_redis():
+    service = RedisService()
+    service._redis = FakeRedis()
+    return service
+
+
+@pytest.mark.asyncio
+class TestRedisFSMStorage:
+    """State/data round trips, TTLs and key isolation."""
+
+    async def test_round_trip_with_ttls(self, fake_redis):
+        storage = RedisFSMStorage(fake_redis, state_ttl=60, data_ttl=120)
+        await storage.set_state(_key(), FlowStates.editing)
+        await storage.update_data(_key(), {"title": "Принтер", "ids": [1, 2]})
+
+        assert await storage.get_state(_key()) == "FlowStates:editing"
+        assert await storage.get_data(_key()) == {"title": "Принтер", "ids": [1, 2]}
+        assert fake_redis._redis.ttls == {"fsm:1:-100:7:state": 60, "fsm:1:-100:7:data": 120}
+        # Compact JSON, Cyrillic kept as is
+        assert fake_redis._redis.values["fsm:1:-100:7:data"] == '{"title":"Принтер","ids":[1,2]}'
+
+    async def test_isolated_per_chat_and_user(self, fake_redis):
+        storage = RedisFSMStorage(fake_redis)
+        await storage.set_state(_key(), FlowStates.editing)
+        assert await storage.get_state(_key(chat_id=-200)) is None
+        assert await storage.get_state(_key(user_id=8)) is None
+
+    async def test_clear_removes_keys(self, fake_redis):
+        storage = RedisFSMStorage(fake_redis)
+        await storage.set_state(_key(), FlowStates.editing)
+        await storage.set_data(_key(), {"a": 1})
+        await storage.set_state(_key(), None)
+        await storage.set_data(_key(), {})
+        assert fake_redis._redis.values == {}
+        assert await storage.get_data(_key()) == {}
+
+    async def test_memory_fallback_returns_copies(self):
+        storage = RedisFSMStorage(RedisService())
+        await storage.set_data(_key(), {"a": 1})
+        data = await storage.get_data(_key())
+        data["a"] = 2
+        assert await storage.get_data(_key()) == {"a": 1}
+
+
+@pytest.mark.asyncio
+class TestNotInSupportRequestFilter:
+    """Chat monitor skips users who are filling a support request."""
+
+    async def test_reads_raw_state(self):
+        check = NotInSupportRequestFilter()
+        assert await check(None, raw_state=None) is True
+        assert await check(None, raw_state="FlowStates:editing") is True
+        assert await check(None, raw_state="SupportRequestStates:waiting_for_title") is False
@@ -0,0 +1,119 @@
+"""
+Tests for the incremental, fingerprint-deduplicated Google Sheets import.
+
+Source: app/integrations/google_sheets.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.work_journal_models import WorkJournalEntry, WorkJournalEntryWorker
+from app.integrations import google_sheets
+from app.integrations.google_sheets import GoogleSheetsParser, entry_fingerprint
+
+
+def _row(work_date, company, description, workers="Иванов"):
+    return {
+        "Timestamp": "", "Email": "a@example.com", "Дата работ": work_date, "Компания": company,
+        "Длительность": "1 час", "Описание": description, "Исполнители": workers,
+    }
+
+
+SHEET = [
+    _row("01.09.2026", "ACME", "Замена картриджа"),
+    _row("02.09.2026", "ACME", "Настройка VPN"),
+    _row("02.09.2026", "ACME", "настройка  vpn"),  # Same work, different spacing/case
+    _row("bad date", "ACME", "Что-то"),
+]
+
+
+@pytest.fixture
+async def journal_table(monkeypatch):
+    async with engine.begin() as conn:
+        await conn.run_sync(WorkJournalEntry.__table__.create, checkfirst=True)
+        await conn.run_sync(WorkJournalEntryWorker.__table__.create, checkfirst=True)
+    monkeypatch.setattr(google_sheets.redis_service, "_fallback", {})
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(WorkJournalEntryWorker.__table__.drop)
+        await conn.run_sync(WorkJournalEntry.__table__.drop)
+
+
+@pytest.fixture
+def parser(monkeypatch):
+    parser = GoogleSheetsParser()
+    parser.spreadsheet_id = "sheet-1"
+    parser.sheet = list(SHEET)
+    parser.requested_from = []
+
+    async def get_entries_from(start_row):
+        parser.requested_from.append(start_row)
+        return parser.sheet[start_row - 2:]
+
+    monkeypatch.setattr(parser, "get_entries_from", get_entries_from)
+    return parser
+
+
+async def _count():
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(func.count()).select_from(WorkJournalEntry))
+
+
+class TestEntryFingerprint:
+    """Normalisation of the dedup key."""
+
+    def test_case_and_whitespace_insensitive(self):
+        day = date(2026, 9, 2)
+        assert entry_fingerprint(day, "ACME ", "Настройка VPN") == entry_fingerprint(day, "acme", "настройка  vpn")
+        assert entry_fingerprint(day, "ACME", "VPN") != entry_fingerprint(date(2026, 9, 3), "ACME", "VPN")
+
+
+@pytest.mark.asyncio
+class TestSyncEntries:
+    """Bulk, incremental import."""
+
+    async def test_first_sync_dedupes_within_sheet(self, journal_table, parser):
+        stats = await parser.sync_entries_to_database()
+
+        assert stats == {"total_processed": 4, "new_entries": 2, "skipped_entries": 1, "error_entries": 1}
+        assert await _count() == 2
+
+    async def test_resync_reads_only_new_rows(self, journal_table, parser):
+        await parser.sync_entries_to_database()
+        parser.sheet.append(_row("03.09.2026", "ACME", "Обновление 1С", "Петров, Сидоров"))
+
+        stats = await parser.sync_entries_to_database()
+
+        assert parser.requested_from == [2, 6]
+        assert stats["new_entries"] == 1
+        async with AsyncSessionLocal() as session:
+            entry = (await session.execute(
+                select(WorkJournalEntry).where(WorkJournalEntry.work_date == date(2026, 9, 3))
+            )).scalar_one()
+            links = (await session.execute(
+                select(WorkJournalEntryWorker.worker_name).where(WorkJournalEntryWorker.entry_id == entry.id)
+            )).scalars().all()
+        assert json.loads(entry.worker_names) == ["Петров", "Сидоров"]
+        assert sorted(links) == ["Петров", "Сидоров"]
+        assert entry.content_fingerprint == entry_fingerprint(date(2026, 9, 3), "ACME", "Обновление 1С")
+
+    async def test_full_resync_skips_existing_and_manual_entries(self, journal_table, parser):
+        async with AsyncSessionLocal() as session:
+            # Entry created in the bot (no fingerprint) for the same work
+            session.add(WorkJournalEntry(
+                telegram_user_id=1, user_email="b@example.com", work_date=date(2026, 9, 1),
+                company="ACME", work_duration="1 час", work_description="Замена картриджа",
+                worker_names="[]", created_by_user_id=1, created_by_name="Bot",
+            ))
+            await session.commit()
+
+        await parser.sync_entries_to_database()
+        stats = await parser.sync_entries_to_database(full=True)
+
+        assert stats["new_entries"] == 0
+        assert await _count() == 2
@@ -0,0 +1,36 @@
+"""
+Tests for the shared outbound HTTP pool.
+
+Source: app/services/http_service.py
+"""
+
+import pytest
+
+from app.services.http_service import HTTPService
+
+
+class TestHTTPService:
+    """Tests for session lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_session_is_shared_until_closed(self):
+        service = HTTPService()
+        await service.start()
+        session = service.session
+        try:
+            assert service.session is session
+            assert service.get_stats()["open"] is True
+        finally:
+            await service.close()
+
+        assert session.closed
+        assert service.get_stats()["open"] is False
+
+    @pytest.mark.asyncio
+    async def test_lazy_session_without_start(self):
+        service = HTTPService()
+        try:
+            assert not service.session.closed
+            assert service.get_stats()["hosts"] == {}
+        finally:
+            await service.close()
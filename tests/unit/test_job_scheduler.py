@@ -0,0 +1,174 @@
+"""
+Tests for the persistent job scheduler.
+
+Source: app/services/job_scheduler.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.scheduler_models import ScheduledJob
+from app.services import job_scheduler as scheduler_module
+from app.services.job_scheduler import LOCK_KEY, Daily, Interval, Job, JobScheduler
+
+
+@pytest.fixture
+async def scheduled_jobs_table():
+    async with engine.begin() as conn:
+        await conn.run_sync(ScheduledJob.__table__.create, checkfirst=True)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(ScheduledJob.__table__.drop)
+
+
+class FakeRedis:
+    """SET NX / DELETE of redis.asyncio.Redis"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+async def _set_next_run(name, when):
+    async with AsyncSessionLocal() as session:
+        session.add(ScheduledJob(name=name, next_run_at=when, run_count=0))
+        await session.commit()
+
+
+class TestSchedules:
+    """Fire time computation."""
+
+    def test_daily_next_after(self):
+        schedule = Daily(9, 0, tz="Europe/Moscow")
+        # 05:00 UTC = 08:00 MSK -> today 09:00 MSK
+        assert schedule.next_after(datetime(2026, 3, 2, 5, 0, tzinfo=timezone.utc)) == datetime(
+            2026, 3, 2, 6, 0, tzinfo=timezone.utc
+        )
+        # Exactly at the fire time -> next day
+        assert schedule.next_after(datetime(2026, 3, 2, 6, 0, tzinfo=timezone.utc)) == datetime(
+            2026, 3, 3, 6, 0, tzinfo=timezone.utc
+        )
+
+    def test_weekly_next_after(self):
+        schedule = Daily(9, 0, tz="Europe/Moscow", weekdays=frozenset({0}))
+        # Tuesday 2026-03-03 -> Monday 2026-03-09
+        assert schedule.next_after(datetime(2026, 3, 3, 12, 0, tzinfo=timezone.utc)).date().isoformat() == "2026-03-09"
+
+
+class TestJobScheduler:
+    """Catch-up after restart and one run per fire across replicas."""
+
+    @pytest.mark.asyncio
+    async def test_missed_run_is_caught_up_once(self, scheduled_jobs_table):
+        missed = datetime.now(timezone.utc) - timedelta(minutes=10)
+        await _set_next_run("report", missed)
+
+        runs = []
+
+        async def report(fire_at):
+            runs.append(fire_at)
+
+        first, second = JobScheduler(max_concurrency=2), JobScheduler(max_concurrency=2)
+        for replica in (first, second):
+            replica.register(Job("report", report, Interval(3600), catch_up=3600))
+        await first.start()
+        await second.start()
+        await asyncio.sleep(0.2)
+        await first.stop()
+        await second.stop()
+
+        assert len(runs) == 1
+        assert runs[0].replace(tzinfo=None) == missed.replace(tzinfo=None)
+
+        async with AsyncSessionLocal() as session:
+            row = await session.get(ScheduledJob, "report")
+            assert row.last_status == "ok" and row.run_count == 1
+            assert row.next_run_at.replace(tzinfo=None) > datetime.now(timezone.utc).replace(tzinfo=None)
+
+    @pytest.mark.asyncio
+    async def test_stale_run_is_skipped(self, scheduled_jobs_table):
+        await _set_next_run("report", datetime.now(timezone.utc) - timedelta(days=2))
+
+        runs = []
+
+        async def report(fire_at):
+            runs.append(fire_at)
+
+        scheduler = JobScheduler(max_concurrency=1)
+        scheduler.register(Job("report", report, Interval(3600), catch_up=3600))
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+        assert runs == []
+        assert scheduler.get_stats()["caught_up"] == 0
+
+    @pytest.mark.asyncio
+    async def test_replicas_starting_together_create_one_row(self, scheduled_jobs_table):
+        async def report(fire_at):
+            pass
+
+        replicas = [JobScheduler(max_concurrency=1) for _ in range(2)]
+        for replica in replicas:
+            replica.register(Job("report", report, Interval(3600)))
+
+        await asyncio.gather(*(replica.start() for replica in replicas))
+        for replica in replicas:
+            assert "report" in replica._next
+            await replica.stop()
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(select(ScheduledJob))).scalars().all()
+            assert [row.name for row in rows] == ["report"]
+            assert rows[0].next_run_at is not None
+
+    @pytest.mark.asyncio
+    async def test_leftover_lock_is_retried_not_spun(self, scheduled_jobs_table, monkeypatch):
+        missed = (datetime.now(timezone.utc) - timedelta(minutes=10)).replace(microsecond=0)
+        await _set_next_run("report", missed)
+
+        # A replica crashed between SET NX and the row UPDATE
+        redis = FakeRedis()
+        redis.values[LOCK_KEY.format(name="report", fire=int(missed.timestamp()))] = "dead:1"
+        monkeypatch.setattr(scheduler_module.redis_service, "_redis", redis)
+        monkeypatch.setattr(scheduler_module.redis_service, "_connected", True)
+        monkeypatch.setattr(scheduler_module, "CLAIM_RETRY", 0.1)
+
+        runs = []
+
+        async def report(fire_at):
+            runs.append(fire_at)
+
+        scheduler = JobScheduler(max_concurrency=1)
+        scheduler.register(Job("report", report, Interval(3600), catch_up=3600))
+        await scheduler.start()
+        await asyncio.sleep(0.5)
+        await scheduler.stop()
+
+        assert [r.replace(tzinfo=None) for r in runs] == [missed.replace(tzinfo=None)]
+        assert scheduler.get_stats()["claim_retries"] == 1
+        assert scheduler.get_stats()["claimed_elsewhere"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_cas_releases_lock(self, scheduled_jobs_table, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(scheduler_module.redis_service, "_redis", redis)
+        monkeypatch.setattr(scheduler_module.redis_service, "_connected", True)
+        when = datetime.now(timezone.utc)
+        await _set_next_run("report", when + timedelta(hours=1))
+
+        assert not await JobScheduler()._claim("report", when, when + timedelta(hours=2))
+        assert redis.values == {}
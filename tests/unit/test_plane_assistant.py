@@ -0,0 +1,70 @@
+"""
+Tests for Plane assistant issue lookup by name.
+
+Source: app/modules/plane_assistant/handlers.py, app/modules/plane_assistant/plane_service.py
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.plane_assistant import handlers
+from app.modules.plane_assistant import plane_service
+from app.utils.text_search import SearchHit
+
+PROJECTS = [{"id": "p1", "name": "Офис", "identifier": "OFF"}]
+
+
+def _task(task_id, name, seq):
+    return SimpleNamespace(
+        id=task_id, name=name, project="p1", project_name="Офис", sequence_id=seq,
+        state_name="Todo", priority="none", assignee_name="Unassigned", target_date=None,
+        get_state_name=lambda: "Todo",
+    )
+
+
+@pytest.fixture
+def plane(monkeypatch):
+    calls = []
+
+    async def get_all_projects():
+        return PROJECTS
+
+    async def search_tasks(search_text, project_ids, limit=5):
+        calls.append((search_text, limit))
+        return [
+            (_task("t1", "Принтер", 1), SearchHit(doc_id="t1", score=5.0, matched=1, terms=4)),
+            (_task("t2", "Принтер в бухгалтерии не печатает", 2), SearchHit(doc_id="t2", score=4.0, matched=4, terms=4)),
+        ][:limit]
+
+    monkeypatch.setattr(plane_service.plane_api, "get_all_projects", get_all_projects)
+    monkeypatch.setattr(plane_service.plane_api, "search_tasks", search_tasks)
+    return calls
+
+
+@pytest.mark.asyncio
+class TestIssueSearchByName:
+    """Coverage filter applied to several candidates; search only for task-like questions."""
+
+    async def test_second_ranked_match_kept(self, plane):
+        result = await plane_service.find_issue_by_name("принтер в бухгалтерии не печатает")
+
+        assert result is not None
+        assert result[2]["id"] == "t2"
+
+    async def test_search_only_when_question_names_a_task(self, plane, monkeypatch):
+        async def summary(*args):
+            return "сводка"
+
+        async def no_reference(user_message):
+            return None
+
+        monkeypatch.setattr(handlers, "_find_referenced_issue", no_reference)
+        monkeypatch.setattr(handlers.plane_service, "get_my_tasks_summary", summary)
+        monkeypatch.setattr(handlers.plane_service, "get_workload_summary", summary)
+
+        await handlers._gather_plane_data("Какая нагрузка у команды?", "me@example.com")
+        assert plane == []
+
+        await handlers._gather_plane_data("Что с задачей про «принтер в бухгалтерии»?", "me@example.com")
+        assert [text for text, _ in plane] == ["принтер в бухгалтерии"]
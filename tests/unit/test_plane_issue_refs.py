@@ -0,0 +1,86 @@
+"""
+Tests for the persistent #123 / PROJ-123 issue reference table.
+
+Source: app/integrations/plane/issue_refs.py
+Redis is not connected in tests, so RedisService uses its in-memory fallback.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.integrations.plane import plane_api
+from app.integrations.plane.issue_refs import PlaneIssueRefStore, IssueRef, PROJECTS_KEY
+from app.services.redis_service import redis_service
+
+
+@pytest.fixture
+def store():
+    redis_service._fallback.clear()
+    yield PlaneIssueRefStore()
+    redis_service._fallback.clear()
+
+
+class TestIssueRefStore:
+    """Tests for record/resolve/remove."""
+
+    @pytest.mark.asyncio
+    async def test_resolve_by_identifier_and_sequence(self, store):
+        await store.record(IssueRef("proj-1", "issue-1", 123, "HHIVP"))
+
+        [by_ident] = await store.resolve("hhivp-123")
+        assert by_ident.issue_id == "issue-1"
+        assert [r.project_id for r in await store.resolve("#123")] == ["proj-1"]
+        assert await store.resolve("HHIVP-124") == []
+
+    @pytest.mark.asyncio
+    async def test_same_sequence_in_two_projects(self, store):
+        await store.record(IssueRef("proj-1", "issue-1", 5, "HHIVP"))
+        await store.record(IssueRef("proj-2", "issue-2", 5, "HARZL"))
+        await store.record(IssueRef("proj-1", "issue-1", 5, "HHIVP"))
+
+        refs = await store.resolve_sequence(5)
+        assert sorted(r.project_id for r in refs) == ["proj-1", "proj-2"]
+
+    @pytest.mark.asyncio
+    async def test_webhook_create_and_delete(self, store):
+        await redis_service.set_json(PROJECTS_KEY, {"proj-1": "HHIVP"}, ttl=None)
+
+        await store.record_from_webhook("created", {"id": "issue-9", "project": "proj-1", "sequence_id": 9})
+        assert (await store.resolve("HHIVP-9"))[0].issue_id == "issue-9"
+
+        await store.record_from_webhook("deleted", {"id": "issue-9", "project": "proj-1", "sequence_id": 9})
+        assert await store.resolve("HHIVP-9") == []
+        assert await store.resolve("#9") == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_records_keep_both_projects(self, store):
+        await asyncio.gather(
+            store.record(IssueRef("proj-1", "issue-1", 7, "HHIVP")),
+            store.record(IssueRef("proj-2", "issue-2", 7, "HARZL")),
+        )
+
+        refs = await store.resolve_sequence(7)
+        assert sorted(r.issue_id for r in refs) == ["issue-1", "issue-2"]
+
+
+class TestIssueRefSweep:
+    """Tests for the periodic full rebuild."""
+
+    @pytest.mark.asyncio
+    async def test_sweep_drops_issues_gone_from_index(self, store, monkeypatch):
+        await store.record(IssueRef("proj-1", "issue-1", 3, "HHIVP"))
+        await store.record(IssueRef("proj-2", "issue-old", 3, "HARZL"))
+
+        async def get_all_projects():
+            return [{"id": "proj-1", "identifier": "HHIVP"}, {"id": "proj-2", "identifier": "HARZL"}]
+
+        async def get_workspace_issues(project_ids, include_closed=False):
+            return [SimpleNamespace(id="issue-1", project="proj-1", sequence_id=3)]
+
+        monkeypatch.setattr(plane_api, "get_all_projects", get_all_projects)
+        monkeypatch.setattr(plane_api, "get_workspace_issues", get_workspace_issues)
+
+        assert await store.sweep() == 1
+        assert [r.issue_id for r in await store.resolve("#3")] == ["issue-1"]
@@ -0,0 +1,116 @@
+"""
+Tests for the cached Plane metadata registry.
+
+Source: app/integrations/plane/metadata.py
+"""
+
+import asyncio
+
+import pytest
+
+from app.integrations.plane.metadata import MEMBERS, PROJECTS, STATES, PlaneMetadataRegistry
+from app.integrations.plane.models import PlaneProject, PlaneUser
+
+
+class FakeClient:
+    """Counts Plane API calls per endpoint."""
+
+    workspace_slug = "ws"
+
+    def __init__(self):
+        self.calls = []
+        self.states = [{"id": "s-done", "name": "Done", "group": "completed"}]
+
+    async def get(self, session, endpoint, params=None):
+        self.calls.append(endpoint)
+        await asyncio.sleep(0)
+        return {"results": list(self.states)}
+
+
+class FakeProjects:
+    def __init__(self, client):
+        self.client = client
+
+    async def get_projects(self, session):
+        self.client.calls.append("projects")
+        return [PlaneProject(id="p1", name="Corp", identifier="CORP", workspace="ws")]
+
+
+class FakeUsers:
+    def __init__(self, client):
+        self.client = client
+        self.seen_projects = None
+
+    async def get_workspace_members(self, session, projects=None):
+        self.client.calls.append("members")
+        self.seen_projects = projects
+        return [PlaneUser(id="u1", email="a@example.com")]
+
+
+def _registry(**ttls):
+    client = FakeClient()
+    return PlaneMetadataRegistry(client, FakeProjects(client), FakeUsers(client), **ttls), client
+
+
+@pytest.mark.asyncio
+class TestPlaneMetadataRegistry:
+    """TTL caching, single flight, background refresh and invalidation."""
+
+    async def test_cached_after_first_fetch(self):
+        registry, client = _registry()
+        for _ in range(3):
+            await registry.get_projects(None)
+            await registry.get_members(None)
+            await registry.get_states(None, "p1")
+        # Members reuse the cached projects instead of fetching them again
+        assert client.calls == ["projects", "members", "/api/v1/workspaces/ws/projects/p1/states/"]
+        assert registry.users_manager.seen_projects[0].id == "p1"
+
+    async def test_concurrent_readers_share_one_request(self):
+        registry, client = _registry()
+        results = await asyncio.gather(*(registry.get_states(None, "p1") for _ in range(5)))
+        assert len(client.calls) == 1
+        assert all(r[0]["id"] == "s-done" for r in results)
+
+    async def test_expired_entry_served_while_refreshing(self):
+        registry, client = _registry(states_ttl=0)
+        await registry.get_states(None, "p1")
+        client.states = [{"id": "s-new", "name": "Closed", "group": "completed"}]
+
+        stale = await registry.get_states(None, "p1")
+        assert stale[0]["id"] == "s-done"
+        await asyncio.gather(*registry._refreshing.values())
+        assert registry._entries[(STATES, "p1")].value[0]["id"] == "s-new"
+        assert registry.get_stats()["stale_hits"] == 1
+
+    async def test_empty_results_not_cached(self):
+        registry, client = _registry()
+        client.states = []
+        await registry.get_states(None, "p1")
+        await registry.get_states(None, "p1")
+        assert len(client.calls) == 2
+
+    async def test_webhook_invalidation(self):
+        registry, client = _registry()
+        await registry.get_projects(None)
+        await registry.get_members(None)
+        await registry.get_states(None, "p1")
+
+        # Known state and assignee: nothing dropped
+        registry.apply_webhook("issue", "updated", {"project": "p1", "state": {"id": "s-done"}, "assignees": ["u1"]})
+        assert set(registry._entries) == {(PROJECTS, None), (MEMBERS, None), (STATES, "p1")}
+
+        # Unknown state / assignee: that project's states and the members are re-fetched
+        registry.apply_webhook("issue", "updated", {"project": "p1", "state": "s-other", "assignees": ["u2"]})
+        assert set(registry._entries) == {(PROJECTS, None)}
+
+        registry.apply_webhook("project", "updated", {"id": "p1"})
+        assert registry._entries == {}
+
+    async def test_invalidation_discards_load_in_flight(self):
+        registry, client = _registry()
+        load = asyncio.create_task(registry.get_states(None, "p1"))
+        await asyncio.sleep(0)
+        registry.invalidate(STATES, "p1")
+        await load
+        assert (STATES, "p1") not in registry._entries
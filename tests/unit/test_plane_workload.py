@@ -0,0 +1,53 @@
+"""
+Tests for single-pass team workload aggregation.
+
+Source: app/integrations/plane/workload.py
+"""
+
+from datetime import datetime, timezone, timedelta
+
+from app.integrations.plane.workload import aggregate_workload, UNASSIGNED
+
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+class TestAggregateWorkload:
+    """Tests for aggregate_workload()."""
+
+    def test_counts_per_member_priority_and_state(self, plane_task_factory):
+        tasks = [
+            plane_task_factory(assignees=["u1"], priority="urgent", state_name="Todo"),
+            plane_task_factory(assignees=["u1"], priority="low", state_name="In Progress"),
+            plane_task_factory(assignees=[{"id": "u2", "email": "b@x"}], priority="high"),
+        ]
+        workload = aggregate_workload(tasks, now=NOW)
+
+        assert workload["u1"].total == 2
+        assert workload["u1"].urgent == 1
+        assert workload["u1"].by_state == {"Todo": 1, "In Progress": 1}
+        assert workload["u2"].by_priority["high"] == 1
+
+    def test_shared_task_counts_for_each_assignee(self, plane_task_factory):
+        workload = aggregate_workload([plane_task_factory(assignees=["u1", "u2"])], now=NOW)
+        assert workload["u1"].total == workload["u2"].total == 1
+
+    def test_unassigned_bucket(self, plane_task_factory):
+        workload = aggregate_workload([plane_task_factory(assignees=[])], now=NOW)
+        assert workload[UNASSIGNED].total == 1
+
+    def test_overdue_and_stale(self, plane_task_factory):
+        task = plane_task_factory(
+            assignees=["u1"],
+            target_date=(NOW - timedelta(days=2)).date().isoformat(),
+        )
+        task.updated_at = (NOW - timedelta(days=30)).isoformat()
+        fresh = plane_task_factory(
+            assignees=["u1"],
+            target_date=(NOW + timedelta(days=2)).date().isoformat(),
+        )
+        fresh.updated_at = NOW.isoformat()
+
+        stats = aggregate_workload([task, fresh], now=NOW)["u1"]
+        assert stats.overdue == 1
+        assert stats.stale == 1
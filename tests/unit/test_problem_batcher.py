@@ -0,0 +1,163 @@
+"""
+Tests for batched AI problem detection.
+
+Source: app/services/problem_batcher.py
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import problem_batcher as batcher_module
+from app.services.problem_batcher import ProblemDetectionBatcher
+from app.services.chat_context_service import chat_message_writer
+from app.services.problem_detector_service import problem_detector
+
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    calls = []
+
+    async def fake_chat(user_message, system_prompt=None, **kwargs):
+        calls.append(user_message)
+        verdicts = [
+            {"id": 1, "is_problem": True, "confidence": 0.9, "type": "urgent", "title": "Сервер упал"},
+            {"id": 2, "is_problem": False},
+        ]
+        return SimpleNamespace(content=json.dumps(verdicts, ensure_ascii=False))
+
+    async def fake_context(chat_id, limit=None, include_metadata=False):
+        return [{"user": "Дима", "text": "Доброе утро", "type": "text"}]
+
+    monkeypatch.setattr(batcher_module.ai_manager, "chat", fake_chat)
+    monkeypatch.setattr(batcher_module.chat_context_service, "get_context", fake_context)
+    problem_detector._last_detection.clear()
+    yield calls
+    problem_detector._last_detection.clear()
+
+
+class TestProblemDetectionBatcher:
+    """One AI call per window, one verdict per message."""
+
+    @pytest.mark.asyncio
+    async def test_messages_in_window_share_one_call(self, fake_ai):
+        batcher = ProblemDetectionBatcher(window_seconds=0.05, max_batch=10)
+
+        first, second = await asyncio.gather(
+            batcher.analyze(-100, "Костя", "Срочно! Сервер упал и не отвечает"),
+            batcher.analyze(-100, "Костя", "Спасибо, посмотрим завтра утром"),
+        )
+
+        assert len(fake_ai) == 1
+        assert "Доброе утро" in fake_ai[0]
+        assert first.problem_type == "urgent"
+        assert second is None
+        assert batcher.get_stats()["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_short_messages_only_extend_context(self, fake_ai):
+        batcher = ProblemDetectionBatcher(window_seconds=0.01, max_batch=10)
+
+        assert await batcher.analyze(-200, "Костя", "ок") is None
+        assert fake_ai == []
+        assert ("Костя", "ок") in batcher._chats[-200].context
+
+    @pytest.mark.asyncio
+    async def test_non_numeric_confidence(self, fake_ai, monkeypatch):
+        async def fake_chat(user_message, system_prompt=None, **kwargs):
+            verdicts = [
+                {"id": 1, "is_problem": True, "confidence": "high", "type": "urgent"},
+                {"id": 2, "is_problem": True, "confidence": [0.9], "type": "problem"},
+            ]
+            return SimpleNamespace(content=json.dumps(verdicts))
+
+        monkeypatch.setattr(batcher_module.ai_manager, "chat", fake_chat)
+        batcher = ProblemDetectionBatcher(window_seconds=0.01, max_batch=10)
+
+        first, second = await asyncio.gather(
+            batcher.analyze(-300, "Костя", "Срочно! Сервер упал и не отвечает"),
+            batcher.analyze(-300, "Костя", "Принтер опять не печатает документы"),
+        )
+
+        assert first.confidence == 0.9
+        assert second is None  # Unparseable confidence falls back to 0.5
+
+    @pytest.mark.asyncio
+    async def test_failing_verdict_does_not_block_other_messages(self, fake_ai, monkeypatch):
+        to_result = ProblemDetectionBatcher._to_result
+
+        def flaky_to_result(message_text, verdict):
+            if "Сервер" in message_text:
+                raise ValueError("broken verdict")
+            return to_result(message_text, verdict)
+
+        batcher = ProblemDetectionBatcher(window_seconds=0.01, max_batch=10)
+        monkeypatch.setattr(batcher, "_to_result", flaky_to_result)
+
+        first, second = await asyncio.wait_for(asyncio.gather(
+            batcher.analyze(-400, "Костя", "Срочно! Сервер упал и не отвечает"),
+            batcher.analyze(-400, "Костя", "Спасибо, посмотрим завтра утром"),
+        ), timeout=1)
+
+        assert first is None and second is None
+        assert batcher.get_stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_one_alert_per_chat_and_cooldown(self, fake_ai, monkeypatch):
+        async def fake_chat(user_message, system_prompt=None, **kwargs):
+            verdicts = [
+                {"id": i, "is_problem": True, "confidence": confidence, "type": "problem"}
+                for i, confidence in enumerate((0.7, 0.95, 0.8), start=1)
+            ]
+            return SimpleNamespace(content=json.dumps(verdicts))
+
+        monkeypatch.setattr(batcher_module.ai_manager, "chat", fake_chat)
+        batcher = ProblemDetectionBatcher(window_seconds=0.01, max_batch=3)
+        texts = ["Принтер опять не печатает", "Срочно! Сервер упал совсем", "Почта не открывается с утра"]
+
+        results = await asyncio.gather(*(batcher.analyze(-500, "Костя", text) for text in texts))
+        assert [r.confidence if r else None for r in results] == [None, 0.95, None]
+
+        # Cooldown started by the first batch: the next one raises nothing
+        monkeypatch.setattr(problem_detector, "_check_rate_limit", lambda chat_id: True)
+        batch = [batcher.analyze(-500, "Костя", text) for text in texts]
+        monkeypatch.setattr(problem_detector, "_check_rate_limit", lambda chat_id: False)
+        assert await asyncio.gather(*batch) == [None, None, None]
+
+    @pytest.mark.asyncio
+    async def test_seed_includes_unflushed_messages(self, fake_ai, monkeypatch):
+        queued = [
+            dict(chat_id=-600, message_id=5, user_id=1, username="olga", message_text="Пропал интернет в офисе"),
+            dict(chat_id=-601, message_id=6, user_id=1, username="olga", message_text="Другой чат"),
+            dict(chat_id=-600, message_id=7, user_id=2, username="kostya", message_text="Не работает сканер на этаже"),
+        ]
+        monkeypatch.setattr(chat_message_writer, "_rows", queued)
+        batcher = ProblemDetectionBatcher(window_seconds=0.01, max_batch=10)
+
+        await batcher.analyze(-600, "kostya", "Не работает сканер на этаже")
+
+        # The current (queued) message is not seeded, only appended once analysed
+        assert list(batcher._chats[-600].context) == [
+            ("Дима", "Доброе утро"), ("olga", "Пропал интернет в офисе"), ("kostya", "Не работает сканер на этаже"),
+        ]
+        assert "Другой чат" not in fake_ai[0]
+
+    @pytest.mark.asyncio
+    async def test_records_verdicts_of_judged_messages(self, fake_ai, monkeypatch):
+        recorded = {}
+
+        async def record_ai_verdicts(chat_id, verdicts):
+            recorded.update(verdicts)
+
+        monkeypatch.setattr(batcher_module.chat_context_service, "record_ai_verdicts", record_ai_verdicts)
+        batcher = ProblemDetectionBatcher(window_seconds=0.01, max_batch=10)
+
+        await asyncio.gather(
+            batcher.analyze(-700, "Костя", "Срочно! Сервер упал и не отвечает", message_id=11),
+            batcher.analyze(-700, "Костя", "Спасибо, посмотрим завтра утром", message_id=12),
+            batcher.analyze(-700, "Костя", "Третье сообщение без вердикта от AI", message_id=13),
+        )
+
+        assert recorded == {11: "problem", 12: "none"}
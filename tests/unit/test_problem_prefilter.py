@@ -0,0 +1,113 @@
+"""
+Tests for the local problem pre-filter.
+
+Source: app/services/problem_prefilter.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+import random
+
+import pytest
+from sqlalchemy import select
+
+from app.database.chat_ai_models import ChatMessage, DetectedIssue
+from app.database.database import AsyncSessionLocal, engine
+from app.services.chat_context_service import chat_context_service, chat_message_writer
+from app.services.problem_prefilter import ANALYZE, SKIP, ProblemPrefilter, train_model
+
+PROBLEMS = [
+    "Не работает принтер в бухгалтерии",
+    "Сервер упал, ничего не открывается",
+    "Срочно! Не запускается 1С у директора",
+    "Почта не отвечает уже час, помогите",
+    "Ошибка при входе в CRM, пишет доступ запрещен",
+    "Интернет тормозит на втором этаже",
+    "Вылетает программа при печати накладных",
+    "Не могу подключиться к VPN из дома",
+]
+CHATTER = [
+    "Спасибо, хорошего вечера всем",
+    "Доброе утро коллеги, с понедельником",
+    "Отправил документы по почте вчера",
+    "Завтра встреча переносится на 15:00",
+    "Обед привезли, кто будет пиццу",
+    "Отлично, договорились тогда так",
+    "Счёт оплатили, закрывающие пришлём",
+    "Буду в офисе после обеда",
+]
+
+
+def _samples():
+    rng = random.Random(1)
+    samples = [(f"{rng.choice(PROBLEMS)} #{i}", 1) for i in range(60)]
+    samples += [(f"{rng.choice(CHATTER)} #{i}", 0) for i in range(240)]
+    rng.shuffle(samples)
+    return samples
+
+
+class TestPrefilter:
+    """Training keeps recall and lets the gate skip chatter."""
+
+    def test_untrained_gate_sends_everything_to_ai(self):
+        gate = ProblemPrefilter()
+        assert gate.decide("Доброе утро коллеги") == ANALYZE
+
+    def test_not_enough_positives(self):
+        assert train_model([("Сервер упал", 1), ("Привет всем", 0)] * 5, min_recall=0.98) is None
+
+    def test_trained_model_keeps_recall_and_skips_chatter(self):
+        model = train_model(_samples(), min_recall=0.98)
+        assert model["report"]["recall"] >= 0.98
+        assert model["report"]["skip_rate"] > 0.5
+
+        gate = ProblemPrefilter()
+        gate.load(model)
+        gate._rng = random.Random(0)
+        assert gate.decide("Не работает принтер в бухгалтерии, помогите") == ANALYZE
+        decisions = [gate.decide(text) for text in CHATTER]
+        assert decisions.count(SKIP) >= len(CHATTER) // 2
+
+
+@pytest.fixture
+async def history_tables():
+    async with engine.begin() as conn:
+        for table in (ChatMessage.__table__, DetectedIssue.__table__):
+            await conn.run_sync(table.create, checkfirst=True)
+    yield
+    async with engine.begin() as conn:
+        for table in (ChatMessage.__table__, DetectedIssue.__table__):
+            await conn.run_sync(table.drop)
+
+
+@pytest.mark.asyncio
+class TestTrainingSamples:
+    """Negatives come only from messages the LLM judged."""
+
+    async def test_only_ai_judged_messages_are_negatives(self, history_tables):
+        async with AsyncSessionLocal() as session:
+            session.add(DetectedIssue(chat_id=-1, message_id=1, issue_type="problem", original_text=PROBLEMS[0]))
+            for mid, text, verdict in [
+                (1, PROBLEMS[0], "problem"),
+                (2, CHATTER[0], "none"),
+                (3, CHATTER[1], None),  # Skipped by the gate, never seen by the LLM
+                (4, PROBLEMS[1], "problem"),  # Held back by the cooldown
+            ]:
+                session.add(ChatMessage(chat_id=-1, message_id=mid, user_id=1, message_text=text, ai_verdict=verdict))
+            await session.commit()
+
+        samples = await ProblemPrefilter._load_samples(days=30)
+
+        assert sorted(samples) == sorted([(PROBLEMS[0], 1), (CHATTER[0], 0)])
+
+    async def test_verdicts_recorded_in_buffer_and_db(self, history_tables, monkeypatch):
+        async with AsyncSessionLocal() as session:
+            session.add(ChatMessage(chat_id=-1, message_id=1, user_id=1, message_text=CHATTER[0]))
+            await session.commit()
+        queued = [dict(chat_id=-1, message_id=2, user_id=1, message_text=PROBLEMS[0], ai_verdict=None)]
+        monkeypatch.setattr(chat_message_writer, "_rows", queued)
+
+        await chat_context_service.record_ai_verdicts(-1, {1: "none", 2: "problem"})
+
+        assert queued[0]["ai_verdict"] == "problem"
+        async with AsyncSessionLocal() as session:
+            assert (await session.execute(select(ChatMessage.ai_verdict))).scalars().all() == ["none"]
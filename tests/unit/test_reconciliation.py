@@ -0,0 +1,151 @@
+"""
+Tests for incremental, concurrent chat reconciliation.
+
+Source: app/modules/reconciliation/reconciliation_service.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.chat_ai_models import ChatMessage
+from app.modules.reconciliation import reconciliation_service as recon
+from app.modules.reconciliation.reconciliation_service import ExtractedIncident, ReconciliationService
+from app.utils.text_search import SearchHit
+
+INCIDENTS = json.dumps({"incidents": [{"title": "Не работает принтер в бухгалтерии", "is_resolved": True}]})
+
+
+@pytest.fixture
+async def chat_messages_table():
+    async with engine.begin() as conn:
+        await conn.run_sync(ChatMessage.__table__.create, checkfirst=True)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(ChatMessage.__table__.drop)
+
+
+async def _add_messages(chat_id, texts):
+    async with AsyncSessionLocal() as session:
+        for text in texts:
+            session.add(ChatMessage(chat_id=chat_id, user_id=1, username="client", message_text=text))
+        await session.commit()
+
+
+@pytest.fixture
+def linked_chats(monkeypatch):
+    mappings = [
+        SimpleNamespace(chat_id=-501, chat_title="Client A", plane_project_id="p1", plane_project_name="ACME"),
+        SimpleNamespace(chat_id=-502, chat_title="Client B", plane_project_id="p1", plane_project_name="ACME"),
+    ]
+
+    async def list_all_mappings(session, only_active=True):
+        return mappings
+
+    async def get_async_session():
+        yield None
+
+    monkeypatch.setattr(recon, "get_async_session", get_async_session)
+    monkeypatch.setattr(recon.redis_service, "_fallback", {})
+    monkeypatch.setattr(recon.support_requests_service, "list_all_mappings", list_all_mappings)
+    return mappings
+
+
+@pytest.fixture
+def fake_backends(monkeypatch):
+    calls = {"ai": [], "project_fetches": 0}
+
+    async def call_ai(self, user_message, system_prompt):
+        calls["ai"].append(user_message)
+        return INCIDENTS
+
+    async def get_project_tasks(self, project_id):
+        calls["project_fetches"] += 1
+        return []
+
+    async def get_company_name(self, plane_project_name):
+        return plane_project_name
+
+    async def get_project_identifier(self, project_id):
+        return "ACME"
+
+    monkeypatch.setattr(ReconciliationService, "_call_ai", call_ai)
+    monkeypatch.setattr(ReconciliationService, "_get_project_tasks", get_project_tasks)
+    monkeypatch.setattr(ReconciliationService, "_get_company_name", get_company_name)
+    monkeypatch.setattr(ReconciliationService, "_get_project_identifier", get_project_identifier)
+    return calls
+
+
+class TestReconciliation:
+    """Shared project fetch per run and per-chat high-water mark."""
+
+    @pytest.mark.asyncio
+    async def test_project_issues_fetched_once_per_run(self, chat_messages_table, linked_chats, fake_backends):
+        for mapping in linked_chats:
+            await _add_messages(mapping.chat_id, ["Не работает принтер в бухгалтерии, помогите срочно"])
+
+        items = await ReconciliationService(concurrency=2).run()
+
+        assert len(items) == 2
+        assert fake_backends["project_fetches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_second_run_only_sees_new_messages(self, chat_messages_table, linked_chats, fake_backends):
+        await _add_messages(-501, ["Утром упал сервер 1С у бухгалтерии, никто не может войти"])
+        await ReconciliationService().run()
+        assert len(fake_backends["ai"]) == 1
+
+        # Nothing new -> no AI call
+        assert await ReconciliationService().run() == []
+        assert len(fake_backends["ai"]) == 1
+
+        await _add_messages(-501, ["Вечером перестал печатать принтер на втором этаже"])
+        await ReconciliationService().run()
+        assert len(fake_backends["ai"]) == 2
+        new_part = fake_backends["ai"][1].split("(Новые сообщения:)")[1]
+        assert "принтер" in new_part and "сервер 1С" not in new_part
+
+        # Full-day run ignores the high-water mark
+        await ReconciliationService().run(incremental=False)
+        assert len(fake_backends["ai"]) == 3
+
+
+class TestTaskMatching:
+    """Explicit '#N' / own 'IDENT-N' references first, then the issue text search."""
+
+    TASKS = {10: {"id": "t10"}, 365: {"id": "t365"}}
+
+    def _match(self, text, identifier="ACME"):
+        incident = ExtractedIncident(title=text, description="", is_resolved=True)
+        return ReconciliationService()._match_task_reference(incident, self.TASKS, identifier)
+
+    def test_hash_and_project_identifier(self):
+        assert self._match("Принтер, см. #10") == {"id": "t10"}
+        assert self._match("Принтер, см. acme-365") == {"id": "t365"}
+
+    def test_other_prefixes_ignored(self):
+        assert self._match("Переустановили Windows-10") is None
+        assert self._match("Не активируется Office-365") is None
+        assert self._match("Ошибка в OTHER-10") is None
+
+    def test_later_reference_used_when_first_is_unknown(self):
+        assert self._match("После Windows-10 и #7 открыли ACME-10") == {"id": "t10"}
+
+    @pytest.mark.asyncio
+    async def test_fuzzy_match_uses_text_search(self, monkeypatch):
+        calls = []
+
+        async def search_tasks(search_text, project_ids, limit=5):
+            calls.append((search_text, project_ids))
+            return [(SimpleNamespace(id="t10"), SearchHit(doc_id="t10", score=3.0, matched=3, terms=4))]
+
+        monkeypatch.setattr(recon.plane_api, "search_tasks", search_tasks)
+        tasks = [{"id": "t10", "name": "Принтер в бухгалтерии"}]
+
+        matched = await ReconciliationService()._fuzzy_match_task("Не работает принтер в бухгалтерии", "p1", tasks)
+
+        assert matched == tasks[0]
+        assert calls == [("Не работает принтер в бухгалтерии", ["p1"])]
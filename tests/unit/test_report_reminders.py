@@ -0,0 +1,143 @@
+"""
+Tests for the batched task report reminder engine.
+
+Source: app/services/task_reports_service.py, app/services/scheduler.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.task_reports_models import TaskReport
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import DailyTasksScheduler
+from app.services.task_reports_service import reminder_level, task_reports_service
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def task_reports_table():
+    async with engine.begin() as conn:
+        await conn.run_sync(TaskReport.__table__.create, checkfirst=True)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(TaskReport.__table__.drop)
+
+
+async def _add_report(seq, closed_hours_ago, last_reminder_minutes_ago=None, status="pending"):
+    async with AsyncSessionLocal() as session:
+        report = TaskReport(
+            plane_issue_id=f"issue-{seq}", plane_sequence_id=seq, plane_project_id="p1",
+            task_title=f"Task {seq}", closed_at=NOW - timedelta(hours=closed_hours_ago), status=status,
+            last_reminder_at=(
+                NOW - timedelta(minutes=last_reminder_minutes_ago)
+                if last_reminder_minutes_ago is not None else None
+            ),
+        )
+        session.add(report)
+        await session.commit()
+        return report.id
+
+
+class TestReminderLevel:
+    """Escalation thresholds."""
+
+    def test_levels(self):
+        assert [reminder_level(h)[0] for h in (0.5, 1, 3.5, 7)] == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+class TestDueReminders:
+    """Due selection and batch update in SQL."""
+
+    async def test_selects_only_due_reports(self, task_reports_table):
+        due = await _add_report(1, closed_hours_ago=2)
+        cooled_down = await _add_report(2, closed_hours_ago=4, last_reminder_minutes_ago=30)
+        await _add_report(3, closed_hours_ago=0.5)  # Too fresh
+        await _add_report(4, closed_hours_ago=4, last_reminder_minutes_ago=10)  # Reminded recently
+        await _add_report(5, closed_hours_ago=9, status="completed")
+
+        async with AsyncSessionLocal() as session:
+            reports = await task_reports_service.get_due_reminders(session, NOW)
+        assert sorted(r.id for r in reports) == sorted([due, cooled_down])
+
+    async def test_mark_sent_updates_batch(self, task_reports_table):
+        first = await _add_report(1, closed_hours_ago=2)
+        second = await _add_report(2, closed_hours_ago=7)
+
+        async with AsyncSessionLocal() as session:
+            updated = await task_reports_service.mark_reminders_sent(session, {first: 1, second: 3}, NOW)
+        assert updated == 2
+
+        async with AsyncSessionLocal() as session:
+            rows = {r.id: r for r in (await session.execute(select(TaskReport))).scalars()}
+            assert (rows[first].reminder_count, rows[first].reminder_level) == (1, 1)
+            assert (rows[second].reminder_count, rows[second].reminder_level) == (1, 3)
+            reports = await task_reports_service.get_due_reminders(session, NOW + timedelta(minutes=5))
+        assert reports == []
+
+
+def _report(rid, hours, closed_by):
+    return SimpleNamespace(
+        id=rid, plane_sequence_id=100 + rid, task_title=f"Task {rid}", hours_since_closed=hours,
+        closed_by_telegram_id=closed_by, reminder_count=0,
+    )
+
+
+async def _run_reminders(monkeypatch, reports):
+    """Run one reminder pass; returns sent (chat_id, text, buttons) and marked levels"""
+    marked = {}
+    sent = []
+
+    async def get_due_reminders(session, now):
+        return reports
+
+    async def mark_reminders_sent(session, levels, now):
+        marked.update(levels)
+        return len(levels)
+
+    async def get_async_session():
+        yield None
+
+    class Bot:
+        async def send_message(self, chat_id, text, reply_markup, parse_mode):
+            sent.append((chat_id, text, len(reply_markup.inline_keyboard)))
+
+    monkeypatch.setattr(scheduler_module, "get_async_session", get_async_session)
+    monkeypatch.setattr(scheduler_module.task_reports_service, "get_due_reminders", get_due_reminders)
+    monkeypatch.setattr(scheduler_module.task_reports_service, "mark_reminders_sent", mark_reminders_sent)
+    monkeypatch.setattr(type(scheduler_module.settings), "admin_user_id_list", property(lambda self: [11, 22]))
+    scheduler = DailyTasksScheduler()
+    monkeypatch.setattr(scheduler, "_bot", lambda: Bot())
+
+    await scheduler._send_report_reminders(NOW)
+    return sent, marked
+
+
+@pytest.mark.asyncio
+class TestSendReportReminders:
+    """One message per admin, one UPDATE per run."""
+
+    async def test_groups_reports_per_admin(self, monkeypatch):
+        reports = [_report(1, 1.5, 11), _report(2, 4, 11), _report(3, 8, 11)]
+
+        sent, marked = await _run_reminders(monkeypatch, reports)
+
+        # Admin 11 closed all three: one message with three buttons; the critical one also goes to 22
+        assert sorted((chat_id, buttons) for chat_id, _, buttons in sent) == [(11, 3), (22, 1)]
+        assert "3 задачам" in next(text for chat_id, text, _ in sent if chat_id == 11)
+        assert marked == {1: 1, 2: 2, 3: 3}
+
+    async def test_reports_without_button_stay_due(self, monkeypatch):
+        monkeypatch.setattr(scheduler_module, "REMINDER_MAX_BUTTONS", 2)
+        reports = [_report(1, 1.5, 11), _report(2, 4, 11), _report(3, 5, 11)]
+
+        sent, marked = await _run_reminders(monkeypatch, reports)
+
+        assert [(chat_id, buttons) for chat_id, _, buttons in sent] == [(11, 2)]
+        assert marked == {1: 1, 2: 2}
@@ -0,0 +1,106 @@
+"""
+Tests for the outbound Telegram delivery queue.
+
+Source: app/services/telegram_delivery.py
+"""
+
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+
+from app.services.telegram_delivery import (
+    DeliveryRequestMiddleware,
+    Priority,
+    TelegramDelivery,
+    TokenBucket,
+    delivery_priority,
+)
+
+
+class TestTokenBucket:
+    """Refill arithmetic."""
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        now = bucket.updated
+        bucket.take(now)
+        bucket.take(now)
+        assert bucket.ready_in(now) == pytest.approx(0.1)
+        assert bucket.ready_in(now + 0.1) == 0
+
+
+@pytest.mark.asyncio
+class TestTelegramDelivery:
+    """Pacing, priorities and flood control."""
+
+    async def test_per_chat_pacing(self):
+        delivery = TelegramDelivery(global_rate=1000, private_rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(3):
+            await delivery.acquire(1)
+        # First token is immediate, then 1/20s per message
+        assert time.monotonic() - start >= 0.09
+        assert delivery.get_stats()["queued"] == 2
+
+    async def test_alerts_overtake_bulk(self):
+        delivery = TelegramDelivery(global_rate=1000, private_rate=50, burst=1)
+        await delivery.acquire(1)  # Drain the burst so the next sends queue
+        order = []
+
+        async def send(tag, priority):
+            await delivery.deliver(1, lambda: asyncio.sleep(0, result=order.append(tag)), priority)
+
+        await asyncio.gather(
+            send("digest-1", Priority.BULK),
+            send("digest-2", Priority.BULK),
+            send("alert", Priority.ALERT),
+        )
+        assert order == ["alert", "digest-1", "digest-2"]
+        assert delivery.get_stats()["by_priority"]["ALERT"] == 1
+
+    async def test_retry_after_pauses_chat_and_retries(self):
+        delivery = TelegramDelivery(global_rate=1000, private_rate=1000, max_retries=2)
+        calls = []
+
+        async def send():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise TelegramRetryAfter(method=None, message="Flood", retry_after=0.1)
+            return "ok"
+
+        assert await delivery.deliver(5, send) == "ok"
+        assert calls[1] - calls[0] >= 0.09
+        assert delivery.get_stats()["retry_after"] == 1
+
+    async def test_gives_up_after_max_retries(self):
+        delivery = TelegramDelivery(global_rate=1000, private_rate=1000, max_retries=0)
+
+        async def send():
+            raise TelegramRetryAfter(method=None, message="Flood", retry_after=0)
+
+        with pytest.raises(TelegramRetryAfter):
+            await delivery.deliver(5, send)
+        assert delivery.get_stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+class TestDeliveryRequestMiddleware:
+    """Only chat-posting methods are paced; priority comes from context."""
+
+    async def test_routes_sends_with_context_priority(self):
+        delivery = TelegramDelivery(global_rate=1000, private_rate=1000)
+        middleware = DeliveryRequestMiddleware(delivery)
+
+        async def make_request(bot, method):
+            return "response"
+
+        with delivery_priority(Priority.BULK):
+            await middleware(make_request, None, SendMessage(chat_id=1, text="hi"))
+        await middleware(make_request, None, AnswerCallbackQuery(callback_query_id="1"))
+
+        stats = delivery.get_stats()
+        assert stats["sent"] == 1
+        assert stats["by_priority"]["BULK"] == 1
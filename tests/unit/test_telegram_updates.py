@@ -0,0 +1,135 @@
+"""
+Tests for Telegram webhook ingestion.
+
+Source: app/webhooks/telegram_updates.py
+"""
+
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.webhooks.telegram_updates import SECRET_HEADER, TelegramUpdateReceiver, webhook_path
+
+SECRET = "s3cret"
+
+
+def _update(update_id: int, text: str = "hi") -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "U"},
+            "text": text,
+        },
+    }
+
+
+async def _client(receiver: TelegramUpdateReceiver, dispatcher: Dispatcher) -> TestClient:
+    app = web.Application()
+    receiver.register(app, dispatcher, Bot("42:TEST"), path="/tg", secret=SECRET)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client
+
+
+def test_webhook_path_from_url():
+    assert webhook_path("https://bot.example.com/hooks/tg") == "/hooks/tg"
+    assert webhook_path("https://bot.example.com") == "/webhooks/telegram"
+
+
+@pytest.mark.asyncio
+class TestTelegramUpdateReceiver:
+    """Secret validation, startup gate and bounded concurrency."""
+
+    async def test_rejects_bad_secret(self):
+        receiver = TelegramUpdateReceiver(max_concurrency=2)
+        receiver.open()
+        client = await _client(receiver, Dispatcher())
+        try:
+            resp = await client.post("/tg", json=_update(1))
+            assert resp.status == 401
+            resp = await client.post("/tg", json=_update(1), headers={SECRET_HEADER: "wrong"})
+            assert resp.status == 401
+        finally:
+            await client.close()
+        assert receiver.get_stats()["rejected"] == 2
+
+    async def test_feeds_dispatcher_with_bounded_concurrency(self):
+        release = asyncio.Event()
+        running, peak, seen = [0], [0], []
+        router = Router()
+
+        @router.message()
+        async def handler(message: Message):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await release.wait()
+            seen.append(message.message_id)
+            running[0] -= 1
+
+        dispatcher = Dispatcher()
+        dispatcher.include_router(router)
+        receiver = TelegramUpdateReceiver(max_concurrency=2)
+        client = await _client(receiver, dispatcher)
+        try:
+            posts = [
+                asyncio.create_task(client.post("/tg", json=_update(i), headers={SECRET_HEADER: SECRET}))
+                for i in range(1, 5)
+            ]
+            await asyncio.sleep(0.1)
+            assert running[0] == 0  # Held until startup completes
+
+            receiver.open()
+            await asyncio.sleep(0.1)
+            assert running[0] == 2
+            assert sum(p.done() for p in posts) == 2  # The rest wait for a free slot
+
+            release.set()
+            responses = await asyncio.gather(*posts)
+            await receiver.close()
+        finally:
+            await client.close()
+
+        assert [r.status for r in responses] == [200] * 4
+        assert sorted(seen) == [1, 2, 3, 4]
+        assert peak[0] == 2
+        assert receiver.get_stats()["handled"] == 4
+
+    async def test_busy_slot_answers_503_and_redelivery_runs_once(self):
+        release = asyncio.Event()
+        seen = []
+        router = Router()
+
+        @router.message()
+        async def handler(message: Message):
+            seen.append(message.message_id)
+            await release.wait()
+
+        dispatcher = Dispatcher()
+        dispatcher.include_router(router)
+        receiver = TelegramUpdateReceiver(max_concurrency=1, slot_timeout=0.1)
+        receiver.open()
+        client = await _client(receiver, dispatcher)
+        headers = {SECRET_HEADER: SECRET}
+        try:
+            assert (await client.post("/tg", json=_update(1), headers=headers)).status == 200
+            assert (await client.post("/tg", json=_update(2), headers=headers)).status == 503
+
+            release.set()
+            await asyncio.sleep(0.05)
+            # Telegram retries the rejected update and repeats an acknowledged one
+            assert (await client.post("/tg", json=_update(2), headers=headers)).status == 200
+            assert (await client.post("/tg", json=_update(1), headers=headers)).status == 200
+            await receiver.close()
+        finally:
+            await client.close()
+
+        assert seen == [1, 2]
+        stats = receiver.get_stats()
+        assert (stats["busy"], stats["duplicates"], stats["handled"]) == (1, 1, 2)
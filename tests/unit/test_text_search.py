@@ -0,0 +1,50 @@
+"""
+Tests for the RU/EN full-text index.
+
+Source: app/utils/text_search.py
+"""
+
+from app.utils.text_search import TextIndex, normalize_tokens
+
+
+class TestNormalizeTokens:
+    """Stemming, transliteration and stopwords."""
+
+    def test_russian_and_english_forms_meet(self):
+        assert normalize_tokens("принтера") == normalize_tokens("принтер") == normalize_tokens("printer")
+        assert normalize_tokens("1С") == normalize_tokens("1C")
+
+    def test_stopwords_dropped(self):
+        assert normalize_tokens("не работает в офисе") == normalize_tokens("работает офисе")
+
+
+class TestTextIndex:
+    """BM25 ranking, fuzzy expansion and incremental updates."""
+
+    def _index(self):
+        index = TextIndex()
+        index.add("a", "Не печатает принтер в бухгалтерии")
+        index.add("b", "Настроить VPN для удалённых сотрудников")
+        index.add("c", "Обновить 1C Бухгалтерия", "Релиз 3.0.150")
+        return index
+
+    def test_ranking(self):
+        hits = self._index().search("принтер бухгалтерия")
+        assert [h.doc_id for h in hits] == ["a", "c"]
+        assert hits[0].matched == 2 and hits[0].coverage == 1.0
+
+    def test_typo_and_script_tolerance(self):
+        index = self._index()
+        assert index.search("впн")[0].doc_id == "b"
+        assert index.search("принтр")[0].doc_id == "a"
+        assert index.search("принтр", fuzzy=False) == []
+
+    def test_incremental_update_and_remove(self):
+        index = self._index()
+        index.add("a", "Заменить картридж")
+        assert index.search("принтер") == []
+        assert index.search("картридж")[0].doc_id == "a"
+
+        index.retain(["a", "b"])
+        assert len(index) == 2
+        assert index.search("1С") == []
@@ -0,0 +1,51 @@
+"""
+Tests for the user identity cache.
+
+Source: app/services/user_cache.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+import pytest
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.models import BotUser
+from app.services.user_cache import UserIdentityCache
+
+
+@pytest.fixture
+async def bot_users_table():
+    async with engine.begin() as conn:
+        await conn.run_sync(BotUser.__table__.create, checkfirst=True)
+    async with AsyncSessionLocal() as session:
+        session.add(BotUser(telegram_user_id=28795547, role="admin", is_active=True))
+        await session.commit()
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(BotUser.__table__.drop)
+
+
+class TestUserIdentityCache:
+    """One DB lookup per TTL, explicit invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_hit_after_first_lookup(self, bot_users_table):
+        cache = UserIdentityCache(ttl=60)
+
+        user = await cache.get(28795547)
+        assert user.is_admin and user.is_active
+        assert await cache.get(28795547) is user
+        assert cache.get_stats()["misses"] == 1
+        assert cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_cached_until_invalidated(self, bot_users_table):
+        cache = UserIdentityCache(ttl=60)
+        assert await cache.get(555) is None
+
+        async with AsyncSessionLocal() as session:
+            session.add(BotUser(telegram_user_id=555, role="user", is_active=True))
+            await session.commit()
+
+        assert await cache.get(555) is None
+        cache.invalidate(555)
+        assert (await cache.get(555)).role == "user"
@@ -0,0 +1,75 @@
+"""
+Tests for indexed worker search and SQL statistics of the work journal.
+
+Source: app/services/work_journal_service.py
+Uses the in-memory SQLite engine provided by tests/conftest.py.
+"""
+
+from datetime import date
+
+import pytest
+
+from app.database.database import AsyncSessionLocal, engine
+from app.database.work_journal_models import WorkJournalEntry, WorkJournalEntryWorker
+from app.services.work_journal_service import WorkJournalService
+
+
+@pytest.fixture
+async def journal():
+    async with engine.begin() as conn:
+        await conn.run_sync(WorkJournalEntry.__table__.create, checkfirst=True)
+        await conn.run_sync(WorkJournalEntryWorker.__table__.create, checkfirst=True)
+
+    async with AsyncSessionLocal() as session:
+        service = WorkJournalService(session)
+        for day, company, travel, workers in [
+            (1, "ООО Ромашка", False, ["Тимофей Иванов", "Дмитрий"]),
+            (2, "ООО Ромашка", True, ["Дмитрий"]),
+            (3, "Acme Corp", False, ["Костя", "Дмитрий", "Костя"]),
+        ]:
+            await service.create_work_entry(
+                telegram_user_id=1, user_email="a@example.com", work_date=date(2026, 9, day),
+                company=company, work_duration="1 час", work_description="Работы",
+                is_travel=travel, worker_names=workers, created_by_user_id=1, created_by_name="Admin",
+            )
+        yield WorkJournalService(session)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(WorkJournalEntryWorker.__table__.drop)
+        await conn.run_sync(WorkJournalEntry.__table__.drop)
+
+
+@pytest.mark.asyncio
+class TestWorkJournalSearch:
+    """Worker/company filters."""
+
+    async def test_worker_filter_uses_entry_worker_rows(self, journal):
+        entries = await journal.get_work_entries(worker_name="иванов")
+        assert [e.work_date.day for e in entries] == [1]
+
+        entries = await journal.get_work_entries(worker_name="Дмитрий")
+        assert [e.work_date.day for e in entries] == [3, 2, 1]
+
+        entries = await journal.get_work_entries(worker_name="Дмитрий", company="corp")
+        assert [e.work_date.day for e in entries] == [3]
+
+
+@pytest.mark.asyncio
+class TestWorkJournalStatistics:
+    """Grouped SQL statistics."""
+
+    async def test_statistics(self, journal):
+        stats = await journal.get_statistics()
+
+        assert stats["total_entries"] == 3
+        assert stats["travel_count"] == 1 and stats["remote_count"] == 2
+        assert stats["companies"] == {"ООО Ромашка": 2, "Acme Corp": 1}
+        assert stats["workers"] == {"Дмитрий": 3, "Тимофей Иванов": 1, "Костя": 1}
+        assert stats["date_range"] == {"from": date(2026, 9, 1), "to": date(2026, 9, 3)}
+
+    async def test_statistics_filtered_by_date(self, journal):
+        stats = await journal.get_statistics(date_from=date(2026, 9, 2))
+        assert stats["total_entries"] == 2
+        assert stats["workers"] == {"Дмитрий": 2, "Костя": 1}
+
+        assert (await journal.get_statistics(date_from=date(2027, 1, 1)))["total_entries"] == 0